@@ -83,6 +83,9 @@ async def run() -> None:
         except asyncio.CancelledError:
             logger.debug("Message processing task cancelled successfully")
 
+        # 关闭Agent持有的工具服务会话
+        await agent.close()
+
     # 获取任务的输出结果
     output = task_node.get_output()
     logger.info(f"Task Output: {output}")
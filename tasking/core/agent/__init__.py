@@ -1,5 +1,8 @@
 from .interface import IAgent
 from .base import BaseAgent
+from .catalog import ToolCatalog, get_default_tool_catalog
+from .session import ToolSessionPool
+from .parallel import CONCURRENCY_SAFE_TAG, is_concurrency_safe
 from .react import build_react_agent, ReActStage, ReActEvent
 from .reflect import build_reflect_agent, ReflectStage, ReflectEvent
 from .orchestrate import OrchestrateStage, OrchestrateEvent, build_orch_agent
@@ -10,6 +13,10 @@ __all__ = [
     "IAgent",
     # Base Agent
     "BaseAgent",
+    # Tool Service
+    "ToolCatalog", "get_default_tool_catalog", "ToolSessionPool",
+    # Parallel Act
+    "CONCURRENCY_SAFE_TAG", "is_concurrency_safe",
     # Reason and Act Agent
     "ReActStage", "ReActEvent", "build_react_agent",
     # Reflect Agent
@@ -1,9 +1,10 @@
 import asyncio
 import inspect
-from collections.abc import Callable, Awaitable
+from collections.abc import Callable, Awaitable, Iterable
 from typing import Any
 from traceback import format_exc
 
+from loguru import logger
 from mcp.types import Tool as McpTool
 from fastmcp import Client
 from fastmcp.client.transports import ClientTransportT
@@ -11,12 +12,50 @@ from mcp.types import CallToolResult, TextContent
 from asyncer import asyncify
 
 from .interface import IAgent
+from .catalog import ToolCatalog, get_default_tool_catalog
+from .session import ToolSessionPool
 from ..state_machine.const import EventT, StateT
 from ..state_machine.task import ITask
 from ..state_machine.workflow import WorkflowEventT, WorkflowStageT, IWorkflow
-from ...model import CompletionConfig, Message, Role, ToolCallRequest
+from ...model import CompletionConfig, Message, Role, StopReason, ToolCallRequest
 from ...model.queue import IAsyncQueue, AsyncQueue
 from ...model.message import TextBlock, ImageBlock, VideoBlock
+from ...utils.string.message import extract_text_from_message
+from ...utils.string.xml import LabelEvent, StreamingLabelParser
+
+
+class _LabelStreamQueue(AsyncQueue[Message]):
+    """流式输出队列：放入消息块的同时增量解析其中的标签，标签闭合时立即调用回调"""
+    _parser: StreamingLabelParser
+    _on_label: Callable[[LabelEvent], None]
+
+    def __init__(self, on_label: Callable[[LabelEvent], None], labels: Iterable[str] | None = None) -> None:
+        """初始化流式输出队列
+
+        Args:
+            on_label (Callable[[LabelEvent], None]): 标签闭合时的回调，在放入消息块的协程中同步调用
+            labels (Iterable[str] | None): 需要监听的标签，None表示所有标签
+        """
+        super().__init__()
+        self._parser = StreamingLabelParser(labels)
+        self._on_label = on_label
+
+    def get_text(self) -> str:
+        """获取已放入队列的全部文本"""
+        return self._parser.get_text()
+
+    async def put(self, item: Message, block: bool = True, timeout: float | None = None) -> None:
+        await super().put(item, block, timeout)
+        self._feed(item)
+
+    async def put_nowait(self, item: Message) -> None:
+        await super().put_nowait(item)
+        self._feed(item)
+
+    def _feed(self, item: Message) -> None:
+        """私有方法：解析消息块中的文本"""
+        for event in self._parser.feed(extract_text_from_message(item)):
+            self._on_label(event)
 
 
 class BaseAgent(IAgent[WorkflowStageT, WorkflowEventT, StateT, EventT, ClientTransportT]):
@@ -28,6 +67,8 @@ class BaseAgent(IAgent[WorkflowStageT, WorkflowEventT, StateT, EventT, ClientTra
     _workflow_factory: Callable[[], IWorkflow[WorkflowStageT, WorkflowEventT, StateT, EventT]] | None
     # Tool Service
     _tool_service: Client[ClientTransportT] | None
+    _tool_catalog: ToolCatalog
+    _tool_session_pool: ToolSessionPool | None
 
     # Run Hooks
     _pre_run_once_hooks: list[Callable[
@@ -126,11 +167,27 @@ class BaseAgent(IAgent[WorkflowStageT, WorkflowEventT, StateT, EventT, ClientTra
         task (ITask[StateT, EventT]): 要运行的任务
     """
 
+    # Stream Label Hooks
+    _stream_label_hooks: list[Callable[
+        [dict[str, Any], IAsyncQueue[Message], LabelEvent, ITask[StateT, EventT]],
+        Awaitable[None] | None
+    ]]
+    """流式标签钩子函数列表，流式思考过程中标签闭合时按顺序执行。钩子函数的签名为:
+
+    Args:
+        context (dict[str, Any]): 任务运行时的上下文信息
+        queue (IQueue[Message]): 数据队列，用于输出任务运行过程中产生的数据
+        event (LabelEvent): 闭合的标签及其内容
+        task (ITask[StateT, EventT]): 要运行的任务
+    """
+
     def __init__(
         self,
         name: str,
         agent_type: str,
         tool_service: Client[ClientTransportT] | None = None,
+        tool_catalog: ToolCatalog | None = None,
+        tool_session_pool: ToolSessionPool | None = None,
     ) -> None:
         """初始化基础Agent实例，钩子函数列表为空，等待后续注册
 
@@ -138,12 +195,23 @@ class BaseAgent(IAgent[WorkflowStageT, WorkflowEventT, StateT, EventT, ClientTra
             name (str): Agent的名称
             agent_type (str): Agent的类型
             tool_service (Client[ClientTransportT] | None): 工具服务客户端实例，默认为None
+            tool_catalog (ToolCatalog | None): 工具目录缓存，默认为None，使用全局共享的工具目录缓存
+            tool_session_pool (ToolSessionPool | None): 工具服务会话池，默认为None，为工具服务创建单会话的会话池
+
+        Raises:
+            ValueError: 如果会话池与工具服务不对应
         """
         self._id = f"agent_{id(self)}"
         self._name = name
         self._type = agent_type
         self._workflow_factory = None
         self._tool_service = tool_service
+        self._tool_catalog = tool_catalog if tool_catalog is not None else get_default_tool_catalog()
+        if tool_session_pool is not None and tool_session_pool.get_tool_service() is not tool_service:
+            raise ValueError("工具服务会话池必须与 Agent 的工具服务对应")
+        if tool_session_pool is None and tool_service is not None:
+            tool_session_pool = ToolSessionPool(tool_service)
+        self._tool_session_pool = tool_session_pool
         # Hooks container
         self._pre_run_once_hooks = []
         self._post_run_once_hooks = []
@@ -153,6 +221,7 @@ class BaseAgent(IAgent[WorkflowStageT, WorkflowEventT, StateT, EventT, ClientTra
         self._post_think_hooks = []
         self._pre_act_hooks = []
         self._post_act_hooks = []
+        self._stream_label_hooks = []
 
     # ********** 基础信息 **********
 
@@ -211,7 +280,7 @@ class BaseAgent(IAgent[WorkflowStageT, WorkflowEventT, StateT, EventT, ClientTra
         return self._tool_service
     
     async def get_tools_with_tags(self, tags: set[str]) -> dict[str, McpTool]:
-        """从工具服务器获取具有指定标签集合的工具列表
+        """从工具服务器获取具有指定标签集合的工具列表，工具的所有标签都包含在给定标签集合中时才会被选中
         
         Args:
             tags (set[str]): 工具标签集合
@@ -219,24 +288,26 @@ class BaseAgent(IAgent[WorkflowStageT, WorkflowEventT, StateT, EventT, ClientTra
         Returns:
             dict[str, Tool]: 符合标签要求的工具名称到工具实例的映射字典
         """
-        all_tools_with_tags: dict[str, McpTool] = {}
-        if self._tool_service is None:
-            return all_tools_with_tags
+        if self._tool_service is None or self._tool_session_pool is None:
+            return {}
+
+        # 工具列表与标签索引由工具目录缓存，只在缓存失效时通过会话池访问工具服务
+        return await self._tool_catalog.get_tools_with_tags(
+            self._tool_service,
+            tags,
+            list_tools=self._tool_session_pool.list_tools,
+        )
 
-        async with self._tool_service:
-            all_tools = await self._tool_service.list_tools()
-            
-            # 过滤符合标签要求的工具
-            for tool in all_tools:
-                if hasattr(tool, "meta") and tool.meta:
-                    fastmcp_meta = tool.meta.get("_fastmcp", {})
-                    tool_tags = set(fastmcp_meta.get("tags", set[str]()))
-                    if tool_tags.issubset(tags):
-                        all_tools_with_tags[tool.name] = tool
-                else:
-                    # 没有 meta 信息，默认该工具可以被任意标签调用
-                    all_tools_with_tags[tool.name] = tool
-        return all_tools_with_tags
+    async def close(self) -> None:
+        """关闭 Agent 持有的工具服务会话"""
+        if self._tool_session_pool is not None:
+            await self._tool_session_pool.close()
+
+    async def __aenter__(self) -> "BaseAgent[WorkflowStageT, WorkflowEventT, StateT, EventT, ClientTransportT]":
+        return self
+
+    async def __aexit__(self, *_args: Any) -> None:
+        await self.close()
 
     async def call_tool(
         self,
@@ -316,18 +387,18 @@ class BaseAgent(IAgent[WorkflowStageT, WorkflowEventT, StateT, EventT, ClientTra
             arguments.update(context=context)  # 注入上下文信息，如用户ID/TraceID等
 
             try:
-                async with self._tool_service as client:
-                    # 2.2 调用工具服务（假设Client有async_request方法，参数为工具名+参数，若实际接口不同需调整）
-                    tool_call_result = await client.call_tool(
-                        name=name,
-                        arguments=arguments,
-                    )
-                    # 2.3. 转换最终结果
-                    result = CallToolResult(
-                        content=tool_call_result.content,
-                        structuredContent=tool_call_result.structured_content,
-                        isError=tool_call_result.is_error,
-                    )
+                # 2.2 通过长连接会话池调用工具服务，避免每次调用都重新建立连接
+                assert self._tool_session_pool is not None
+                tool_call_result = await self._tool_session_pool.call_tool(
+                    name=name,
+                    arguments=arguments,
+                )
+                # 2.3. 转换最终结果
+                result = CallToolResult(
+                    content=tool_call_result.content,
+                    structuredContent=tool_call_result.structured_content,
+                    isError=tool_call_result.is_error,
+                )
             except RuntimeError as e:
                 # 遇到 FastMcp 客户端抛出的运行时错误，继续向外抛出
                 raise e
@@ -597,8 +668,30 @@ class BaseAgent(IAgent[WorkflowStageT, WorkflowEventT, StateT, EventT, ClientTra
                     await asyncify(hook)(context, queue, None, task)
                     
         else:
-            # 创建流式输出队列
-            stream_queue: IAsyncQueue[Message] = AsyncQueue[Message]()
+            # 创建流式输出队列，需要监听标签时在放入消息块的同时增量解析标签
+            # `label` 表示标签闭合即停止，`label=value` 表示标签内容等于 value（忽略大小写）时才停止
+            stop_labels: dict[str, str | None] = {}
+            for stop_label in completion_config.stop_labels:
+                label, sep, value = stop_label.partition("=")
+                stop_labels[label.strip().lower()] = value.strip().lower() if sep else None
+            stopped_by: LabelEvent | None = None
+            label_events: asyncio.Queue[LabelEvent | None] = asyncio.Queue()
+            stream_queue: IAsyncQueue[Message]
+            if stop_labels or self._stream_label_hooks:
+                def on_label(event: LabelEvent) -> None:
+                    nonlocal stopped_by
+                    if self._stream_label_hooks:
+                        label_events.put_nowait(event)
+                    # 终止标签闭合后立即取消生成，不再等待剩余的输出
+                    if event.label in stop_labels and stopped_by is None:
+                        expected = stop_labels[event.label]
+                        if expected is None or event.content.strip().lower() == expected:
+                            stopped_by = event
+                            think_task.cancel()
+                stream_queue = _LabelStreamQueue(on_label, None if self._stream_label_hooks else stop_labels)
+            else:
+                stream_queue = AsyncQueue[Message]()
+
             # 处理流式输出
             async def process_stream() -> None:
                 for hook in self._post_think_hooks:
@@ -608,6 +701,20 @@ class BaseAgent(IAgent[WorkflowStageT, WorkflowEventT, StateT, EventT, ClientTra
                         await asyncify(hook)(context, queue, stream_queue, task)
             stream_task = asyncio.create_task(process_stream())
 
+            # 处理闭合的标签，钩子出错时取消生成
+            async def process_labels() -> None:
+                try:
+                    while (event := await label_events.get()) is not None:
+                        for hook in self._stream_label_hooks:
+                            if inspect.iscoroutinefunction(hook):
+                                await hook(context, queue, event, task)
+                            else:
+                                await asyncify(hook)(context, queue, event, task)
+                except BaseException:
+                    think_task.cancel()
+                    raise
+            label_task = asyncio.create_task(process_labels())
+
             # 创建思考任务
             think_task = asyncio.create_task(
                 llm.completion(
@@ -619,8 +726,17 @@ class BaseAgent(IAgent[WorkflowStageT, WorkflowEventT, StateT, EventT, ClientTra
                 )
             )
 
-            # 等待思考任务完成（LLM流式输出完成）
-            await think_task
+            # 等待思考任务完成（LLM流式输出完成，或被终止标签/标签钩子取消）
+            try:
+                await think_task
+            except asyncio.CancelledError:
+                current_task = asyncio.current_task()
+                if current_task is not None and current_task.cancelling():
+                    label_task.cancel()
+                    raise
+            except BaseException:
+                label_task.cancel()
+                raise
 
             # 等待队列中所有数据都被消费完再关闭
             # 使用短暂的超时轮询来等待队列为空，避免无限阻塞
@@ -630,9 +746,22 @@ class BaseAgent(IAgent[WorkflowStageT, WorkflowEventT, StateT, EventT, ClientTra
             await stream_queue.close()
             # 等待流式处理任务完成
             await stream_task
+            # 等待所有标签处理完成，标签钩子的异常（如 HumanInterfere）在这里抛出
+            label_events.put_nowait(None)
+            await label_task
 
             # 获取思考结果
-            think_result = think_task.result()
+            if stopped_by is not None and think_task.cancelled():
+                # 终止标签闭合时的生成结果：截取到结束标签为止的文本，工具调用和 token 用量不可用
+                assert isinstance(stream_queue, _LabelStreamQueue)
+                logger.info(f"[Agent] 标签 <{stopped_by.label}> 已闭合，提前结束生成")
+                think_result = Message(
+                    role=Role.ASSISTANT,
+                    content=[TextBlock(text=stream_queue.get_text()[:stopped_by.end])],
+                    stop_reason=StopReason.STOP,
+                )
+            else:
+                think_result = think_task.result()
             # 更新到任务上下文中
             task.append_context(think_result)
 
@@ -675,6 +804,26 @@ class BaseAgent(IAgent[WorkflowStageT, WorkflowEventT, StateT, EventT, ClientTra
         """
         self._post_think_hooks.append(hook)
 
+    def add_stream_label_hook(
+        self,
+        hook: Callable[
+            [dict[str, Any], IAsyncQueue[Message], LabelEvent, ITask[StateT, EventT]],
+            Awaitable[None] | None
+        ],
+    ) -> None:
+        """添加流式标签钩子函数，流式思考时每个标签第一次闭合就会调用，不必等待生成结束。
+        钩子抛出的异常会取消生成，并在思考结束时从 `think` 抛出（如 HumanInterfere）
+
+        参数:
+            hook (Callable):
+                流式标签钩子函数，接受上下文信息/输出队列/标签事件/任务，函数签名如下：
+                - context: dict[str, Any]
+                - queue: IQueue[Message]
+                - event: LabelEvent
+                - task: ITask[StateT, EventT]
+        """
+        self._stream_label_hooks.append(hook)
+
     async def act(
         self,
         context: dict[str, Any],
@@ -0,0 +1,217 @@
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+from weakref import WeakKeyDictionary
+
+from loguru import logger
+from fastmcp import Client
+from mcp.types import Tool as McpTool, ToolListChangedNotification
+
+
+def get_tool_tags(tool: McpTool) -> frozenset[str]:
+    """获取 fastmcp 工具的标签集合，没有 meta 信息的工具返回空集合
+
+    Args:
+        tool (McpTool): 工具实例
+
+    Returns:
+        frozenset[str]: 工具标签集合
+    """
+    if hasattr(tool, "meta") and tool.meta:
+        fastmcp_meta = tool.meta.get("_fastmcp", {})
+        return frozenset(fastmcp_meta.get("tags", set[str]()))
+    return frozenset()
+
+
+class ToolIndex:
+    """工具标签倒排索引：标签 -> 带有该标签的工具名称。
+
+    工具的所有标签都包含在查询标签集合中时才会被选中，没有标签的工具可以被任意标签集合选中。查询结果按照标签集合缓存，
+    同一个标签集合的重复查询只需要一次字典查找。
+    """
+    _tools: dict[str, McpTool]
+    _tags: dict[str, frozenset[str]]
+    _untagged: list[str]
+    _inverted: dict[str, list[str]]
+    _results: dict[frozenset[str], dict[str, McpTool]]
+
+    def __init__(self, tools: list[McpTool]) -> None:
+        """根据工具列表构建倒排索引
+
+        Args:
+            tools (list[McpTool]): 工具服务返回的工具列表
+        """
+        self._tools = {}
+        self._tags = {}
+        self._untagged = []
+        self._inverted = {}
+        self._results = {}
+
+        for tool in tools:
+            self._tools[tool.name] = tool
+            tool_tags = get_tool_tags(tool)
+            self._tags[tool.name] = tool_tags
+            if not tool_tags:
+                self._untagged.append(tool.name)
+            for tag in tool_tags:
+                self._inverted.setdefault(tag, []).append(tool.name)
+
+    def __len__(self) -> int:
+        return len(self._tools)
+
+    def select(self, tags: set[str] | frozenset[str]) -> dict[str, McpTool]:
+        """选出所有标签都包含在给定标签集合中的工具
+
+        Args:
+            tags (set[str] | frozenset[str]): 查询标签集合
+
+        Returns:
+            dict[str, McpTool]: 工具名称到工具实例的映射字典，顺序与工具服务返回的顺序一致
+        """
+        key = frozenset(tags)
+        result = self._results.get(key)
+        if result is None:
+            # 统计每个工具命中的标签数量，全部命中的工具符合要求
+            hits: dict[str, int] = {}
+            for tag in key:
+                for name in self._inverted.get(tag, []):
+                    hits[name] = hits.get(name, 0) + 1
+            selected = set(self._untagged)
+            selected.update(name for name, count in hits.items() if count == len(self._tags[name]))
+            result = {name: tool for name, tool in self._tools.items() if name in selected}
+            self._results[key] = result
+        # 返回副本，避免调用方修改缓存
+        return dict(result)
+
+
+class ToolCatalog:
+    """工具目录缓存：按工具服务缓存 `list_tools` 的结果以及对应的标签倒排索引。
+
+    缓存在以下情况下失效：
+    - 超过 `ttl` 秒未刷新
+    - 收到工具服务的 `notifications/tools/list_changed` 通知
+    - 手动调用 `invalidate`
+
+    Example:
+        ```python
+        catalog = ToolCatalog(ttl=300)
+        # 将 handle_message 注册为客户端的消息处理器，工具列表变化时自动失效
+        client = Client(transport, message_handler=catalog.handle_message)
+        agent = build_react_agent(..., tool_service=client, tool_catalog=catalog)
+        ```
+    """
+    _ttl: float | None
+    _entries: WeakKeyDictionary[Client[Any], tuple[float, ToolIndex]]
+    _locks: WeakKeyDictionary[Client[Any], asyncio.Lock]
+
+    def __init__(self, ttl: float | None = 60.0) -> None:
+        """初始化工具目录缓存
+
+        Args:
+            ttl (float | None): 缓存有效期（秒），None 表示只在收到通知或手动失效时刷新，0 表示不缓存
+        """
+        if ttl is not None and ttl < 0:
+            raise ValueError(f"工具目录缓存有效期不能为负数：{ttl}")
+        self._ttl = ttl
+        self._entries = WeakKeyDictionary()
+        self._locks = WeakKeyDictionary()
+
+    def _is_fresh(self, loaded_at: float) -> bool:
+        if self._ttl is None:
+            return True
+        return time.monotonic() - loaded_at < self._ttl
+
+    async def get_index(
+        self,
+        tool_service: Client[Any],
+        list_tools: Callable[[], Awaitable[list[McpTool]]] | None = None,
+    ) -> ToolIndex:
+        """获取工具服务的标签倒排索引，缓存失效时重新从工具服务拉取工具列表
+
+        Args:
+            tool_service (Client[Any]): 工具服务客户端，同时作为缓存的键
+            list_tools (Callable[[], Awaitable[list[McpTool]]] | None): 获取工具列表的函数，默认为None，
+                临时连接工具服务获取
+
+        Returns:
+            ToolIndex: 工具标签倒排索引
+        """
+        entry = self._entries.get(tool_service)
+        if entry is not None and self._is_fresh(entry[0]):
+            return entry[1]
+
+        # 同一个工具服务同时只刷新一次
+        lock = self._locks.setdefault(tool_service, asyncio.Lock())
+        async with lock:
+            entry = self._entries.get(tool_service)
+            if entry is not None and self._is_fresh(entry[0]):
+                return entry[1]
+
+            if list_tools is not None:
+                tools = await list_tools()
+            else:
+                async with tool_service:
+                    tools = await tool_service.list_tools()
+            index = ToolIndex(tools)
+            self._entries[tool_service] = (time.monotonic(), index)
+            logger.debug(f"[工具目录] 已刷新工具服务 {id(tool_service)} 的工具列表，共 {len(index)} 个工具")
+            return index
+
+    async def get_tools_with_tags(
+        self,
+        tool_service: Client[Any],
+        tags: set[str],
+        list_tools: Callable[[], Awaitable[list[McpTool]]] | None = None,
+    ) -> dict[str, McpTool]:
+        """获取工具服务中所有标签都包含在给定标签集合中的工具
+
+        Args:
+            tool_service (Client[Any]): 工具服务客户端
+            tags (set[str]): 工具标签集合
+            list_tools (Callable[[], Awaitable[list[McpTool]]] | None): 获取工具列表的函数，默认为None，
+                临时连接工具服务获取
+
+        Returns:
+            dict[str, McpTool]: 工具名称到工具实例的映射字典
+        """
+        index = await self.get_index(tool_service, list_tools)
+        return index.select(tags)
+
+    def invalidate(self, tool_service: Client[Any] | None = None) -> None:
+        """使缓存失效
+
+        Args:
+            tool_service (Client[Any] | None): 需要失效的工具服务，None 表示全部失效
+        """
+        if tool_service is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(tool_service, None)
+
+    async def handle_message(self, message: Any) -> None:
+        """fastmcp 客户端消息处理器，收到工具列表变化通知时使缓存失效
+
+        Args:
+            message (Any): 工具服务发送的请求、通知或异常
+        """
+        # 通知可能被包装在 ServerNotification 中
+        notification = getattr(message, "root", message)
+        if isinstance(notification, ToolListChangedNotification):
+            logger.info("[工具目录] 收到工具列表变化通知，缓存已失效")
+            self.invalidate()
+
+
+_default_tool_catalog: ToolCatalog | None = None
+
+
+def get_default_tool_catalog() -> ToolCatalog:
+    """获取全局共享的工具目录缓存，使用同一个工具服务的 Agent 共享同一份工具列表
+
+    Returns:
+        ToolCatalog: 全局共享的工具目录缓存
+    """
+    global _default_tool_catalog
+    if _default_tool_catalog is None:
+        _default_tool_catalog = ToolCatalog()
+    return _default_tool_catalog
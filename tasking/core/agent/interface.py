@@ -86,6 +86,11 @@ class IAgent(ABC, Generic[WorkflowStageT, WorkflowEventT, StateT, EventT, Client
         """
         pass
 
+    @abstractmethod
+    async def close(self) -> None:
+        """关闭Agent持有的资源（如工具服务的长连接会话），Agent使用结束后必须调用"""
+        pass
+
     @abstractmethod
     async def call_tool(
         self,
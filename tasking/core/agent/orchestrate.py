@@ -12,6 +12,9 @@ from fastmcp.client.transports import ClientTransportT
 
 from .interface import IAgent
 from .base import BaseAgent
+from .catalog import ToolCatalog
+from .session import ToolSessionPool
+from .parallel import act_tool_calls, group_tool_calls
 from ..state_machine.workflow import IWorkflow, BaseWorkflow
 from ..state_machine.task import (
     ITask,
@@ -20,6 +23,7 @@ from ..state_machine.task import (
     TaskEvent,
     RequirementTaskView,
     ProtocolTaskView,
+    check_dependencies,
 )
 from ...hook.human import HumanInterfere
 from ...llm import ILLM, build_llm
@@ -34,10 +38,10 @@ from ...utils.string.message import extract_text_from_message
 CREATE_DOC = """根据 JSON 字符串创建子任务列表，并将其添加到指定的父任务中。该函数不会返回值，而是直接修改传入的父任务实例。
 
     Args:
-        json_str (str): 包含子任务信息的 JSON 字符串
+        json_str (str): 包含子任务信息的 JSON 字符串，子任务可以通过可选的 '依赖任务' 字段声明依赖的兄弟任务标题
 
     Raises:
-        ValueError: 如果无法解析 JSON 字符串
+        ValueError: 如果无法解析 JSON 字符串，或者子任务的依赖关系不合法
         AssertionError: 如果子任务数据缺少必要字段
 """
 
@@ -48,13 +52,13 @@ def create_sub_tasks(json_str: str, kwargs: dict[str, Any] | None = None) -> str
     Args:
         valid_tasks (dict[str, type[ITask]]): 有效任务类型映射，键为任务类型名称，值为任务类型
         task (ITreeTaskNode): 父任务实例
-        json_str (str): 包含子任务信息的 JSON 字符串
+        json_str (str): 包含子任务信息的 JSON 字符串，可选的 '依赖任务' 字段用于声明依赖的兄弟任务标题
         
     Returns:
         str: 创建子任务的结果描述字符串
 
     Raises:
-        ValueError: 如果无法解析 JSON 字符串
+        ValueError: 如果无法解析 JSON 字符串，或者子任务依赖了不存在的任务、依赖关系中存在环
         AssertionError: 如果子任务数据缺少必要字段
     """
     assert kwargs is not None, "kwargs 参数不能为空"
@@ -67,6 +71,17 @@ def create_sub_tasks(json_str: str, kwargs: dict[str, Any] | None = None) -> str
     except json.JSONDecodeError as e:
         raise ValueError(f"无法解析子任务 JSON 字符串: {e}")
 
+    # 解析并校验子任务之间的依赖关系，已存在的兄弟任务也可以作为依赖
+    dependencies: dict[str, list[str]] = {
+        sub_task.get_title(): sub_task.get_dependencies() for sub_task in task.get_sub_tasks()
+    }
+    for title, sub_task_data in sub_tasks_data.items():
+        deps = sub_task_data.get("依赖任务", [])
+        if isinstance(deps, str):
+            deps = [deps] if deps else []
+        dependencies[title] = [str(dep) for dep in deps]
+    check_dependencies(dependencies)
+
     for title, sub_task_data in sub_tasks_data.items():
         # 根据任务类型创建子任务实例
         assert "任务类型" in sub_task_data, "子任务数据必须包含 '任务类型' 字段"
@@ -75,6 +90,8 @@ def create_sub_tasks(json_str: str, kwargs: dict[str, Any] | None = None) -> str
         assert "任务输入" in sub_task_data, "子任务数据必须包含 '任务输入' 字段"
         sub_task.set_input([TextBlock(text=sub_task_data["任务输入"])])
         sub_task.set_title(title)
+        # 设置子任务依赖的兄弟任务
+        sub_task.set_dependencies(dependencies[title])
         # 将子任务添加到父任务
         task.add_sub_task(sub_task, True)
 
@@ -143,6 +160,7 @@ def get_orch_event_chain() -> list[OrchestrateEvent]:
 def get_orch_actions(
     agent: IAgent[OrchestrateStage, OrchestrateEvent, TaskState, TaskEvent, ClientTransportT],
     valid_tasks: dict[str, type[ITreeTaskNode[TaskState, TaskEvent]]],
+    parallel_act: bool = False,
 ) -> dict[
     OrchestrateStage,
     Callable[
@@ -163,6 +181,7 @@ def get_orch_actions(
     Args:
         agent (IAgent): 关联的智能体实例
         valid_tasks (dict[str, Type[ITreeTaskNode]]): 有效任务类型映射，键为任务类型名称，值为任务类型
+        parallel_act (bool): 是否并行执行同一轮推理中连续的并发安全工具调用，默认值为False
 
     Returns:
         常用工作流动作定义
@@ -207,7 +226,7 @@ def get_orch_actions(
             task.get_tags(),
         )
         # 更新推理配置中的工具列表
-        completion_config.update(stop_words=["</orchestration>"])
+        completion_config.update(stop_words=["</orchestration>"], stop_labels=["orchestration"])
 
         # 获取当前工作流的提示词
         prompt = workflow.get_prompt()
@@ -244,15 +263,10 @@ def get_orch_actions(
             # 返回 THINK 事件重新思考
             return OrchestrateEvent.THINK
 
-        # 从消息中提取 orchestration 输出
-        orchestration = extract_by_label(
-            extract_text_from_message(message),
-            "orchestration", "orchestrate"
-        )
-        orch_require = extract_by_label(
-            extract_text_from_message(message),
-            "orch_require", "orchestration_require",
-        )
+        # 从消息中提取 orchestration 输出，两次提取共用同一份解析结果
+        message_text = extract_text_from_message(message)
+        orchestration = extract_by_label(message_text, "orchestration", "orchestrate")
+        orch_require = extract_by_label(message_text, "orch_require", "orchestration_require")
         # 检查是否需要编排任务
         if orch_require and orch_require.lower() == "false":
             if message.stop_reason == StopReason.TOOL_CALL:
@@ -290,46 +304,52 @@ def get_orch_actions(
         allow_tool: bool = True
 
         if message.stop_reason == StopReason.TOOL_CALL:
-            # Act on the task or environment
-            for tool_call in message.tool_calls:
+            # Act on the task or environment, 开启并行执行时连续的并发安全工具调用会同时执行
+            for batch in group_tool_calls(message.tool_calls, service_tools, parallel_act):
                 # 检查工具执行许可
                 if not allow_tool:
-                    # 生成错误信息
-                    result = Message(
-                        role=Role.TOOL,
-                        tool_call_id=tool_call.id,
-                        is_error=True,
-                        content=[TextBlock(text="由于前置工具调用出错，后续工具调用被禁止继续执行")]
-                    )
-                    # 更新到任务上下文
-                    task.get_context().append_context_data(result)
+                    for tool_call in batch:
+                        # 生成错误信息
+                        result = Message(
+                            role=Role.TOOL,
+                            tool_call_id=tool_call.id,
+                            is_error=True,
+                            content=[TextBlock(text="由于前置工具调用出错，后续工具调用被禁止继续执行")]
+                        )
+                        # 更新到任务上下文
+                        task.get_context().append_context_data(result)
                     continue
 
-                try:
-                    # 注入 Task 和 Workflow，并开始执行工具
-                    result = await agent.act(
-                        context=context,
-                        workflow=workflow,
-                        queue=queue,
-                        tool_call=tool_call,
-                        task=task,
-                    )
-                except HumanInterfere as e:
-                    # 将人类介入信息反馈到任务
-                    result = Message(
-                        role=Role.USER,
-                        content=e.get_messages(),
-                        is_error=True,
-                    )
-                    # 禁止后续工具调用执行
-                    allow_tool = False
-
-                # 检查调用错误状态
-                if result.is_error:
-                    # 将任务设置为错误状态
-                    task.set_error(extract_text_from_message(result))
-                    # 停止执行剩余的工具
-                    allow_tool = False
+                # 注入 Task 和 Workflow，并开始执行工具，结果按照调用顺序返回
+                outcomes = await act_tool_calls(
+                    agent,
+                    context=context,
+                    workflow=workflow,
+                    queue=queue,
+                    task=task,
+                    tool_calls=batch,
+                )
+                for outcome in outcomes:
+                    if isinstance(outcome, HumanInterfere):
+                        # 将人类介入信息反馈到任务
+                        result = Message(
+                            role=Role.USER,
+                            content=outcome.get_messages(),
+                            is_error=True,
+                        )
+                        # 禁止后续工具调用执行
+                        allow_tool = False
+                    elif isinstance(outcome, BaseException):
+                        raise outcome
+                    else:
+                        result = outcome
+
+                    # 检查调用错误状态
+                    if result.is_error:
+                        # 将任务设置为错误状态
+                        task.set_error(extract_text_from_message(result))
+                        # 停止执行剩余的工具
+                        allow_tool = False
 
         if task.is_error():
             # 任务进入错误状态，返回 FINISH 事件结束工作流
@@ -496,6 +516,9 @@ def build_orch_agent(
     name: str,
     valid_tasks: dict[str, type[ITreeTaskNode[TaskState, TaskEvent]]],
     tool_service: Client[ClientTransportT] | None = None,
+    tool_catalog: ToolCatalog | None = None,
+    tool_session_pool: ToolSessionPool | None = None,
+    parallel_act: bool = False,
     actions: dict[
         OrchestrateStage,
         Callable[
@@ -527,13 +550,16 @@ def build_orch_agent(
         name: 智能体名称，必填，用于在 settings 中读取对应的配置
         valid_tasks: 有效任务类型映射，必填，用于智能体管理和调度
         tool_service: 工具服务客户端，可选，如果未提供则不关联工具服务
+        tool_catalog: 工具目录缓存，可选，如果未提供则使用全局共享的工具目录缓存
+        tool_session_pool: 工具服务会话池，可选，如果未提供则为工具服务创建单会话的会话池
+        parallel_act: 是否并行执行同一轮推理中连续的并发安全工具调用（`readOnlyHint` 注解或 `concurrency_safe` 标签），默认不开启
         actions: 动作定义，可选，如果未提供则使用默认定义
         transitions: 状态转换规则，可选，如果未提供则使用默认定义
         prompts: 提示词，可选，如果未提供则使用默认定义
         observe_funcs: 观察函数，可选，如果未提供则使用默认定义
 
     Returns:
-        智能体实例
+        智能体实例，使用结束后需要调用 `close`（或使用 `async with`）释放工具服务会话
     """
     # 获取全局设置
     settings = get_settings()
@@ -548,6 +574,8 @@ def build_orch_agent(
         name=name,
         agent_type=agent_cfg.agent_type,
         tool_service=tool_service,
+        tool_catalog=tool_catalog,
+        tool_session_pool=tool_session_pool,
     )
 
     # 获取 event chain
@@ -557,7 +585,7 @@ def build_orch_agent(
     # 获取初始状态
     init_state = OrchestrateStage.THINKING
     # 获取动作定义
-    actions = actions if actions is not None else get_orch_actions(agent, valid_tasks)
+    actions = actions if actions is not None else get_orch_actions(agent, valid_tasks, parallel_act=parallel_act)
     # 获取转换规则
     transitions = transitions if transitions is not None else get_orch_transition()
     # 定义提示词
@@ -0,0 +1,122 @@
+import asyncio
+from typing import Any
+
+from mcp.types import Tool as McpTool
+
+from .catalog import get_tool_tags
+from .interface import IAgent
+from ..state_machine.task import ITask
+from ..state_machine.workflow import IWorkflow
+from ...model import Message, ToolCallRequest
+from ...model.queue import IAsyncQueue
+
+
+CONCURRENCY_SAFE_TAG = "concurrency_safe"
+"""带有该标签的工具没有副作用，可以与其他并发安全的工具同时执行"""
+
+
+def is_concurrency_safe(tool: McpTool | None) -> bool:
+    """判断工具是否可以并发执行：工具声明了 `readOnlyHint` 注解，或者带有 `concurrency_safe` 标签
+
+    Args:
+        tool (McpTool | None): 工具实例，None 表示工具未知
+
+    Returns:
+        bool: 是否可以并发执行
+    """
+    if tool is None:
+        return False
+    if tool.annotations is not None and tool.annotations.readOnlyHint:
+        return True
+    return CONCURRENCY_SAFE_TAG in get_tool_tags(tool)
+
+
+def group_tool_calls(
+    tool_calls: list[ToolCallRequest],
+    tools: dict[str, McpTool],
+    parallel: bool = False,
+) -> list[list[ToolCallRequest]]:
+    """将工具调用按照原始顺序分组，连续的并发安全工具调用分为同一组，其余工具调用各自单独一组
+
+    Args:
+        tool_calls (list[ToolCallRequest]): 工具调用请求列表
+        tools (dict[str, McpTool]): 本轮推理可用的工具
+        parallel (bool): 是否开启并行执行，默认值为False，每个工具调用单独一组
+
+    Returns:
+        list[list[ToolCallRequest]]: 工具调用分组
+    """
+    if not parallel:
+        return [[tool_call] for tool_call in tool_calls]
+
+    groups: list[list[ToolCallRequest]] = []
+    last_safe = False
+    for tool_call in tool_calls:
+        safe = is_concurrency_safe(tools.get(tool_call.name))
+        if safe and last_safe:
+            groups[-1].append(tool_call)
+        else:
+            groups.append([tool_call])
+        last_safe = safe
+    return groups
+
+
+async def act_tool_calls(
+    agent: IAgent[Any, Any, Any, Any, Any],
+    context: dict[str, Any],
+    workflow: IWorkflow[Any, Any, Any, Any],
+    queue: IAsyncQueue[Message],
+    task: ITask[Any, Any],
+    tool_calls: list[ToolCallRequest],
+) -> list[Message | BaseException]:
+    """执行一组工具调用，多个工具调用时同时执行。异常不会直接抛出，而是按照调用顺序返回，由调用方决定如何处理
+
+    同时执行的工具调用结果会按照调用顺序排列在任务上下文中，而不是按照完成顺序。
+
+    Args:
+        agent (IAgent): 执行工具调用的智能体
+        context (dict[str, Any]): 上下文字典，用于传递用户ID/AccessToken/TraceID等信息
+        workflow (IWorkflow): 工作流实例
+        queue (IAsyncQueue[Message]): 数据队列，用于输出数据
+        task (ITask): 任务实例
+        tool_calls (list[ToolCallRequest]): 工具调用请求列表
+
+    Returns:
+        list[Message | BaseException]: 按照调用顺序排列的工具调用结果或异常
+    """
+    if len(tool_calls) == 1:
+        try:
+            return [await agent.act(
+                context=context,
+                workflow=workflow,
+                queue=queue,
+                tool_call=tool_calls[0],
+                task=task,
+            )]
+        except Exception as e:
+            return [e]
+
+    outcomes = await asyncio.gather(
+        *(
+            agent.act(
+                context=context,
+                workflow=workflow,
+                queue=queue,
+                tool_call=tool_call,
+                task=task,
+            )
+            for tool_call in tool_calls
+        ),
+        return_exceptions=True,
+    )
+
+    # 工具结果按照完成顺序写入上下文，这里将它们调整回调用顺序
+    results = [outcome for outcome in outcomes if isinstance(outcome, Message)]
+    result_ids = {id(result) for result in results}
+    data = task.get_context().get_context_data()
+    positions = [i for i, item in enumerate(data) if id(item) in result_ids]
+    if len(positions) == len(results):
+        for position, result in zip(positions, results):
+            data[position] = result
+
+    return list(outcomes)
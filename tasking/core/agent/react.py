@@ -10,6 +10,9 @@ from fastmcp.tools import Tool as FastMcpTool
 
 from .interface import IAgent
 from .base import BaseAgent
+from .catalog import ToolCatalog
+from .session import ToolSessionPool
+from .parallel import act_tool_calls, group_tool_calls
 from ..state_machine.task import ITask, TaskState, TaskEvent, RequirementTaskView, DocumentTreeTaskView
 from ..state_machine.workflow import IWorkflow, BaseWorkflow
 from ...hook.human import HumanInterfere
@@ -128,6 +131,7 @@ def get_react_event_chain() -> list[ReActEvent]:
 
 def get_react_actions(
     agent: IAgent[ReActStage, ReActEvent, TaskState, TaskEvent, ClientTransportT],
+    parallel_act: bool = False,
 ) -> dict[
     ReActStage,
     Callable[
@@ -144,6 +148,7 @@ def get_react_actions(
 
     Args:
         agent (IAgent): 关联的智能体实例
+        parallel_act (bool): 是否并行执行同一轮推理中连续的并发安全工具调用，默认值为False
 
     Returns:
         常用工作流动作定义
@@ -197,6 +202,8 @@ def get_react_actions(
         # 更新推理配置中的工具列表
         completion_config.update(
             stop_words=["</final_flag>", "</finish>", "</finish_flag>", "</end_flag>"],
+            # 只有结束标志为 true 时才提前停止生成，否则还要等待后续的工具调用
+            stop_labels=["final_flag=true", "finish=true", "finish_flag=true", "end_flag=true"],
         )
 
         # 获取当前工作流的提示词
@@ -239,46 +246,52 @@ def get_react_actions(
         allow_tool: bool = True
 
         if message.stop_reason == StopReason.TOOL_CALL:
-            # Act on the task or environment
-            for tool_call in message.tool_calls:
+            # Act on the task or environment, 开启并行执行时连续的并发安全工具调用会同时执行
+            for batch in group_tool_calls(message.tool_calls, tools, parallel_act):
                 # 检查工具执行许可
                 if not allow_tool:
-                    # 生成错误信息
-                    result = Message(
-                        role=Role.TOOL,
-                        tool_call_id=tool_call.id,
-                        is_error=True,
-                        content=[TextBlock(text="由于前置工具调用出错，后续工具调用被禁止继续执行")]
-                    )
-                    # 更新到任务上下文
-                    task.get_context().append_context_data(result)
+                    for tool_call in batch:
+                        # 生成错误信息
+                        result = Message(
+                            role=Role.TOOL,
+                            tool_call_id=tool_call.id,
+                            is_error=True,
+                            content=[TextBlock(text="由于前置工具调用出错，后续工具调用被禁止继续执行")]
+                        )
+                        # 更新到任务上下文
+                        task.get_context().append_context_data(result)
                     continue
 
-                try:
-                    # 注入 Task 和 Workflow，并开始执行工具
-                    result = await agent.act(
-                        context=context,
-                        workflow=workflow,
-                        queue=queue,
-                        tool_call=tool_call,
-                        task=task,
-                    )
-                except HumanInterfere as e:
-                    # 将人类介入信息反馈到任务
-                    result = Message(
-                        role=Role.USER,
-                        content=e.get_messages(),
-                        is_error=True,
-                    )
-                    # 禁止后续工具调用执行
-                    allow_tool = False
-
-                # 检查调用错误状态
-                if result.is_error:
-                    # 将任务设置为错误状态
-                    task.set_error(extract_text_from_message(result))
-                    # 停止执行剩余的工具
-                    allow_tool = False
+                # 注入 Task 和 Workflow，并开始执行工具，结果按照调用顺序返回
+                outcomes = await act_tool_calls(
+                    agent,
+                    context=context,
+                    workflow=workflow,
+                    queue=queue,
+                    task=task,
+                    tool_calls=batch,
+                )
+                for outcome in outcomes:
+                    if isinstance(outcome, HumanInterfere):
+                        # 将人类介入信息反馈到任务
+                        result = Message(
+                            role=Role.USER,
+                            content=outcome.get_messages(),
+                            is_error=True,
+                        )
+                        # 禁止后续工具调用执行
+                        allow_tool = False
+                    elif isinstance(outcome, BaseException):
+                        raise outcome
+                    else:
+                        result = outcome
+
+                    # 检查调用错误状态
+                    if result.is_error:
+                        # 将任务设置为错误状态
+                        task.set_error(extract_text_from_message(result))
+                        # 停止执行剩余的工具
+                        allow_tool = False
 
         # 没有调用工具，手动检查结束标志位
         elif finish_flag.upper() == "TRUE":
@@ -351,6 +364,9 @@ def get_react_transition() -> dict[
 def build_react_agent(
     name: str,
     tool_service: Client[ClientTransportT] | None = None,
+    tool_catalog: ToolCatalog | None = None,
+    tool_session_pool: ToolSessionPool | None = None,
+    parallel_act: bool = False,
     actions: dict[
         ReActStage,
         Callable[
@@ -381,13 +397,16 @@ def build_react_agent(
     Args:
         name: 智能体名称，必填，用于在 settings 中读取对应的配置
         tool_service: 工具服务客户端，可选，如果未提供则不关联工具服务
+        tool_catalog: 工具目录缓存，可选，如果未提供则使用全局共享的工具目录缓存
+        tool_session_pool: 工具服务会话池，可选，如果未提供则为工具服务创建单会话的会话池
+        parallel_act: 是否并行执行同一轮推理中连续的并发安全工具调用（`readOnlyHint` 注解或 `concurrency_safe` 标签），默认不开启
         actions: 动作定义，可选，如果未提供则使用默认定义
         transitions: 状态转换规则，可选，如果未提供则使用默认定义
         prompts: 提示词，可选，如果未提供则使用默认定义
         observe_funcs: 观察函数，可选，如果未提供则使用默认定义
 
     Returns:
-        IAgent: 智能体实例
+        IAgent: 智能体实例，使用结束后需要调用 `close`（或使用 `async with`）释放工具服务会话
     """
     # 获取全局设置
     settings = get_settings()
@@ -401,6 +420,8 @@ def build_react_agent(
         name=name,
         agent_type=agent_cfg.agent_type,
         tool_service=tool_service,
+        tool_catalog=tool_catalog,
+        tool_session_pool=tool_session_pool,
     )
     # 获取 event chain
     event_chain = get_react_event_chain()
@@ -411,7 +432,7 @@ def build_react_agent(
     # 获取转换规则
     transitions = transitions if transitions is not None else get_react_transition()
     # 获取动作定义
-    actions = actions if actions is not None else get_react_actions(agent)
+    actions = actions if actions is not None else get_react_actions(agent, parallel_act=parallel_act)
     # 定义提示词
     prompts = prompts if prompts is not None else {
         ReActStage.PROCESSING: read_document("workflow/react/processing.md"),
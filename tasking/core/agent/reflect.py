@@ -10,6 +10,9 @@ from fastmcp.tools import Tool as FastMcpTool
 
 from .interface import IAgent
 from .base import BaseAgent
+from .catalog import ToolCatalog
+from .session import ToolSessionPool
+from .parallel import act_tool_calls, group_tool_calls
 from .react import end_workflow, END_WORKFLOW_DOC
 from ..state_machine.workflow import IWorkflow, BaseWorkflow
 from ..state_machine.task import ITask, TaskState, TaskEvent, RequirementTaskView
@@ -136,6 +139,7 @@ def get_reflect_event_chain() -> list[ReflectEvent]:
 
 def get_reflect_actions(
     agent: IAgent[ReflectStage, ReflectEvent, TaskState, TaskEvent, ClientTransportT],
+    parallel_act: bool = False,
 ) -> dict[
     ReflectStage,
     Callable[
@@ -155,6 +159,7 @@ def get_reflect_actions(
 
     Args:
         agent (IAgent): 关联的智能体实例
+        parallel_act (bool): 是否并行执行同一轮推理中连续的并发安全工具调用，默认值为False
 
     Returns:
         常用工作流动作定义
@@ -201,6 +206,8 @@ def get_reflect_actions(
         # 更新推理配置中的工具列表
         completion_config.update(
             stop_words=["</final_flag>", "</finish>", "</finish_flag>", "</end_flag>"],
+            # 只有结束标志为 true 时才提前停止生成，否则还要等待后续的工具调用
+            stop_labels=["final_flag=true", "finish=true", "finish_flag=true", "end_flag=true"],
         )
 
         # 获取当前工作流的提示词
@@ -240,48 +247,54 @@ def get_reflect_actions(
         allow_tool: bool = True
 
         if message.stop_reason == StopReason.TOOL_CALL:
-            # Act on the task or environment
-            for tool_call in message.tool_calls:
+            # Act on the task or environment, 开启并行执行时连续的并发安全工具调用会同时执行
+            for batch in group_tool_calls(message.tool_calls, service_tools, parallel_act):
                 # 检查工具执行许可
                 if not allow_tool:
-                    # 生成错误信息
-                    result = Message(
-                        role=Role.TOOL,
-                        tool_call_id=tool_call.id,
-                        is_error=True,
-                        content=[TextBlock(text="由于前置工具调用出错，后续工具调用被禁止继续执行")]
-                    )
-                    # 更新到任务上下文
-                    task.get_context().append_context_data(result)
+                    for tool_call in batch:
+                        # 生成错误信息
+                        result = Message(
+                            role=Role.TOOL,
+                            tool_call_id=tool_call.id,
+                            is_error=True,
+                            content=[TextBlock(text="由于前置工具调用出错，后续工具调用被禁止继续执行")]
+                        )
+                        # 更新到任务上下文
+                        task.get_context().append_context_data(result)
                     continue
 
-                try:
-                    # 开始执行工具，如果是工具服务的工具，则 task/workflow 不会被注入到参数中
-                    result = await agent.act(
-                        context=context,
-                        queue=queue,
-                        tool_call=tool_call,
-                        task=task,
-                        workflow=workflow,
-                    )
-                except HumanInterfere as e:
-                    # 将人类介入信息反馈到任务
-                    result = Message(
-                        role=Role.USER,
-                        content=e.get_messages(),
-                        is_error=True,
-                    )
-                    # 禁止后续工具调用执行
-                    allow_tool = False
-
-                # 检查调用错误状态
-                if result.is_error:
-                    # 将任务设置为错误状态
-                    task.set_error(extract_text_from_message(result))
-                    # 停止执行剩余的工具
-                    allow_tool = False
-                    # 返回 FINISH 事件，结束工作流
-                    return ReflectEvent.FINISH
+                # 开始执行工具，如果是工具服务的工具，则 task/workflow 不会被注入到参数中
+                outcomes = await act_tool_calls(
+                    agent,
+                    context=context,
+                    workflow=workflow,
+                    queue=queue,
+                    task=task,
+                    tool_calls=batch,
+                )
+                for outcome in outcomes:
+                    if isinstance(outcome, HumanInterfere):
+                        # 将人类介入信息反馈到任务
+                        result = Message(
+                            role=Role.USER,
+                            content=outcome.get_messages(),
+                            is_error=True,
+                        )
+                        # 禁止后续工具调用执行
+                        allow_tool = False
+                    elif isinstance(outcome, BaseException):
+                        raise outcome
+                    else:
+                        result = outcome
+
+                    # 检查调用错误状态
+                    if result.is_error:
+                        # 将任务设置为错误状态
+                        task.set_error(extract_text_from_message(result))
+                        # 停止执行剩余的工具
+                        allow_tool = False
+                        # 返回 FINISH 事件，结束工作流
+                        return ReflectEvent.FINISH
 
         # 正常进入下一个工作流阶段
         return ReflectEvent.REFLECT
@@ -322,6 +335,8 @@ def get_reflect_actions(
             tools[tool.name] = tool.to_mcp_tool()
         completion_config.update(
             stop_words=["</final_flag>", "</finish>", "</finish_flag>", "</end_flag>"],
+            # 只有结束标志为 true 时才提前停止生成，否则还要等待后续的工具调用
+            stop_labels=["final_flag=true", "finish=true", "finish_flag=true", "end_flag=true"],
         )
 
         # 获取当前工作流的提示词
@@ -355,35 +370,42 @@ def get_reflect_actions(
         allow_tool: bool = True
 
         if message.stop_reason == StopReason.TOOL_CALL:
-            # Act on the task or environment
-            for tool_call in message.tool_calls:
+            # Act on the task or environment, 开启并行执行时连续的并发安全工具调用会同时执行
+            for batch in group_tool_calls(message.tool_calls, tools, parallel_act):
                 # 检查工具执行许可
                 if not allow_tool:
-                    # 生成错误信息
-                    result = Message(
-                        role=Role.TOOL,
-                        tool_call_id=tool_call.id,
-                        is_error=True,
-                        content=[TextBlock(text="由于前置工具调用出错，后续工具调用被禁止继续执行")]
-                    )
-                    # 更新到任务上下文
-                    task.get_context().append_context_data(result)
+                    for tool_call in batch:
+                        # 生成错误信息
+                        result = Message(
+                            role=Role.TOOL,
+                            tool_call_id=tool_call.id,
+                            is_error=True,
+                            content=[TextBlock(text="由于前置工具调用出错，后续工具调用被禁止继续执行")]
+                        )
+                        # 更新到任务上下文
+                        task.get_context().append_context_data(result)
                     continue
 
-                # 注入 Task 和 Workflow，并开始执行工具
-                result = await agent.act(
+                # 注入 Task 和 Workflow，并开始执行工具，结果按照调用顺序返回
+                outcomes = await act_tool_calls(
+                    agent,
                     context=context,
+                    workflow=workflow,
                     queue=queue,
-                    tool_call=tool_call,
                     task=task,
-                    workflow=workflow,
+                    tool_calls=batch,
                 )
-                # 检查调用错误状态
-                if result.is_error:
-                    # 将任务设置为错误状态
-                    task.set_error(extract_text_from_message(result))
-                    # 停止执行剩余的工具
-                    allow_tool = False
+                for outcome in outcomes:
+                    if isinstance(outcome, BaseException):
+                        raise outcome
+                    result = outcome
+
+                    # 检查调用错误状态
+                    if result.is_error:
+                        # 将任务设置为错误状态
+                        task.set_error(extract_text_from_message(result))
+                        # 停止执行剩余的工具
+                        allow_tool = False
 
         # 没有调用工具，手动检查结束标志位
         elif finish_flag.upper() == "TRUE":
@@ -404,6 +426,9 @@ def get_reflect_actions(
 def build_reflect_agent(
     name: str,
     tool_service: Client[ClientTransportT] | None = None,
+    tool_catalog: ToolCatalog | None = None,
+    tool_session_pool: ToolSessionPool | None = None,
+    parallel_act: bool = False,
     actions: dict[
         ReflectStage,
         Callable[
@@ -434,13 +459,16 @@ def build_reflect_agent(
     Args:
         name: 智能体名称，必填，用于在 settings 中读取对应的配置
         tool_service: 工具服务客户端，可选，如果未提供则不关联工具服务
+        tool_catalog: 工具目录缓存，可选，如果未提供则使用全局共享的工具目录缓存
+        tool_session_pool: 工具服务会话池，可选，如果未提供则为工具服务创建单会话的会话池
+        parallel_act: 是否并行执行同一轮推理中连续的并发安全工具调用（`readOnlyHint` 注解或 `concurrency_safe` 标签），默认不开启
         actions: 动作定义，可选，如果未提供则使用默认定义
         transitions: 状态转换规则，可选，如果未提供则使用默认定义
         prompts: 提示词，可选，如果未提供则使用默认定义
         observe_funcs: 观察函数，可选，如果未提供则使用默认定义
 
     Returns:
-        智能体实例
+        智能体实例，使用结束后需要调用 `close`（或使用 `async with`）释放工具服务会话
     """
     # 获取全局设置
     settings = get_settings()
@@ -454,6 +482,8 @@ def build_reflect_agent(
         name=name,
         agent_type=agent_cfg.agent_type,
         tool_service=tool_service,
+        tool_catalog=tool_catalog,
+        tool_session_pool=tool_session_pool,
     )
     # 获取 event chain
     event_chain = get_reflect_event_chain()
@@ -462,7 +492,7 @@ def build_reflect_agent(
     # 获取初始状态
     init_state = ReflectStage.REASONING
     # 获取动作定义
-    actions = actions if actions is not None else get_reflect_actions(agent)
+    actions = actions if actions is not None else get_reflect_actions(agent, parallel_act=parallel_act)
     # 获取转换规则
     transitions = transitions if transitions is not None else get_reflect_transition()
     # 定义提示词
@@ -0,0 +1,248 @@
+import asyncio
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Any
+
+import anyio
+from loguru import logger
+from fastmcp import Client
+from fastmcp.client.client import CallToolResult as FastMcpCallToolResult
+from mcp.types import Tool as McpTool
+
+
+# 这些异常说明会话已经断开，需要重新连接。只用于可以安全重复的请求（如获取工具列表）
+RECONNECT_ERRORS: tuple[type[BaseException], ...] = (
+    ConnectionError,
+    EOFError,
+    OSError,
+    RuntimeError,
+    anyio.ClosedResourceError,
+    anyio.BrokenResourceError,
+)
+
+# 这些异常说明请求还没有送达工具服务（写入端已关闭或者连接被拒绝），重新连接后重试不会重复执行工具。
+# 请求送达之后出现的异常直接抛给调用方，避免非幂等的工具被执行两次
+UNDELIVERED_ERRORS: tuple[type[BaseException], ...] = (
+    ConnectionRefusedError,
+    anyio.ClosedResourceError,
+    anyio.BrokenResourceError,
+)
+
+
+class ToolSession:
+    """工具服务的一个长连接会话，多个请求可以同时通过同一个会话发送（MCP 按请求 ID 区分响应）
+
+    - `in_flight` 记录正在使用该会话的请求数量，会话池据此选择最空闲的会话
+    - `generation` 在每次重新连接后加一，避免多个失败的请求重复重连同一个会话
+    - `lock` 保证同一时刻只有一个请求在建立连接、检查健康状态或重新连接
+    """
+    client: Client[Any]
+    last_used: float
+    in_flight: int
+    generation: int
+    lock: asyncio.Lock
+
+    def __init__(self, client: Client[Any]) -> None:
+        self.client = client
+        self.last_used = 0.0
+        self.in_flight = 0
+        self.generation = 0
+        self.lock = asyncio.Lock()
+
+    def is_connected(self) -> bool:
+        return self.client.is_connected()
+
+    async def connect(self) -> None:
+        if not self.client.is_connected():
+            await self.client.__aenter__()
+        self.last_used = time.monotonic()
+
+    async def disconnect(self) -> None:
+        if self.client.is_connected():
+            try:
+                await self.client.__aexit__(None, None, None)
+            except Exception as e:
+                logger.warning(f"[工具会话] 断开工具服务会话失败：{e}")
+
+    async def reconnect(self) -> None:
+        await self.disconnect()
+        await self.connect()
+        self.generation += 1
+
+
+class ToolSessionPool:
+    """工具服务会话池：持有若干个长连接会话，避免每次调用工具都重新建立传输连接。
+
+    - 会话不会被某个请求独占，并发的请求共享已连接的会话，每次选择正在处理的请求最少的会话。
+      默认只有一个会话，并发的工具调用通过它同时发送，不会互相等待
+    - 会话在第一次使用时建立，之后一直保持连接，直到调用 `close`
+    - 会话空闲超过 `health_check_interval` 秒后，下次使用前会先 `ping` 检查，失败则重新连接
+    - 调用工具时只有请求确定没有送达才会重新连接并重试一次，获取工具列表时连接异常都会重试一次
+    - 会话的连接绑定在建立它的事件循环上。在新的事件循环中使用时（如多次调用 `asyncio.run`），
+      会丢弃旧事件循环中的会话，在新的事件循环中重新连接
+
+    Example:
+        ```python
+        async with ToolSessionPool(client, size=4) as pool:
+            result = await pool.call_tool("search", {"query": "weather"})
+        ```
+    """
+    _tool_service: Client[Any]
+    _size: int
+    _sessions: list[ToolSession]
+    _loop: asyncio.AbstractEventLoop | None
+    _health_check_interval: float
+    _closed: bool
+
+    def __init__(
+        self,
+        tool_service: Client[Any],
+        size: int = 1,
+        health_check_interval: float = 30.0,
+    ) -> None:
+        """初始化工具服务会话池
+
+        Args:
+            tool_service (Client[Any]): 工具服务客户端，第一个会话直接复用该客户端，其余会话使用相同配置新建
+            size (int): 会话数量，默认值为1。每个会话都可以同时处理多个请求
+            health_check_interval (float): 空闲多少秒后需要在使用前做健康检查，默认值为30秒
+
+        Raises:
+            ValueError: 如果会话数量小于1或者健康检查间隔为负数
+        """
+        if size < 1:
+            raise ValueError(f"工具服务会话数量必须大于0：{size}")
+        if health_check_interval < 0:
+            raise ValueError(f"健康检查间隔不能为负数：{health_check_interval}")
+
+        self._tool_service = tool_service
+        self._size = size
+        self._sessions = [ToolSession(tool_service)]
+        self._sessions.extend(ToolSession(tool_service.new()) for _ in range(size - 1))
+        self._loop = None
+        self._health_check_interval = health_check_interval
+        self._closed = False
+
+    async def __aenter__(self) -> "ToolSessionPool":
+        return self
+
+    async def __aexit__(self, *_args: Any) -> None:
+        await self.close()
+
+    def get_tool_service(self) -> Client[Any]:
+        """获取会话池对应的工具服务客户端"""
+        return self._tool_service
+
+    def _bind_loop(self) -> None:
+        """私有方法：把会话池绑定到当前事件循环，事件循环变化时丢弃旧的会话"""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        if self._loop is not None:
+            # 旧会话的连接任务属于旧的事件循环，无法在当前事件循环中继续使用或断开
+            logger.warning("[工具会话] 事件循环已变化，丢弃旧的会话并在当前事件循环中重新连接")
+            self._sessions = [ToolSession(self._tool_service.new()) for _ in range(self._size)]
+        self._loop = loop
+
+    async def _prepare(self, session: ToolSession) -> None:
+        """私有方法：确保会话已连接，空闲时间过长时先做健康检查"""
+        async with session.lock:
+            if not session.is_connected():
+                await session.connect()
+            elif session.in_flight == 1 and time.monotonic() - session.last_used > self._health_check_interval:
+                # 空闲时间过长且没有其他请求在使用，检查连接是否仍然可用
+                try:
+                    await session.client.ping()
+                except Exception as e:
+                    logger.warning(f"[工具会话] 健康检查失败，重新连接：{e}")
+                    await session.reconnect()
+            if self._closed:
+                # 连接期间会话池被关闭
+                await session.disconnect()
+                raise RuntimeError("工具服务会话池已关闭")
+
+    async def _reconnect(self, session: ToolSession, generation: int) -> None:
+        """私有方法：重新连接会话，如果其他请求已经重新连接过则直接复用"""
+        async with session.lock:
+            if self._closed:
+                raise RuntimeError("工具服务会话池已关闭")
+            if session.generation == generation:
+                await session.reconnect()
+            elif not session.is_connected():
+                await session.connect()
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[ToolSession]:
+        """从会话池中选择一个已连接且健康的会话，会话不会被独占，其他请求可以同时使用
+
+        Yields:
+            ToolSession: 已连接的会话
+
+        Raises:
+            RuntimeError: 如果会话池已经关闭
+        """
+        if self._closed:
+            raise RuntimeError("工具服务会话池已关闭")
+
+        self._bind_loop()
+        session = min(self._sessions, key=lambda item: item.in_flight)
+        session.in_flight += 1
+        try:
+            await self._prepare(session)
+            yield session
+        finally:
+            session.in_flight -= 1
+            session.last_used = time.monotonic()
+
+    async def call_tool(self, name: str, arguments: dict[str, Any]) -> FastMcpCallToolResult:
+        """通过会话池调用工具，只有请求确定没有送达时才重新连接并重试一次
+
+        Args:
+            name (str): 工具名称
+            arguments (dict[str, Any]): 工具参数
+
+        Returns:
+            CallToolResult: fastmcp 的工具调用结果
+        """
+        async with self.acquire() as session:
+            generation = session.generation
+            try:
+                return await session.client.call_tool(name=name, arguments=arguments)
+            except UNDELIVERED_ERRORS as e:
+                if self._closed:
+                    raise
+                logger.warning(f"[工具会话] 调用工具 {name} 的请求未送达，重新连接后重试：{e}")
+                await self._reconnect(session, generation)
+                return await session.client.call_tool(name=name, arguments=arguments)
+
+    async def list_tools(self) -> list[McpTool]:
+        """通过会话池获取工具列表，连接断开时重新连接并重试一次
+
+        Returns:
+            list[McpTool]: 工具列表
+        """
+        async with self.acquire() as session:
+            generation = session.generation
+            try:
+                return await session.client.list_tools()
+            except RECONNECT_ERRORS as e:
+                if self._closed:
+                    raise
+                logger.warning(f"[工具会话] 获取工具列表时连接异常，重新连接后重试：{e}")
+                await self._reconnect(session, generation)
+                return await session.client.list_tools()
+
+    async def close(self) -> None:
+        """关闭会话池，直接断开所有会话（包括正在处理请求的会话），不等待请求结束"""
+        if self._closed:
+            return
+        self._closed = True
+
+        if self._loop is not None and self._loop is not asyncio.get_running_loop():
+            # 会话的连接任务属于其他事件循环，无法在当前事件循环中断开
+            logger.warning("[工具会话] 会话池不在建立连接的事件循环中关闭，直接丢弃旧的会话")
+            return
+        for session in self._sessions:
+            await session.disconnect()
+        logger.debug(f"[工具会话] 已关闭 {len(self._sessions)} 个工具服务会话")
@@ -1,6 +1,6 @@
 from .interface import IScheduler
 from .base import BaseScheduler
-from .task import build_base_scheduler
+from .task import build_base_scheduler, build_dag_scheduler
 
 
 __all__ = [
@@ -10,4 +10,5 @@ __all__ = [
     "BaseScheduler",
     # Scripts
     "build_base_scheduler",
+    "build_dag_scheduler",
 ]
@@ -0,0 +1,79 @@
+import asyncio
+from typing import Any
+
+from loguru import logger
+
+from .interface import IScheduler
+from ..state_machine.task import ITreeTaskNode, TaskState, TaskEvent, check_dependencies
+from ...model import Message, IAsyncQueue
+
+
+async def schedule_by_dependencies(
+    scheduler: IScheduler[TaskState, TaskEvent],
+    context: dict[str, Any],
+    queue: IAsyncQueue[Message],
+    sub_tasks: list[ITreeTaskNode[TaskState, TaskEvent]],
+    max_concurrency: int = 0,
+) -> None:
+    """按照兄弟任务之间的依赖关系调度子任务，任一子任务的前置任务全部进入 FINISHED 状态后立即开始调度该子任务。
+    如果前置任务未能完成（例如被取消），依赖它的子任务不会被调度，保持当前状态等待父任务重新规划。
+
+    Args:
+        scheduler: 调度器实例
+        context: 上下文字典，用于传递用户ID/AccessToken/TraceID等信息
+        queue: 数据队列，用于输出调度过程中产生的数据
+        sub_tasks: 待调度的子任务列表
+        max_concurrency: 同时调度的子任务数量上限，默认值为0（不限制）
+
+    Raises:
+        ValueError: 如果子任务的标题为空或重复，子任务依赖了不存在的兄弟任务，或者依赖关系中存在环
+    """
+    # 1. 校验标题和依赖关系，依赖关系按标题引用兄弟任务，标题必须非空且唯一
+    sub_task_map: dict[str, ITreeTaskNode[TaskState, TaskEvent]] = {}
+    for sub_task in sub_tasks:
+        title = sub_task.get_title()
+        if not title.strip():
+            raise ValueError("按依赖关系调度的子任务标题不能为空")
+        if title in sub_task_map:
+            raise ValueError(f"按依赖关系调度的子任务标题重复：'{title}'")
+        sub_task_map[title] = sub_task
+    check_dependencies({title: sub_task.get_dependencies() for title, sub_task in sub_task_map.items()})
+
+    # 2. 每个子任务结束调度后设置完成事件，通知依赖它的子任务
+    done_events: dict[str, asyncio.Event] = {title: asyncio.Event() for title in sub_task_map}
+    semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency > 0 else None
+
+    async def run_sub_task(sub_task: ITreeTaskNode[TaskState, TaskEvent]) -> None:
+        title = sub_task.get_title()
+        try:
+            # 等待所有前置任务结束
+            dependencies = sub_task.get_dependencies()
+            for dep in dependencies:
+                await done_events[dep].wait()
+
+            # 前置任务未完成，跳过当前子任务
+            unfinished = [
+                dep for dep in dependencies
+                if sub_task_map[dep].get_current_state() != TaskState.FINISHED
+            ]
+            if unfinished:
+                logger.warning(f"[调度器] 子任务 {title} 的前置任务 {unfinished} 未完成，跳过调度")
+                return
+
+            # 前置任务全部完成后才占用并发名额
+            if semaphore is None:
+                await scheduler.schedule(context, queue, sub_task)
+            else:
+                async with semaphore:
+                    await scheduler.schedule(context, queue, sub_task)
+        finally:
+            done_events[title].set()
+
+    # 3. 并发启动所有子任务，等待全部子任务结束后再按原始顺序抛出第一个异常
+    results = await asyncio.gather(
+        *(run_sub_task(sub_task) for sub_task in sub_tasks),
+        return_exceptions=True,
+    )
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
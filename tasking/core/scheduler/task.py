@@ -1,3 +1,5 @@
+import asyncio
+from contextlib import nullcontext, AbstractAsyncContextManager
 from typing import Any, TypeVar
 from collections.abc import Callable, Awaitable
 
@@ -6,6 +8,7 @@ from fastmcp.client.transports import ClientTransportT
 
 from .interface import IScheduler
 from .base import BaseScheduler
+from .dag import schedule_by_dependencies
 from ..agent import IAgent
 from ..state_machine.task import ITask, ITreeTaskNode, TaskState, TaskEvent
 from ..state_machine.workflow.const import WorkflowStageProtocol, WorkflowEventProtocol
@@ -21,6 +24,9 @@ OrchEvent = TypeVar("OrchEvent", bound=WorkflowEventProtocol)
 def get_tree_on_state_fn(
     executor: IAgent[ExecStage, ExecEvent, TaskState, TaskEvent, ClientTransportT],
     orchestrator: IAgent[OrchStage, OrchEvent, TaskState, TaskEvent, ClientTransportT] | None = None,
+    max_concurrency: int = 1,
+    max_tree_concurrency: int = 0,
+    use_dependencies: bool = False,
 ) -> dict[TaskState, Callable[
     [
         IScheduler[TaskState, TaskEvent],
@@ -35,10 +41,68 @@ def get_tree_on_state_fn(
     Args:
         executor: 执行者代理实例
         orchestrator: 规划者代理实例，可选，如果未提供则跳过规划阶段
+        max_concurrency: 单个节点下同时调度的子任务数量上限，默认值为1（按顺序执行），0表示不限制
+        max_tree_concurrency: 整棵任务树同时执行的代理调用数量上限，默认值为0（不限制）
+        use_dependencies: 是否按照子任务声明的依赖关系调度，默认值为False（忽略依赖关系）
 
     Returns:
         dict: 状态调度函数映射表
+
+    Raises:
+        ValueError: 并发数量配置为负数时抛出该异常
     """
+    if max_concurrency < 0:
+        raise ValueError(f"子任务并发数量不能为负数：{max_concurrency}")
+    if max_tree_concurrency < 0:
+        raise ValueError(f"任务树并发数量不能为负数：{max_tree_concurrency}")
+
+    # 整棵任务树共享的并发限制，只约束代理调用，避免父任务等待子任务时占用名额导致死锁
+    tree_semaphore: asyncio.Semaphore | None = (
+        asyncio.Semaphore(max_tree_concurrency) if max_tree_concurrency > 0 else None
+    )
+
+    def tree_slot() -> AbstractAsyncContextManager[Any]:
+        """获取任务树的并发名额，未配置限制时不做任何约束"""
+        if tree_semaphore is None:
+            return nullcontext()
+        return tree_semaphore
+
+    async def schedule_sub_tasks(
+        scheduler: IScheduler[TaskState, TaskEvent],
+        context: dict[str, Any],
+        queue: IAsyncQueue[Message],
+        sub_tasks: list[ITreeTaskNode[TaskState, TaskEvent]],
+    ) -> None:
+        """调度子任务，子任务列表本身不会被修改，因此父任务视图中的子任务顺序保持不变"""
+        if use_dependencies:
+            # 按照依赖关系调度，前置任务完成后立即启动后续任务
+            await schedule_by_dependencies(scheduler, context, queue, sub_tasks, max_concurrency)
+            return
+
+        if max_concurrency == 1 or len(sub_tasks) <= 1:
+            # 顺序执行子任务
+            for sub_task in sub_tasks:
+                await scheduler.schedule(context, queue, sub_task)
+            return
+
+        # 单个节点的并发限制
+        node_semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency > 0 else None
+
+        async def run_sub_task(sub_task: ITreeTaskNode[TaskState, TaskEvent]) -> None:
+            if node_semaphore is None:
+                await scheduler.schedule(context, queue, sub_task)
+                return
+            async with node_semaphore:
+                await scheduler.schedule(context, queue, sub_task)
+
+        # 并发执行子任务，等待全部子任务结束后再按原始顺序抛出第一个异常
+        results = await asyncio.gather(
+            *(run_sub_task(sub_task) for sub_task in sub_tasks),
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
 
     on_state_fn: dict[TaskState, Callable[
         [
@@ -63,7 +127,8 @@ def get_tree_on_state_fn(
 
         if orchestrator is not None:
             # 调用 orchestrator 进行任务规划
-            await orchestrator.run_task_stream(context=context, queue=queue, task=task)
+            async with tree_slot():
+                await orchestrator.run_task_stream(context=context, queue=queue, task=task)
 
         # 检查任务状态
         if task.is_error():
@@ -89,13 +154,14 @@ def get_tree_on_state_fn(
         - RUNNING: 任务执行出错，状态机重试执行
         - FINISHED: 任务正常完成
         - INITED: 子任务中有被取消的任务，当前任务进入初始状态，等待重新规划执行
+
+        子任务按 max_concurrency 的配置顺序或并发调度，所有子任务结束后才检查取消状态。
         """
         # 强制转换为 ITreeTaskNode 以使用树形特定方法
         assert isinstance(task, ITreeTaskNode)
         # 先执行其子任务
         sub_tasks = task.get_sub_tasks()
-        for sub_task in sub_tasks:
-            await scheduler.schedule(context, queue, sub_task)
+        await schedule_sub_tasks(scheduler, context, queue, sub_tasks)
 
         # 检查任务状态，如果任一子任务被取消，则当前任务进入初始状态，等待重新执行
         if any(sub_task.get_current_state() == TaskState.CANCELED for sub_task in sub_tasks):
@@ -103,7 +169,8 @@ def get_tree_on_state_fn(
             return TaskEvent.INIT
 
         # 调用 Executor 进行任务执行
-        await executor.run_task_stream(context=context, queue=queue, task=task)
+        async with tree_slot():
+            await executor.run_task_stream(context=context, queue=queue, task=task)
         if task.is_error():
             if task.get_state_visit_count(TaskState.RUNNING) >= scheduler.get_max_revisit_count():
                 # 达到最大重试次数，取消任务
@@ -283,6 +350,8 @@ def build_base_scheduler(
     executor: IAgent[ExecStage, ExecEvent, TaskState, TaskEvent, ClientTransportT],
     orchestrator: IAgent[OrchStage, OrchEvent, TaskState, TaskEvent, ClientTransportT] | None = None,
     max_error_retry: int = 3,
+    max_concurrency: int = 1,
+    max_tree_concurrency: int = 0,
 ) -> IScheduler[TaskState, TaskEvent]:
     """创建基础任务调度器实例。
 
@@ -290,6 +359,50 @@ def build_base_scheduler(
         executor: 执行者代理实例
         orchestrator: 编排者代理实例，可选，如果未提供则跳过编排阶段
         max_error_retry: 最大错误重试次数，默认值为3
+        max_concurrency: 单个节点下同时调度的子任务数量上限，默认值为1（按顺序执行），0表示不限制
+        max_tree_concurrency: 整棵任务树同时执行的代理调用数量上限，默认值为0（不限制）
+
+    Returns:
+        BaseScheduler[TaskState, TaskEvent]实例
+    """
+    # 构建任务调度规则映射表
+    on_state_fn = get_tree_on_state_fn(
+        executor=executor,
+        orchestrator=orchestrator,
+        max_concurrency=max_concurrency,
+        max_tree_concurrency=max_tree_concurrency,
+    )
+    # 构建任务回调调度规则映射表
+    on_state_changed_fn = get_tree_on_state_changed_fn()
+
+    # 设置结束状态
+    end_states = {TaskState.FINISHED, TaskState.CANCELED}
+
+    # 构建调度器实例
+    return BaseScheduler[TaskState, TaskEvent](
+        end_states=end_states,
+        on_state_fn=on_state_fn,
+        on_state_changed_fn=on_state_changed_fn,
+        max_revisit_count=max_error_retry,
+    )
+
+
+def build_dag_scheduler(
+    executor: IAgent[ExecStage, ExecEvent, TaskState, TaskEvent, ClientTransportT],
+    orchestrator: IAgent[OrchStage, OrchEvent, TaskState, TaskEvent, ClientTransportT] | None = None,
+    max_error_retry: int = 3,
+    max_concurrency: int = 0,
+    max_tree_concurrency: int = 0,
+) -> IScheduler[TaskState, TaskEvent]:
+    """创建按依赖关系调度子任务的任务调度器实例。子任务的所有前置任务进入 FINISHED 状态后立即开始调度，
+    相互独立的子任务并发执行。
+
+    Args:
+        executor: 执行者代理实例
+        orchestrator: 编排者代理实例，可选，如果未提供则跳过编排阶段
+        max_error_retry: 最大错误重试次数，默认值为3
+        max_concurrency: 单个节点下同时调度的子任务数量上限，默认值为0（不限制）
+        max_tree_concurrency: 整棵任务树同时执行的代理调用数量上限，默认值为0（不限制）
 
     Returns:
         BaseScheduler[TaskState, TaskEvent]实例
@@ -298,6 +411,9 @@ def build_base_scheduler(
     on_state_fn = get_tree_on_state_fn(
         executor=executor,
         orchestrator=orchestrator,
+        max_concurrency=max_concurrency,
+        max_tree_concurrency=max_tree_concurrency,
+        use_dependencies=True,
     )
     # 构建任务回调调度规则映射表
     on_state_changed_fn = get_tree_on_state_changed_fn()
@@ -311,4 +427,4 @@ def build_base_scheduler(
         on_state_fn=on_state_fn,
         on_state_changed_fn=on_state_changed_fn,
         max_revisit_count=max_error_retry,
-    )
\ No newline at end of file
+    )
@@ -14,6 +14,7 @@ from .tree import (
     JsonTreeTaskView,
     DocumentTreeTaskView,
     RequirementTreeTaskView,
+    check_dependencies,
 )
 from .default_node import DefaultTreeNode, get_base_states, get_base_transition
 
@@ -29,6 +30,8 @@ __all__ = [
     "TodoTaskView", "DocumentTaskView", "RequirementTaskView", "ProtocolTaskView", "JsonTaskView",
     # Tree Task Views
     "TodoTreeTaskView", "JsonTreeTaskView", "DocumentTreeTaskView", "RequirementTreeTaskView",
+    # Tree Dependencies
+    "check_dependencies",
     # Default Node
     "DefaultTreeNode", "get_base_states", "get_base_transition",
 ]
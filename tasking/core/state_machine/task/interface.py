@@ -388,3 +388,23 @@ class ITreeTaskNode(ITask[StateT, EventT]):
             被移除的子任务任务对象
         """
         pass
+
+    @abstractmethod
+    def get_dependencies(self) -> list[str]:
+        """
+        获取当前任务依赖的兄弟任务标题列表，依赖任务全部完成后当前任务才能开始执行
+
+        Returns:
+            依赖的兄弟任务标题列表
+        """
+        pass
+
+    @abstractmethod
+    def set_dependencies(self, dependencies: list[str]) -> None:
+        """
+        设置当前任务依赖的兄弟任务标题列表
+
+        Args:
+            dependencies: 依赖的兄弟任务标题列表
+        """
+        pass
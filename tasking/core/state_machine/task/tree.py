@@ -17,6 +17,49 @@ from ...context import IContext, BaseContext
 from ....model.message import MultimodalContent
 
 
+def check_dependencies(dependencies: dict[str, list[str]]) -> list[str]:
+    """检查兄弟任务之间的依赖关系，并返回一个满足依赖关系的执行顺序
+
+    Args:
+        dependencies: 任务依赖关系，键为任务标题，值为该任务依赖的兄弟任务标题列表
+
+    Returns:
+        list[str]: 拓扑排序后的任务标题列表，无依赖关系的任务保持原有顺序
+
+    Raises:
+        ValueError: 如果依赖了不存在的任务，或者依赖关系中存在环
+    """
+    # 1. 检查依赖的任务是否存在
+    for title, deps in dependencies.items():
+        for dep in deps:
+            if dep not in dependencies:
+                raise ValueError(f"任务 '{title}' 依赖的任务 '{dep}' 不存在")
+
+    # 2. Kahn 算法进行拓扑排序，按照原有顺序选择入度为0的任务
+    in_degree: dict[str, int] = {title: len(set(deps)) for title, deps in dependencies.items()}
+    successors: dict[str, list[str]] = {title: [] for title in dependencies}
+    for title, deps in dependencies.items():
+        for dep in set(deps):
+            successors[dep].append(title)
+
+    order: list[str] = []
+    ready: list[str] = [title for title, degree in in_degree.items() if degree == 0]
+    while ready:
+        title = ready.pop(0)
+        order.append(title)
+        for successor in successors[title]:
+            in_degree[successor] -= 1
+            if in_degree[successor] == 0:
+                ready.append(successor)
+
+    # 3. 仍有任务未被排序，说明存在环
+    if len(order) != len(dependencies):
+        cycle = [title for title in dependencies if title not in order]
+        raise ValueError(f"任务依赖关系中存在环：{cycle}")
+
+    return order
+
+
 class BaseTreeTaskNode(ITreeTaskNode[StateT, EventT], BaseTask[StateT, EventT]):
     """树形任务节点实现，支持父子节点管理"""
     # *** 树形结构属性 ***
@@ -27,6 +70,8 @@ class BaseTreeTaskNode(ITreeTaskNode[StateT, EventT], BaseTask[StateT, EventT]):
     # *** 父子节点管理 ***
     _parent: ITreeTaskNode[StateT, EventT] | None
     _sub_tasks: OrderedDict[str, ITreeTaskNode[StateT, EventT]]
+    # 依赖的兄弟任务标题
+    _dependencies: list[str]
 
     def __init__(
         self,
@@ -47,6 +92,8 @@ class BaseTreeTaskNode(ITreeTaskNode[StateT, EventT], BaseTask[StateT, EventT]):
         self._parent = None  # 初始化为None，将通过set_parent设置
         # 创建空的子任务有序字典
         self._sub_tasks = OrderedDict()
+        # 默认不依赖任何兄弟任务
+        self._dependencies = []
 
         # 初始化深度（延迟计算）
         self._current_depth = 0  # 将在父子关系建立后重新计算
@@ -242,6 +289,29 @@ class BaseTreeTaskNode(ITreeTaskNode[StateT, EventT], BaseTask[StateT, EventT]):
 
         return node
 
+    def get_dependencies(self) -> list[str]:
+        """
+        获取当前节点依赖的兄弟节点标题列表
+
+        Returns:
+            依赖的兄弟节点标题列表
+        """
+        return list(self._dependencies)
+
+    def set_dependencies(self, dependencies: list[str]) -> None:
+        """
+        设置当前节点依赖的兄弟节点标题列表，重复的标题会被去除
+
+        Args:
+            dependencies: 依赖的兄弟节点标题列表
+
+        Raises:
+            ValueError: 如果依赖列表中包含当前节点自身
+        """
+        if self._title and self._title in dependencies:
+            raise ValueError(f"任务 '{self._title}' 不能依赖自身")
+        self._dependencies = list(dict.fromkeys(dependencies))
+
 
 class RequirementTreeTaskView(ITaskView[StateT, EventT]):
     """将树形任务可视化为需求格式的字符串表示，格式化内容可用于任务需求描述，递归包含所有子任务。
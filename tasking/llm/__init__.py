@@ -3,7 +3,9 @@ from .openai import OpenAiLLM, OpenAiEmbeddingLLM
 from .anthropic import AnthropicLLM, AnthropicEmbeddingLLM
 from .ark import ArkLLM, ArkEmbeddingLLM
 from .zhipu import ZhipuLLM, ZhipuEmbeddingLLM
+from .cache import CachedLLM, ResponseCache
 from .const import Provider
+from .http_pool import HttpClientRegistry, PoolStats, get_http_client_registry
 from .utils import build_llm, build_embed_model
 
 
@@ -12,8 +14,12 @@ __all__ = [
     "IModel", "ILLM", "IEmbedModel",
     # Implementations
     "OpenAiLLM", "OpenAiEmbeddingLLM", "AnthropicLLM", "AnthropicEmbeddingLLM", "ArkLLM", "ArkEmbeddingLLM", "ZhipuLLM", "ZhipuEmbeddingLLM", 
+    # Cache
+    "CachedLLM", "ResponseCache",
     # Providers
     "Provider",
+    # HTTP connection pools
+    "HttpClientRegistry", "PoolStats", "get_http_client_registry",
     # Builders
     "build_llm", "build_embed_model",
 ]
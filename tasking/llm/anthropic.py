@@ -17,7 +17,11 @@ from anthropic.types import (
 from pydantic import SecretStr
 
 from .const import Provider
+from .history import MessageHistoryCache
+from .http_pool import get_http_client_registry
 from .interface import ILLM, IEmbedModel
+from .prompt_cache import MIN_CACHE_PREFIX_SIZE, plan_cache_breakpoints, sort_tools
+from .stream import ToolCallAccumulator
 from ..model import (
     ToolCallRequest,
     Message,
@@ -93,7 +97,8 @@ def to_anthropic(config: CompletionConfig, tools: list[McpTool] | None = None) -
     # tools（Anthropic: [{name, description, input_schema}]）
     if tools:
         anthropic_tools: list[dict[str, str | dict[str, Any]]] = []
-        for tool in tools:
+        # 工具按名称排序，保持请求前缀稳定
+        for tool in sort_tools(tools):
             # McpTool has name/description/inputSchema
             anthropic_tools.append(
                 {
@@ -177,7 +182,19 @@ def to_anthropic_messages(messages: list[Message]) -> list[MessageParam]:
             The Anthropic compatible messages dictionaries.
     """
     history: list[MessageParam] = []
+    _extend_anthropic_messages(history, messages)
+    return history
+
+
+def _extend_anthropic_messages(history: list[MessageParam], messages: list[Message]) -> None:
+    """把消息依次转换为 Anthropic 格式并追加到已有的消息历史，SYSTEM/USER 消息可能与历史中的最后一条合并
 
+    Args:
+        history (list[MessageParam]):
+            已转换的消息历史，会被原地修改
+        messages (list[Message]):
+            新追加的消息
+    """
     for message in messages:
         # Get last message sender
         last_role: str | None = history[-1]["role"] if history else None
@@ -244,8 +261,6 @@ def to_anthropic_messages(messages: list[Message]) -> list[MessageParam]:
 
         _append_message_by_role(history, message, content)
 
-    return history
-
 
 def _append_message_by_role(
     history: list[MessageParam],
@@ -293,6 +308,45 @@ def _append_message_by_role(
         raise ValueError(f"Unsupported message role: {message.role}")
 
 
+def add_cache_control(history: list[MessageParam], kwargs: dict[str, Any]) -> list[MessageParam]:
+    """为稳定的提示词前缀添加 Anthropic 的 `cache_control` 缓存断点
+
+    Anthropic 每次请求最多支持 4 个断点：最后一个工具定义，以及 `plan_cache_breakpoints` 选出的最多 3 条消息，
+    前缀过短的断点会被跳过。
+    被标记的消息和内容块都是副本，传入的消息历史（其中的元素与历史缓存共享）不会被修改。
+
+    Args:
+        history (list[MessageParam]):
+            Anthropic 格式的消息历史
+        kwargs (dict[str, Any]):
+            `to_anthropic` 生成的请求参数，其中的工具定义列表会被原地替换最后一项
+
+    Returns:
+        list[MessageParam]:
+            添加了缓存断点的新消息历史
+    """
+    tools = kwargs.get("tools")
+    tools_size = len(str(tools)) if tools else 0
+    if tools and tools_size >= MIN_CACHE_PREFIX_SIZE:
+        tools[-1] = {**tools[-1], "cache_control": {"type": "ephemeral"}}
+
+    marked = list(history)
+    roles = [message["role"] for message in history]
+    sizes = [len(str(message["content"])) for message in history]
+    for index in plan_cache_breakpoints(roles, sizes, prefix_size=tools_size):
+        content = history[index]["content"]
+        if isinstance(content, str):
+            blocks: list[ContentBlockParam] = [TextBlockParam(type="text", text=content)]
+        else:
+            blocks = list(cast(list[ContentBlockParam], content))
+        # 空文本块不能作为断点
+        if not blocks or (blocks[-1]["type"] == "text" and not blocks[-1].get("text")):
+            continue
+        blocks[-1] = cast(ContentBlockParam, {**blocks[-1], "cache_control": {"type": "ephemeral"}})
+        marked[index] = MessageParam(role=history[index]["role"], content=blocks)
+    return marked
+
+
 class AnthropicLLM(ILLM):
     """Anthropic LLM implementation."""
 
@@ -301,6 +355,7 @@ class AnthropicLLM(ILLM):
     _base_url: str
     _api_key: SecretStr
     _client: AsyncAnthropic
+    _history_cache: MessageHistoryCache[MessageParam]
 
     def __init__(self, config: LLMConfig, **_kwargs: Any) -> None:
         """Initialize the AnthropicEmbeddingLLM.
@@ -324,8 +379,16 @@ class AnthropicLLM(ILLM):
         self._client = AsyncAnthropic(
             base_url=self._base_url,
             api_key=self._api_key.get_secret_value(),
+            timeout=config.timeout,
+            # 相同提供商、基础 URL 和 API 密钥的实例共享连接池
+            http_client=get_http_client_registry().get_client(
+                self._provider, self._base_url, self._api_key, config.timeout,
+            ),
         )
 
+        # 按任务上下文缓存已转换的消息历史
+        self._history_cache = MessageHistoryCache[MessageParam](_extend_anthropic_messages)
+
     @classmethod
     def from_config(cls, config: LLMConfig) -> ILLM:
         """Create an instance of AnthropicEmbeddingLLM from LLMConfig."""
@@ -374,11 +437,15 @@ class AnthropicLLM(ILLM):
 
         # 转换阶段统一处理 CompletionConfig（包含 extra_body / extra_headers / ignore_params）
         kwargs = to_anthropic(completion_config, tools)
-        history = to_anthropic_messages(messages)
+        # 只转换上次请求之后新追加的消息
+        history = self._history_cache.convert(messages)
+        if completion_config.prompt_cache and "prompt_cache" not in (completion_config.ignore_params or []):
+            # 标记稳定的提示词前缀，后续请求命中 Anthropic 的提示词缓存
+            history = add_cache_control(history, kwargs)
 
         # Initialize accumulators for streaming response
         accumulated_content = ""
-        accumulated_tool_calls: dict[int, ToolCallRequest] = {}
+        tool_call_accumulator = ToolCallAccumulator()
 
         try:
             if stream_queue is not None:
@@ -400,15 +467,19 @@ class AnthropicLLM(ILLM):
                             )
                             await stream_queue.put(chunk_message)
 
-                        elif event.type == "tool_use":
-                            # Accumulate tool call
-                            tool_call = ToolCallRequest(
-                                id=event.id,
-                                name=event.name,
-                                type="function",
-                                args=event.input,
-                            )
-                            accumulated_tool_calls[event.index] = tool_call
+                        elif event.type == "content_block_start":
+                            # A tool use block carries id and name, its input arrives as json deltas
+                            if event.content_block.type == "tool_use":
+                                tool_call_accumulator.add(
+                                    event.index,
+                                    id=event.content_block.id,
+                                    name=event.content_block.name,
+                                )
+
+                        elif event.type == "content_block_delta":
+                            # Raw input fragments are buffered and parsed once at the end
+                            if event.delta.type == "input_json_delta":
+                                tool_call_accumulator.add(event.index, arguments=event.delta.partial_json)
 
                         elif event.type == "content_block_stop":
                             # Content block finished
@@ -441,7 +512,7 @@ class AnthropicLLM(ILLM):
         if stream_queue is not None:
             # For streaming mode, use accumulated data
             content = [TextBlock(text=accumulated_content)] if accumulated_content else []
-            tool_calls = list(accumulated_tool_calls.values())
+            tool_calls = tool_call_accumulator.finish()
             usage = _create_usage(final_response.usage)
             stop_reason = _map_stop_reason(final_response.stop_reason)
         else:
@@ -484,8 +555,18 @@ def _extract_response_content(
 
 
 def _create_usage(anthropic_usage: Usage) -> CompletionUsage:
-    """Create CompletionUsage from Anthropic Usage."""
-    prompt_tokens = anthropic_usage.input_tokens or -100
+    """Create CompletionUsage from Anthropic Usage.
+
+    Anthropic 的 input_tokens 不包含读取和写入缓存的 token，prompt_tokens 为三者之和。
+    """
+    cache_read_tokens = getattr(anthropic_usage, "cache_read_input_tokens", None)
+    cache_creation_tokens = getattr(anthropic_usage, "cache_creation_input_tokens", None)
+    cache_read_tokens = cache_read_tokens if isinstance(cache_read_tokens, int) else -100
+    cache_creation_tokens = cache_creation_tokens if isinstance(cache_creation_tokens, int) else -100
+
+    prompt_tokens = (
+        (anthropic_usage.input_tokens or 0) + max(cache_read_tokens, 0) + max(cache_creation_tokens, 0)
+    ) or -100
     completion_tokens = anthropic_usage.output_tokens or -100
     total_tokens = (
         (prompt_tokens + completion_tokens)
@@ -496,6 +577,8 @@ def _create_usage(anthropic_usage: Usage) -> CompletionUsage:
         prompt_tokens=prompt_tokens,
         completion_tokens=completion_tokens,
         total_tokens=total_tokens,
+        cached_tokens=cache_read_tokens,
+        cache_creation_tokens=cache_creation_tokens,
     )
 
 
@@ -542,6 +625,11 @@ class AnthropicEmbeddingLLM(IEmbedModel):
         self._client = AsyncAnthropic(
             base_url=self._base_url,
             api_key=self._api_key.get_secret_value(),
+            timeout=config.timeout,
+            # 相同提供商、基础 URL 和 API 密钥的实例共享连接池
+            http_client=get_http_client_registry().get_client(
+                self._provider, self._base_url, self._api_key, config.timeout,
+            ),
         )
 
     @classmethod
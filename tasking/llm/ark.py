@@ -3,7 +3,6 @@ import getpass
 import json
 from typing import Any, cast
 
-from json_repair import repair_json
 from loguru import logger
 from pydantic import SecretStr
 from mcp.types import Tool as McpTool
@@ -38,7 +37,11 @@ from volcenginesdkarkruntime.types.multimodal_embedding.embedding_content_part_v
 )
 
 from .const import Provider
+from .history import MessageHistoryCache
+from .http_pool import get_http_client_registry
+from .prompt_cache import get_cached_tokens, sort_tools
 from .interface import ILLM, IEmbedModel
+from .stream import ToolCallAccumulator, parse_tool_arguments
 from ..model import (
     ToolCallRequest,
     Message,
@@ -125,7 +128,8 @@ def to_ark(config: CompletionConfig, tools: list[McpTool] | None = None) -> dict
 
     # tools (Ark uses OpenAI-like format)
     if tools:
-        kwargs["tools"] = [tool_schema(tool) for tool in tools]
+        # 工具按名称排序，保持请求前缀稳定以命中提供商的前缀缓存
+        kwargs["tools"] = [tool_schema(tool) for tool in sort_tools(tools)]
 
     return kwargs
 
@@ -202,7 +206,19 @@ def to_ark_dict(messages: list[Message]) -> list[ChatCompletionMessageParam]:
             The Ark compatible messages dictionaries.
     """
     history: list[ChatCompletionMessageParam] = []
+    _extend_ark_dict(history, messages)
+    return history
+
 
+def _extend_ark_dict(history: list[ChatCompletionMessageParam], messages: list[Message]) -> None:
+    """把消息依次转换为 Ark 格式并追加到已有的消息历史，SYSTEM/USER 消息可能与历史中的最后一条合并
+
+    Args:
+        history (list[ChatCompletionMessageParam]):
+            已转换的消息历史，会被原地修改
+        messages (list[Message]):
+            新追加的消息
+    """
     for message in messages:
         # Get last message sender
         last_role: str | None = history[-1]["role"] if history else None
@@ -267,8 +283,6 @@ def to_ark_dict(messages: list[Message]) -> list[ChatCompletionMessageParam]:
 
         _append_message_by_role(history, message, content)
 
-    return history
-
 
 def _append_message_by_role(
     history: list[ChatCompletionMessageParam],
@@ -336,6 +350,7 @@ class ArkLLM(ILLM):
     _base_url: str
     _api_key: SecretStr
     _client: AsyncArk
+    _history_cache: MessageHistoryCache[ChatCompletionMessageParam]
 
     def __init__(self, config: LLMConfig, **_kwargs: Any) -> None:
         """Initialize the ArkLLM.
@@ -364,8 +379,16 @@ class ArkLLM(ILLM):
         self._client = AsyncArk(
             base_url=self._base_url,
             api_key=self._api_key.get_secret_value(),
+            timeout=config.timeout,
+            # 相同提供商、基础 URL 和 API 密钥的实例共享连接池
+            http_client=get_http_client_registry().get_client(
+                self._provider, self._base_url, self._api_key, config.timeout,
+            ),
         )
 
+        # 按任务上下文缓存已转换的消息历史
+        self._history_cache = MessageHistoryCache[ChatCompletionMessageParam](_extend_ark_dict)
+
     @classmethod
     def from_config(cls, config: LLMConfig) -> ILLM:
         """Create an instance of ArkLLM from LLMConfig."""
@@ -416,15 +439,22 @@ class ArkLLM(ILLM):
 
         # 转换阶段统一处理 CompletionConfig（包含 extra_body / extra_headers / ignore_params）
         kwargs = to_ark(completion_config, tools)
-        history = to_ark_dict(messages)
+        # 只转换上次请求之后新追加的消息
+        history = self._history_cache.convert(messages)
 
         # Initialize accumulators for streaming response
         accumulated_content = ""
-        accumulated_tool_calls: dict[int, ToolCallRequest] = {}
+        tool_call_accumulator = ToolCallAccumulator()
+        # Usage and finish reason are read from the stream itself
+        stream_usage: Any = None
+        stream_finish_reason: str | None = None
+        final_response: ChatCompletion | None = None
 
         try:
             if stream_queue is not None:
-                # Streaming mode
+                # Streaming mode, ask the server to append a usage chunk at the end of the stream
+                if "stream_options" not in (completion_config.ignore_params or []):
+                    kwargs["stream_options"] = {"include_usage": True}
                 response = await self._client.chat.completions.create(
                     model=self._model,
                     messages=history,
@@ -435,65 +465,51 @@ class ArkLLM(ILLM):
                 # Type assertion: stream=True returns AsyncStream
                 # Process the stream - Ark streaming format might be different
                 stream = cast(Any, response)  # Cast to Any to handle AsyncStream properly
-                async for chunk in stream:  # type: ignore[reportGeneralTypeIssues]
-                    if hasattr(chunk, 'choices') and chunk.choices:
-                        choice = chunk.choices[0]
-
-                        # Handle content delta
-                        if hasattr(choice, 'delta') and hasattr(choice.delta, 'content'):
-                            if choice.delta.content:
-                                content_delta = choice.delta.content
-                                accumulated_content += content_delta
-                                # Send chunk message to stream queue
-                                chunk_message = Message(
-                                    role=Role.ASSISTANT,
-                                    content=[TextBlock(text=content_delta)],
-                                    is_chunking=True,
-                                    stop_reason=StopReason.NONE,
-                                )
-                                await stream_queue.put(chunk_message)
-
-                        # Handle tool call delta
-                        if hasattr(choice, 'delta') and hasattr(choice.delta, 'tool_calls'):
-                            if choice.delta.tool_calls:
-                                for tool_call_delta in choice.delta.tool_calls:
-                                    if hasattr(tool_call_delta, 'index'):
-                                        tool_index = tool_call_delta.index
-                                    else:
-                                        tool_index = 0
-
-                                    if tool_index not in accumulated_tool_calls:
-                                        # Initialize new tool call
-                                        tool_call = ToolCallRequest(
-                                            id=getattr(tool_call_delta, 'id', f"tool_call_{tool_index}"),
-                                            name=getattr(tool_call_delta, 'function', {}).get('name', ''),
-                                            type="function",
-                                            args=json.loads(repair_json(getattr(tool_call_delta, 'function', {}).get('arguments') or '{}'))
+                try:
+                    async for chunk in stream:  # type: ignore[reportGeneralTypeIssues]
+                        # The usage chunk has an empty choices list
+                        if getattr(chunk, 'usage', None):
+                            stream_usage = chunk.usage
+                        if hasattr(chunk, 'choices') and chunk.choices:
+                            choice = chunk.choices[0]
+                            if getattr(choice, 'finish_reason', None):
+                                stream_finish_reason = choice.finish_reason
+
+                            # Handle content delta
+                            if hasattr(choice, 'delta') and hasattr(choice.delta, 'content'):
+                                if choice.delta.content:
+                                    content_delta = choice.delta.content
+                                    accumulated_content += content_delta
+                                    # Send chunk message to stream queue
+                                    chunk_message = Message(
+                                        role=Role.ASSISTANT,
+                                        content=[TextBlock(text=content_delta)],
+                                        is_chunking=True,
+                                        stop_reason=StopReason.NONE,
+                                    )
+                                    await stream_queue.put(chunk_message)
+
+                            # Handle tool call delta, raw argument fragments are buffered and parsed once at the end
+                            if hasattr(choice, 'delta') and hasattr(choice.delta, 'tool_calls'):
+                                if choice.delta.tool_calls:
+                                    for tool_call_delta in choice.delta.tool_calls:
+                                        tool_index = getattr(tool_call_delta, 'index', None)
+                                        if tool_index is None:
+                                            tool_index = 0
+
+                                        function = getattr(tool_call_delta, 'function', None)
+                                        tool_call_accumulator.add(
+                                            tool_index,
+                                            id=getattr(tool_call_delta, 'id', None),
+                                            name=getattr(function, 'name', None),
+                                            arguments=getattr(function, 'arguments', None),
                                         )
-                                        accumulated_tool_calls[tool_index] = tool_call
-                                    else:
-                                        # Update existing tool call
-                                        existing_tool_call = accumulated_tool_calls[tool_index]
-                                        if hasattr(tool_call_delta, 'id') and tool_call_delta.id:
-                                            existing_tool_call.id = tool_call_delta.id
-                                        if hasattr(tool_call_delta, 'function'):
-                                            if hasattr(tool_call_delta.function, 'name') and tool_call_delta.function.name:
-                                                existing_tool_call.name = tool_call_delta.function.name
-                                            if hasattr(tool_call_delta.function, 'arguments') and tool_call_delta.function.arguments:
-                                                new_args = json.loads(repair_json(tool_call_delta.function.arguments or '{}'))
-                                                existing_tool_call.args.update(new_args)
-
-                # For Ark, we need to make a non-streaming call to get final usage
-                # This is a common pattern for APIs that don't provide usage in streaming
-                final_response = await self._client.chat.completions.create(
-                    model=self._model,
-                    messages=history,
-                    stream=False,
-                    **kwargs,
-                )
-                final_response = cast(ChatCompletion, final_response)
+                except BaseException:
+                    # 生成被取消（如终止标签闭合）或出错时关闭响应，把连接归还给连接池
+                    await stream.close()
+                    raise
 
-                logger.info(f"[Ark] Streaming completion successful, input_tokens: {final_response.usage.prompt_tokens if final_response.usage else 'unknown'}, output_tokens: {final_response.usage.completion_tokens if final_response.usage else 'unknown'}")
+                logger.info(f"[Ark] Streaming completion successful, input_tokens: {stream_usage.prompt_tokens if stream_usage else 'unknown'}, output_tokens: {stream_usage.completion_tokens if stream_usage else 'unknown'}")
 
             else:
                 # Non-streaming mode
@@ -524,18 +540,19 @@ class ArkLLM(ILLM):
         if stream_queue is not None:
             # For streaming mode, use accumulated data
             content_blocks = [TextBlock(text=accumulated_content)] if accumulated_content else []
-            tool_calls = list(accumulated_tool_calls.values())
-            usage = _create_usage(final_response)
-            stop_reason = _map_stop_reason(final_response, tool_calls)
+            tool_calls = tool_call_accumulator.finish()
+            usage = _create_usage(stream_usage)
+            stop_reason = _map_stop_reason(stream_finish_reason, tool_calls)
         else:
             # For non-streaming mode, extract from response
+            assert final_response is not None
             content_text: str = final_response.choices[0].message.content or ""
             # Convert to list[TextBlock] format
             content_blocks = [TextBlock(text=content_text)] if content_text else []
 
-            usage = _create_usage(final_response)
+            usage = _create_usage(final_response.usage)
             tool_calls = _extract_tool_calls(final_response)
-            stop_reason = _map_stop_reason(final_response, tool_calls)
+            stop_reason = _map_stop_reason(final_response.choices[0].finish_reason, tool_calls)
 
         return Message(
             role=Role.ASSISTANT,
@@ -546,9 +563,8 @@ class ArkLLM(ILLM):
         )
 
 
-def _create_usage(response: ChatCompletion) -> CompletionUsage:
-    """Create CompletionUsage from Ark response."""
-    ark_usage = response.usage
+def _create_usage(ark_usage: Any) -> CompletionUsage:
+    """Create CompletionUsage from Ark usage, either `response.usage` or the usage chunk of a stream."""
     if ark_usage is None:
         return CompletionUsage(
             prompt_tokens=-100,
@@ -559,6 +575,7 @@ def _create_usage(response: ChatCompletion) -> CompletionUsage:
         prompt_tokens=ark_usage.prompt_tokens or -100,
         completion_tokens=ark_usage.completion_tokens or -100,
         total_tokens=ark_usage.total_tokens or -100,
+        cached_tokens=get_cached_tokens(ark_usage),
     )
 
 
@@ -573,19 +590,17 @@ def _extract_tool_calls(response: ChatCompletion) -> list[ToolCallRequest]:
                 id=tool_call.id,
                 name=tool_call.function.name,
                 type="function",
-                args=json.loads(repair_json(tool_call.function.arguments or '{}')),
+                args=parse_tool_arguments(tool_call.function.arguments or ''),
             ))
 
     return tool_calls
 
 
 def _map_stop_reason(
-    response: ChatCompletion,
+    finish_reason: str | None,
     tool_calls: list[ToolCallRequest],
 ) -> StopReason:
     """Map Ark finish reason to StopReason enum."""
-    finish_reason = response.choices[0].finish_reason
-
     if finish_reason == "length":
         return StopReason.LENGTH
     if finish_reason == "content_filter":
@@ -694,6 +709,11 @@ class ArkEmbeddingLLM(IEmbedModel):
         self._client = AsyncArk(
             base_url=self._base_url,
             api_key=self._api_key.get_secret_value(),
+            timeout=config.timeout,
+            # 相同提供商、基础 URL 和 API 密钥的实例共享连接池
+            http_client=get_http_client_registry().get_client(
+                self._provider, self._base_url, self._api_key, config.timeout,
+            ),
         )
 
     @classmethod
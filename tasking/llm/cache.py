@@ -0,0 +1,417 @@
+"""
+补全结果的本地缓存：按请求内容计算哈希，相同的请求直接回放缓存的结果（包括流式输出的片段），
+用于 CI、评测和重试时的确定性、零成本重跑
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import time
+from typing import Any, NamedTuple
+
+import aiosqlite
+from loguru import logger
+from mcp.types import Tool as McpTool
+
+from .const import Provider
+from .interface import ILLM
+from .prompt_cache import sort_tools
+from ..model import CompletionConfig, CompletionUsage, Message, Role, TextBlock
+from ..model.queue import IAsyncQueue
+from ..model.setting import LLMConfig
+
+
+_CACHE_VERSION = "1"
+# 不影响补全结果的消息字段
+_MESSAGE_EXCLUDE = {"uid", "timestamp", "usage", "is_chunking", "metadata"}
+# 不影响补全结果的配置字段，流式和非流式请求共享缓存
+_CONFIG_EXCLUDE = {"stream", "stop_labels"}
+
+
+class CachedResponse(NamedTuple):
+    """缓存的补全结果"""
+
+    message: Message
+    """补全得到的消息"""
+    chunks: list[tuple[float, str]]
+    """流式输出的片段：(相对请求开始的秒数, 文本)，非流式请求为空列表"""
+
+
+def completion_cache_key(
+    llm: ILLM,
+    messages: list[Message],
+    tools: list[McpTool] | None,
+    completion_config: CompletionConfig,
+    **kwargs: Any,
+) -> str:
+    """计算补全请求的缓存键：模型、规范化的消息、工具和补全配置的 SHA-256 哈希
+
+    Args:
+        llm: 语言模型
+        messages: 要补全的消息，忽略 uid、时间戳、用量等与请求内容无关的字段
+        tools: 可用的工具列表，按名称排序
+        completion_config: 补全配置，忽略是否流式输出
+        **kwargs: 额外的关键字参数
+
+    Returns:
+        str: 十六进制的哈希值
+    """
+    payload = {
+        "version": _CACHE_VERSION,
+        "provider": str(llm.get_provider()),
+        "base_url": llm.get_base_url(),
+        "model": llm.get_model(),
+        "messages": [message.model_dump(mode="json", exclude=_MESSAGE_EXCLUDE) for message in messages],
+        "tools": [tool.model_dump(mode="json") for tool in sort_tools(tools or [])],
+        "config": completion_config.model_dump(mode="json", exclude=_CONFIG_EXCLUDE),
+        "kwargs": kwargs,
+    }
+    data = json.dumps(payload, ensure_ascii=False, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """基于 SQLite 的补全结果缓存，使用 aiosqlite 在后台线程中读写，不阻塞事件循环
+
+    - 超过 `ttl` 秒的结果视为过期
+    - 条目数量或总大小超过上限时，按最近访问时间淘汰最久未使用的结果
+    - 数据库连接在第一次使用时打开，同一时间只执行一个读写操作
+
+    Example:
+        ```python
+        cache = ResponseCache("~/.cache/tasking/responses.sqlite3", ttl=7 * 24 * 3600)
+        llm = CachedLLM(build_llm(config), cache)
+        ```
+    """
+    _path: str
+    _ttl: float | None
+    _max_entries: int
+    _max_bytes: int
+    _conn: aiosqlite.Connection | None
+    _lock: asyncio.Lock
+
+    def __init__(
+        self,
+        path: str | None = None,
+        ttl: float | None = None,
+        max_entries: int = 10000,
+        max_bytes: int = 256 * 1024 * 1024,
+    ) -> None:
+        """初始化补全结果缓存，数据库文件在第一次使用时打开（或创建）
+
+        Args:
+            path: 缓存文件路径，None表示使用 `~/.cache/tasking/responses.sqlite3`，":memory:" 表示只保存在内存中
+            ttl: 结果的有效期（秒），None表示永不过期
+            max_entries: 最多缓存的结果数量
+            max_bytes: 缓存结果的总大小上限（字节）
+
+        Raises:
+            ValueError: 如果 ttl、max_entries 或 max_bytes 不是正数。
+        """
+        if ttl is not None and ttl <= 0:
+            raise ValueError(f"ttl必须大于0：{ttl}")
+        if max_entries <= 0:
+            raise ValueError(f"max_entries必须大于0：{max_entries}")
+        if max_bytes <= 0:
+            raise ValueError(f"max_bytes必须大于0：{max_bytes}")
+
+        if path is None:
+            path = os.path.join(os.path.expanduser("~"), ".cache", "tasking", "responses.sqlite3")
+        elif path != ":memory:":
+            path = os.path.expanduser(path)
+        self._path = path
+        self._ttl = ttl
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._conn = None
+        self._lock = asyncio.Lock()
+
+    def get_path(self) -> str:
+        """获取缓存文件路径"""
+        return self._path
+
+    async def _get_conn(self) -> aiosqlite.Connection:
+        """私有方法：获取数据库连接，第一次使用时打开数据库并创建数据表"""
+        if self._conn is None:
+            if self._path != ":memory:":
+                os.makedirs(os.path.dirname(self._path) or ".", exist_ok=True)
+            conn = await aiosqlite.connect(self._path)
+            await conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, created REAL NOT NULL, accessed REAL NOT NULL, "
+                "size INTEGER NOT NULL, message TEXT NOT NULL, chunks TEXT NOT NULL)"
+            )
+            await conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+            await conn.commit()
+            self._conn = conn
+        return self._conn
+
+    async def count(self) -> int:
+        """获取缓存的结果数量"""
+        async with self._lock:
+            conn = await self._get_conn()
+            async with conn.execute("SELECT COUNT(*) FROM responses") as cursor:
+                row = await cursor.fetchone()
+        return row[0] if row is not None else 0
+
+    async def get(self, key: str) -> CachedResponse | None:
+        """读取缓存的结果并更新访问时间
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            CachedResponse | None: 缓存的结果，不存在或已过期时返回None
+        """
+        now = time.time()
+        async with self._lock:
+            conn = await self._get_conn()
+            async with conn.execute("SELECT created, message, chunks FROM responses WHERE key = ?", (key,)) as cursor:
+                row = await cursor.fetchone()
+            if row is None:
+                return None
+            created, message, chunks = row
+            if self._ttl is not None and now - created > self._ttl:
+                await conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                await conn.commit()
+                return None
+            await conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+            await conn.commit()
+
+        # 每次读取都生成新的 uid 和时间戳，避免同一条消息重复出现在上下文中
+        return CachedResponse(
+            Message.model_validate_json(message),
+            [(offset, text) for offset, text in json.loads(chunks)],
+        )
+
+    async def put(self, key: str, message: Message, chunks: list[tuple[float, str]]) -> None:
+        """写入结果，超过上限时淘汰最久未使用的结果
+
+        Args:
+            key: 缓存键
+            message: 补全得到的消息
+            chunks: 流式输出的片段
+        """
+        message_json = message.model_dump_json(exclude={"uid", "timestamp"})
+        chunks_json = json.dumps(chunks, ensure_ascii=False)
+        size = len(message_json) + len(chunks_json)
+        now = time.time()
+        async with self._lock:
+            conn = await self._get_conn()
+            await conn.execute(
+                "INSERT OR REPLACE INTO responses (key, created, accessed, size, message, chunks) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, now, now, size, message_json, chunks_json),
+            )
+            await self._evict(conn, now)
+            await conn.commit()
+
+    async def _evict(self, conn: aiosqlite.Connection, now: float) -> None:
+        """私有方法：删除过期的结果，再按访问时间淘汰超出数量或大小上限的结果，淘汰在数据库中完成"""
+        if self._ttl is not None:
+            await conn.execute("DELETE FROM responses WHERE created < ?", (now - self._ttl,))
+
+        async with conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses") as cursor:
+            row = await cursor.fetchone()
+        count, total = row if row is not None else (0, 0)
+        if count <= self._max_entries and total <= self._max_bytes:
+            return
+
+        evicted = 0
+        if count > self._max_entries:
+            cursor = await conn.execute(
+                "DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY accessed LIMIT ?)",
+                (count - self._max_entries,),
+            )
+            evicted += cursor.rowcount
+            async with conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses") as cursor:
+                row = await cursor.fetchone()
+            total = row[0] if row is not None else 0
+        if total > self._max_bytes:
+            # 按访问时间累加大小，删除累加到超出部分为止的最旧结果
+            cursor = await conn.execute(
+                "DELETE FROM responses WHERE key IN ("
+                "SELECT key FROM (SELECT key, size, SUM(size) OVER (ORDER BY accessed, key) AS running FROM responses) "
+                "WHERE running - size < ?)",
+                (total - self._max_bytes,),
+            )
+            evicted += cursor.rowcount
+        logger.debug(f"[响应缓存] 淘汰了 {evicted} 个结果")
+
+    async def clear(self) -> None:
+        """清空所有缓存的结果"""
+        async with self._lock:
+            conn = await self._get_conn()
+            await conn.execute("DELETE FROM responses")
+            await conn.commit()
+
+    async def close(self) -> None:
+        """关闭数据库连接"""
+        async with self._lock:
+            if self._conn is not None:
+                await self._conn.close()
+                self._conn = None
+
+
+class _RecordingQueue(IAsyncQueue[Message]):
+    """转发流式消息到原队列，并记录每个片段的文本和相对时间"""
+
+    def __init__(self, queue: IAsyncQueue[Message]) -> None:
+        self._queue = queue
+        self._start = time.monotonic()
+        self.chunks: list[tuple[float, str]] = []
+
+    def _record(self, item: Message) -> None:
+        text = "".join(block.text for block in item.content if isinstance(block, TextBlock))
+        if text:
+            self.chunks.append((round(time.monotonic() - self._start, 4), text))
+
+    async def put(self, item: Message, block: bool = True, timeout: float | None = None) -> None:
+        self._record(item)
+        await self._queue.put(item, block, timeout)
+
+    async def put_nowait(self, item: Message) -> None:
+        self._record(item)
+        await self._queue.put_nowait(item)
+
+    async def get(self, block: bool = True, timeout: float | None = None) -> Message:
+        return await self._queue.get(block, timeout)
+
+    async def get_nowait(self) -> Message:
+        return await self._queue.get_nowait()
+
+    def is_empty(self) -> bool:
+        return self._queue.is_empty()
+
+    def is_full(self) -> bool:
+        return self._queue.is_full()
+
+    def qsize(self) -> int:
+        return self._queue.qsize()
+
+    def is_closed(self) -> bool:
+        return self._queue.is_closed()
+
+    async def close(self) -> None:
+        await self._queue.close()
+
+
+class CachedLLM(ILLM):
+    """带本地结果缓存的语言模型装饰器
+
+    相同的请求（模型、消息、工具和补全配置）直接返回缓存的结果，不再调用底层模型；
+    流式请求命中缓存时，按 `replay_speed` 把记录的片段依次放入流式数据队列。
+    失败或被取消的请求不会被缓存。
+
+    Example:
+        ```python
+        llm = CachedLLM(build_llm(config), ResponseCache(ttl=24 * 3600), replay_speed=None)
+        message = await llm.completion(messages, tools, stream_queue, completion_config)
+        ```
+    """
+    _llm: ILLM
+    _cache: ResponseCache
+    _replay_speed: float | None
+    _hits: int
+    _misses: int
+
+    def __init__(self, llm: ILLM, cache: ResponseCache, replay_speed: float | None = None) -> None:
+        """初始化缓存装饰器
+
+        Args:
+            llm: 被装饰的语言模型
+            cache: 补全结果缓存
+            replay_speed: 回放流式片段的速度倍数，1.0 表示按记录时的节奏回放，None表示不等待
+
+        Raises:
+            ValueError: 如果 replay_speed 不是正数。
+        """
+        if replay_speed is not None and replay_speed <= 0:
+            raise ValueError(f"replay_speed必须大于0：{replay_speed}")
+        self._llm = llm
+        self._cache = cache
+        self._replay_speed = replay_speed
+        self._hits = 0
+        self._misses = 0
+
+    @classmethod
+    def from_config(cls, config: LLMConfig) -> ILLM:
+        """根据配置构建语言模型，并使用默认路径的结果缓存"""
+        from .utils import build_llm
+        return cls(build_llm(config), ResponseCache())
+
+    def get_provider(self) -> Provider:
+        return self._llm.get_provider()
+
+    def get_base_url(self) -> str:
+        return self._llm.get_base_url()
+
+    def get_model(self) -> str:
+        return self._llm.get_model()
+
+    def get_stats(self) -> tuple[int, int]:
+        """获取缓存命中和未命中的次数
+
+        Returns:
+            tuple[int, int]: (命中次数, 未命中次数)
+        """
+        return self._hits, self._misses
+
+    async def completion(
+        self,
+        messages: list[Message],
+        tools: list[McpTool] | None,
+        stream_queue: IAsyncQueue[Message] | None,
+        completion_config: CompletionConfig,
+        **kwargs: Any,
+    ) -> Message:
+        """补全消息，命中缓存时回放缓存的结果
+
+        Args:
+            messages (list[Message]):
+                要补全的消息
+            tools (list[McpTool] | None):
+                可用的工具列表，如果没有工具则为 None
+            stream_queue (IQueue[Message] | None):
+                流式数据队列，用于输出补全过程中产生的流式数据，如果不需要流式输出则为 None
+            completion_config (CompletionConfig):
+                补全消息配置
+            **kwargs:
+                额外的关键字参数
+
+        Returns:
+            Message:
+                来自语言模型或缓存的补全结果，命中缓存时 token 用量为 0
+        """
+        key = completion_cache_key(self._llm, messages, tools, completion_config, **kwargs)
+        cached = await self._cache.get(key)
+        if cached is not None:
+            self._hits += 1
+            logger.info(f"[响应缓存] 命中缓存：{key[:16]}")
+            if stream_queue is not None:
+                await self._replay(cached, stream_queue)
+            # 命中缓存没有消耗 token，避免重复计入用量
+            cached.message.usage = CompletionUsage(
+                prompt_tokens=0, completion_tokens=0, total_tokens=0, cached_tokens=0, cache_creation_tokens=0,
+            )
+            return cached.message
+
+        self._misses += 1
+        recorder = _RecordingQueue(stream_queue) if stream_queue is not None else None
+        message = await self._llm.completion(messages, tools, recorder, completion_config, **kwargs)
+        await self._cache.put(key, message, recorder.chunks if recorder is not None else [])
+        return message
+
+    async def _replay(self, cached: CachedResponse, stream_queue: IAsyncQueue[Message]) -> None:
+        """私有方法：把缓存的流式片段放入队列，非流式请求的结果作为一个片段输出"""
+        chunks = cached.chunks
+        if not chunks:
+            text = "".join(block.text for block in cached.message.content if isinstance(block, TextBlock))
+            chunks = [(0.0, text)] if text else []
+
+        previous = 0.0
+        for offset, text in chunks:
+            if self._replay_speed is not None and offset > previous:
+                await asyncio.sleep((offset - previous) / self._replay_speed)
+            previous = offset
+            await stream_queue.put(Message(role=Role.ASSISTANT, content=[TextBlock(text=text)], is_chunking=True))
@@ -0,0 +1,93 @@
+"""按任务上下文增量转换消息历史的缓存，供各个 LLM 适配器共享使用。"""
+
+import copy
+import operator
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import Generic, TypeVar
+
+from ..model import Message
+
+
+ParamT = TypeVar("ParamT")
+
+
+class MessageHistoryCache(Generic[ParamT]):
+    """消息历史转换缓存
+
+    任务上下文只会追加消息，但每次补全请求都需要完整的消息历史。缓存按上下文（第一条消息的 uid）
+    保存已转换的消息和转换结果，下次请求时如果已转换的消息仍是新消息列表的前缀，只转换新追加的消息，
+    并接在缓存的结果后面继续转换。边界处的 SYSTEM/USER 合并作用于缓存结果中最后一条消息的副本，
+    因此结果与一次性转换完全一致，之前返回的结果也不会改变。
+
+    - 前缀按消息对象判断，消息被替换、删除或重新排序时重新转换整个上下文
+    - 已加入上下文的消息不应再被原地修改
+    - 转换出错时丢弃该上下文的缓存，最多缓存 `max_contexts` 个上下文
+
+    Example:
+        ```python
+        cache = MessageHistoryCache(_extend_openai_dict)
+        history = cache.convert(task.get_context().get_context_data())
+        ```
+    """
+    _extend: Callable[[list[ParamT], list[Message]], None]
+    _max_contexts: int
+    _entries: OrderedDict[str, tuple[list[Message], list[ParamT]]]
+    _lock: threading.Lock
+
+    def __init__(self, extend: Callable[[list[ParamT], list[Message]], None], max_contexts: int = 64) -> None:
+        """初始化消息历史转换缓存
+
+        Args:
+            extend: 把消息依次转换并追加到已有转换结果的函数
+            max_contexts: 最多缓存的上下文数量
+
+        Raises:
+            ValueError: 如果 max_contexts 不是正数
+        """
+        if max_contexts <= 0:
+            raise ValueError(f"max_contexts必须大于0：{max_contexts}")
+        self._extend = extend
+        self._max_contexts = max_contexts
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def convert(self, messages: list[Message]) -> list[ParamT]:
+        """转换消息历史，只转换上次转换之后新追加的消息
+
+        Args:
+            messages: 完整的消息历史
+
+        Returns:
+            list[ParamT]: 提供商格式的消息历史，列表为新建的，其中的元素与缓存共享，不应修改
+        """
+        if not messages:
+            return []
+
+        key = messages[0].uid
+        # 取出缓存，转换期间其他调用不会使用同一份结果
+        with self._lock:
+            entry = self._entries.pop(key, None)
+
+        converted, history = entry if entry is not None else ([], [])
+        if len(converted) > len(messages) or not all(map(operator.is_, converted, messages)):
+            converted, history = [], []
+
+        new_messages = messages[len(converted):]
+        if new_messages and history:
+            # 合并会原地修改最后一条消息，先复制，之前返回的结果保持不变
+            history[-1] = copy.deepcopy(history[-1])
+        self._extend(history, new_messages)
+        converted.extend(new_messages)
+
+        with self._lock:
+            self._entries[key] = (converted, history)
+            while len(self._entries) > self._max_contexts:
+                self._entries.popitem(last=False)
+        return list(history)
+
+    def clear(self) -> None:
+        """清空所有缓存"""
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,273 @@
+"""
+进程内共享的 HTTP 连接池，供各个 LLM 适配器共享使用：相同提供商、基础 URL 和 API 密钥的模型实例
+共享同一个 `httpx.AsyncClient`，避免每个实例各自建立 TCP/TLS 连接
+"""
+
+import asyncio
+import hashlib
+import importlib.util
+import threading
+import weakref
+from collections.abc import AsyncIterator, Callable
+from typing import NamedTuple
+
+import httpx
+from httpx._utils import get_environment_proxies
+from loguru import logger
+from pydantic import SecretStr
+
+from .const import Provider
+
+
+# 安装了 h2 时才能启用 HTTP/2
+_HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+class PoolStats(NamedTuple):
+    """共享连接池的使用情况"""
+
+    provider: str
+    """提供商"""
+    base_url: str
+    """基础 URL"""
+    max_connections: int
+    """每个事件循环的最大连接数"""
+    connections: int
+    """当前打开的连接数"""
+    idle_connections: int
+    """当前空闲的连接数"""
+    in_flight: int
+    """正在处理的请求数（流式响应读取完毕前都算在内）"""
+    peak_in_flight: int
+    """同时处理的请求数峰值"""
+    requests: int
+    """累计请求数"""
+
+    @property
+    def utilization(self) -> float:
+        """连接池利用率：正在处理的请求数 / 最大连接数"""
+        return self.in_flight / self.max_connections
+
+
+class _TrackedStream(httpx.AsyncByteStream):
+    """响应体包装，读取完毕或关闭时结束请求计数"""
+
+    def __init__(self, stream: httpx.AsyncByteStream, on_close: Callable[[], None]) -> None:
+        self._stream = stream
+        self._on_close: Callable[[], None] | None = on_close
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        if self._on_close is not None:
+            self._on_close()
+            self._on_close = None
+        await self._stream.aclose()
+
+
+class _SharedTransport(httpx.AsyncBaseTransport):
+    """按事件循环分配连接池的传输层，并统计请求数
+
+    连接绑定在创建它的事件循环上，不同事件循环（如多次调用 `asyncio.run`）使用各自的连接池，
+    事件循环被回收后其连接池随之释放。设置了 `proxy` 时所有请求经由该代理发送。
+    """
+
+    def __init__(self, limits: httpx.Limits, http2: bool, proxy: str | None = None) -> None:
+        self._limits = limits
+        self._http2 = http2
+        self._proxy = proxy
+        self._lock = threading.Lock()
+        self._transports: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncHTTPTransport] = (
+            weakref.WeakKeyDictionary()
+        )
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.requests = 0
+
+    def _get_transport(self) -> httpx.AsyncHTTPTransport:
+        """私有方法：获取当前事件循环的连接池，不存在时创建"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            transport = self._transports.get(loop)
+            if transport is None:
+                transport = httpx.AsyncHTTPTransport(limits=self._limits, http2=self._http2, proxy=self._proxy)
+                self._transports[loop] = transport
+            return transport
+
+    def _finish(self) -> None:
+        """私有方法：结束一个请求的计数"""
+        self.in_flight -= 1
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        transport = self._get_transport()
+        self.requests += 1
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            response = await transport.handle_async_request(request)
+        except BaseException:
+            self._finish()
+            raise
+        response.stream = _TrackedStream(response.stream, self._finish)  # type: ignore[arg-type]
+        return response
+
+    def get_connection_counts(self) -> tuple[int, int]:
+        """获取所有事件循环中打开的连接数和空闲的连接数"""
+        connections = idle = 0
+        with self._lock:
+            transports = list(self._transports.values())
+        for transport in transports:
+            pool = getattr(transport, "_pool", None)
+            for connection in getattr(pool, "connections", []):
+                connections += 1
+                idle += connection.is_idle()
+        return connections, idle
+
+    async def aclose(self) -> None:
+        with self._lock:
+            transports = list(self._transports.items())
+            self._transports.clear()
+        for loop, transport in transports:
+            # 只能在连接所属的事件循环中关闭连接，其他事件循环的连接随事件循环回收
+            if loop is asyncio.get_running_loop():
+                await transport.aclose()
+
+
+class _SharedAsyncClient(httpx.AsyncClient):
+    """共享的客户端，SDK 客户端关闭时不关闭它，由注册表统一关闭"""
+
+    async def aclose(self) -> None:
+        return None
+
+    async def __aexit__(self, *_args: object) -> None:
+        return None
+
+    async def _aclose(self) -> None:
+        await super().aclose()
+
+
+class HttpClientRegistry:
+    """共享 HTTP 客户端注册表
+
+    按 (提供商, 基础 URL, API 密钥的哈希) 共享 `httpx.AsyncClient`，客户端启用长连接和连接数上限，
+    安装了 h2 时启用 HTTP/2。与 SDK 默认的客户端一样，创建客户端时读取环境变量中的代理设置
+    （HTTP_PROXY/HTTPS_PROXY/ALL_PROXY/NO_PROXY），每个代理使用各自的共享连接池。
+
+    Example:
+        ```python
+        http_client = get_http_client_registry().get_client(Provider.OPENAI, base_url, api_key, timeout=60)
+        client = AsyncOpenAI(base_url=base_url, api_key=api_key.get_secret_value(), http_client=http_client)
+        ```
+    """
+    _limits: httpx.Limits
+    _http2: bool
+    _lock: threading.Lock
+    _clients: dict[tuple[str, str, str], tuple[_SharedAsyncClient, list[_SharedTransport]]]
+
+    def __init__(
+        self,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 30.0,
+        http2: bool | None = None,
+    ) -> None:
+        """初始化注册表
+
+        Args:
+            max_connections: 每个客户端在每个事件循环中的最大连接数
+            max_keepalive_connections: 每个客户端在每个事件循环中保持的最大空闲连接数
+            keepalive_expiry: 空闲连接的保持时间（秒）
+            http2: 是否启用 HTTP/2，None表示安装了 h2 时启用
+
+        Raises:
+            ValueError: 如果连接数或保持时间不是正数，或者未安装 h2 却要求启用 HTTP/2。
+        """
+        if max_connections <= 0 or max_keepalive_connections <= 0:
+            raise ValueError(f"连接数必须大于0：{max_connections}, {max_keepalive_connections}")
+        if keepalive_expiry <= 0:
+            raise ValueError(f"keepalive_expiry必须大于0：{keepalive_expiry}")
+        if http2 and not _HTTP2_AVAILABLE:
+            raise ValueError("启用 HTTP/2 需要安装 h2：pip install 'httpx[http2]'")
+
+        self._limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=min(max_keepalive_connections, max_connections),
+            keepalive_expiry=keepalive_expiry,
+        )
+        self._http2 = _HTTP2_AVAILABLE if http2 is None else http2
+        self._lock = threading.Lock()
+        self._clients = {}
+
+    def get_client(self, provider: Provider, base_url: str, api_key: SecretStr, timeout: float) -> httpx.AsyncClient:
+        """获取共享的客户端，不存在时创建
+
+        Args:
+            provider: 提供商
+            base_url: 基础 URL
+            api_key: API 密钥，只使用其哈希区分客户端
+            timeout: 创建客户端时使用的请求超时时间（秒），SDK 按自己的超时设置覆盖每个请求
+
+        Returns:
+            httpx.AsyncClient: 共享的客户端
+        """
+        digest = hashlib.sha256(api_key.get_secret_value().encode("utf-8")).hexdigest()
+        key = (provider.value, base_url.rstrip("/"), digest)
+        with self._lock:
+            entry = self._clients.get(key)
+            if entry is None or entry[0].is_closed:
+                transport = _SharedTransport(self._limits, self._http2)
+                # 传入自定义传输层后 httpx 不再读取环境变量中的代理，需要自行按 URL 模式挂载代理传输层。
+                # NO_PROXY 对应的模式挂载为 None，表示使用默认的直连传输层
+                mounts: dict[str, httpx.AsyncBaseTransport | None] = {
+                    pattern: None if proxy is None else _SharedTransport(self._limits, self._http2, proxy)
+                    for pattern, proxy in get_environment_proxies().items()
+                }
+                client = _SharedAsyncClient(
+                    transport=transport,
+                    mounts=mounts,
+                    timeout=httpx.Timeout(timeout, connect=min(timeout, 10.0)),
+                    follow_redirects=True,
+                )
+                transports = [transport, *(item for item in mounts.values() if isinstance(item, _SharedTransport))]
+                entry = self._clients[key] = (client, transports)
+                logger.debug(f"[连接池] 创建共享客户端：{provider.value} {key[1]}，HTTP/2: {self._http2}")
+            return entry[0]
+
+    def get_stats(self) -> list[PoolStats]:
+        """获取所有共享连接池的使用情况"""
+        with self._lock:
+            entries = list(self._clients.items())
+
+        stats: list[PoolStats] = []
+        for (provider, base_url, _), (_, transports) in entries:
+            # 经由代理的请求与直连的请求合并统计
+            counts = [transport.get_connection_counts() for transport in transports]
+            stats.append(PoolStats(
+                provider=provider,
+                base_url=base_url,
+                max_connections=self._limits.max_connections or 0,
+                connections=sum(connections for connections, _ in counts),
+                idle_connections=sum(idle for _, idle in counts),
+                in_flight=sum(transport.in_flight for transport in transports),
+                peak_in_flight=max(transport.peak_in_flight for transport in transports),
+                requests=sum(transport.requests for transport in transports),
+            ))
+        return stats
+
+    async def aclose(self) -> None:
+        """关闭所有共享的客户端"""
+        with self._lock:
+            entries = list(self._clients.values())
+            self._clients.clear()
+        for client, _ in entries:
+            await client._aclose()
+
+
+_registry = HttpClientRegistry()
+
+
+def get_http_client_registry() -> HttpClientRegistry:
+    """获取进程内默认的共享 HTTP 客户端注册表"""
+    return _registry
@@ -3,7 +3,6 @@ import getpass
 import json
 from typing import Any, cast
 
-from json_repair import repair_json
 from loguru import logger
 from pydantic import SecretStr
 from mcp.types import Tool as McpTool
@@ -13,6 +12,10 @@ from openai.types.completion_usage import CompletionUsage as OpenAICompletionUsa
 
 from .interface import ILLM, IEmbedModel
 from .const import Provider
+from .history import MessageHistoryCache
+from .http_pool import get_http_client_registry
+from .prompt_cache import get_cached_tokens, sort_tools
+from .stream import ToolCallAccumulator, parse_tool_arguments
 from ..model import (
     ToolCallRequest,
     Message,
@@ -105,7 +108,8 @@ def to_openai(config: CompletionConfig, tools: list[McpTool] | None = None) -> d
 
     # Add tools
     if tools:
-        kwargs["tools"] = [tool_schema(tool) for tool in tools]
+        # 工具按名称排序，保持请求前缀稳定以命中提供商的前缀缓存
+        kwargs["tools"] = [tool_schema(tool) for tool in sort_tools(tools)]
 
     return kwargs
 
@@ -174,6 +178,19 @@ def to_openai_dict(messages: list[Message]) -> list[ChatCompletionMessageParam]:
     """
     # Create the generation history
     history: list[ChatCompletionMessageParam] = []
+    _extend_openai_dict(history, messages)
+    return history
+
+
+def _extend_openai_dict(history: list[ChatCompletionMessageParam], messages: list[Message]) -> None:
+    """把消息依次转换为 OpenAI 格式并追加到已有的消息历史，SYSTEM/USER 消息可能与历史中的最后一条合并
+
+    Args:
+        history (list[ChatCompletionMessageParam]):
+            已转换的消息历史，会被原地修改
+        messages (list[Message]):
+            新追加的消息
+    """
     for message in messages:
         # Get last message sender
         last_role = history[-1]['role'] if len(history) > 0 else None
@@ -275,8 +292,6 @@ def to_openai_dict(messages: list[Message]) -> list[ChatCompletionMessageParam]:
         # 添加信息
         history.append(cast(ChatCompletionMessageParam, message_dict))
 
-    return history
-
 
 class OpenAiLLM(ILLM):
     """OpenAI LLM implementation."""
@@ -284,6 +299,7 @@ class OpenAiLLM(ILLM):
     _model: str
     _base_url: str
     _api_key: SecretStr
+    _history_cache: MessageHistoryCache[ChatCompletionMessageParam]
 
     def __init__(self, config: LLMConfig, **kwargs: Any) -> None:
         """Initialize the OpenAiLLM.
@@ -309,8 +325,16 @@ class OpenAiLLM(ILLM):
         self.client = AsyncOpenAI(
             base_url=self._base_url,
             api_key=self._api_key.get_secret_value(),
+            timeout=config.timeout,
+            # 相同提供商、基础 URL 和 API 密钥的实例共享连接池
+            http_client=get_http_client_registry().get_client(
+                self._provider, self._base_url, self._api_key, config.timeout,
+            ),
         )
 
+        # 按任务上下文缓存已转换的消息历史
+        self._history_cache = MessageHistoryCache[ChatCompletionMessageParam](_extend_openai_dict)
+
         # Check extra keyword arguments for requests
         self.kwargs: dict[str, Any] = {}
         for key, value in kwargs.items():
@@ -369,79 +393,74 @@ class OpenAiLLM(ILLM):
         kwargs = to_openai(completion_config, tools)
 
         # Create the generation history
-        history = to_openai_dict(messages)
+        # 只转换上次请求之后新追加的消息
+        history = self._history_cache.convert(messages)
 
         # Initialize accumulators for streaming response
         accumulated_content = ""
-        accumulated_tool_calls: dict[str, ToolCallRequest] = {}
+        tool_call_accumulator = ToolCallAccumulator()
         current_tool_call_index = 0
+        # Usage and finish reason are read from the stream itself
+        stream_usage: OpenAICompletionUsage | None = None
+        stream_finish_reason: str | None = None
+        final_response: ChatCompletion | None = None
 
         try:
             if stream_queue is not None:
-                # Streaming mode
+                # Streaming mode, ask the server to append a usage chunk at the end of the stream
+                if "stream_options" not in (completion_config.ignore_params or []):
+                    kwargs["stream_options"] = {"include_usage": True}
                 stream = await self.client.chat.completions.create(
                     model=self._model,
                     messages=history,
                     stream=True,
                     **kwargs,
                 )
-                async for chunk in stream:
-                    if chunk.choices:
-                        choice = chunk.choices[0]
-
-                        # Handle content delta
-                        if choice.delta and choice.delta.content:
-                            content_delta = choice.delta.content
-                            accumulated_content += content_delta
-                            # Send chunk message to stream queue
-                            chunk_message = Message(
-                                role=Role.ASSISTANT,
-                                content=[TextBlock(text=content_delta)],
-                                is_chunking=True,
-                                stop_reason=StopReason.NONE,
-                            )
-                            await stream_queue.put(chunk_message)
-
-                        # Handle tool call delta
-                        if choice.delta and choice.delta.tool_calls:
-                            for tool_call_delta in choice.delta.tool_calls:
-                                if tool_call_delta.index is not None: # pyright: ignore[reportUnnecessaryComparison]
-                                    tool_index = tool_call_delta.index
-                                else:
-                                    tool_index = current_tool_call_index
-                                    current_tool_call_index += 1
-
-                                # Use string key for dictionary
-                                tool_key = str(tool_index)
-                                if tool_key not in accumulated_tool_calls:
-                                    function_name = tool_call_delta.function.name if tool_call_delta.function and tool_call_delta.function.name else ""
-                                    accumulated_tool_calls[tool_key] = ToolCallRequest(
-                                        id=tool_call_delta.id or f"tool_call_{tool_index}",
-                                        name=function_name,
-                                        type="function",
-                                        args=json.loads(repair_json(tool_call_delta.function.arguments or '{}')) if tool_call_delta.function and tool_call_delta.function.arguments else {},
+                try:
+                    async for chunk in stream:
+                        # The usage chunk has an empty choices list
+                        if chunk.usage:
+                            stream_usage = chunk.usage
+                        if chunk.choices:
+                            choice = chunk.choices[0]
+                            if choice.finish_reason:
+                                stream_finish_reason = choice.finish_reason
+
+                            # Handle content delta
+                            if choice.delta and choice.delta.content:
+                                content_delta = choice.delta.content
+                                accumulated_content += content_delta
+                                # Send chunk message to stream queue
+                                chunk_message = Message(
+                                    role=Role.ASSISTANT,
+                                    content=[TextBlock(text=content_delta)],
+                                    is_chunking=True,
+                                    stop_reason=StopReason.NONE,
+                                )
+                                await stream_queue.put(chunk_message)
+
+                            # Handle tool call delta, raw argument fragments are buffered and parsed once at the end
+                            if choice.delta and choice.delta.tool_calls:
+                                for tool_call_delta in choice.delta.tool_calls:
+                                    if tool_call_delta.index is not None: # pyright: ignore[reportUnnecessaryComparison]
+                                        tool_index = tool_call_delta.index
+                                    else:
+                                        tool_index = current_tool_call_index
+                                        current_tool_call_index += 1
+
+                                    function = tool_call_delta.function
+                                    tool_call_accumulator.add(
+                                        tool_index,
+                                        id=tool_call_delta.id,
+                                        name=function.name if function else None,
+                                        arguments=function.arguments if function else None,
                                     )
-                                else:
-                                    # Update existing tool call
-                                    existing_tool_call = accumulated_tool_calls[tool_key]
-                                    if tool_call_delta.id:
-                                        existing_tool_call.id = tool_call_delta.id
-                                    if tool_call_delta.function and tool_call_delta.function.name:
-                                        existing_tool_call.name = tool_call_delta.function.name
-                                    if tool_call_delta.function and tool_call_delta.function.arguments:
-                                        # Merge arguments
-                                        new_args = json.loads(repair_json(tool_call_delta.function.arguments or '{}'))
-                                        existing_tool_call.args.update(new_args)
-
-                # For streaming, we need to make a separate non-streaming call to get usage info
-                # This is a common pattern when streaming doesn't provide full usage details
-                final_response = await self.client.chat.completions.create(
-                    model=self._model,
-                    messages=history,
-                    stream=False,
-                    **kwargs,
-                )
-                logger.info(f"[OpenAI] Streaming completion successful, input_tokens: {final_response.usage.prompt_tokens if final_response.usage else 'unknown'}, output_tokens: {final_response.usage.completion_tokens if final_response.usage else 'unknown'}")
+                except BaseException:
+                    # 生成被取消（如终止标签闭合）或出错时关闭响应，把连接归还给连接池
+                    await stream.close()
+                    raise
+
+                logger.info(f"[OpenAI] Streaming completion successful, input_tokens: {stream_usage.prompt_tokens if stream_usage else 'unknown'}, output_tokens: {stream_usage.completion_tokens if stream_usage else 'unknown'}")
 
             else:
                 # Non-streaming mode
@@ -466,18 +485,17 @@ class OpenAiLLM(ILLM):
         if stream_queue is not None:
             # For streaming mode, use accumulated data
             content_blocks = [TextBlock(text=accumulated_content)] if accumulated_content else []
-            tool_calls = list(accumulated_tool_calls.values())
+            tool_calls = tool_call_accumulator.finish()
             usage = CompletionUsage(
-                prompt_tokens=final_response.usage.prompt_tokens if final_response.usage else -100,
-                completion_tokens=final_response.usage.completion_tokens if final_response.usage else -100,
-                total_tokens=final_response.usage.total_tokens if final_response.usage else -100
+                prompt_tokens=stream_usage.prompt_tokens if stream_usage else -100,
+                completion_tokens=stream_usage.completion_tokens if stream_usage else -100,
+                total_tokens=stream_usage.total_tokens if stream_usage else -100,
+                cached_tokens=get_cached_tokens(stream_usage),
             )
-            if final_response.choices:
-                finish_reason = final_response.choices[0].finish_reason
-            else:
-                finish_reason = None
+            finish_reason = stream_finish_reason
         else:
             # For non-streaming mode, extract from response
+            assert final_response is not None
             content_text: str = final_response.choices[0].message.content or ""
             content_blocks = [TextBlock(text=content_text)] if content_text else []
 
@@ -486,7 +504,8 @@ class OpenAiLLM(ILLM):
             usage = CompletionUsage(
                 prompt_tokens=openai_usage.prompt_tokens if openai_usage else -100,
                 completion_tokens=openai_usage.completion_tokens if openai_usage else -100,
-                total_tokens=openai_usage.total_tokens if openai_usage else -100
+                total_tokens=openai_usage.total_tokens if openai_usage else -100,
+                cached_tokens=get_cached_tokens(openai_usage),
             )
 
             # Extract tool calls from response
@@ -497,7 +516,7 @@ class OpenAiLLM(ILLM):
                         id=tool_call.id,
                         name=tool_call.function.name,  # pyright: ignore[reportUnknownMemberType, reportUnknownArgumentType, reportAttributeAccessIssue]
                         type="function",
-                        args=json.loads(repair_json(tool_call.function.arguments or '{}'))  # pyright: ignore[reportUnknownMemberType, reportUnknownArgumentType, reportAttributeAccessIssue]
+                        args=parse_tool_arguments(tool_call.function.arguments or '')  # pyright: ignore[reportUnknownMemberType, reportUnknownArgumentType, reportAttributeAccessIssue]
                     ))
             finish_reason = final_response.choices[0].finish_reason
 
@@ -558,6 +577,11 @@ class OpenAiEmbeddingLLM(IEmbedModel):
         self._client = AsyncOpenAI(
             base_url=self._base_url,
             api_key=self._api_key.get_secret_value(),
+            timeout=config.timeout,
+            # 相同提供商、基础 URL 和 API 密钥的实例共享连接池
+            http_client=get_http_client_registry().get_client(
+                self._provider, self._base_url, self._api_key, config.timeout,
+            ),
         )
 
     @classmethod
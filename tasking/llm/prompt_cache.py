@@ -0,0 +1,85 @@
+"""提供商提示词缓存（前缀缓存）的辅助工具，供各个 LLM 适配器共享使用。"""
+
+import itertools
+from collections.abc import Sequence
+from typing import Any
+
+from mcp.types import Tool as McpTool
+
+
+MIN_CACHE_PREFIX_SIZE = 4096
+"""可缓存前缀的最小估计长度（字符数），约为 1024 个 token，更短的前缀不会被提供商缓存"""
+
+
+def sort_tools(tools: list[McpTool]) -> list[McpTool]:
+    """按名称排序工具，使每次请求的工具定义顺序一致，从而命中提供商的前缀缓存
+
+    Args:
+        tools: 工具列表
+
+    Returns:
+        list[McpTool]: 按名称排序后的新列表
+    """
+    return sorted(tools, key=lambda tool: tool.name)
+
+
+def get_cached_tokens(usage: Any) -> int:
+    """读取 OpenAI 兼容格式的 usage 中命中缓存的提示词 token 数量（`prompt_tokens_details.cached_tokens`）
+
+    Args:
+        usage: 提供商返回的 usage 对象，可以为 None
+
+    Returns:
+        int: 命中缓存的 token 数量，-100 表示不可用
+    """
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached_tokens = getattr(details, "cached_tokens", None)
+    return cached_tokens if isinstance(cached_tokens, int) else -100
+
+
+def plan_cache_breakpoints(
+    roles: Sequence[str],
+    sizes: Sequence[int],
+    prefix_size: int = 0,
+    min_prefix_size: int = MIN_CACHE_PREFIX_SIZE,
+    max_breakpoints: int = 3,
+) -> list[int]:
+    """选择消息历史中的缓存断点，断点之前（含断点）的前缀会被提供商缓存
+
+    按优先级依次选择：
+
+    - 最后一条消息：写入本次请求的完整前缀，供下一次请求读取
+    - 上一次请求的最后一条消息（最后一条 assistant 消息之前的 user 消息）：读取上一次请求写入的缓存
+    - 第一条消息：任务协议和系统提示词，所有请求共享
+
+    前缀长度小于 `min_prefix_size` 的断点不会被缓存，直接跳过。
+
+    Args:
+        roles: 提供商格式的消息历史中每条消息的角色
+        sizes: 每条消息内容的估计长度（字符数）
+        prefix_size: 消息之前的前缀（如工具定义）的估计长度
+        min_prefix_size: 可缓存前缀的最小长度
+        max_breakpoints: 最多选择的断点数量
+
+    Returns:
+        list[int]: 断点所在消息的下标，升序排列
+    """
+    if not roles or max_breakpoints <= 0:
+        return []
+
+    last = len(roles) - 1
+    candidates = [last]
+    for index in range(last - 1, 0, -1):
+        if roles[index] == "user" and roles[index + 1] == "assistant":
+            candidates.append(index)
+            break
+    candidates.append(0)
+
+    prefix_sizes = list(itertools.accumulate(sizes, initial=prefix_size))
+    breakpoints: list[int] = []
+    for index in candidates:
+        if len(breakpoints) >= max_breakpoints:
+            break
+        if index not in breakpoints and prefix_sizes[index + 1] >= min_prefix_size:
+            breakpoints.append(index)
+    return sorted(breakpoints)
@@ -0,0 +1,392 @@
+"""流式响应中工具调用的累加工具，供各个 LLM 适配器共享使用。"""
+
+import json
+import re
+from typing import Any
+
+from json_repair import repair_json
+
+from ..model import ToolCallRequest
+
+
+def parse_tool_arguments(arguments: str) -> dict[str, Any]:
+    """解析工具调用参数字符串，先尝试严格解析，失败时使用 json_repair 修复后再解析
+
+    Args:
+        arguments: 工具调用参数的 JSON 字符串，可能不完整
+
+    Returns:
+        dict[str, Any]: 解析得到的参数字典，无法解析为对象时返回空字典
+    """
+    if not arguments.strip():
+        return {}
+    try:
+        result = json.loads(arguments)
+    except json.JSONDecodeError:
+        result = json.loads(repair_json(arguments) or "{}")
+    return result if isinstance(result, dict) else {}
+
+
+# 字符串中需要特殊处理的字符：结束引号和转义符
+_STRING_SPECIAL = re.compile(r'["\\]')
+# 数字或字面量的结束位置
+_TOKEN_END = re.compile(r'[\s,\]}]')
+# 字符串结尾可能尚未完整的转义：成对代理中的高位 \\uD8XX，以及不完整的 \\ 或 \\uXXXX
+_INCOMPLETE_ESCAPE = re.compile(r"(?:\\u[dD][89abAB][0-9a-fA-F]{2})?(?:\\(?:u[0-9a-fA-F]{0,3})?)?$")
+_LITERALS: dict[str, Any] = {"true": True, "false": False, "null": None}
+
+
+class _IncrementalJSONParser:
+    """增量 JSON 解析器
+
+    保存解析到一半的状态（容器栈、未闭合的字符串或数字），每次只扫描新追加的文本，
+    已经闭合的值直接写入结果对象，预览时只需补上当前未闭合的值。遇到无法识别的文本时
+    标记为失败，由调用方退回到整体修复解析。
+    """
+
+    # 解析状态
+    VALUE = 0           # 等待一个值
+    VALUE_OR_END = 1    # 数组开头，等待一个值或 ]
+    KEY = 2             # 逗号之后，等待键
+    KEY_OR_END = 3      # 对象开头，等待键或 }
+    COLON = 4           # 等待冒号
+    AFTER_VALUE = 5     # 等待逗号或容器结束符
+    STRING = 6          # 位于字符串内部
+    TOKEN = 7           # 位于数字或字面量内部
+    DONE = 8            # 根值已经结束
+    FAILED = 9          # 无法增量解析
+
+    def __init__(self) -> None:
+        self.root: Any = None
+        self._state = self.VALUE
+        # 容器栈及每个对象容器当前等待赋值的键
+        self._stack: list[dict[str, Any] | list[Any]] = []
+        self._keys: list[str | None] = []
+        # 未闭合字符串已解码的部分、结尾尚未完整的转义及其是否为键
+        self._decoded: list[str] = []
+        self._raw_tail = ""
+        self._is_key = False
+        self._escaped = False
+        # 未结束的数字或字面量
+        self._token = ""
+        # 预览时临时写入的未闭合值
+        self._partial = False
+
+    @property
+    def failed(self) -> bool:
+        return self._state == self.FAILED
+
+    def feed(self, text: str) -> None:
+        """扫描新追加的文本
+
+        Args:
+            text: 新追加的参数片段
+        """
+        self._drop_partial()
+        i, n = 0, len(text)
+        while i < n and self._state != self.FAILED:
+            state = self._state
+            if state == self.STRING:
+                i = self._feed_string(text, i)
+                continue
+            if state == self.TOKEN:
+                match = _TOKEN_END.search(text, i)
+                end = match.start() if match else n
+                self._token += text[i:end]
+                i = end
+                if match:
+                    self._close_token()
+                continue
+
+            char = text[i]
+            i += 1
+            if char in " \t\n\r":
+                continue
+            if state in (self.VALUE, self.VALUE_OR_END):
+                if char == "]" and state == self.VALUE_OR_END:
+                    self._pop()
+                else:
+                    self._start_value(char)
+            elif state in (self.KEY, self.KEY_OR_END):
+                if char == '"':
+                    self._start_string(is_key=True)
+                elif char == "}" and state == self.KEY_OR_END:
+                    self._pop()
+                else:
+                    self._state = self.FAILED
+            elif state == self.COLON:
+                self._state = self.VALUE if char == ":" else self.FAILED
+            elif state == self.AFTER_VALUE:
+                top = self._stack[-1]
+                if char == ",":
+                    self._state = self.KEY if isinstance(top, dict) else self.VALUE
+                elif char == ("}" if isinstance(top, dict) else "]"):
+                    self._pop()
+                else:
+                    self._state = self.FAILED
+            else:
+                # 根值结束后仍有非空白内容
+                self._state = self.FAILED
+
+    def preview(self) -> Any:
+        """返回目前的解析结果，未闭合的字符串、数字或字面量尽量补全后写入
+
+        Returns:
+            Any: 根值，后续片段到达时会原地更新
+        """
+        self._drop_partial()
+        if self._stack and not (self._state == self.STRING and self._is_key):
+            found, value = self._partial_value()
+            if found:
+                top = self._stack[-1]
+                if isinstance(top, dict):
+                    key = self._keys[-1]
+                    if key is not None:
+                        top[key] = value
+                        self._partial = True
+                else:
+                    top.append(value)
+                    self._partial = True
+        return self.root
+
+    def _feed_string(self, text: str, i: int) -> int:
+        start, n = i, len(text)
+        while i < n:
+            if self._escaped:
+                self._escaped = False
+                i += 1
+                continue
+            match = _STRING_SPECIAL.search(text, i)
+            if match is None:
+                i = n
+                break
+            i = match.end()
+            if match.group() == "\\":
+                self._escaped = True
+                continue
+            self._append_raw(text[start:match.start()])
+            self._close_string()
+            return i
+        self._append_raw(text[start:i])
+        return i
+
+    def _append_raw(self, piece: str) -> None:
+        # 只保留结尾尚未完整的转义，其余部分立即解码，预览时不必重新解码整个字符串
+        raw = self._raw_tail + piece
+        cut, pos = len(raw), 0
+        while pos < len(raw):
+            match = _INCOMPLETE_ESCAPE.search(raw, pos)
+            if match is None or match.start() == len(raw):
+                break
+            backslashes = len(raw[:match.start()]) - len(raw[:match.start()].rstrip("\\"))
+            if backslashes % 2 == 0:
+                cut = match.start()
+                break
+            # 匹配到的反斜杠本身是被转义的字符，从下一个位置继续查找
+            pos = match.start() + 1
+        self._raw_tail = raw[cut:]
+        if cut:
+            self._decoded.append(self._decode(raw[:cut]))
+
+    def _decode(self, raw: str) -> str:
+        if "\\" not in raw:
+            return raw
+        try:
+            return json.loads('"' + raw + '"', strict=False)
+        except json.JSONDecodeError:
+            self._state = self.FAILED
+            return ""
+
+    def _start_value(self, char: str) -> None:
+        if char == "{":
+            self._push({}, self.KEY_OR_END)
+        elif char == "[":
+            self._push([], self.VALUE_OR_END)
+        elif char == '"':
+            self._start_string(is_key=False)
+        elif char == "-" or char.isdigit() or char in "tfn":
+            self._token = char
+            self._state = self.TOKEN
+        else:
+            self._state = self.FAILED
+
+    def _start_string(self, is_key: bool) -> None:
+        self._decoded = []
+        self._raw_tail = ""
+        self._is_key = is_key
+        self._state = self.STRING
+
+    def _close_string(self) -> None:
+        value = "".join(self._decoded) + self._decode(self._raw_tail)
+        if self._state == self.FAILED:
+            return
+        self._decoded = []
+        self._raw_tail = ""
+        if self._is_key:
+            self._keys[-1] = value
+            self._state = self.COLON
+        else:
+            self._add_value(value)
+
+    def _close_token(self) -> None:
+        token, self._token = self._token, ""
+        if token in _LITERALS:
+            self._add_value(_LITERALS[token])
+            return
+        try:
+            self._add_value(json.loads(token))
+        except json.JSONDecodeError:
+            self._state = self.FAILED
+
+    def _add_value(self, value: Any) -> None:
+        if not self._stack:
+            self.root = value
+            self._state = self.DONE
+            return
+        top = self._stack[-1]
+        if isinstance(top, dict):
+            top[self._keys[-1] or ""] = value
+            self._keys[-1] = None
+        else:
+            top.append(value)
+        self._state = self.AFTER_VALUE
+
+    def _push(self, container: dict[str, Any] | list[Any], state: int) -> None:
+        # 先挂到父容器上，保证预览时能看到尚未闭合的嵌套容器
+        self._add_value(container)
+        self._stack.append(container)
+        self._keys.append(None)
+        self._state = state
+
+    def _pop(self) -> None:
+        self._stack.pop()
+        self._keys.pop()
+        self._state = self.AFTER_VALUE if self._stack else self.DONE
+
+    def _partial_value(self) -> tuple[bool, Any]:
+        if self._state == self.STRING:
+            # 合并已解码的部分，之后的预览只需拼接新解码的内容；结尾不完整的转义不显示
+            if len(self._decoded) > 1:
+                self._decoded = ["".join(self._decoded)]
+            return True, "".join(self._decoded)
+        if self._state == self.TOKEN:
+            for literal, value in _LITERALS.items():
+                if literal.startswith(self._token):
+                    return True, value
+            try:
+                return True, json.loads(self._token)
+            except json.JSONDecodeError:
+                return False, None
+        return False, None
+
+    def _drop_partial(self) -> None:
+        if not self._partial:
+            return
+        self._partial = False
+        top = self._stack[-1]
+        if isinstance(top, dict):
+            top.pop(self._keys[-1] or "", None)
+        else:
+            top.pop()
+
+
+class ToolCallAccumulator:
+    """流式工具调用累加器
+
+    按工具调用的序号缓存原始参数片段，只在流结束时拼接并解析一次，避免对每个片段重复解析和错误合并。
+    如果需要在界面上预览尚未结束的参数，可以调用 `preview`，它只扫描上次预览之后新到达的片段。
+
+    Example:
+        ```python
+        accumulator = ToolCallAccumulator()
+        accumulator.add(0, id="call_1", name="search", arguments='{"query": ')
+        accumulator.add(0, arguments='"weather"}')
+        tool_calls = accumulator.finish()
+        ```
+    """
+
+    def __init__(self) -> None:
+        # 保持工具调用首次出现的顺序
+        self._ids: dict[int, str] = {}
+        self._names: dict[int, str] = {}
+        self._fragments: dict[int, list[str]] = {}
+        # 预览状态：序号 -> (已扫描的片段数量, 增量解析器, 预览结果)
+        self._previews: dict[int, tuple[int, _IncrementalJSONParser, dict[str, Any]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._fragments)
+
+    def add(
+        self,
+        index: int,
+        id: str | None = None,
+        name: str | None = None,
+        arguments: str | None = None,
+    ) -> None:
+        """追加一个工具调用增量
+
+        Args:
+            index: 工具调用的序号
+            id: 工具调用的唯一标识符，非空时覆盖已有值
+            name: 工具名称，非空时覆盖已有值
+            arguments: 参数的原始字符串片段
+        """
+        fragments = self._fragments.setdefault(index, [])
+        if id:
+            self._ids[index] = id
+        if name:
+            self._names[index] = name
+        if arguments:
+            fragments.append(arguments)
+
+    def arguments(self, index: int) -> str:
+        """获取指定工具调用目前累积的原始参数字符串
+
+        Args:
+            index: 工具调用的序号
+
+        Returns:
+            str: 原始参数字符串
+        """
+        return "".join(self._fragments.get(index, []))
+
+    def preview(self, index: int) -> dict[str, Any]:
+        """增量解析尚未结束的参数，用于界面预览
+
+        Args:
+            index: 工具调用的序号
+
+        Returns:
+            dict[str, Any]: 尽力修复后的参数字典，后续片段到达时会原地更新
+        """
+        fragments = self._fragments.get(index, [])
+        scanned, parser, result = self._previews.get(index, (0, _IncrementalJSONParser(), {}))
+        if scanned == len(fragments) and index in self._previews:
+            return result
+
+        for fragment in fragments[scanned:]:
+            parser.feed(fragment)
+        if parser.failed:
+            # 参数不是合法的 JSON 前缀，退回到整体修复解析
+            result = parse_tool_arguments("".join(fragments))
+        else:
+            root = parser.preview()
+            result = root if isinstance(root, dict) else {}
+        self._previews[index] = (len(fragments), parser, result)
+        return result
+
+    def finish(self) -> list[ToolCallRequest]:
+        """结束累积，一次性解析所有工具调用的参数
+
+        Returns:
+            list[ToolCallRequest]: 按首次出现顺序排列的工具调用请求
+        """
+        return [
+            ToolCallRequest(
+                id=self._ids.get(index, f"tool_call_{index}"),
+                name=self._names.get(index, ""),
+                type="function",
+                args=parse_tool_arguments("".join(fragments)),
+            )
+            for index, fragments in self._fragments.items()
+        ]
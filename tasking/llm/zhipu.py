@@ -1,23 +1,21 @@
 """Zhipu AI LLM implementation module."""
-import asyncio
 import getpass
 import json
 from typing import Any, cast
 
-from json_repair import repair_json
 from loguru import logger
 from pydantic import SecretStr
 from mcp.types import Tool as McpTool
-from zai import ZhipuAiClient as ZhipuAI
-from zai.types.chat.chat_completion import (
-    Completion as ZhipuCompletion,
-    CompletionMessageToolCall as ZhipuToolCall,
-    CompletionUsage as ZhipuUsage,
-)
-from asyncer import asyncify
+from openai import AsyncOpenAI
+from openai.types.chat import ChatCompletion
+from openai.types.completion_usage import CompletionUsage as ZhipuUsage
 
 from .const import Provider
+from .history import MessageHistoryCache
+from .http_pool import get_http_client_registry
+from .prompt_cache import get_cached_tokens, sort_tools
 from .interface import ILLM, IEmbedModel
+from .stream import ToolCallAccumulator, parse_tool_arguments
 from ..model import (
     ToolCallRequest,
     Message,
@@ -100,16 +98,20 @@ def to_zhipu(config: CompletionConfig, tools: list[McpTool] | None = None) -> di
     # response_format (Zhipu AI supports json_object)
     if "format_json" not in ignored and config.format_json:
         kwargs["response_format"] = {"type": "json_object"}
+    # SDK 不认识的智谱参数通过 extra_body 合并到请求体顶层
+    extra_body: dict[str, Any] = {}
     # thinking control (Zhipu AI specific - 作为顶层参数传递)
     if "allow_thinking" not in ignored:
         if config.allow_thinking:
-            kwargs["thinking"] = {"type": "enabled"}
+            extra_body["thinking"] = {"type": "enabled"}
         else:
-            kwargs["thinking"] = {"type": "disabled"}
+            extra_body["thinking"] = {"type": "disabled"}
 
     # 透传 extra_body 到 SDK（遵循 OpenAI 风格）
     if "extra_body" not in ignored and config.extra_body:
-        kwargs["extra_body"] = dict(config.extra_body)
+        extra_body.update(config.extra_body)
+    if extra_body:
+        kwargs["extra_body"] = extra_body
 
     # 额外请求头
     if "extra_headers" not in ignored and config.extra_headers:
@@ -117,7 +119,8 @@ def to_zhipu(config: CompletionConfig, tools: list[McpTool] | None = None) -> di
 
     # tools (Zhipu AI uses OpenAI-like format)
     if tools:
-        kwargs["tools"] = [tool_schema(tool) for tool in tools]
+        # 工具按名称排序，保持请求前缀稳定以命中提供商的前缀缓存
+        kwargs["tools"] = [tool_schema(tool) for tool in sort_tools(tools)]
 
     return kwargs
 
@@ -195,7 +198,19 @@ def to_zhipu_messages(messages: list[Message]) -> list[dict[str, Any]]:
             The Zhipu AI compatible messages dictionaries.
     """
     history: list[dict[str, str | list[dict[str, Any]]]] = []
+    _extend_zhipu_messages(history, messages)
+    return history
+
+
+def _extend_zhipu_messages(history: list[dict[str, str | list[dict[str, Any]]]], messages: list[Message]) -> None:
+    """把消息依次转换为 Zhipu AI 格式并追加到已有的消息历史，SYSTEM/USER 消息可能与历史中的最后一条合并
 
+    Args:
+        history (list[dict[str, str | list[dict[str, Any]]]]):
+            已转换的消息历史，会被原地修改
+        messages (list[Message]):
+            新追加的消息
+    """
     for message in messages:
         # Get last message sender
         last_role: str | None = None
@@ -314,8 +329,6 @@ def to_zhipu_messages(messages: list[Message]) -> list[dict[str, Any]]:
         # Add message to history
         history.append(message_dict)
 
-    return history
-
 
 class ZhipuLLM(ILLM):
     """Zhipu AI LLM implementation."""
@@ -324,7 +337,8 @@ class ZhipuLLM(ILLM):
     _model: str
     _base_url: str
     _api_key: SecretStr
-    _client: ZhipuAI
+    _client: AsyncOpenAI
+    _history_cache: MessageHistoryCache[dict[str, str | list[dict[str, Any]]]]
 
     def __init__(self, config: LLMConfig, **_kwargs: Any) -> None:
         """Initialize the ZhipuLLM.
@@ -345,11 +359,20 @@ class ZhipuLLM(ILLM):
                 getpass.getpass(f"Enter your API key for {self._provider}: ")
             )
 
-        self._client = ZhipuAI(
+        # 智谱 v4 接口兼容 OpenAI 协议，使用原生异步客户端，不再占用工作线程
+        self._client = AsyncOpenAI(
             api_key=self._api_key.get_secret_value(),
             base_url=self._base_url,
+            timeout=config.timeout,
+            # 相同提供商、基础 URL 和 API 密钥的实例共享连接池
+            http_client=get_http_client_registry().get_client(
+                self._provider, self._base_url, self._api_key, config.timeout,
+            ),
         )
 
+        # 按任务上下文缓存已转换的消息历史
+        self._history_cache = MessageHistoryCache[dict[str, str | list[dict[str, Any]]]](_extend_zhipu_messages)
+
     @classmethod
     def from_config(cls, config: LLMConfig) -> ILLM:
         """Create an instance of ZhipuLLM from LLMConfig."""
@@ -406,35 +429,39 @@ class ZhipuLLM(ILLM):
                 zhipu_kwargs[key] = value
 
         # Convert messages to Zhipu AI format
-        history = to_zhipu_messages(messages)
+        # 只转换上次请求之后新追加的消息
+        history = self._history_cache.convert(messages)
 
         # Initialize accumulators for streaming response
         accumulated_content = ""
-        accumulated_tool_calls: dict[int, ToolCallRequest] = {}
+        tool_call_accumulator = ToolCallAccumulator()
+        # 智谱在最后一个流式片段中返回用量与结束原因，不需要再发起一次非流式请求
+        stream_usage: ZhipuUsage | None = None
+        stream_finish_reason: str | None = None
+        final_response: ChatCompletion | None = None
 
         try:
             if stream_queue is not None:
                 # Streaming mode
-                zhipu_kwargs["stream"] = True
-
-                # Create a streaming completion using asyncify
-                create_completion = asyncify(self._client.chat.completions.create)
-                stream = await create_completion(
+                stream = await self._client.chat.completions.create(
                     model=self._model,
-                    messages=history,
+                    messages=cast(Any, history),
+                    stream=True,
                     **zhipu_kwargs,
                 )
 
                 # Process the stream
-                stream = cast(Any, stream)  # Cast to Any to handle streaming properly
-                async for chunk in stream:  # type: ignore[reportGeneralTypeIssues]
-                    # Zhipu AI streaming format might be different
-                    if hasattr(chunk, 'choices') and chunk.choices:
-                        choice = chunk.choices[0]
-
-                        # Handle content delta
-                        if hasattr(choice, 'delta') and hasattr(choice.delta, 'content'):
-                            if choice.delta.content:
+                try:
+                    async for chunk in stream:
+                        if chunk.usage:
+                            stream_usage = chunk.usage
+                        if chunk.choices:
+                            choice = chunk.choices[0]
+                            if choice.finish_reason:
+                                stream_finish_reason = choice.finish_reason
+
+                            # Handle content delta
+                            if choice.delta and choice.delta.content:
                                 content_delta = choice.delta.content
                                 accumulated_content += content_delta
                                 # Send chunk message to stream queue
@@ -446,62 +473,41 @@ class ZhipuLLM(ILLM):
                                 )
                                 await stream_queue.put(chunk_message)
 
-                        # Handle tool call delta
-                        if hasattr(choice, 'delta') and hasattr(choice.delta, 'tool_calls'):
-                            if choice.delta.tool_calls:
+                            # Handle tool call delta, raw argument fragments are buffered and parsed once at the end
+                            if choice.delta and choice.delta.tool_calls:
                                 for tool_call_delta in choice.delta.tool_calls:
-                                    if hasattr(tool_call_delta, 'index'):
-                                        tool_index = tool_call_delta.index
-                                    else:
+                                    tool_index = getattr(tool_call_delta, 'index', None)
+                                    if tool_index is None:
                                         tool_index = 0
 
-                                    if tool_index not in accumulated_tool_calls:
-                                        # Initialize new tool call
-                                        tool_call = ToolCallRequest(
-                                            id=getattr(tool_call_delta, 'id', f"tool_call_{tool_index}"),
-                                            name=getattr(tool_call_delta, 'function', {}).get('name', ''),
-                                            type="function",
-                                            args=json.loads(repair_json(getattr(tool_call_delta, 'function', {}).get('arguments') or '{}'))
-                                        )
-                                        accumulated_tool_calls[tool_index] = tool_call
-                                    else:
-                                        # Update existing tool call
-                                        existing_tool_call = accumulated_tool_calls[tool_index]
-                                        if hasattr(tool_call_delta, 'id') and tool_call_delta.id:
-                                            existing_tool_call.id = tool_call_delta.id
-                                        if hasattr(tool_call_delta, 'function'):
-                                            if hasattr(tool_call_delta.function, 'name') and tool_call_delta.function.name:
-                                                existing_tool_call.name = tool_call_delta.function.name
-                                            if hasattr(tool_call_delta.function, 'arguments') and tool_call_delta.function.arguments:
-                                                new_args = json.loads(repair_json(tool_call_delta.function.arguments or '{}'))
-                                                existing_tool_call.args.update(new_args)
-
-                # For Zhipu AI, we need to make a non-streaming call to get final usage
-                # This is a common pattern for APIs that don't provide usage in streaming
-                zhipu_kwargs_final = to_zhipu(completion_config, tools)
-                zhipu_kwargs_final["stream"] = False
-                create_completion_final = asyncify(self._client.chat.completions.create)
-                final_response = await create_completion_final(
-                    model=self._model,
-                    messages=history,
-                    **zhipu_kwargs_final,
-                )
+                                    function = tool_call_delta.function
+                                    tool_call_accumulator.add(
+                                        tool_index,
+                                        id=tool_call_delta.id,
+                                        name=function.name if function else None,
+                                        arguments=function.arguments if function else None,
+                                    )
+                except BaseException:
+                    # 生成被取消（如终止标签闭合）或出错时关闭响应，把连接归还给连接池
+                    await stream.close()
+                    raise
 
-                final_response = cast(ZhipuCompletion, final_response)  # Type assertion for proper usage access
-                logger.info(f"[Zhipu] Streaming completion successful, input_tokens: {final_response.usage.prompt_tokens if final_response.usage else 'unknown'}, output_tokens: {final_response.usage.completion_tokens if final_response.usage else 'unknown'}")
+                logger.info(f"[Zhipu] Streaming completion successful, input_tokens: {stream_usage.prompt_tokens if stream_usage else 'unknown'}, output_tokens: {stream_usage.completion_tokens if stream_usage else 'unknown'}")
 
             else:
                 # Non-streaming mode
-                zhipu_kwargs["stream"] = False
-                create_completion = asyncify(self._client.chat.completions.create)
-                response = await create_completion(
-                    model=self._model,
-                    messages=history,
-                    **zhipu_kwargs,
+                response = cast(
+                    ChatCompletion,
+                    await self._client.chat.completions.create(
+                        model=self._model,
+                        messages=cast(Any, history),
+                        stream=False,
+                        **zhipu_kwargs,
+                    ),
                 )
 
                 # Extract usage information for logging
-                if isinstance(response, ZhipuCompletion) and response.usage:
+                if response.usage:
                     logger.info(f"[Zhipu] Completion successful, input_tokens: {response.usage.prompt_tokens}, output_tokens: {response.usage.completion_tokens}")
                 else:
                     logger.info("[Zhipu] Completion successful (usage info unavailable)")
@@ -514,69 +520,46 @@ class ZhipuLLM(ILLM):
 
         # Extract final content and tool calls
         tool_calls: list[ToolCallRequest]
+        zhipu_usage: ZhipuUsage | None
         if stream_queue is not None:
             # For streaming mode, use accumulated data
             content_blocks = [TextBlock(text=accumulated_content)] if accumulated_content else []
-            tool_calls = list(accumulated_tool_calls.values())
-            final_response = cast(ZhipuCompletion, final_response)  # Type assertion for proper usage access
-            usage = CompletionUsage(
-                prompt_tokens=final_response.usage.prompt_tokens if final_response.usage else -1,
-                completion_tokens=final_response.usage.completion_tokens if final_response.usage else -1,
-                total_tokens=final_response.usage.total_tokens if final_response.usage else -1
-            )
-            finish_reason = final_response.choices[0].finish_reason if final_response.choices else "stop"
+            tool_calls = tool_call_accumulator.finish()
+            zhipu_usage = stream_usage
+            finish_reason = stream_finish_reason or "stop"
         else:
             # For non-streaming mode, extract from response
-            # Extract content from response using proper types
+            assert final_response is not None
             content_text: str = ""
-            zhipu_usage: ZhipuUsage | None = None
-            tool_calls_response: list[ZhipuToolCall] = []
             finish_reason = "stop"
-
-            # Use the actual types from zai package
-            if isinstance(final_response, ZhipuCompletion) and final_response.choices:
+            tool_calls = []
+            if final_response.choices:
                 choice = final_response.choices[0]
                 message = choice.message
                 content_text = message.content or ""
-                tool_calls_response = message.tool_calls or []
                 finish_reason = choice.finish_reason
 
-                # Extract usage information
-                zhipu_usage = final_response.usage
-            else:
-                # Fallback for unexpected response format
-                content_text = str(final_response) if final_response else ""
-
-            # Convert to list[TextBlock] format
-            content_blocks = [TextBlock(text=content_text)] if content_text else []
-
-            # Create the usage using proper types
-            if zhipu_usage:
-                usage = CompletionUsage(
-                    prompt_tokens=zhipu_usage.prompt_tokens,
-                    completion_tokens=zhipu_usage.completion_tokens,
-                    total_tokens=zhipu_usage.total_tokens
-                )
-            else:
-                # Fallback usage when actual usage data is not available
-                usage = CompletionUsage(
-                    prompt_tokens=-1,
-                    completion_tokens=-1,
-                    total_tokens=-1
-                )
-
-            # Extract tool calls from response
-            tool_calls = []
-            if tool_calls_response:
                 # Traverse all the tool calls and create tool call requests
-                for tool_call in tool_calls_response:
+                for tool_call in message.tool_calls or []:
                     tool_calls.append(ToolCallRequest(
                         id=tool_call.id,
-                        name=tool_call.function.name,
+                        name=tool_call.function.name,  # pyright: ignore[reportAttributeAccessIssue]
                         type="function",
-                        args=json.loads(repair_json(tool_call.function.arguments or '{}'))
+                        args=parse_tool_arguments(tool_call.function.arguments or '')  # pyright: ignore[reportAttributeAccessIssue]
                     ))
 
+            # Convert to list[TextBlock] format
+            content_blocks = [TextBlock(text=content_text)] if content_text else []
+            zhipu_usage = final_response.usage
+
+        # Create the usage, fallback when actual usage data is not available
+        usage = CompletionUsage(
+            prompt_tokens=zhipu_usage.prompt_tokens if zhipu_usage else -1,
+            completion_tokens=zhipu_usage.completion_tokens if zhipu_usage else -1,
+            total_tokens=zhipu_usage.total_tokens if zhipu_usage else -1,
+            cached_tokens=get_cached_tokens(zhipu_usage),
+        )
+
         if finish_reason == "length":
             stop_reason = StopReason.LENGTH
         elif finish_reason == "content_filter":
@@ -604,7 +587,7 @@ class ZhipuEmbeddingLLM(IEmbedModel):
     _model: str
     _base_url: str
     _api_key: SecretStr
-    _client: ZhipuAI
+    _client: AsyncOpenAI
 
     def __init__(self, config: LLMConfig, **_kwargs: Any) -> None:
         """Initialize the ZhipuEmbeddingLLM.
@@ -625,9 +608,15 @@ class ZhipuEmbeddingLLM(IEmbedModel):
                 getpass.getpass(f"Enter your API key for {self._provider}: ")
             )
 
-        self._client = ZhipuAI(
+        # 智谱 v4 接口兼容 OpenAI 协议，使用原生异步客户端，不再占用工作线程
+        self._client = AsyncOpenAI(
             api_key=self._api_key.get_secret_value(),
             base_url=self._base_url,
+            timeout=config.timeout,
+            # 相同提供商、基础 URL 和 API 密钥的实例共享连接池
+            http_client=get_http_client_registry().get_client(
+                self._provider, self._base_url, self._api_key, config.timeout,
+            ),
         )
 
     @classmethod
@@ -685,8 +674,7 @@ class ZhipuEmbeddingLLM(IEmbedModel):
             embed_kwargs["dimensions"] = dimensions
 
         try:
-            response = await asyncio.to_thread(
-                self._client.embeddings.create,
+            response = await self._client.embeddings.create(
                 model=self._model,
                 input=text,
                 **embed_kwargs,
@@ -746,8 +734,7 @@ class ZhipuEmbeddingLLM(IEmbedModel):
             embed_kwargs["dimensions"] = dimensions
 
         try:
-            response = await asyncio.to_thread(
-                self._client.embeddings.create,
+            response = await self._client.embeddings.create(
                 model=self._model,
                 input=texts,
                 **embed_kwargs,
@@ -30,6 +30,7 @@ from .filesystem import (
     SearchResult,
     FileType,
     FileInfo,
+    FileListPage,
 )
 
 __all__ = [
@@ -48,5 +49,5 @@ __all__ = [
     # File System
     "EditOperation", "SearchPattern", "FileFilter", "OutputFormat", "SearchParams", "MatchInfo", "SearchResult",
     # File
-    "FileType", "FileInfo",
+    "FileType", "FileInfo", "FileListPage",
 ]
@@ -68,6 +68,13 @@ class FileInfo(BaseModel):
     extension: str  # 文件扩展名（含点，例如 .txt），目录为空字符串
 
 
+class FileListPage(BaseModel):
+    """分页列出目录的结果"""
+
+    entries: list[FileInfo]  # 本页的文件/目录信息，按路径顺序
+    next_cursor: str | None  # 下一页的游标（本页最后一项的相对路径），None 表示已列出全部
+
+
 class OutputFormat(BaseModel):
     """输出格式配置"""
     context_lines: int = 2  # 上下文行数
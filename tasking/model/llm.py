@@ -21,8 +21,13 @@ class CompletionConfig(BaseModel):
             Whether to allow the agent to think.
         stop_words (list[str], optional, defaults to []):
             The words to stop the response.
+        stop_labels (list[str], optional, defaults to []):
+            The labels to stop the streaming response as soon as they are closed. Use `label=value` to stop
+            only when the content of the label equals `value` (case insensitive).
         stream (bool, optional, defaults to False):
             Whether to stream the response.
+        prompt_cache (bool, optional, defaults to True):
+            Whether to mark the stable prompt prefix for provider-side prompt caching.
         extra_headers (dict[str, str], optional, defaults to {}):
             Extra headers to add to the request.
         extra_body (dict[str, Any], optional, defaults to {}):
@@ -57,8 +62,14 @@ class CompletionConfig(BaseModel):
     stop_words: list[str] = Field(default=[])
     """The words to stop the response."""
 
+    stop_labels: list[str] = Field(default=[])
+    """The labels to stop the streaming response as soon as they are closed, `label=value` to stop only on that value."""
+
     stream: bool = Field(default=False)
     """Whether to stream the response."""
+
+    prompt_cache: bool = Field(default=True)
+    """Whether to mark the stable prompt prefix for provider-side prompt caching."""
     
     extra_headers: dict[str, str] = Field(default={})
     """Extra headers to add to the request."""
@@ -60,6 +60,12 @@ class CompletionUsage(BaseModel):
     total_tokens: int = Field(description="The total number of tokens.", default=-100)
     """总共消耗的 token 数量，默认值 -100 表示不可用"""
 
+    cached_tokens: int = Field(description="The number of prompt tokens read from the prompt cache.", default=-100)
+    """提示词中命中提供商缓存的 token 数量（已包含在 prompt_tokens 中），默认值 -100 表示不可用"""
+
+    cache_creation_tokens: int = Field(description="The number of prompt tokens written to the prompt cache.", default=-100)
+    """提示词中写入提供商缓存的 token 数量（已包含在 prompt_tokens 中），默认值 -100 表示不可用"""
+
 
 class TextBlock(BaseModel):
     """TextBlock 是对文本内容的封装，包含文本及其元数据"""
@@ -1,5 +1,8 @@
 from .terminal import ITerminal, LocalTerminal
+from .terminal_pool import TerminalPool
 from .filesystem import IFileSystem, LocalFileSystem
+from .search import LocalSearchEngine
+from .search_index import TrigramIndex
 from .text_editor import ITextEditor, LocalTextEditor
 
 
@@ -8,4 +11,8 @@ __all__ = [
     "ITerminal", "IFileSystem", "ITextEditor",
     # Implementations
     "LocalTerminal", "LocalFileSystem", "LocalTextEditor",
+    # Pools
+    "TerminalPool",
+    # Search
+    "LocalSearchEngine", "TrigramIndex",
 ]
@@ -6,18 +6,26 @@ import os
 import shlex
 import base64
 import mimetypes
+import shutil
 import time
-from pathlib import Path
+import uuid
 from abc import ABC, abstractmethod
-from collections.abc import AsyncIterator
+from collections.abc import AsyncIterable, AsyncIterator, Iterator
+from itertools import islice
+from typing import Literal
 
 import aiofiles
 from asyncer import asyncify
 from loguru import logger
 
+from .search import FileSearchResult, LocalSearchEngine
+from .search_index import TrigramIndex
 from .terminal import ITerminal
+from .terminal_pool import TerminalPool
+from ..utils.ignore import IgnoreRules, is_ignored
 from ..model.filesystem import (
     FileInfo,
+    FileListPage,
     FileType,
     SearchParams,
     SearchResult,
@@ -25,6 +33,81 @@ from ..model.filesystem import (
 )
 
 
+_CODE_LIKE_EXTS = frozenset({
+    ".py",
+    ".js",
+    ".ts",
+    ".tsx",
+    ".jsx",
+    ".java",
+    ".c",
+    ".cc",
+    ".cpp",
+    ".cxx",
+    ".h",
+    ".hh",
+    ".hpp",
+    ".cs",
+    ".go",
+    ".rs",
+    ".rb",
+    ".php",
+    ".swift",
+    ".kt",
+    ".kts",
+    ".scala",
+    ".sh",
+    ".bash",
+    ".zsh",
+    ".fish",
+    ".ps1",
+    ".bat",
+    ".cmd",
+    ".lua",
+    ".pl",
+    ".pm",
+    ".r",
+    ".jl",
+    ".m",
+    ".sql",
+    ".graphql",
+    ".gql",
+    ".hs",
+    ".erl",
+    ".ex",
+    ".exs",
+    ".clj",
+    ".cljs",
+    ".coffee",
+    ".dart",
+})
+
+_TEXT_LIKE_EXTS = frozenset({
+    ".txt",
+    ".md",
+    ".json",
+    ".yaml",
+    ".yml",
+    ".csv",
+    ".tsv",
+    ".toml",
+    ".ini",
+    ".cfg",
+    ".log",
+})
+
+
+_LIST_BATCH_SIZE = 256      # 流式列出目录时每次在线程中产生的条目数
+
+
+def _get_suffix(name: str) -> str:
+    """获取文件扩展名（含点），与 Path.suffix 一致"""
+    index = name.rfind(".")
+    if 0 < index < len(name) - 1:
+        return name[index:]
+    return ""
+
+
 class IFileSystem(ABC):
     """文件系统接口"""
 
@@ -48,6 +131,63 @@ class IFileSystem(ABC):
             list[FileInfo]: 文件/目录元数据列表。
         """
 
+    @abstractmethod
+    async def iter_files(
+        self,
+        directory_path: str,
+        recursive: bool = False,
+        max_depth: int | None = None,
+        max_entries: int | None = None,
+        ignore_patterns: list[str] | None = None,
+        use_gitignore: bool = False,
+        cursor: str | None = None,
+    ) -> AsyncIterator[FileInfo]:
+        """流式列出目录下的文件/子目录，按路径顺序（目录在其内容之前）逐个返回。
+
+        Args:
+            directory_path: 目标目录路径。
+            recursive: 是否递归列出子目录下的文件（默认 False）。
+            max_depth: 递归的最大深度（目录的直接子项为第1层），None 表示不限制。
+            max_entries: 最多返回的条目数，None 表示不限制。
+            ignore_patterns: .gitignore 风格的忽略模式，相对于目标目录。
+            use_gitignore: 是否读取工作空间中的 .gitignore 文件并跳过 .git 目录（默认 False）。
+            cursor: 分页游标（上一页最后一项的相对路径），从该项之后继续列出。
+
+        Returns:
+            AsyncIterator[FileInfo]: 文件/目录元数据的异步迭代器。
+
+        Raises:
+            FileNotFoundError: 目录不存在。
+            RuntimeError: 路径越界或读取失败。
+            ValueError: 参数或游标无效。
+        """
+
+    @abstractmethod
+    async def list_files_page(
+        self,
+        directory_path: str,
+        recursive: bool = False,
+        max_entries: int = 1000,
+        max_depth: int | None = None,
+        ignore_patterns: list[str] | None = None,
+        use_gitignore: bool = False,
+        cursor: str | None = None,
+    ) -> FileListPage:
+        """分页列出目录下的文件/子目录，适合逐页浏览大型目录。
+
+        Args:
+            directory_path: 目标目录路径。
+            recursive: 是否递归列出子目录下的文件（默认 False）。
+            max_entries: 每页最多返回的条目数（默认 1000）。
+            max_depth: 递归的最大深度，None 表示不限制。
+            ignore_patterns: .gitignore 风格的忽略模式，相对于目标目录。
+            use_gitignore: 是否读取工作空间中的 .gitignore 文件并跳过 .git 目录（默认 False）。
+            cursor: 上一页返回的 next_cursor，None 表示第一页。
+
+        Returns:
+            FileListPage: 本页的条目和下一页的游标。
+        """
+
     @abstractmethod
     def file_exists(self, file_path: str) -> bool:
         """检查文件是否存在。
@@ -117,6 +257,23 @@ class IFileSystem(ABC):
             FileExistsError: 文件已存在，且replace为False。
         """
 
+    @abstractmethod
+    async def save_file_stream(self, file_path: str, chunks: AsyncIterable[bytes], replace: bool = False) -> str:
+        """以流式方式保存文件，按块写入bytes，适合大文件。
+
+        Args:
+            file_path: 目标文件路径。
+            chunks: 异步字节流。
+            replace: 是否覆盖文件。
+
+        Returns:
+            str: 保存结果消息。
+
+        Raises:
+            RuntimeError: 文件路径超出workspace范围或保存失败。
+            FileExistsError: 文件已存在，且replace为False。
+        """
+
     @abstractmethod
     async def delete_file(self, file_path: str) -> str:
         """删除文件。
@@ -175,15 +332,49 @@ class LocalFileSystem(IFileSystem):
         self,
         terminal_instance: ITerminal,
         allow_commands: list[str] | None = None,
+        terminal_pool: TerminalPool | None = None,
+        search_backend: Literal["native", "bash"] = "native",
+        search_index: TrigramIndex | None = None,
     ) -> None:
         """初始化文件系统工具
 
         Args:
             terminal_instance: ITerminal 实现类实例
             allow_commands: 允许的命令列表（白名单）
+            terminal_pool: 终端会话池（可选），设置后搜索等命令从池中借用终端执行，
+                不再与 terminal_instance 上的其他命令争用同一个进程
+            search_backend: 内容搜索后端，"native" 使用进程内搜索引擎（不支持的参数自动回退到bash），
+                "bash" 始终通过终端执行 find + grep，默认值为 "native"
+            search_index: 工作空间的三元组索引（可选），设置后进程内搜索先用索引筛选候选文件，
+                写入和删除文件时同步使索引失效，仅支持 "native" 搜索后端
+
+        Raises:
+            ValueError: 终端会话池或搜索索引与终端的工作空间不一致，或 search_backend 无效
         """
+        if search_backend not in ("native", "bash"):
+            raise ValueError(f"无效的搜索后端：{search_backend}，仅支持 native/bash")
         self._terminal = terminal_instance
         self._workspace = terminal_instance.get_workspace()
+        self._search_engine = LocalSearchEngine() if search_backend == "native" else None
+
+        if search_index is not None:
+            if search_backend != "native":
+                raise ValueError("搜索索引仅支持 native 搜索后端")
+            if search_index.get_workspace() != self._workspace:
+                raise ValueError(
+                    f"搜索索引与终端的工作空间不一致：\n"
+                    f"  终端：{self._workspace}\n"
+                    f"  搜索索引：{search_index.get_workspace()}"
+                )
+        self._search_index = search_index
+
+        if terminal_pool is not None and terminal_pool.get_workspace() != self._workspace:
+            raise ValueError(
+                f"终端会话池与终端的工作空间不一致：\n"
+                f"  终端：{self._workspace}\n"
+                f"  终端池：{terminal_pool.get_workspace()}"
+            )
+        self._terminal_pool = terminal_pool
 
         # 校验终端状态
         self._validate_terminal_state(terminal_instance)
@@ -238,7 +429,21 @@ class LocalFileSystem(IFileSystem):
                     f"  终端：{terminal_allowed}"
                 )
             self._allow_commands = allow_commands
-            
+
+    async def _run_command(self, command: str) -> str:
+        """私有方法：执行命令，设置了终端会话池时从池中借用终端执行。
+
+        Args:
+            command: 要执行的命令
+
+        Returns:
+            str: 命令输出
+        """
+        if self._terminal_pool is None:
+            return await self._terminal.run_command(command, allow_by_human=True)
+        async with self._terminal_pool.session() as terminal:
+            return await terminal.run_command(command, allow_by_human=True)
+
     async def list_files(self, directory_path: str, recursive: bool = False) -> list[FileInfo]:
         """列出目录下的所有文件和子目录，返回结构化的文件信息。
 
@@ -253,6 +458,103 @@ class LocalFileSystem(IFileSystem):
             RuntimeError: 目录路径超出workspace范围或读取失败。
             FileNotFoundError: 目录不存在。
         """
+        file_infos = [info async for info in self.iter_files(directory_path, recursive=recursive)]
+        logger.info(
+            f"📁 列出目录内容成功：{directory_path}，共 {len(file_infos)} 项（递归={recursive}）"
+        )
+        return file_infos
+
+    async def list_files_page(
+        self,
+        directory_path: str,
+        recursive: bool = False,
+        max_entries: int = 1000,
+        max_depth: int | None = None,
+        ignore_patterns: list[str] | None = None,
+        use_gitignore: bool = False,
+        cursor: str | None = None,
+    ) -> FileListPage:
+        """分页列出目录下的文件和子目录。
+
+        多读取一项来判断是否还有下一页，最后一页的 next_cursor 为 None。
+
+        Args:
+            directory_path: 目标目录路径。
+            recursive: 是否递归列出子目录内容。
+            max_entries: 每页最多返回的条目数。
+            max_depth: 递归的最大深度，None 表示不限制。
+            ignore_patterns: .gitignore 风格的忽略模式，相对于目标目录。
+            use_gitignore: 是否读取 .gitignore 文件并跳过 .git 目录。
+            cursor: 上一页返回的 next_cursor。
+
+        Returns:
+            FileListPage: 本页的条目和下一页的游标。
+
+        Raises:
+            RuntimeError: 目录路径超出workspace范围或读取失败。
+            FileNotFoundError: 目录不存在。
+            ValueError: 参数或游标无效。
+        """
+        if max_entries <= 0:
+            raise ValueError(f"max_entries必须大于0：{max_entries}")
+
+        entries = [
+            info async for info in self.iter_files(
+                directory_path,
+                recursive=recursive,
+                max_depth=max_depth,
+                max_entries=max_entries + 1,
+                ignore_patterns=ignore_patterns,
+                use_gitignore=use_gitignore,
+                cursor=cursor,
+            )
+        ]
+        next_cursor = None
+        if len(entries) > max_entries:
+            entries = entries[:max_entries]
+            next_cursor = entries[-1].path
+        return FileListPage(entries=entries, next_cursor=next_cursor)
+
+    async def iter_files( # pyright: ignore[reportIncompatibleMethodOverride]
+        self,
+        directory_path: str,
+        recursive: bool = False,
+        max_depth: int | None = None,
+        max_entries: int | None = None,
+        ignore_patterns: list[str] | None = None,
+        use_gitignore: bool = False,
+        cursor: str | None = None,
+    ) -> AsyncIterator[FileInfo]:
+        """基于 os.scandir 流式列出目录下的文件和子目录。
+
+        - 同一目录下按名称排序，递归时按深度优先的顺序返回（目录在其内容之前），
+          因此游标可以直接跳过已返回的子树，只重新读取游标路径上的目录
+        - 目录类型和文件大小来自 DirEntry 的缓存，每个文件最多一次 stat
+        - 不进入符号链接指向的目录
+        - 遍历在线程中分批进行，每批最多 _LIST_BATCH_SIZE 项，不阻塞事件循环
+
+        Args:
+            directory_path: 目标目录路径。
+            recursive: 是否递归列出子目录内容。
+            max_depth: 递归的最大深度（直接子项为第1层），None 表示不限制。
+            max_entries: 最多返回的条目数，None 表示不限制。
+            ignore_patterns: .gitignore 风格的忽略模式，相对于目标目录，优先于 .gitignore 文件。
+            use_gitignore: 是否读取 .gitignore 文件（包括工作空间到目标目录之间的上级目录）并跳过 .git 目录。
+            cursor: 分页游标（上一次返回的最后一项的 path），从该项之后继续列出。
+
+        Yields:
+            FileInfo: 文件或目录信息。
+
+        Raises:
+            RuntimeError: 目录路径超出workspace范围或读取失败。
+            FileNotFoundError: 目录不存在。
+            ValueError: 参数或游标无效。
+        """
+        if max_depth is not None and max_depth <= 0:
+            raise ValueError(f"max_depth必须大于0：{max_depth}")
+        if max_entries is not None and max_entries <= 0:
+            raise ValueError(f"max_entries必须大于0：{max_entries}")
+
         dir_abs, _ = self._terminal.check_path(directory_path)
 
         if not os.path.exists(dir_abs):
@@ -261,41 +563,145 @@ class LocalFileSystem(IFileSystem):
         if not os.path.isdir(dir_abs):
             raise RuntimeError(f"指定路径不是目录：{dir_abs}")
 
-        workspace_path = Path(self._workspace).resolve()
-        target_path = Path(dir_abs).resolve()
-
+        workspace_abs = os.path.realpath(self._workspace)
+        dir_abs = os.path.realpath(dir_abs)
+        dir_rel = os.path.relpath(dir_abs, workspace_abs)
+        dir_rel = "" if dir_rel == "." else dir_rel.replace(os.sep, "/")
+
+        cursor_parts: tuple[str, ...] | None = None
+        if cursor is not None:
+            prefix = f"{dir_rel}/" if dir_rel else ""
+            if not cursor.startswith(prefix) or cursor == prefix:
+                raise ValueError(f"无效的游标：{cursor}，不在目录 {directory_path} 下")
+            cursor_parts = tuple(cursor[len(prefix):].split("/"))
+
+        scopes: list[IgnoreRules] = []
+        if use_gitignore:
+            scopes = self._load_parent_ignore_rules(workspace_abs, dir_abs, dir_rel)
+        extra_rules = IgnoreRules.from_lines(ignore_patterns, dir_rel) if ignore_patterns else None
+
+        walker = self._walk_directory(
+            dir_abs=dir_abs,
+            dir_rel=dir_rel,
+            depth_limit=(max_depth if recursive else 1),
+            scopes=scopes,
+            extra_rules=extra_rules,
+            use_gitignore=use_gitignore,
+            cursor_parts=cursor_parts,
+        )
+        remaining = max_entries
         try:
-            iterator = target_path.rglob("*") if recursive else target_path.iterdir()
-            file_infos: list[FileInfo] = []
-
-            for entry in iterator:
-                rel_path = entry.relative_to(workspace_path)
-                parent_rel = (
-                    entry.parent.relative_to(workspace_path)
-                    if entry.parent != workspace_path
-                    else Path("")
-                )
-
-                file_infos.append(
-                    FileInfo(
-                        name=entry.name,
-                        path=str(rel_path),
-                        full_path=str(entry),
-                        parent=str(parent_rel),
-                        size=entry.stat().st_size if entry.is_file() else None,
-                        file_type=self._infer_file_type(entry),
-                        extension=entry.suffix if entry.is_file() else "",
-                    )
-                )
-
-            logger.info(
-                f"📁 列出目录内容成功：{dir_abs}，共 {len(file_infos)} 项（递归={recursive}）"
-            )
-            return file_infos
-        except (OSError, IOError) as e:
+            while remaining is None or remaining > 0:
+                size = _LIST_BATCH_SIZE if remaining is None else min(_LIST_BATCH_SIZE, remaining)
+                batch = await asyncify(lambda: list(islice(walker, size)))()
+                for info in batch:
+                    yield info
+                if remaining is not None:
+                    remaining -= len(batch)
+                if len(batch) < size:
+                    break
+        except OSError as e:
             raise RuntimeError(
                 f"读取目录内容失败：{dir_abs}，错误：{str(e)}"
             ) from e
+        finally:
+            walker.close()
+
+    @staticmethod
+    def _load_parent_ignore_rules(workspace_abs: str, dir_abs: str, dir_rel: str) -> list[IgnoreRules]:
+        """私有方法：读取工作空间根目录到目标目录（不含）之间各级目录的 .gitignore"""
+        scopes: list[IgnoreRules] = []
+        if not dir_rel:
+            return scopes
+        parts = dir_rel.split("/")
+        for depth in range(len(parts)):
+            base = "/".join(parts[:depth])
+            directory = os.path.join(workspace_abs, *parts[:depth]) if depth else workspace_abs
+            rules = IgnoreRules.from_file(os.path.join(directory, ".gitignore"), base)
+            if rules is not None:
+                scopes.append(rules)
+        return scopes
+
+    def _walk_directory(
+        self,
+        dir_abs: str,
+        dir_rel: str,
+        depth_limit: int | None,
+        scopes: list[IgnoreRules],
+        extra_rules: IgnoreRules | None,
+        use_gitignore: bool,
+        cursor_parts: tuple[str, ...] | None,
+    ) -> Iterator[FileInfo]:
+        """私有方法：深度优先遍历目录（同步生成器，由 iter_files 在线程中分批驱动）
+
+        条目按相对于目标目录的路径分段（元组）排序，与遍历顺序一致：
+        游标本身及其上级目录已经返回过，只进入不再返回；排在游标之前的子树整体跳过。
+        """
+        def scan(directory: str, rel: str, parent_scopes: list[IgnoreRules]) -> tuple[list[os.DirEntry[str]], list[IgnoreRules]]:
+            with os.scandir(directory) as iterator:
+                entries = sorted(iterator, key=lambda entry: entry.name)
+            if use_gitignore:
+                rules = IgnoreRules.from_file(os.path.join(directory, ".gitignore"), rel)
+                if rules is not None:
+                    parent_scopes = [*parent_scopes, rules]
+            return entries, parent_scopes
+
+        def ignored(rel_path: str, is_dir: bool, entry_scopes: list[IgnoreRules]) -> bool:
+            if extra_rules is not None:
+                matched = extra_rules.match(rel_path, is_dir)
+                if matched is not None:
+                    return matched
+            return is_ignored(entry_scopes, rel_path, is_dir)
+
+        root_entries, root_scopes = scan(dir_abs, dir_rel, scopes)
+        # 栈中的每一帧：(目录的条目迭代器, 目录相对路径, 路径分段, 规则组, 深度)
+        stack = [(iter(root_entries), dir_rel, (), root_scopes, 1)]
+        while stack:
+            entries, parent_rel, parent_parts, entry_scopes, depth = stack[-1]
+            entry = next(entries, None)
+            if entry is None:
+                stack.pop()
+                continue
+
+            name = entry.name
+            parts = (*parent_parts, name)
+            emit = True
+            if cursor_parts is not None:
+                if parts == cursor_parts[:len(parts)]:
+                    emit = False
+                elif parts < cursor_parts:
+                    continue
+                else:
+                    cursor_parts = None
+
+            try:
+                is_dir = entry.is_dir()
+                if use_gitignore and is_dir and name == ".git":
+                    continue
+                rel_path = f"{parent_rel}/{name}" if parent_rel else name
+                if (extra_rules is not None or entry_scopes) and ignored(rel_path, is_dir, entry_scopes):
+                    continue
+
+                if emit:
+                    is_file = not is_dir and entry.is_file()
+                    # 字段均由遍历得到，跳过校验以减少大目录下的开销
+                    yield FileInfo.model_construct(
+                        name=name,
+                        path=rel_path,
+                        full_path=entry.path,
+                        parent=parent_rel or ".",
+                        size=entry.stat().st_size if is_file else None,
+                        file_type=FileType.FOLDER if is_dir else self._infer_file_type_by_name(name),
+                        extension=_get_suffix(name) if is_file else "",
+                    )
+
+                if is_dir and not entry.is_symlink() and (depth_limit is None or depth < depth_limit):
+                    child_entries, child_scopes = scan(entry.path, rel_path, entry_scopes)
+                    stack.append((iter(child_entries), rel_path, parts, child_scopes, depth + 1))
+            except OSError as e:
+                # 子目录无法读取或条目在遍历期间被删除时跳过
+                logger.debug(f"📁 跳过无法读取的条目：{entry.path}，错误：{str(e)}")
+                continue
 
     async def open_file_stream(self, file_path: str, chunk_size: int = 8192) -> AsyncIterator[bytes]: # pyright: ignore[reportIncompatibleMethodOverride]
         """流式读取文件为bytes块。
@@ -332,82 +738,17 @@ class LocalFileSystem(IFileSystem):
                 f"流式读取文件失败：{file_abs}，错误：{str(e)}"
             ) from e
 
-    def _infer_file_type(self, path: Path) -> FileType:
-        """根据路径推断文件类型。"""
-
-        if path.is_dir():
-            return FileType.FOLDER
-
-        suffix = path.suffix.lower()
-
-        code_like_exts = {
-            ".py",
-            ".js",
-            ".ts",
-            ".tsx",
-            ".jsx",
-            ".java",
-            ".c",
-            ".cc",
-            ".cpp",
-            ".cxx",
-            ".h",
-            ".hh",
-            ".hpp",
-            ".cs",
-            ".go",
-            ".rs",
-            ".rb",
-            ".php",
-            ".swift",
-            ".kt",
-            ".kts",
-            ".scala",
-            ".sh",
-            ".bash",
-            ".zsh",
-            ".fish",
-            ".ps1",
-            ".bat",
-            ".cmd",
-            ".lua",
-            ".pl",
-            ".pm",
-            ".r",
-            ".jl",
-            ".m",
-            ".sql",
-            ".graphql",
-            ".gql",
-            ".hs",
-            ".erl",
-            ".ex",
-            ".exs",
-            ".clj",
-            ".cljs",
-            ".coffee",
-            ".dart",
-        }
-
-        text_like_exts = {
-            ".txt",
-            ".md",
-            ".json",
-            ".yaml",
-            ".yml",
-            ".csv",
-            ".tsv",
-            ".toml",
-            ".ini",
-            ".cfg",
-            ".log",
-        }
-
-        mime_type, _ = mimetypes.guess_type(path.name)
+    @staticmethod
+    def _infer_file_type_by_name(name: str) -> FileType:
+        """根据文件名推断（非目录的）文件类型。"""
+
+        suffix = _get_suffix(name).lower()
+
+        mime_type, _ = mimetypes.guess_type(name)
         if mime_type:
             if mime_type.startswith("text/"):
                 # 优先使用扩展名判断是否为代码文件
-                if suffix in code_like_exts:
+                if suffix in _CODE_LIKE_EXTS:
                     return FileType.CODE
                 return FileType.TEXT
             if mime_type.startswith("image/"):
@@ -417,10 +758,10 @@ class LocalFileSystem(IFileSystem):
             if mime_type.startswith("video/"):
                 return FileType.VIDEO
 
-        if suffix in code_like_exts:
+        if suffix in _CODE_LIKE_EXTS:
             return FileType.CODE
 
-        if suffix in text_like_exts:
+        if suffix in _TEXT_LIKE_EXTS:
             return FileType.TEXT
 
         return FileType.OTHER
@@ -519,6 +860,8 @@ class LocalFileSystem(IFileSystem):
         1. 通过 check_path 进行路径解析和鉴权
         2. 再次使用 check_path 确认路径在工作区内
         
+        内容先写入临时文件再重命名替换目标文件，写入中断不会留下不完整的文件。
+        
         Args:
             file_path: 目标文件路径
             content: 文件内容（str 或 bytes）
@@ -570,11 +913,9 @@ class LocalFileSystem(IFileSystem):
                     # 如果是bytes，假设已经正确编码
                     file_bytes = content
 
-            # 使用aiofiles进行异步文件写入
-            async with aiofiles.open(file_abs, 'wb') as f:
-                await f.write(file_bytes)
-
-            file_size = len(file_bytes)
+            # 使用aiofiles进行异步文件写入（临时文件 + 重命名）
+            file_size = await self._write_atomic(file_abs, file_bytes)
+            self._invalidate_search_index(file_abs)
             logger.info(f"📄 文件保存成功：{file_abs}，大小：{file_size} 字节")
             return f"文件保存成功：{file_abs}，大小：{file_size} 字节"
 
@@ -585,6 +926,83 @@ class LocalFileSystem(IFileSystem):
                 f"保存文件失败：{file_abs}，错误：{str(e)}"
             ) from e
 
+    async def save_file_stream(self, file_path: str, chunks: AsyncIterable[bytes], replace: bool = False) -> str:
+        """以流式方式保存文件（使用aiofiles异步IO）
+
+        内容先写入同目录下的临时文件，全部写入成功后再替换目标文件，
+        写入过程中出错时目标文件保持不变。
+
+        Args:
+            file_path: 目标文件路径
+            chunks: 异步字节流
+            replace: 是否覆盖已存在的文件，默认为 False
+
+        Returns:
+            str: 保存结果消息
+
+        Raises:
+            RuntimeError: 文件路径超出workspace范围或保存失败
+            FileExistsError: 文件已存在，且replace为False
+        """
+        # 路径解析和鉴权（如果路径不在工作区内，会抛出异常）
+        file_abs, _ = self._terminal.check_path(file_path)
+
+        # 检查文件是否已存在
+        if os.path.exists(file_abs) and not replace:
+            raise FileExistsError(f"文件已存在：{file_abs}，如需覆盖请设置 replace=True")
+
+        try:
+            file_size = await self._write_atomic(file_abs, chunks)
+            self._invalidate_search_index(file_abs)
+            logger.info(f"📄 文件保存成功：{file_abs}，大小：{file_size} 字节")
+            return f"文件保存成功：{file_abs}，大小：{file_size} 字节"
+        except (OSError, IOError) as e:
+            raise RuntimeError(
+                f"保存文件失败：{file_abs}，错误：{str(e)}"
+            ) from e
+
+    async def _write_atomic(self, file_abs: str, content: bytes | AsyncIterable[bytes]) -> int:
+        """私有方法：先写入同目录下的临时文件，再通过重命名原子替换目标文件
+
+        Args:
+            file_abs: 目标文件绝对路径
+            content: 文件内容，或异步字节流
+
+        Returns:
+            int: 写入的字节数
+        """
+        directory = os.path.dirname(file_abs)
+        os.makedirs(directory, exist_ok=True)
+        temp_path = os.path.join(directory, f".{os.path.basename(file_abs)}.{uuid.uuid4().hex[:8]}.tmp")
+
+        file_size = 0
+        try:
+            async with aiofiles.open(temp_path, 'xb') as f:
+                if isinstance(content, bytes):
+                    await f.write(content)
+                    file_size = len(content)
+                else:
+                    async for chunk in content:
+                        await f.write(chunk)
+                        file_size += len(chunk)
+                await f.flush()
+                await asyncify(os.fsync)(f.fileno())
+
+            # 保留原文件的权限
+            if os.path.exists(file_abs):
+                shutil.copymode(file_abs, temp_path)
+            os.replace(temp_path, file_abs)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        return file_size
+
+    def _invalidate_search_index(self, file_abs: str) -> None:
+        """私有方法：文件被写入或删除后使其在搜索索引中失效"""
+        if self._search_index is not None:
+            self._search_index.invalidate(file_abs)
+
     async def delete_file(self, file_path: str) -> str:
         """删除文件（使用aiofiles异步IO）
         
@@ -613,6 +1031,7 @@ class LocalFileSystem(IFileSystem):
             # 使用aiofiles.os.remove进行异步文件删除
             # 注意：aiofiles 不直接提供删除功能，我们使用 asyncify 包装 os.remove
             await asyncify(os.remove)(file_abs)
+            self._invalidate_search_index(file_abs)
 
             logger.info(f"🗑️ 文件删除成功：{file_abs}")
             return f"文件删除成功：{file_abs}"
@@ -628,20 +1047,23 @@ class LocalFileSystem(IFileSystem):
             self._validate_search_params(search_params)
             resolved_paths = self._resolve_search_paths(search_params.search_paths)
 
-            find_cmd = self._build_find_command(search_params, resolved_paths)
-            grep_cmd = self._build_grep_command(search_params)
-
-            # 修复搜索逻辑：使用find的-exec参数正确搜索文件内容
-            if search_params.output_format.highlight_matches:
-                # 构建带高亮的grep命令
-                highlight_grep = f"{grep_cmd} --color=always"
-                final_cmd = f"{find_cmd} -exec {highlight_grep} {{}} + 2>/dev/null || true"
+            if self._use_native_search(search_params):
+                # 进程内搜索，直接得到结构化结果
+                file_results, files_searched = await self._search_native(search_params, resolved_paths)
+                matches = [match for file_result in file_results for match in file_result.matches]
+                search_result = SearchResult(
+                    params=search_params,
+                    total_files_searched=files_searched,
+                    files_with_matches=len(file_results),
+                    total_matches=len(matches),
+                    search_time=time.time() - start_time,
+                    file_results=matches,
+                    errors=[]
+                )
             else:
-                final_cmd = f"{find_cmd} -exec {grep_cmd} {{}} + 2>/dev/null || true"
-
-            raw_output = await self._terminal.run_command(final_cmd, allow_by_human=True)
-            search_result = self._parse_grep_output(
-                raw_output, search_params, time.time() - start_time)
+                raw_output = await self._run_command(self._build_search_command(search_params, resolved_paths))
+                search_result = self._parse_grep_output(
+                    raw_output, search_params, time.time() - start_time)
 
             logger.info(
                 f"🔍 搜索完成：找到 {search_result.total_matches} 个匹配，耗时 {search_result.search_time:.2f} 秒")
@@ -666,18 +1088,12 @@ class LocalFileSystem(IFileSystem):
             self._validate_search_params(search_params)
             resolved_paths = self._resolve_search_paths(search_params.search_paths)
 
-            find_cmd = self._build_find_command(search_params, resolved_paths)
-            grep_cmd = self._build_grep_command(search_params)
-
-            # 修复搜索逻辑：使用find的-exec参数正确搜索文件内容
-            if search_params.output_format.highlight_matches:
-                # 构建带高亮的grep命令
-                highlight_grep = f"{grep_cmd} --color=always"
-                final_cmd = f"{find_cmd} -exec {highlight_grep} {{}} + 2>/dev/null || true"
+            if self._use_native_search(search_params):
+                # 进程内搜索后渲染为grep风格的文本
+                file_results, _ = await self._search_native(search_params, resolved_paths)
+                raw_output = LocalSearchEngine.format_grep_output(file_results, search_params)
             else:
-                final_cmd = f"{find_cmd} -exec {grep_cmd} {{}} + 2>/dev/null || true"
-
-            raw_output = await self._terminal.run_command(final_cmd, allow_by_human=True)
+                raw_output = await self._run_command(self._build_search_command(search_params, resolved_paths))
             formatted_output = self._format_text_output(raw_output, search_params)
 
             logger.info("🔍 搜索完成：返回文本格式结果")
@@ -687,6 +1103,49 @@ class LocalFileSystem(IFileSystem):
             logger.error(f"❌ 搜索失败：{str(e)}")
             return f"搜索失败：{str(e)}"
 
+    def _use_native_search(self, params: SearchParams) -> bool:
+        """是否使用进程内搜索引擎，引擎不支持的参数（如高亮输出）回退到bash"""
+        return self._search_engine is not None and self._search_engine.is_supported(params)
+
+    async def _search_native(
+        self, params: SearchParams, resolved_paths: list[tuple[str, str]]
+    ) -> tuple[list[FileSearchResult], int]:
+        """私有方法：进程内搜索，设置了搜索索引时先筛选候选文件，只对候选文件逐行匹配
+
+        Returns:
+            tuple[list[FileSearchResult], int]: (有匹配的文件结果列表, 满足过滤条件的文件总数)
+        """
+        engine: LocalSearchEngine = self._search_engine  # type: ignore[assignment]
+        roots = [abs_path for abs_path, _ in resolved_paths]
+        if self._search_index is None:
+            return await engine.search(params, roots)
+
+        index = self._search_index
+        files = await asyncify(lambda: list(engine.iter_files(roots, params.file_filter)))()
+        candidates = await asyncify(index.filter_candidates)(files, params.content_pattern)
+        logger.debug(f"🔍 搜索索引筛选：{len(files)} 个文件中有 {len(candidates)} 个候选文件")
+        file_results, _ = await engine.search(params, roots, files=candidates)
+        return file_results, len(files)
+
+    def _build_search_command(self, params: SearchParams, resolved_paths: list[tuple[str, str]]) -> str:
+        """构建bash搜索命令：find过滤文件后通过-exec交给grep搜索内容。
+
+        Args:
+            params: 搜索参数对象
+            resolved_paths: 已解析的搜索路径列表
+
+        Returns:
+            str: 完整的搜索命令
+        """
+        find_cmd = self._build_find_command(params, resolved_paths)
+        grep_cmd = self._build_grep_command(params)
+
+        # 修复搜索逻辑：使用find的-exec参数正确搜索文件内容
+        if params.output_format.highlight_matches:
+            # 构建带高亮的grep命令
+            grep_cmd = f"{grep_cmd} --color=always"
+        return f"{find_cmd} -exec {grep_cmd} {{}} + 2>/dev/null || true"
+
     def _resolve_search_paths(self, search_paths: list[str]) -> list[tuple[str, str]]:
         """解析搜索路径列表。
 
@@ -0,0 +1,321 @@
+"""
+进程内文件内容搜索引擎：使用 os.scandir 遍历文件，mmap 映射文件后用预编译的正则/字面量匹配，
+多个文件在线程池中并行搜索，直接返回结构化的 MatchInfo 结果
+"""
+
+import asyncio
+import mmap
+import os
+import re
+import threading
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from fnmatch import fnmatchcase
+from typing import NamedTuple
+
+from ..model.filesystem import FileFilter, MatchInfo, SearchParams
+
+
+_BINARY_CHECK_SIZE = 8192   # 检查前多少字节中是否包含NUL来判断二进制文件（与grep一致）
+_FILES_PER_TASK = 32        # 每个线程池任务搜索的文件数量
+
+
+class FileSearchResult(NamedTuple):
+    """单个文件的搜索结果"""
+
+    file_path: str
+    """文件绝对路径"""
+    matches: list[MatchInfo]
+    """匹配信息列表，按行号递增"""
+
+
+class LocalSearchEngine:
+    """进程内文件内容搜索引擎
+
+    - 文件过滤与 `find -type f` 的语义一致：不跟随符号链接，跳过隐藏文件和隐藏目录，
+      `max_depth` 以搜索路径为第0层，`name_patterns`/`extensions` 为任一匹配，`exclude_patterns` 只作用于文件名
+    - 内容匹配与 `grep -E/-F` 的语义一致：逐行匹配，支持忽略大小写、反转匹配、上下文行和每文件最大匹配数，
+      包含NUL字节的二进制文件不输出匹配
+    - 字面量且区分大小写的搜索直接在mmap上查找，不包含模式的文件无需解码
+    - 不支持的正则语法（如POSIX字符类 `[[:alpha:]]`）通过 `is_supported` 判断，由调用方回退到grep
+
+    Example:
+        ```python
+        engine = LocalSearchEngine(max_workers=4)
+        results, files_searched = await engine.search(params, ["/workspace"])
+        engine.shutdown()
+        ```
+    """
+    _max_workers: int
+    _max_file_size: int
+    _executor: ThreadPoolExecutor | None
+    _executor_lock: threading.Lock
+
+    def __init__(self, max_workers: int | None = None, max_file_size: int = 64 * 1024 * 1024) -> None:
+        """初始化搜索引擎
+
+        Args:
+            max_workers: 并行搜索的线程数，None表示使用 min(8, CPU核数)
+            max_file_size: 单个文件的最大字节数，超过的文件跳过，默认值为64MB
+
+        Raises:
+            ValueError: 如果 max_workers 或 max_file_size 不是正数。
+        """
+        if max_workers is not None and max_workers <= 0:
+            raise ValueError(f"max_workers必须大于0：{max_workers}")
+        if max_file_size <= 0:
+            raise ValueError(f"max_file_size必须大于0：{max_file_size}")
+        self._max_workers = max_workers or min(8, os.cpu_count() or 1)
+        self._max_file_size = max_file_size
+        self._executor = None
+        self._executor_lock = threading.Lock()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """私有方法：首次搜索时创建线程池"""
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self._max_workers, thread_name_prefix="tasking-search",
+                )
+            return self._executor
+
+    def shutdown(self) -> None:
+        """关闭线程池，之后再次搜索会重新创建"""
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    @staticmethod
+    def is_supported(params: SearchParams) -> bool:
+        """判断搜索参数能否由进程内引擎处理
+
+        Returns:
+            bool: 高亮输出、POSIX字符类或Python无法编译的正则返回False
+        """
+        if params.output_format.highlight_matches:
+            return False
+        pattern = params.content_pattern
+        if not pattern.is_regex:
+            return True
+        if "[:" in pattern.pattern:
+            return False
+        try:
+            re.compile(pattern.pattern)
+        except re.error:
+            return False
+        return True
+
+    # ********** 文件过滤 **********
+
+    @staticmethod
+    def _match_name(name: str, file_filter: FileFilter) -> bool:
+        """判断文件名是否满足过滤条件"""
+        if file_filter.name_patterns and not any(fnmatchcase(name, p) for p in file_filter.name_patterns):
+            return False
+        if file_filter.extensions and not any(name.endswith(f".{ext}") for ext in file_filter.extensions):
+            return False
+        if file_filter.exclude_patterns and any(fnmatchcase(name, p) for p in file_filter.exclude_patterns):
+            return False
+        return True
+
+    def iter_files(self, roots: list[str], file_filter: FileFilter) -> Iterator[str]:
+        """按照文件过滤条件遍历搜索路径下的文件
+
+        Args:
+            roots: 搜索路径列表（绝对路径），可以是目录或文件，不存在的路径会被跳过
+            file_filter: 文件过滤器
+
+        Yields:
+            str: 文件绝对路径，同一目录下按名称排序
+        """
+        max_depth = file_filter.max_depth
+        for root in roots:
+            if os.path.islink(root):
+                continue
+            if os.path.isfile(root):
+                if self._match_name(os.path.basename(root), file_filter):
+                    yield root
+                continue
+            if not os.path.isdir(root) or max_depth == 0:
+                continue
+
+            # 深度优先遍历，目录项按名称倒序入栈，保证出栈顺序与名称顺序一致
+            stack: list[tuple[str, int]] = [(root, 1)]
+            while stack:
+                directory, depth = stack.pop()
+                try:
+                    with os.scandir(directory) as iterator:
+                        entries = sorted(iterator, key=lambda entry: entry.name, reverse=True)
+                except OSError:
+                    continue
+
+                subdirs: list[tuple[str, int]] = []
+                files: list[str] = []
+                for entry in entries:
+                    if entry.name.startswith("."):
+                        continue
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if max_depth is None or depth < max_depth:
+                                subdirs.append((entry.path, depth + 1))
+                        elif entry.is_file(follow_symlinks=False) and self._match_name(entry.name, file_filter):
+                            files.append(entry.path)
+                    except OSError:
+                        continue
+
+                yield from reversed(files)
+                stack.extend(subdirs)
+
+    # ********** 内容匹配 **********
+
+    def _compile(self, params: SearchParams) -> re.Pattern[str]:
+        """私有方法：编译搜索模式"""
+        pattern = params.content_pattern
+        source = pattern.pattern if pattern.is_regex else re.escape(pattern.pattern)
+        flags = 0 if pattern.case_sensitive else re.IGNORECASE
+        return re.compile(source, flags)
+
+    def search_file(self, file_path: str, params: SearchParams, compiled: re.Pattern[str]) -> FileSearchResult:
+        """搜索单个文件（同步方法，在线程池中执行）
+
+        Args:
+            file_path: 文件绝对路径
+            params: 搜索参数
+            compiled: 预编译的搜索模式
+
+        Returns:
+            FileSearchResult: 文件的搜索结果，无法读取或二进制文件返回空结果
+        """
+        content_pattern = params.content_pattern
+        try:
+            with open(file_path, "rb") as f:
+                size = os.fstat(f.fileno()).st_size
+                if size == 0 or size > self._max_file_size:
+                    return FileSearchResult(file_path, [])
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    if mm.find(b"\0", 0, _BINARY_CHECK_SIZE) != -1:
+                        return FileSearchResult(file_path, [])
+                    # 字面量区分大小写时直接在字节上查找，不包含模式的文件无需解码
+                    if (not content_pattern.is_regex and content_pattern.case_sensitive
+                            and not content_pattern.invert_match
+                            and mm.find(content_pattern.pattern.encode("utf-8")) == -1):
+                        return FileSearchResult(file_path, [])
+                    text = str(mm, "utf-8", "replace")
+        except (OSError, ValueError):
+            return FileSearchResult(file_path, [])
+
+        # 整个文件中都没有匹配时跳过逐行匹配（MULTILINE使 ^/$ 与逐行匹配时一致）
+        if not content_pattern.invert_match:
+            whole = re.compile(compiled.pattern, compiled.flags | re.MULTILINE)
+            if whole.search(text) is None:
+                return FileSearchResult(file_path, [])
+
+        lines = text.split("\n")
+        if lines and lines[-1] == "":
+            lines.pop()
+
+        context = params.output_format.context_lines
+        max_matches = params.output_format.max_matches_per_file
+        matches: list[MatchInfo] = []
+        for index, line in enumerate(lines):
+            found = compiled.search(line)
+            if (found is None) != content_pattern.invert_match:
+                continue
+
+            start_column, end_column = (found.start() + 1, max(found.end(), found.start() + 1)) if found else (1, 1)
+            matches.append(MatchInfo(
+                file_path=file_path,
+                line_number=index + 1,
+                matched_content=line,
+                context_before=lines[max(0, index - context):index],
+                context_after=lines[index + 1:index + 1 + context],
+                start_column=start_column,
+                end_column=end_column,
+            ))
+            if max_matches is not None and len(matches) >= max_matches:
+                break
+
+        return FileSearchResult(file_path, matches)
+
+    def _search_batch(self, files: list[str], params: SearchParams, compiled: re.Pattern[str]) -> list[FileSearchResult]:
+        """私有方法：搜索一批文件，只返回有匹配的文件"""
+        results: list[FileSearchResult] = []
+        for file_path in files:
+            result = self.search_file(file_path, params, compiled)
+            if result.matches:
+                results.append(result)
+        return results
+
+    async def search(
+        self,
+        params: SearchParams,
+        roots: list[str],
+        files: list[str] | None = None,
+    ) -> tuple[list[FileSearchResult], int]:
+        """在线程池中并行搜索文件内容
+
+        Args:
+            params: 搜索参数
+            roots: 搜索路径列表（绝对路径）
+            files: 已经确定的候选文件列表，None表示按照 `params.file_filter` 遍历 roots
+
+        Returns:
+            tuple[list[FileSearchResult], int]: (有匹配的文件结果列表（按遍历顺序）, 搜索的文件总数)
+
+        Raises:
+            re.error: 正则表达式无效。
+        """
+        compiled = self._compile(params)
+        if files is None:
+            files = await asyncio.to_thread(lambda: list(self.iter_files(roots, params.file_filter)))
+
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        batches = [files[i:i + _FILES_PER_TASK] for i in range(0, len(files), _FILES_PER_TASK)]
+        batch_results = await asyncio.gather(*(
+            loop.run_in_executor(executor, self._search_batch, batch, params, compiled) for batch in batches
+        ))
+        return [result for batch in batch_results for result in batch], len(files)
+
+    # ********** 文本输出 **********
+
+    @staticmethod
+    def format_grep_output(results: list[FileSearchResult], params: SearchParams) -> str:
+        """将搜索结果渲染为grep风格的文本（匹配行用 `:` 分隔，上下文行用 `-` 分隔，不连续的片段之间用 `--` 分隔）
+
+        Args:
+            results: 有匹配的文件结果列表
+            params: 搜索参数
+
+        Returns:
+            str: grep风格的文本
+        """
+        output_format = params.output_format
+        out: list[str] = []
+        for result in results:
+            # 行号 -> (内容, 是否为匹配行)，匹配行优先于上下文行
+            rows: dict[int, tuple[str, bool]] = {}
+            for match in result.matches:
+                first_before = match.line_number - len(match.context_before)
+                for offset, content in enumerate(match.context_before):
+                    rows.setdefault(first_before + offset, (content, False))
+                rows[match.line_number] = (match.matched_content, True)
+                for offset, content in enumerate(match.context_after):
+                    rows.setdefault(match.line_number + 1 + offset, (content, False))
+
+            previous: int | None = None
+            for line_number in sorted(rows):
+                content, is_match = rows[line_number]
+                if output_format.context_lines > 0 and out and (previous is None or line_number > previous + 1):
+                    out.append("--")
+                previous = line_number
+
+                separator = ":" if is_match else "-"
+                prefix = ""
+                if output_format.show_filename:
+                    prefix += f"{result.file_path}{separator}"
+                if output_format.show_line_numbers:
+                    prefix += f"{line_number}{separator}"
+                out.append(prefix + content)
+        return "\n".join(out)
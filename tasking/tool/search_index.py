@@ -0,0 +1,345 @@
+"""
+工作空间内容搜索的持久化三元组（trigram）索引：按文件记录内容中出现的所有三字节片段，
+搜索时先用模式中必须出现的片段筛选候选文件，再交给搜索引擎逐行确认
+"""
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+from array import array
+from re import _parser as _sre_parser  # type: ignore[attr-defined]
+from typing import NamedTuple
+
+from loguru import logger
+
+from ..model.filesystem import SearchPattern
+
+
+_INDEX_VERSION = "1"
+_BINARY_CHECK_SIZE = 8192                       # 与搜索引擎一致：前8KB包含NUL视为二进制文件
+_TRIGRAM_RE = re.compile(rb"(?=([^\n]{3}))")    # 不跨行的三字节片段
+_REPEAT_OPS = tuple(
+    op for op in (
+        getattr(_sre_parser, "MAX_REPEAT", None),
+        getattr(_sre_parser, "MIN_REPEAT", None),
+        getattr(_sre_parser, "POSSESSIVE_REPEAT", None),
+    ) if op is not None
+)
+
+
+def _extract_trigrams(data: bytes) -> set[bytes]:
+    """提取内容中所有不跨行的三字节片段（内容需预先转为小写）"""
+    # 先对行去重，代码中大量重复的行（空行、括号、缩进）只需扫描一次
+    return set(_TRIGRAM_RE.findall(b"\n".join(set(data.split(b"\n")))))
+
+
+def _regex_literal_runs(source: str) -> tuple[list[str], bool] | None:
+    """从正则表达式中提取每次匹配都必须出现的字面量片段
+
+    Returns:
+        tuple[list[str], bool] | None: (字面量片段列表, 是否包含忽略大小写标志)，无法解析时返回None
+    """
+    try:
+        parsed = _sre_parser.parse(source)
+    except Exception:
+        return None
+
+    runs: list[str] = []
+    current: list[str] = []
+    ignore_case = bool(parsed.state.flags & re.IGNORECASE)
+
+    def flush() -> None:
+        if current:
+            runs.append("".join(current))
+            current.clear()
+
+    def walk(items) -> None:  # type: ignore[no-untyped-def]
+        nonlocal ignore_case
+        for op, av in items:
+            if op is _sre_parser.LITERAL:
+                current.append(chr(av))
+            elif op is _sre_parser.AT:
+                # 锚点不消耗字符
+                continue
+            elif op is _sre_parser.SUBPATTERN:
+                _, add_flags, _, sub_items = av
+                if add_flags & re.IGNORECASE:
+                    ignore_case = True
+                walk(sub_items)
+            elif op in _REPEAT_OPS:
+                low, _, sub_items = av
+                flush()
+                # 至少出现一次的重复内容中的字面量也是必需的
+                if low >= 1:
+                    walk(sub_items)
+                    flush()
+            else:
+                # 分支、字符集、任意字符等：前后的字面量不再连续
+                flush()
+
+    walk(parsed)
+    flush()
+    return runs, ignore_case
+
+
+def required_trigrams(pattern: SearchPattern) -> set[bytes] | None:
+    """计算搜索模式的每个匹配行中必须出现的三字节片段（小写）
+
+    Args:
+        pattern: 搜索模式
+
+    Returns:
+        set[bytes] | None: 必需的片段集合，无法用于筛选（反转匹配、无足够长的字面量等）时返回None
+    """
+    if pattern.invert_match:
+        return None
+
+    ignore_case = not pattern.case_sensitive
+    if pattern.is_regex:
+        extracted = _regex_literal_runs(pattern.pattern)
+        if extracted is None:
+            return None
+        runs, regex_ignore_case = extracted
+        ignore_case = ignore_case or regex_ignore_case
+    else:
+        runs = [pattern.pattern]
+
+    trigrams: set[bytes] = set()
+    for run in runs:
+        for trigram in _extract_trigrams(run.encode("utf-8").lower()):
+            # 忽略大小写时非ASCII字符的大小写折叠无法在字节上复现，只使用纯ASCII片段
+            if ignore_case and not trigram.isascii():
+                continue
+            trigrams.add(trigram)
+    return trigrams or None
+
+
+class _IndexEntry(NamedTuple):
+    """索引中的单个文件"""
+
+    file_id: int
+    mtime_ns: int
+    size: int
+
+
+class TrigramIndex:
+    """工作空间内容搜索的持久化三元组索引
+
+    - 索引保存在SQLite文件中，默认位于 `~/.cache/tasking/search_index/` 下，按工作空间路径区分
+    - 文件按需建立索引：搜索时对候选范围内的文件检查修改时间和大小，变化的文件重新读取
+    - 写入路径（save_file/new_file/delete_file）调用 `invalidate` 使文件的索引失效
+    - 内存中维护倒排表（片段 -> 文件ID数组），文件更新时分配新的ID，旧ID作废，
+      作废的ID过多时从数据库重新加载倒排表
+    - 超过 `max_file_size` 的文件不建立索引，始终作为候选文件
+
+    Example:
+        ```python
+        index = TrigramIndex(workspace="/workspace")
+        filesystem = LocalFileSystem(terminal, search_index=index)
+        ```
+    """
+    _workspace: str
+    _index_path: str
+    _max_file_size: int
+    _conn: sqlite3.Connection
+    _lock: threading.RLock
+    _entries: dict[str, _IndexEntry]
+    _postings: dict[bytes, array]
+    _always: set[int]                               # 未建立索引、始终作为候选的文件ID
+    _next_id: int
+    _dead: int                                      # 作废的文件ID数量
+    _pending: dict[str, tuple[int, int, bytes | None] | None]  # 待写入数据库的变更，None表示删除
+
+    def __init__(self, workspace: str, index_path: str | None = None, max_file_size: int = 8 * 1024 * 1024) -> None:
+        """打开（或创建）工作空间的三元组索引
+
+        Args:
+            workspace: 工作空间绝对路径，应与 `ITerminal.get_workspace()` 一致
+            index_path: 索引文件路径，None表示使用 `~/.cache/tasking/search_index/<工作空间哈希>.sqlite3`
+            max_file_size: 建立索引的文件大小上限，默认值为8MB
+
+        Raises:
+            ValueError: 如果 workspace 不是绝对路径或 max_file_size 不是正数。
+        """
+        if not os.path.isabs(workspace):
+            raise ValueError(f"工作空间必须为绝对路径：{workspace}")
+        if max_file_size <= 0:
+            raise ValueError(f"max_file_size必须大于0：{max_file_size}")
+
+        self._workspace = workspace
+        if index_path is None:
+            digest = hashlib.sha256(workspace.encode("utf-8")).hexdigest()[:16]
+            index_path = os.path.join(os.path.expanduser("~"), ".cache", "tasking", "search_index", f"{digest}.sqlite3")
+        self._index_path = index_path
+        self._max_file_size = max_file_size
+        self._lock = threading.RLock()
+        self._pending = {}
+
+        os.makedirs(os.path.dirname(index_path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(index_path, check_same_thread=False)
+        self._init_schema()
+        self._load()
+        logger.info(f"[搜索索引] 已加载 {len(self._entries)} 个文件的索引：{index_path}")
+
+    def get_workspace(self) -> str:
+        """获取索引对应的工作空间"""
+        return self._workspace
+
+    def get_index_path(self) -> str:
+        """获取索引文件路径"""
+        return self._index_path
+
+    def get_file_count(self) -> int:
+        """获取已建立索引的文件数量"""
+        return len(self._entries)
+
+    def _init_schema(self) -> None:
+        """私有方法：创建数据表，版本或工作空间不一致时清空索引"""
+        with self._conn:
+            self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS files ("
+                "path TEXT PRIMARY KEY, mtime_ns INTEGER NOT NULL, size INTEGER NOT NULL, trigrams BLOB)"
+            )
+            meta = dict(self._conn.execute("SELECT key, value FROM meta").fetchall())
+            if meta.get("version") != _INDEX_VERSION or meta.get("workspace") != self._workspace:
+                self._conn.execute("DELETE FROM files")
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                    [("version", _INDEX_VERSION), ("workspace", self._workspace)],
+                )
+
+    def _load(self) -> None:
+        """私有方法：从数据库加载所有文件并重建内存中的倒排表"""
+        self._entries = {}
+        self._postings = {}
+        self._always = set()
+        self._next_id = 0
+        self._dead = 0
+        for path, mtime_ns, size, blob in self._conn.execute("SELECT path, mtime_ns, size, trigrams FROM files"):
+            self._add_entry(path, mtime_ns, size, blob)
+
+    def _add_entry(self, path: str, mtime_ns: int, size: int, blob: bytes | None) -> None:
+        """私有方法：为文件分配新ID并加入倒排表，blob为None表示未建立索引"""
+        file_id = self._next_id
+        self._next_id += 1
+        if path in self._entries:
+            self._dead += 1
+        self._entries[path] = _IndexEntry(file_id, mtime_ns, size)
+
+        if blob is None:
+            self._always.add(file_id)
+            return
+        postings = self._postings
+        for offset in range(0, len(blob), 3):
+            trigram = blob[offset:offset + 3]
+            posting = postings.get(trigram)
+            if posting is None:
+                postings[trigram] = posting = array("I")
+            posting.append(file_id)
+
+    def _index_file(self, path: str, stat: os.stat_result) -> None:
+        """私有方法：读取文件内容并更新索引"""
+        blob: bytes | None
+        if stat.st_size > self._max_file_size:
+            blob = None
+        else:
+            try:
+                with open(path, "rb") as f:
+                    data = f.read()
+            except OSError:
+                return
+            if b"\0" in data[:_BINARY_CHECK_SIZE]:
+                # 二进制文件不会被搜索引擎匹配，不包含任何片段
+                blob = b""
+            else:
+                blob = b"".join(sorted(_extract_trigrams(data.lower())))
+
+        self._add_entry(path, stat.st_mtime_ns, stat.st_size, blob)
+        self._pending[path] = (stat.st_mtime_ns, stat.st_size, blob)
+
+    def invalidate(self, file_path: str) -> None:
+        """使文件的索引失效（文件被写入或删除时调用），下次搜索时重新建立
+
+        Args:
+            file_path: 文件绝对路径
+        """
+        with self._lock:
+            if self._entries.pop(file_path, None) is not None:
+                self._dead += 1
+                self._pending[file_path] = None
+
+    def _flush(self) -> None:
+        """私有方法：把待写入的变更写入数据库，作废的ID过多时重建倒排表"""
+        if self._pending:
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO files (path, mtime_ns, size, trigrams) VALUES (?, ?, ?, ?)",
+                    [(path, *change) for path, change in self._pending.items() if change is not None],
+                )
+                self._conn.executemany(
+                    "DELETE FROM files WHERE path = ?",
+                    [(path,) for path, change in self._pending.items() if change is None],
+                )
+            self._pending.clear()
+
+        if self._dead > max(1024, len(self._entries)):
+            logger.debug(f"[搜索索引] 作废的文件ID过多（{self._dead}），重建倒排表")
+            self._load()
+
+    def filter_candidates(self, files: list[str], pattern: SearchPattern) -> list[str]:
+        """筛选可能包含匹配的文件（同步方法），变化过的文件会先重新建立索引
+
+        Args:
+            files: 待搜索的文件绝对路径列表
+            pattern: 搜索模式
+
+        Returns:
+            list[str]: 候选文件列表，保持原有顺序。模式无法用于筛选时原样返回
+        """
+        required = required_trigrams(pattern)
+        if required is None:
+            return files
+
+        with self._lock:
+            # 1. 检查修改时间和大小，更新变化的文件
+            existing: list[str] = []
+            for path in files:
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entry = self._entries.get(path)
+                if entry is None or entry.mtime_ns != stat.st_mtime_ns or entry.size != stat.st_size:
+                    self._index_file(path, stat)
+                existing.append(path)
+            self._flush()
+
+            # 2. 从最短的倒排表开始求交集
+            postings = [self._postings.get(trigram) for trigram in required]
+            if any(posting is None for posting in postings):
+                candidate_ids: set[int] = set()
+            else:
+                postings.sort(key=len)  # type: ignore[arg-type]
+                candidate_ids = set(postings[0])  # type: ignore[arg-type]
+                for posting in postings[1:]:
+                    if not candidate_ids:
+                        break
+                    candidate_ids.intersection_update(posting)  # type: ignore[arg-type]
+
+            candidates: list[str] = []
+            for path in existing:
+                entry = self._entries.get(path)
+                if entry is None or entry.file_id in candidate_ids or entry.file_id in self._always:
+                    candidates.append(path)
+            return candidates
+
+    def close(self) -> None:
+        """写入未保存的变更并关闭数据库连接"""
+        with self._lock:
+            try:
+                self._flush()
+            finally:
+                self._conn.close()
@@ -6,6 +6,7 @@ workspace restrictions, command whitelisting/blacklisting, and script execution
 """
 
 import asyncio
+import functools
 import threading
 import os
 import subprocess
@@ -13,7 +14,10 @@ import shlex
 import re
 import platform
 import signal
+import time
 from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+from typing import NamedTuple
 from uuid import uuid4
 from pathlib import Path
 from concurrent.futures import ThreadPoolExecutor
@@ -25,6 +29,25 @@ from loguru import logger
 # ------------------------------
 # 命令执行完成标记（用于分割输出）
 _COMMAND_DONE_MARKER = "__SINGLE_THREAD_TERMINAL_EXEC_DONE__"
+# 每次从终端输出管道读取的最大字节数
+_READ_CHUNK_SIZE = 64 * 1024
+# 记录初始化完成时的环境变量、shell 变量名、函数和别名，保存在以 __TASKING_ 开头的 shell 变量中
+_SAVE_SHELL_STATE = (
+    "__TASKING_ENV=$(export -p); "
+    "__TASKING_VARS=$'\\n'\"$(compgen -v)\"$'\\n'; "
+    "__TASKING_FUNCS=$(declare -f); "
+    "__TASKING_ALIASES=$(alias -p)"
+)
+# 恢复到记录的状态：删除新增的变量、函数和别名，取消导出后按记录重新导出环境变量
+_RESTORE_SHELL_STATE = (
+    "unalias -a; eval \"$__TASKING_ALIASES\"; "
+    "for __tasking_name in $(compgen -A function); do unset -f \"$__tasking_name\"; done; "
+    "eval \"$__TASKING_FUNCS\"; "
+    "for __tasking_name in $(compgen -v); do case \"$__tasking_name\" in __TASKING_*|__tasking_name) ;; "
+    "*) case \"$__TASKING_VARS\" in *$'\\n'\"$__tasking_name\"$'\\n'*) export -n \"$__tasking_name\" 2>/dev/null ;; "
+    "*) unset \"$__tasking_name\" 2>/dev/null ;; esac ;; esac; done; "
+    "eval \"$__TASKING_ENV\" 2>/dev/null; unset __tasking_name"
+)
 
 # 禁止命令正则列表（支持复杂匹配：批量删除、跨层级删除、提权变体）
 # 优先级：绝对禁止（无论是否人类允许）> 条件禁止（非人类允许时拦截）
@@ -126,6 +149,406 @@ _PATH_SENSITIVE_COMMANDS = ["find", "grep", "ls", "cp", "mv", "rm", "cat", "sed"
 # rm命令精准删除校验正则（仅允许单个具体路径，排除通配符/批量符号）
 _RM_SAFE_PATH_PATTERN = re.compile(r'^[\w./-]+$')  # 只允许字母、数字、./-，无*、..
 
+# 命令校验结果缓存的最大条目数（按 命令 + 是否人类允许 + 当前目录 缓存）
+_COMMAND_VERDICT_CACHE_SIZE = 1024
+
+
+# ------------------------------
+# 预编译的规则组（模块加载时编译一次，每组另有合并后的正则用于快速排除）
+# ------------------------------
+def _compile_any(patterns: list[str], flags: int = 0) -> re.Pattern[str]:
+    """将一组正则合并为一个（任一匹配即匹配），用于在逐条匹配之前快速排除"""
+    return re.compile("|".join(f"(?:{pattern})" for pattern in patterns), flags)
+
+
+class _ProhibitedRule(NamedTuple):
+    """预编译的禁止命令规则"""
+    regex: str                  # 原始正则（用于日志）
+    pattern: re.Pattern[str]    # 编译后的正则（命令名规则已加上 ^ 前缀）
+    desc: str                   # 禁止类型
+    is_absolute: bool           # 是否绝对禁止
+    full_command: bool          # True=检查完整命令，False=只检查命令名
+
+
+# 需要检查完整命令的规则特征（如 rm -rf /），其余规则只检查命令名
+_FULL_COMMAND_RULE_MARKERS = (
+    'rm -rf\\s+/',          # 根目录删除
+    'rm -rf\\s+(\\*|',      # 批量删除
+    'rm -rf\\s+\\.\\.(\\/|$)', # 跨层级删除
+    'dd if=/dev/(zero|null))|(> /dev/sda)',  # 硬件破坏
+    'shutdown\\s+',         # 关机命令
+    'passwd root',          # 根密码修改
+    'chpasswd',             # 密码修改
+    'find\\s+.*\\s+-exec\\s+.*sudo',  # find -exec with sudo
+    'bsudo\\b',             # sudo提权
+    'bsu\\b'                # su提权
+)
+
+
+def _compile_prohibited_rules() -> list[_ProhibitedRule]:
+    """编译禁止命令正则列表（bytes 规则先解码，空规则跳过）"""
+    rules: list[_ProhibitedRule] = []
+    for prohib in _PROHIBITED_REGEX:
+        raw_pattern = prohib.get("regex", "")
+        regex = raw_pattern.decode("utf-8", errors="ignore") if isinstance(raw_pattern, bytes) else str(raw_pattern)
+        if not regex:
+            continue
+        full_command = any(marker in regex for marker in _FULL_COMMAND_RULE_MARKERS)
+        rules.append(_ProhibitedRule(
+            regex=regex,
+            pattern=re.compile(regex if full_command else f'^{regex}', re.IGNORECASE),
+            desc=str(prohib.get("desc", "")),
+            is_absolute=bool(prohib.get("is_absolute", False)),
+            full_command=full_command,
+        ))
+    return rules
+
+
+_PROHIBITED_RULES = _compile_prohibited_rules()
+_PROHIBITED_FULL_ANY = _compile_any(
+    [rule.regex for rule in _PROHIBITED_RULES if rule.full_command], re.IGNORECASE)
+_PROHIBITED_NAME_ANY = _compile_any(
+    [f'^{rule.regex}' for rule in _PROHIBITED_RULES if not rule.full_command], re.IGNORECASE)
+
+# 脚本执行规则（支持路径的解释器 + 直接执行的脚本文件）
+# - (^|\s|/)：匹配命令开头、空格或路径分隔符（确保是独立的解释器/脚本名）
+# - [\w./-]*：匹配路径（如 /usr/bin/、./venv/、~/）
+# - ($|\s|;)：匹配命令结尾、空格或分隔符（避免部分匹配，如"pythonic"）
+_SCRIPT_RULES = [
+    # 规则1：脚本解释器（支持路径，如 /usr/bin/python、./bash）
+    r'(^|\s|/)[\w./-]*(python|python3|python2)($|\s|;)',  # Python
+    r'(^|\s|/)[\w./-]*(bash|sh|zsh|ksh|csh)($|\s|;)',     # Shell
+    r'(^|\s|/)[\w./-]*(go)($|\s|;)\s+run',                # Go run（需跟run参数）
+    r'(^|\s|/)[\w./-]*(go)($|\s|;)\s+test',               # Go test
+    r'(^|\s|/)[\w./-]*(node|npm|yarn|pnpm)($|\s|;)',       # JS/TS
+    r'(^|\s|/)[\w./-]*(perl|ruby|php|lua)($|\s|;)',        # 其他解释器
+    # 规则2：直接执行的脚本文件（带路径+后缀，如 ./script.sh、/home/test.py）
+    r'(^|\s|/)[\w./-]+\.(sh|py|go|js)($|\s|;)',           # 后缀匹配
+    r'(^|\s)\./[\w./-]*($|\s|;)'                          # 相对路径执行（如 ./script）
+]
+_SCRIPT_RULE_PATTERNS = [(rule, re.compile(rule)) for rule in _SCRIPT_RULES]
+_SCRIPT_RULES_ANY = _compile_any(_SCRIPT_RULES)
+_SCRIPT_FILE_EXTS = ('.sh', '.py', '.go', '.js')
+_SCRIPT_INTERPRETERS = ('python', 'bash', 'sh', 'node', 'go')
+
+# 重定向操作符及其目标（判断脚本执行前移除，如 echo 'hello' > test.sh 中的 test.sh 不是脚本执行）
+_REDIRECT_TARGET_PATTERNS = [
+    re.compile(r'\s*[<>]+\s*\S+'),
+    re.compile(r'\s*2>\s*\S+'),
+    re.compile(r'\s*&\s*[<>]\s*\S+'),
+]
+
+# Shell脚本化编程模式（复合命令攻击）：表明是复杂的shell脚本，而非简单命令
+_SHELL_SCRIPT_PATTERNS = [
+    r'[a-zA-Z_]\w*=[\'"][^\'"]*[\'"]',                      # 带引号的变量赋值（VAR='value'）
+    r'\b[a-zA-Z_]\w*=\s*[\'"][a-zA-Z]\s*[\'"]',            # 单字符变量赋值（S='s'）
+    r'[a-zA-Z_]\w*\(\s*\)\s*\{',                          # 函数定义（func() {）
+    r'(\$\(|\`)[^)]*(\)|\`)',                             # 命令替换（$(cmd) 或 `cmd`）
+    r'<<\s*[\'"]?\w+[\'"]?',                               # Here document（<<EOF）
+    r'<<<\s*[\'"]?[^\'"]*[\'"]?',                          # Here string（<<<"text"）
+    r'\$\(\(\s*[^\)]*\s*\)\)',                             # 算术扩展（$((expr))）
+    r'\bif\s+.*\bthen\b',                                  # if条件语句
+    r'\bfor\s+.*\bdo\b',                                   # for循环语句
+    r'\bwhile\s+.*\bdo\b',                                 # while循环语句
+    r'\bcase\s+.*\besac\b',                                # case语句
+]
+_SHELL_SCRIPT_PATTERNS_ANY = _compile_any(_SHELL_SCRIPT_PATTERNS)
+
+# 单条命令中的脚本化编程模式（禁用脚本执行时对所有命令检查）
+# 注意：$(command) 命令替换和 $((...)) 算术扩展由 _has_escaped_prohibited_cmd 处理
+_INLINE_SCRIPT_PATTERNS_ANY = _compile_any([
+    r'[a-zA-Z_]\w*=[\'"][^\'\"]*[\'"]',                      # 带引号的变量赋值（VAR='value'）
+    r'[a-zA-Z_]\w*\(\s*\)\s*\{',                          # 函数定义（func() {）
+    r'<<\s*[\'"]?\w+[\'"]?',                               # Here document（<<EOF）
+    r'<<<\s*[\'"]?[^\'"]*[\'"]?',                          # Here string（<<<"text"）
+    r'\bif\s+.*\bthen\b',                                  # if条件语句
+    r'\bfor\s+.*\bdo\b',                                   # for循环语句
+    r'\bwhile\s+.*\bdo\b',                                 # while循环语句
+    r'\bcase\s+.*\besac\b',                                # case语句
+])
+
+# 命令替换、算术扩展、进程替换、here string 和 here document
+_SUBSTITUTION_PATTERNS = [
+    re.compile(r'\$\(([^)]+)\)'),           # $(command) - 命令替换
+    re.compile(r'\$\(\(([^)]+)\)\)'),       # $((expression)) - 算术扩展
+    re.compile(r'`([^`]+)`'),               # `command` - 命令替换
+    re.compile(r'<\(([^)]+)\)'),            # <(command) - 进程替换
+    re.compile(r'<<<\s*[\'"]?([^\'"]*)[\'"]?'),  # <<<text - here string
+    re.compile(r'<<-\s*[\'"]?\w+[\'"]?'),   # <<-EOF - here document (with dash)
+    re.compile(r'<<\s*[\'"]?\w+[\'"]?'),    # <<EOF - here document (without dash)
+]
+_SUBSTITUTION_MARKERS = ('$(', '`', '<(', '<<')
+
+# 命令执行型嵌套（bash -c "..."、eval '...'），支持转义/未转义引号
+# - ^.*?(bash|sh|python|python3|node|go) -c\s*：匹配执行命令的解释器（如 bash -c）
+# - ^.*?(eval|exec)\s+：匹配代码执行命令（如 eval、exec）
+# - (?:\\\\['"]|['"]])：匹配开头的转义引号（\\\"）或未转义引号（"）
+# - (.*?)：非贪婪匹配引号内的嵌套命令
+# - (?:\\\\\1|(?<!\\\\)\1)：匹配结尾的转义引号（\\\"）或未转义引号（"，确保未被转义）
+_ESCAPED_CMD_PATTERN = re.compile(
+    r'^.*?(bash|sh|python|python3|node|go) -c\s*(?P<quote>(?:\\\\[\'"]|[\'"]))(?P<content>.*?)(?:\\\\(?P=quote)|(?<!\\\\)(?P=quote))|'
+    r'^.*?(eval|exec)\s+(?P<quote2>(?:\\\\[\'"]|[\'"]))(?P<content2>.*?)(?:\\\\(?P=quote2)|(?<!\\\\)(?P=quote2))',
+    re.IGNORECASE | re.DOTALL  # DOTALL 允许匹配换行符
+)
+_ESCAPED_QUOTE_PATTERN = re.compile(r'\\\\([\'"])')
+
+# 重定向注入检查
+_STDERR_TO_NULL_PATTERN = re.compile(r'\s*2>\s*/dev/null\s*')    # 合法的错误输出重定向
+_REDIRECTION_ANY = _compile_any([
+    # 标准重定向：>、>>、<
+    r'\s*>\s*\S+', r'\s*>>\s*\S+', r'\s*<\s*\S+',
+    # 文件描述符重定向（除了2>/dev/null）：2>、&>、2>>、&>>
+    r'\s*2>\s*(?!/dev/null)\S+', r'\s*&>\s*\S+', r'\s*2>>\s*\S+', r'\s*&>>\s*\S+',
+])
+_SENSITIVE_FILE_PATTERNS = [
+    r'/etc/passwd', r'/etc/shadow', r'/etc/sudoers', r'/etc/hosts',
+    r'/etc/group', r'/etc/gshadow', r'/etc/crontab', r'/etc/fstab',
+    r'/proc/', r'/sys/', r'/dev/zero', r'/dev/random',
+    r'~/.ssh/', r'~/.bashrc', r'~/.profile', r'~/.bash_profile',
+    r'/root/', r'/home/', r'/var/log/', r'/var/spool/'
+]
+_SENSITIVE_FILE_PATTERNS_ANY = _compile_any(_SENSITIVE_FILE_PATTERNS)
+_SYSTEM_DIR_PATTERNS = [r'/etc/', r'/bin/', r'/sbin/', r'/usr/', r'/opt/', r'/var/']
+_SYSTEM_DIR_PATTERNS_ANY = _compile_any(_SYSTEM_DIR_PATTERNS)
+
+# 不完整命令中明确的极其危险操作
+_EXTREMELY_DANGEROUS_ANY = _compile_any([
+    r'rm -rf\s+/',  # 明确的根目录删除
+    r'sudo\s+rm\s+-rf\s+/',  # sudo + 根目录删除
+])
+
+
+@functools.lru_cache(maxsize=_COMMAND_VERDICT_CACHE_SIZE)
+def _shlex_split(command: str) -> tuple[str, ...]:
+    """按shell规则拆分命令（结果缓存，同一命令在各检查步骤中只拆分一次）
+
+    Raises:
+        ValueError: 引号未闭合等语法错误。
+    """
+    return tuple(shlex.split(command))
+
+
+class _OutputCollector:
+    """命令输出收集器：超过字节上限时只保留开头和结尾部分，中间部分丢弃"""
+    __slots__ = ("limit", "head", "tail", "total")
+
+    def __init__(self, limit: int | None = None) -> None:
+        self.limit = limit
+        self.head = bytearray()
+        self.tail = bytearray()
+        self.total = 0
+
+    def add(self, data: bytes | bytearray) -> None:
+        self.total += len(data)
+        if self.limit is None:
+            self.head += data
+            return
+
+        head_limit = self.limit // 2
+        tail_limit = self.limit - head_limit
+        if len(self.head) < head_limit:
+            taken = head_limit - len(self.head)
+            self.head += data[:taken]
+            data = data[taken:]
+        if data:
+            self.tail += data
+            if len(self.tail) > tail_limit:
+                del self.tail[:len(self.tail) - tail_limit]
+
+    @property
+    def omitted(self) -> int:
+        """被丢弃的字节数"""
+        return self.total - len(self.head) - len(self.tail)
+
+    def get_text(self) -> str:
+        """解码为文本，截断时在中间插入省略提示"""
+        head = self.head.decode("utf-8", errors="replace")
+        if not self.omitted:
+            return head + self.tail.decode("utf-8", errors="replace")
+        tail = self.tail.decode("utf-8", errors="replace")
+        return f"{head}\n...[输出过长，已省略中间 {self.omitted} 字节]...\n{tail}"
+
+
+class TerminalLockStats(NamedTuple):
+    """终端锁的统计信息快照"""
+    queue_depth: int            # 当前排队等待的任务数
+    max_queue_depth: int        # 历史最大排队数
+    acquisitions: int           # 累计成功获取锁的次数（不含重入）
+    timeouts: int               # 累计等待超时的次数
+    total_wait_time: float      # 累计等待时间（秒）
+    max_wait_time: float        # 单次最长等待时间（秒）
+
+    @property
+    def avg_wait_time(self) -> float:
+        """平均等待时间（秒）"""
+        return self.total_wait_time / self.acquisitions if self.acquisitions else 0.0
+
+
+class _LockWaiter:
+    """排队等待终端锁的任务"""
+    __slots__ = ("owner", "loop", "future", "enqueued_at", "granted")
+
+    def __init__(self, owner: object, loop: asyncio.AbstractEventLoop) -> None:
+        self.owner = owner
+        self.loop = loop
+        self.future: asyncio.Future[None] = loop.create_future()
+        self.enqueued_at = time.monotonic()
+        self.granted = False
+
+
+def _wake_waiter(future: "asyncio.Future[None]") -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class TerminalLock:
+    """终端命令串行锁：异步等待、公平FIFO、可重入，且可跨线程/跨事件循环使用。
+
+    - 等待锁的协程挂起在各自事件循环的 Future 上，不会阻塞事件循环线程
+    - 锁释放时直接移交给队首的等待者，保证先到先得
+    - 同一个任务（或同步调用时的同一个线程）可重入
+    - 内部状态由 `threading.Lock` 保护，同步的 `try_acquire`/`release` 可在任意线程调用
+    """
+    _mutex: threading.Lock
+    _owner: object | None
+    _count: int
+    _waiters: deque[_LockWaiter]
+    _max_queue_depth: int
+    _acquisitions: int
+    _timeouts: int
+    _total_wait_time: float
+    _max_wait_time: float
+
+    def __init__(self) -> None:
+        self._mutex = threading.Lock()
+        self._owner = None
+        self._count = 0
+        self._waiters = deque()
+        self._max_queue_depth = 0
+        self._acquisitions = 0
+        self._timeouts = 0
+        self._total_wait_time = 0.0
+        self._max_wait_time = 0.0
+
+    @staticmethod
+    def _current_owner() -> object:
+        """当前持有者标识：协程中为当前任务，同步调用时为当前线程"""
+        try:
+            task = asyncio.current_task()
+        except RuntimeError:
+            task = None
+        return task if task is not None else threading.current_thread()
+
+    def locked(self) -> bool:
+        """锁是否已被持有"""
+        with self._mutex:
+            return self._owner is not None
+
+    def _grant(self, owner: object, wait_time: float) -> None:
+        """将锁交给指定持有者并记录等待时间（调用方需持有 _mutex）"""
+        self._owner = owner
+        self._count = 1
+        self._acquisitions += 1
+        self._total_wait_time += wait_time
+        self._max_wait_time = max(self._max_wait_time, wait_time)
+
+    async def acquire(self, timeout: float | None = None) -> None:
+        """异步获取锁，锁被占用时按FIFO顺序排队等待
+
+        Args:
+            timeout (float | None): 最长等待时间（秒），None表示一直等待
+
+        Raises:
+            TimeoutError: 等待超时
+        """
+        owner = self._current_owner()
+        with self._mutex:
+            if self._owner is None:
+                self._grant(owner, 0.0)
+                return
+            if self._owner is owner:
+                self._count += 1
+                return
+            waiter = _LockWaiter(owner, asyncio.get_running_loop())
+            self._waiters.append(waiter)
+            self._max_queue_depth = max(self._max_queue_depth, len(self._waiters))
+
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), timeout=timeout)
+        except BaseException as e:
+            with self._mutex:
+                if not waiter.granted:
+                    # 尚未轮到，从队列中移除
+                    self._waiters.remove(waiter)
+                    if isinstance(e, TimeoutError):
+                        self._timeouts += 1
+                    granted = False
+                else:
+                    granted = True
+            if granted:
+                # 超时/取消与移交同时发生，锁已经交给了当前任务，需要继续移交给下一个等待者
+                self.release()
+            if isinstance(e, TimeoutError):
+                raise TimeoutError(f"等待终端锁超时（{timeout}秒）") from None
+            raise
+
+    def try_acquire(self) -> bool:
+        """非阻塞获取锁，用于同步上下文（例如关闭终端）
+
+        Returns:
+            bool: 是否获取成功
+        """
+        owner = self._current_owner()
+        with self._mutex:
+            if self._owner is None:
+                self._grant(owner, 0.0)
+                return True
+            if self._owner is owner:
+                self._count += 1
+                return True
+            return False
+
+    def release(self) -> None:
+        """释放锁，若有等待者则直接移交给队首等待者
+
+        Raises:
+            RuntimeError: 锁未被当前任务/线程持有
+        """
+        owner = self._current_owner()
+        with self._mutex:
+            if self._owner is None:
+                raise RuntimeError("终端锁未被持有，无法释放")
+            if self._owner is not owner:
+                raise RuntimeError("终端锁不属于当前任务，无法释放")
+            self._count -= 1
+            if self._count > 0:
+                return
+            self._owner = None
+
+            while self._waiters:
+                waiter = self._waiters.popleft()
+                now = time.monotonic()
+                try:
+                    waiter.loop.call_soon_threadsafe(_wake_waiter, waiter.future)
+                except RuntimeError:
+                    # 等待者所在的事件循环已关闭，跳过
+                    continue
+                waiter.granted = True
+                self._grant(waiter.owner, now - waiter.enqueued_at)
+                break
+
+    def get_stats(self) -> TerminalLockStats:
+        """获取锁的统计信息快照"""
+        with self._mutex:
+            return TerminalLockStats(
+                queue_depth=len(self._waiters),
+                max_queue_depth=self._max_queue_depth,
+                acquisitions=self._acquisitions,
+                timeouts=self._timeouts,
+                total_wait_time=self._total_wait_time,
+                max_wait_time=self._max_wait_time,
+            )
+
 
 class ITerminal(ABC):
     """终端操作抽象接口，新增允许命令列表与脚本执行控制能力。
@@ -222,10 +645,10 @@ class ITerminal(ABC):
         """
         raise NotImplementedError
     @abstractmethod
-    async def acquire(self) -> None:
+    async def acquire(self, timeout: float | None = None) -> None:
         """获取终端使用信号量，确保并发安全。
 
-        同一时刻只能有一个任务获取此信号量并使用终端。
+        同一时刻只能有一个任务获取此信号量并使用终端，其余任务异步排队等待，不阻塞事件循环。
         调用方必须在完成终端操作后调用 release() 释放信号量。
 
         建议使用模式：
@@ -237,8 +660,12 @@ class ITerminal(ABC):
             await terminal.release()
         ```
 
+        Args:
+            timeout: 最长等待时间（秒），None表示一直等待。
+
         Raises:
             RuntimeError: 终端未启动或信号量获取失败。
+            TimeoutError: 等待信号量超时。
         """
         raise NotImplementedError
 
@@ -300,7 +727,10 @@ class ITerminal(ABC):
 
     @abstractmethod
     async def read_process(self, stop_word: str) -> str:
-        """读取终端输出。
+        """读取终端输出，直到遇到停止词。
+
+        Args:
+            stop_word: 停止词（命令完成标记），不包含在返回结果中。
 
         Returns:
             str: 终端标准输出。
@@ -341,7 +771,8 @@ class LocalTerminal(ITerminal):
     - 实时同步终端当前目录，支持cd命令在工作空间内自由跳转
     - 人类允许时可以跳出workspace，但绝对禁止危险命令
     - 强化路径校验：find/grep等路径类命令均需通过工作空间边界检查
-    - 线程安全：通过 threading.RLock 确保同一时刻只有一个线程使用终端
+    - 并发安全：通过 TerminalLock 按FIFO顺序串行执行命令，等待时不阻塞事件循环，支持跨线程使用
+    - 输出读取：非阻塞管道按块读取并在缓冲区中查找完成标记，可设置输出字节上限（超出时保留首尾）
 
     平台支持：
     - ✅ Linux：完全支持（使用 /proc/<pid>/cwd 获取真实目录）
@@ -358,8 +789,14 @@ class LocalTerminal(ITerminal):
     _current_dir: str                   # 终端当前目录（与bash实时同步）
     _process: subprocess.Popen[str] | None     # 长期bash进程
     _allowed_commands: list[str]        # 允许命令列表（白名单）
+    _allowed_commands_lower: list[str]  # 小写的允许命令列表（预先转换，避免每次校验重复转换）
     _disable_script_execution: bool     # 是否禁用脚本执行
-    _lock: threading.RLock              # 线程锁，确保并发安全
+    _command_verdicts: OrderedDict[tuple[str, bool, str], bool]    # 命令校验结果的LRU缓存
+    _command_verdicts_lock: threading.Lock
+    _lock: TerminalLock                 # 命令串行锁，确保并发安全
+    _acquire_timeout: float | None      # 等待终端锁的默认超时时间
+    _max_output_bytes: int | None       # 单条命令输出的字节上限
+    _read_buffer: bytearray             # 已读取但尚未消费的终端输出
     _init_commands: list[str]           # 初始化命令
 
     def __init__(
@@ -370,6 +807,8 @@ class LocalTerminal(ITerminal):
         allowed_commands: list[str] | None = None,
         disable_script_execution: bool = True,
         init_commands: list[str] | None = None,
+        acquire_timeout: float | None = None,
+        max_output_bytes: int | None = None,
     ) -> None:
         """终端实例化构造函数，强制注入工作空间与安全控制参数。
 
@@ -379,9 +818,13 @@ class LocalTerminal(ITerminal):
             create_workspace: 工作空间不存在时是否自动创建（默认False）。
             allowed_commands: 允许命令列表（白名单），默认空列表（允许除禁止外的所有命令）。
             disable_script_execution: 是否禁用脚本执行（默认True，拒绝python/bash等脚本）。
+            init_commands: 终端启动后执行的初始化命令列表。
+            acquire_timeout: run_command 等待终端锁的超时时间（秒），默认None表示一直等待。
+            max_output_bytes: 单条命令输出的字节上限，超出时只保留开头和结尾各一半，默认None表示不限制。
 
         Raises:
-            ValueError: root_dir不是绝对路径，或绝对路径的workspace不在root_dir下。
+            ValueError: root_dir不是绝对路径，或绝对路径的workspace不在root_dir下，或acquire_timeout为负数，
+                或max_output_bytes不是正数。
             FileNotFoundError: 根目录或工作空间不存在且create_workspace=False。
             NotADirectoryError: root_dir或workspace路径存在但不是目录。
             RuntimeError: 终端进程启动失败或不支持当前操作系统。
@@ -406,7 +849,16 @@ class LocalTerminal(ITerminal):
             )
 
         self._terminal_id = uuid4().hex  # 生成唯一终端ID
-        self._lock = threading.RLock()    # 初始化线程锁
+        self._lock = TerminalLock()       # 初始化命令串行锁
+
+        if acquire_timeout is not None and acquire_timeout < 0:
+            raise ValueError(f"acquire_timeout不能为负数：{acquire_timeout}")
+        self._acquire_timeout = acquire_timeout
+
+        if max_output_bytes is not None and max_output_bytes <= 0:
+            raise ValueError(f"max_output_bytes必须为正数：{max_output_bytes}")
+        self._max_output_bytes = max_output_bytes
+        self._read_buffer = bytearray()
 
         # 1. 处理根目录：必须传入绝对路径
         if not os.path.isabs(root_dir):
@@ -452,7 +904,10 @@ class LocalTerminal(ITerminal):
 
         # 初始化安全控制参数（处理默认值，避免外部修改内部列表）
         self._allowed_commands = allowed_commands.copy() if allowed_commands else []
+        self._allowed_commands_lower = [allowed_cmd.lower() for allowed_cmd in self._allowed_commands]
         self._disable_script_execution = disable_script_execution
+        self._command_verdicts = OrderedDict()
+        self._command_verdicts_lock = threading.Lock()
 
         # 初始化命令列表
         self._init_commands = init_commands if init_commands is not None else []
@@ -489,6 +944,10 @@ class LocalTerminal(ITerminal):
                 cwd=self._workspace,  # 直接指定工作目录
             )
             logger.info(f"✅ 终端进程启动成功（PID: {self._process.pid}），工作目录：{self._workspace}")
+            # 输出管道设置为非阻塞，由事件循环监听可读事件后按块读取
+            assert self._process.stdout is not None
+            os.set_blocking(self._process.stdout.fileno(), False)
+            self._read_buffer = bytearray()
 
             # 同步运行异步初始化命令
             try:
@@ -543,6 +1002,9 @@ class LocalTerminal(ITerminal):
             except Exception as e:
                 logger.error(f"❌ 初始化命令执行失败：{cmd}，错误：{e}")
 
+        # 记录初始化完成后的 shell 状态，供 reset_shell_state 恢复
+        await self._execute_with_timeout(_SAVE_SHELL_STATE, timeout=5.0)
+
     def get_id(self) -> str:
         return self._terminal_id
 
@@ -568,6 +1030,15 @@ class LocalTerminal(ITerminal):
             logger.error(f"❌ 切换到workspace目录失败：{e}")
             raise
 
+    async def reset_shell_state(self) -> None:
+        """把 shell 状态恢复到初始化完成时：删除之后新增的环境变量、shell 变量、函数和别名，
+        被修改或删除的环境变量、函数和别名恢复原值。
+
+        初始化时已存在的非导出 shell 变量的值以及 shell 选项（如 `set -e`）不会恢复。
+        """
+        await self._execute_with_timeout(_RESTORE_SHELL_STATE, timeout=5.0)
+        logger.debug(f"🔄 终端 {self._terminal_id} 已恢复初始的 shell 状态")
+
     async def _sync_current_dir(self) -> None:
         """私有方法：同步bash会话的真实当前目录到_current_dir（防篡改）。
         
@@ -643,26 +1114,34 @@ class LocalTerminal(ITerminal):
             logger.warning(f"⚠️ 获取bash当前目录失败：{str(e)[:50]}，使用root_dir作为fallback")
             return self._root_dir
 
-    async def acquire(self) -> None:
-        """获取终端使用信号量，确保并发安全"""
+    async def acquire(self, timeout: float | None = None) -> None:
+        """获取终端使用信号量，确保并发安全。锁被占用时异步排队等待，不阻塞事件循环"""
         if not self._process or self._process.poll() is not None:
             raise RuntimeError("终端未运行或已退出")
         current_task = asyncio.current_task()
         task_name = current_task.get_name() if current_task else 'unknown'
-        logger.debug(f"🔒 任务 {task_name} 获取终端锁")
-        self._lock.acquire()
+        logger.debug(f"🔒 任务 {task_name} 获取终端锁（排队：{self._lock.get_stats().queue_depth}）")
+        await self._lock.acquire(timeout=timeout)
 
     async def release(self) -> None:
         """释放终端使用信号量，唤醒等待的任务"""
-        # 检查进程是否存在（在关闭过程中可能已被删除）
-        if hasattr(self, '_process') and self._process:
-            if self._process.poll() is not None:
-                raise RuntimeError("终端未运行或已退出")
-        # 如果进程不存在，可能是正在关闭，仍然尝试释放锁
+        # 先释放锁再检查进程状态，避免进程退出时锁无法释放导致其他任务永久等待
         self._lock.release()
         current_task = asyncio.current_task()
         task_name = current_task.get_name() if current_task else 'unknown'
         logger.debug(f"🔓 任务 {task_name} 释放终端锁")
+        # 检查进程是否存在（在关闭过程中可能已被删除）
+        if hasattr(self, '_process') and self._process:
+            if self._process.poll() is not None:
+                raise RuntimeError("终端未运行或已退出")
+
+    def get_lock_stats(self) -> TerminalLockStats:
+        """获取终端锁的统计信息（排队深度、等待时间等）
+
+        Returns:
+            TerminalLockStats: 终端锁统计信息快照
+        """
+        return self._lock.get_stats()
 
     def get_current_dir(self) -> str:
         if self._current_dir == "":
@@ -845,40 +1324,6 @@ class LocalTerminal(ITerminal):
         if not command_clean:
             return False  # 空命令无脚本风险
 
-        # 2. 定义"支持路径的脚本规则"：正则列表（覆盖解释器+脚本文件）
-        # 规则说明：
-        # - (^|\s|/)：匹配命令开头、空格或路径分隔符（确保是独立的解释器/脚本名）
-        # - [\w./-]*：匹配路径（如 /usr/bin/、./venv/、~/）
-        # - ($|\s|;)：匹配命令结尾、空格或分隔符（避免部分匹配，如"pythonic"）
-        script_rules = [
-            # 规则1：脚本解释器（支持路径，如 /usr/bin/python、./bash）
-            r'(^|\s|/)[\w./-]*(python|python3|python2)($|\s|;)',  # Python
-            r'(^|\s|/)[\w./-]*(bash|sh|zsh|ksh|csh)($|\s|;)',     # Shell
-            r'(^|\s|/)[\w./-]*(go)($|\s|;)\s+run',                # Go run（需跟run参数）
-            r'(^|\s|/)[\w./-]*(go)($|\s|;)\s+test',               # Go test
-            r'(^|\s|/)[\w./-]*(node|npm|yarn|pnpm)($|\s|;)',       # JS/TS
-            r'(^|\s|/)[\w./-]*(perl|ruby|php|lua)($|\s|;)',        # 其他解释器
-            # 规则2：直接执行的脚本文件（带路径+后缀，如 ./script.sh、/home/test.py）
-            r'(^|\s|/)[\w./-]+\.(sh|py|go|js)($|\s|;)',           # 后缀匹配
-            r'(^|\s)\./[\w./-]*($|\s|;)'                          # 相对路径执行（如 ./script）
-        ]
-
-        # 规则3：Shell脚本化编程模式检测（复合命令攻击）
-        # 这些模式表明是复杂的shell脚本，而非简单命令
-        shell_script_patterns = [
-            r'[a-zA-Z_]\w*=[\'"][^\'"]*[\'"]',                      # 带引号的变量赋值（VAR='value'）
-            r'\b[a-zA-Z_]\w*=\s*[\'"][a-zA-Z]\s*[\'"]',            # 单字符变量赋值（S='s'）
-            r'[a-zA-Z_]\w*\(\s*\)\s*\{',                          # 函数定义（func() {）
-            r'(\$\(|\`)[^)]*(\)|\`)',                             # 命令替换（$(cmd) 或 `cmd`）
-            r'<<\s*[\'"]?\w+[\'"]?',                               # Here document（<<EOF）
-            r'<<<\s*[\'"]?[^\'"]*[\'"]?',                          # Here string（<<<"text"）
-            r'\$\(\(\s*[^\)]*\s*\)\)',                             # 算术扩展（$((expr))）
-            r'\bif\s+.*\bthen\b',                                  # if条件语句
-            r'\bfor\s+.*\bdo\b',                                   # for循环语句
-            r'\bwhile\s+.*\bdo\b',                                 # while循环语句
-            r'\bcase\s+.*\besac\b',                                # case语句
-        ]
-
         # 3. 分割复合命令（逐条检查，避免漏判）
         independent_commands = self._split_commands(command_clean)
         for single_cmd in independent_commands:
@@ -888,14 +1333,18 @@ class LocalTerminal(ITerminal):
 
             # 排除重定向操作符后的文件名（如 echo 'hello' > test.sh 中的 test.sh 不是脚本执行）
             # 移除重定向操作符及其后的内容（>、>>、<、2>、&> 等）
-            cmd_without_redirect = re.sub(r'\s*[<>]+\s*\S+', '', single_cmd_stripped)
-            cmd_without_redirect = re.sub(r'\s*2>\s*\S+', '', cmd_without_redirect)
-            cmd_without_redirect = re.sub(r'\s*&\s*[<>]\s*\S+', '', cmd_without_redirect)
-            
+            cmd_without_redirect = single_cmd_stripped
+            for redirect_pattern in _REDIRECT_TARGET_PATTERNS:
+                cmd_without_redirect = redirect_pattern.sub('', cmd_without_redirect)
+
+            # 合并规则未命中时，逐条规则也不会命中
+            if not _SCRIPT_RULES_ANY.search(cmd_without_redirect):
+                continue
+
             # 4. 检查当前独立命令是否命中任一脚本规则（使用去除重定向后的命令）
-            for rule in script_rules:
+            for rule, rule_pattern in _SCRIPT_RULE_PATTERNS:
                 # 用正则匹配：忽略大小写（已预处理小写，此处可简化）
-                match = re.search(rule, cmd_without_redirect)
+                match = rule_pattern.search(cmd_without_redirect)
                 if match:
                     # 特殊排除：避免将"目录路径"误判为脚本（如 ./dir/ 不是脚本）
                     matched_str = match.group(0).strip()
@@ -903,7 +1352,7 @@ class LocalTerminal(ITerminal):
                     if matched_str.endswith('/'):
                         continue
                     # 排除场景2：无后缀的纯路径目录（如 ./venv/bin）
-                    if '/' in matched_str and not any(ext in matched_str for ext in ['.sh', '.py', '.go', '.js']) and not any(inter in matched_str for inter in ['python', 'bash', 'sh', 'node', 'go']):
+                    if '/' in matched_str and not any(ext in matched_str for ext in _SCRIPT_FILE_EXTS) and not any(inter in matched_str for inter in _SCRIPT_INTERPRETERS):
                         continue
 
                     # 命中有效脚本规则，记录日志并返回True
@@ -913,8 +1362,9 @@ class LocalTerminal(ITerminal):
         # 额外检查：Shell脚本化编程模式（复合命令攻击）
         # 检查原始命令（而非分割后的命令）中的脚本化模式
         # 这样可以检测到如 "S='s'; C='u'" 这样的复合脚本攻击
-        if len(independent_commands) > 1 or ';' in command_clean or '&' in command_clean:
-            for pattern in shell_script_patterns:
+        if (len(independent_commands) > 1 or ';' in command_clean or '&' in command_clean) \
+                and _SHELL_SCRIPT_PATTERNS_ANY.search(command_clean):
+            for pattern in _SHELL_SCRIPT_PATTERNS:
                 if re.search(pattern, command_clean):
                     logger.debug(f"⚠️ 检测到Shell脚本化模式：{command}（匹配模式：{pattern}）")
                     return True
@@ -939,71 +1389,31 @@ class LocalTerminal(ITerminal):
         # 提取命令名（如 "/usr/bin/sudo" → "sudo"）
         cmd_name = self._extract_command_name(command_stripped.split()[0] if command_stripped.split() else "")
 
-        # 遍历禁止命令正则列表，逐个匹配
-        for prohib in _PROHIBITED_REGEX:
-            # 取出原始 pattern 并确保为 str（若为 bytes 则 decode）
-            raw_pattern = prohib.get("regex", "")
-            if isinstance(raw_pattern, bytes):
-                regex = raw_pattern.decode("utf-8", errors="ignore")
-            else:
-                regex = str(raw_pattern)
-
-            desc = str(prohib.get("desc", ""))
-            is_absolute = bool(prohib.get("is_absolute", False))
-
-            # 如果没有有效的正则表达式，跳过该条规则
-            if not regex:
-                continue
-
-            # 对于需要完整命令检查的特殊规则（如 rm -rf /），检查完整命令
-            needs_full_command_check = any(pattern in regex for pattern in [
-                'rm -rf\\s+/',          # 根目录删除
-                'rm -rf\\s+(\\*|',      # 批量删除
-                'rm -rf\\s+\\.\\.(\\/|$)', # 跨层级删除
-                'dd if=/dev/(zero|null))|(> /dev/sda)',  # 硬件破坏
-                'shutdown\\s+',         # 关机命令
-                'passwd root',          # 根密码修改
-                'chpasswd',             # 密码修改
-                'find\\s+.*\\s+-exec\\s+.*sudo',  # find -exec with sudo
-                'bsudo\\b',             # sudo提权
-                'bsu\\b'                # su提权
-            ])
-
-            if needs_full_command_check:
-                # 检查完整命令
-                if re.search(regex, cmd_lower, re.IGNORECASE):
-                    if is_absolute or (not is_absolute and not allow_by_human):
-                        logger.error(
-                            f"❌ 命令包含禁止操作：\n"
-                            f"  禁止类型：{desc}\n"
-                            f"  匹配规则：{regex}\n"
-                            f"  执行命令：{command_stripped}"
-                        )
-                        return True
-            else:
-                # 对于大多数命令，只检查命令名
-                # 修改正则表达式以只匹配命令名开头
-                cmd_only_regex = f'^{regex}'
-                if re.search(cmd_only_regex, cmd_name, re.IGNORECASE):
-                    if is_absolute or (not is_absolute and not allow_by_human):
-                        logger.error(
-                            f"❌ 命令包含禁止操作：\n"
-                            f"  禁止类型：{desc}\n"
-                            f"  匹配规则：{regex}\n"
-                            f"  执行命令：{command_stripped}"
-                        )
-                        return True
+        # 合并规则均未命中时跳过逐条匹配：完整命令规则检查完整命令，其余规则只检查命令名
+        if _PROHIBITED_FULL_ANY.search(cmd_lower) or _PROHIBITED_NAME_ANY.search(cmd_name):
+            for rule in _PROHIBITED_RULES:
+                target = cmd_lower if rule.full_command else cmd_name
+                if not rule.pattern.search(target):
+                    continue
+                if rule.is_absolute or not allow_by_human:
+                    logger.error(
+                        f"❌ 命令包含禁止操作：\n"
+                        f"  禁止类型：{rule.desc}\n"
+                        f"  匹配规则：{rule.regex}\n"
+                        f"  执行命令：{command_stripped}"
+                    )
+                    return True
 
         # 额外校验：rm命令的路径是否为“精准路径”（排除通配符/特殊符号）
         if cmd_name == "rm":
             # 拆分rm命令的参数（如 "rm -rf ./tmp/log.txt" → ["./tmp/log.txt"]）
             try:
-                cmd_parts = shlex.split(command_stripped)
+                cmd_parts = _shlex_split(command_stripped)
                 # 提取路径参数（跳过命令名和选项，如 -rf、-f）
                 path_args = [p for p in cmd_parts[1:] if not p.startswith("-")]
                 for path in path_args:
                     # 检查路径是否含危险符号（*、..），或不符合精准路径规则
-                    if "*" in path or ".." in path or not re.match(_RM_SAFE_PATH_PATTERN, path.strip()):
+                    if "*" in path or ".." in path or not _RM_SAFE_PATH_PATTERN.match(path.strip()):
                         logger.error(
                             f"❌ rm命令路径非法（非精准删除）：\n"
                             f"  非法路径：{path}\n"
@@ -1036,19 +1446,11 @@ class LocalTerminal(ITerminal):
             return True
 
         # 步骤2：检查各种形式的命令替换、重定向和算术扩展
-        # 匹配 $(...)、`...`、$((...))、<(...)、<<< 和 <<
-        substitution_patterns = [
-            r'\$\(([^)]+)\)',           # $(command) - 命令替换
-            r'\$\(\(([^)]+)\)\)',       # $((expression)) - 算术扩展
-            r'`([^`]+)`',               # `command` - 命令替换
-            r'<\(([^)]+)\)',            # <(command) - 进程替换
-            r'<<<\s*[\'"]?([^\'"]*)[\'"]?',  # <<<text - here string
-            r'<<-\s*[\'"]?\w+[\'"]?',   # <<-EOF - here document (with dash)
-            r'<<\s*[\'"]?\w+[\'"]?',    # <<EOF - here document (without dash)
-        ]
-        
+        # 匹配 $(...)、`...`、$((...))、<(...)、<<< 和 <<（不含这些符号的命令无需逐条匹配）
+        substitution_patterns = _SUBSTITUTION_PATTERNS if any(
+            marker in command_stripped for marker in _SUBSTITUTION_MARKERS) else []
         for pattern in substitution_patterns:
-            matches = re.finditer(pattern, command_stripped)
+            matches = pattern.finditer(command_stripped)
             for match in matches:
                 full_match = match.group(0)
 
@@ -1088,18 +1490,7 @@ class LocalTerminal(ITerminal):
                             return True
 
         # 步骤3：正则匹配「命令执行型嵌套」（支持转义/未转义引号）
-        # 正则说明：
-        # - ^.*?(bash|sh|python|python3|node|go) -c\s*：匹配执行命令的解释器（如 bash -c）
-        # - ^.*?(eval|exec)\s+：匹配代码执行命令（如 eval、exec）
-        # - (?:\\\\['"]|['"]])：匹配开头的转义引号（\\\\\"）或未转义引号（"）
-        # - (.*?)：非贪婪匹配引号内的嵌套命令
-        # - (?:\\\\\1|(?<!\\\\)\1)：匹配结尾的转义引号（\\\\\"）或未转义引号（"，确保未被转义）
-        escaped_cmd_pattern = re.compile(
-            r'^.*?(bash|sh|python|python3|node|go) -c\s*(?P<quote>(?:\\\\[\'"]|[\'"]))(?P<content>.*?)(?:\\\\(?P=quote)|(?<!\\\\)(?P=quote))|'
-            r'^.*?(eval|exec)\s+(?P<quote2>(?:\\\\[\'"]|[\'"]))(?P<content2>.*?)(?:\\\\(?P=quote2)|(?<!\\\\)(?P=quote2))',
-            re.IGNORECASE | re.DOTALL  # DOTALL 允许匹配换行符
-        )
-        matches = escaped_cmd_pattern.finditer(command_stripped)
+        matches = _ESCAPED_CMD_PATTERN.finditer(command_stripped)
         if not matches:
             return False  # 无命令执行型嵌套，直接返回
 
@@ -1121,7 +1512,7 @@ class LocalTerminal(ITerminal):
                 continue
 
             # 清理嵌套内容中的转义符（如 \\" → "，\\' → '）
-            cleaned_content = re.sub(r'\\\\([\'"])', r'\1', nested_content.strip())
+            cleaned_content = _ESCAPED_QUOTE_PATTERN.sub(r'\1', nested_content.strip())
             logger.debug(
                 f"⚠️ 检测到转义嵌套命令：{command_desc}\n"
                 f"   清理后命令：{cleaned_content}"
@@ -1179,10 +1570,10 @@ class LocalTerminal(ITerminal):
         """
         # 1. 拆分命令词（仅取第一个，排除参数，如 "go run" → "go"）
         try:
-            cmd_parts = shlex.split(command_path.strip())
+            cmd_parts = _shlex_split(command_path.strip())
         except ValueError:
             # 引号未闭合等语法错误，使用简单分割
-            cmd_parts = command_path.strip().split()
+            cmd_parts = tuple(command_path.strip().split())
         if not cmd_parts:
             return ""
         
@@ -1207,8 +1598,8 @@ class LocalTerminal(ITerminal):
             if self._allowed_commands:  # 有允许列表时检查是否在列表中
                 command_lower = command_stripped.lower()
                 is_allowed = any(
-                    allowed_cmd.lower() in command_lower
-                    for allowed_cmd in self._allowed_commands
+                    allowed_cmd in command_lower
+                    for allowed_cmd in self._allowed_commands_lower
                 )
                 if not is_allowed:
                     logger.error(
@@ -1257,10 +1648,10 @@ class LocalTerminal(ITerminal):
         try:
             # 尝试使用 shlex.split，但如果引号未闭合则使用简单分割
             try:
-                cmd_parts = shlex.split(command)
+                cmd_parts = _shlex_split(command)
             except ValueError:
                 # 引号未闭合等语法错误，使用简单分割
-                cmd_parts = command.split()
+                cmd_parts = tuple(command.split())
             if not cmd_parts:
                 return True
 
@@ -1268,51 +1659,31 @@ class LocalTerminal(ITerminal):
 
             # 检查重定向注入攻击 - 检测危险的重定向操作符
             # 特殊处理：允许标准错误重定向到 /dev/null
-            if re.search(r'\s*2>\s*/dev/null\s*', command):
+            if _STDERR_TO_NULL_PATTERN.search(command):
                 # 这是合法的错误输出重定向，允许通过
                 pass
-            else:
-                # 检测标准重定向：>、>>、<
-                redirection_patterns = [r'\s*>\s*\S+', r'\s*>>\s*\S+', r'\s*<\s*\S+']
-                # 检测文件描述符重定向（除了2>/dev/null）：2>、&>、2>>、&>>
-                fd_redirection_patterns = [r'\s*2>\s*(?!/dev/null)\S+', r'\s*&>\s*\S+', r'\s*2>>\s*\S+', r'\s*&>>\s*\S+']
-
-                all_redirection_patterns = redirection_patterns + fd_redirection_patterns
-
-                # 检查命令中是否包含重定向操作符
-                for pattern in all_redirection_patterns:
-                    if re.search(pattern, command):
-                        # 如果是重定向到敏感系统文件，则阻止
-                        sensitive_file_patterns = [
-                            r'/etc/passwd', r'/etc/shadow', r'/etc/sudoers', r'/etc/hosts',
-                            r'/etc/group', r'/etc/gshadow', r'/etc/crontab', r'/etc/fstab',
-                            r'/proc/', r'/sys/', r'/dev/zero', r'/dev/random',
-                            r'~/.ssh/', r'~/.bashrc', r'~/.profile', r'~/.bash_profile',
-                            r'/root/', r'/home/', r'/var/log/', r'/var/spool/'
-                        ]
-
-                        # 检查重定向目标是否为敏感文件
-                        for sensitive_pattern in sensitive_file_patterns:
-                            if re.search(sensitive_pattern, command):
-                                logger.error(
-                                    f"❌ 检测到重定向注入攻击：尝试重定向到敏感文件\n"
-                                    f"  敏感文件模式：{sensitive_pattern}\n"
-                                    f"  执行命令：{command}"
-                                )
-                                return False
+            elif _REDIRECTION_ANY.search(command):
+                # 命令中包含重定向操作符（>、>>、<、2>、&>、2>>、&>>）
+                # 如果是重定向到敏感系统文件，则阻止
+                if _SENSITIVE_FILE_PATTERNS_ANY.search(command):
+                    sensitive_pattern = next(p for p in _SENSITIVE_FILE_PATTERNS if re.search(p, command))
+                    logger.error(
+                        f"❌ 检测到重定向注入攻击：尝试重定向到敏感文件\n"
+                        f"  敏感文件模式：{sensitive_pattern}\n"
+                        f"  执行命令：{command}"
+                    )
+                    return False
 
-                        # 如果重定向到系统关键目录（且非workspace内），也需要人类许可
-                        if not allow_by_human:
-                            system_dir_patterns = [r'/etc/', r'/bin/', r'/sbin/', r'/usr/', r'/opt/', r'/var/']
-                            for system_pattern in system_dir_patterns:
-                                if re.search(system_pattern, command):
-                                    logger.error(
-                                        f"❌ 检测到重定向到系统目录：需要人类许可\n"
-                                        f"  系统目录模式：{system_pattern}\n"
-                                        f"  执行命令：{command}\n"
-                                        f"  提示：如需重定向到系统目录，请使用 allow_by_human=True"
-                                    )
-                                    return False
+                # 如果重定向到系统关键目录（且非workspace内），也需要人类许可
+                if not allow_by_human and _SYSTEM_DIR_PATTERNS_ANY.search(command):
+                    system_pattern = next(p for p in _SYSTEM_DIR_PATTERNS if re.search(p, command))
+                    logger.error(
+                        f"❌ 检测到重定向到系统目录：需要人类许可\n"
+                        f"  系统目录模式：{system_pattern}\n"
+                        f"  执行命令：{command}\n"
+                        f"  提示：如需重定向到系统目录，请使用 allow_by_human=True"
+                    )
+                    return False
 
             # 非路径敏感命令直接放行
             if cmd_name not in _PATH_SENSITIVE_COMMANDS:
@@ -1669,24 +2040,38 @@ class LocalTerminal(ITerminal):
         if not is_valid:
             return False
 
+        # 校验结果只取决于命令、是否人类允许和当前目录（相对路径基于当前目录解析）
+        cache_key = (command_stripped, allow_by_human, self._current_dir)
+        with self._command_verdicts_lock:
+            verdict = self._command_verdicts.get(cache_key)
+            if verdict is not None:
+                self._command_verdicts.move_to_end(cache_key)
+        if verdict is not None:
+            logger.debug(f"🔍 命令校验命中缓存（{'通过' if verdict else '拒绝'}）：{command_stripped}")
+            return verdict
+
+        verdict = self._evaluate_command(command, command_stripped, allow_by_human)
+        with self._command_verdicts_lock:
+            self._command_verdicts[cache_key] = verdict
+            if len(self._command_verdicts) > _COMMAND_VERDICT_CACHE_SIZE:
+                self._command_verdicts.popitem(last=False)
+        return verdict
+
+    def _evaluate_command(self, command: str, command_stripped: str, allow_by_human: bool) -> bool:
+        """私有方法：对通过基础校验的命令执行完整的安全校验（check_command 的未缓存部分）。
+
+        Args:
+            command: 原始命令（用于日志）
+            command_stripped: 去除首尾空格后的命令
+            allow_by_human: 是否由人类用户允许执行
+
+        Returns:
+            bool: True=命令安全可执行，False=命令不安全。
+        """
         # 第0.5步：脚本化模式检查（适用于所有命令，不仅仅是复合命令）
         # 检查命令中的脚本化编程模式（命令替换、here document等）
         if not allow_by_human and self._disable_script_execution:
             command_lower = command_stripped.lower()
-            # 检查脚本化特征
-            shell_script_patterns = [
-                r'[a-zA-Z_]\w*=[\'"][^\'\"]*[\'"]',                      # 带引号的变量赋值（VAR='value'）
-                r'[a-zA-Z_]\w*\(\s*\)\s*\{',                          # 函数定义（func() {）
-                # 注意：$(command) 命令替换由 _has_escaped_prohibited_cmd 处理，而不是这里
-                r'<<\s*[\'"]?\w+[\'"]?',                               # Here document（<<EOF）
-                r'<<<\s*[\'"]?[^\'"]*[\'"]?',                          # Here string（<<<"text"）
-                # 注意：$((...)) 算术扩展也由 _has_escaped_prohibited_cmd 处理，而不是这里
-                r'\bif\s+.*\bthen\b',                                  # if条件语句
-                r'\bfor\s+.*\bdo\b',                                   # for循环语句
-                r'\bwhile\s+.*\bdo\b',                                 # while循环语句
-                r'\bcase\s+.*\besac\b',                                # case语句
-            ]
-
             # 特殊处理反引号，避免误判单引号内的反引号
             # 先检查是否包含反引号
             if '`' in command_lower:
@@ -1696,10 +2081,10 @@ class LocalTerminal(ITerminal):
                     logger.error(f"❌ 命令包含脚本化编程模式（反引号命令替换）（已禁用脚本执行）：{command}")
                     return False
 
-            for pattern in shell_script_patterns:
-                if re.search(pattern, command_lower):
-                    logger.error(f"❌ 命令包含脚本化编程模式（已禁用脚本执行）：{command}")
-                    return False
+            # 检查脚本化特征
+            if _INLINE_SCRIPT_PATTERNS_ANY.search(command_lower):
+                logger.error(f"❌ 命令包含脚本化编程模式（已禁用脚本执行）：{command}")
+                return False
 
         # 分割命令为独立命令列表
         commands = self._split_commands(command_stripped)
@@ -1735,15 +2120,9 @@ class LocalTerminal(ITerminal):
                 else:
                     # 对于单行不完整命令，进行基本检查但更宽松
                     # 只有当明确包含极其危险的模式时才阻止
-                    extremely_dangerous_patterns = [
-                        r'rm -rf\s+/',  # 明确的根目录删除
-                        r'sudo\s+rm\s+-rf\s+/',  # sudo + 根目录删除
-                    ]
-
-                    for pattern in extremely_dangerous_patterns:
-                        if re.search(pattern, full_cmd_for_check):
-                            logger.error(f"❌ 不完整命令包含极其危险操作：{full_cmd_for_check}")
-                            return False
+                    if _EXTREMELY_DANGEROUS_ANY.search(full_cmd_for_check):
+                        logger.error(f"❌ 不完整命令包含极其危险操作：{full_cmd_for_check}")
+                        return False
 
                     # 对于普通不完整命令，跳过剩余的安全检查
                     should_skip_remaining_checks = True
@@ -1811,10 +2190,10 @@ class LocalTerminal(ITerminal):
             RuntimeError: 终端未启动或工作空间未初始化。
             PermissionError: 命令未通过安全校验（如在黑名单、路径越界）。
             subprocess.SubprocessError: 命令执行中发生IO错误。
-            TimeoutError: 命令执行超时。
+            TimeoutError: 命令执行超时，或等待终端锁超时。
         """
         # 获取异步锁，确保并发安全
-        await self.acquire()
+        await self.acquire(timeout=self._acquire_timeout)
         try:
             # 1. 前置校验：终端状态
             self._validate_terminal_state()
@@ -1855,7 +2234,11 @@ class LocalTerminal(ITerminal):
             await self.release()
 
     async def read_process(self, stop_word: str) -> str:
-        """读取终端输出。
+        """读取终端输出，直到遇到停止词。
+
+        输出管道为非阻塞模式，由事件循环监听可读事件后按块读取，并在缓冲区中查找停止词，
+        不会为每一行输出切换一次线程。停止词之后的数据保留在缓冲区中，供下一次读取。
+        设置了 max_output_bytes 时，超长输出只保留开头和结尾部分。
 
         Args:
             stop_word: 遇到该停止词时结束读取。
@@ -1864,24 +2247,69 @@ class LocalTerminal(ITerminal):
             str: 终端输出。
 
         Raises:
-            RuntimeError: 终端未启动或输出流不可用。
+            RuntimeError: 终端未启动、输出流不可用或终端进程输出已关闭。
         """
         if not self._process or self._process.poll() is not None:
             raise RuntimeError("终端未运行或已退出")
         if not self._process.stdout:
             raise RuntimeError("终端输出流不可用")
 
-        data: list[str] = []
-        loop = asyncio.get_event_loop()
+        fd = self._process.stdout.fileno()
+        marker = stop_word.encode("utf-8") + b"\n"
+        collector = _OutputCollector(self._max_output_bytes)
+        buffer = self._read_buffer
 
         while True:
-            # Use run_in_executor to make blocking readline() async
-            line = await loop.run_in_executor(None, self._process.stdout.readline)
-            if line.strip() == stop_word:
+            index = buffer.find(marker)
+            if index != -1:
+                collector.add(buffer[:index])
+                del buffer[:index + len(marker)]
                 break
-            data.append(line.rstrip('\n\r'))
 
-        return '\n'.join(data)
+            # 停止词可能跨越两次读取，保留末尾不足一个停止词长度的数据，其余部分交给收集器
+            keep = len(marker) - 1
+            if len(buffer) > keep:
+                collector.add(buffer[:len(buffer) - keep])
+                del buffer[:len(buffer) - keep]
+
+            chunk = await self._read_chunk(fd)
+            if not chunk:
+                raise RuntimeError("终端进程输出已关闭")
+            buffer += chunk
+
+        if collector.omitted:
+            logger.warning(
+                f"✂️ 命令输出过长（{collector.total} 字节），已截断至 {self._max_output_bytes} 字节"
+            )
+
+        # 去掉停止词前的换行符，统一换行为\n
+        text = collector.get_text()
+        if text.endswith("\n"):
+            text = text[:-1]
+        return text.replace("\r\n", "\n")
+
+    async def _read_chunk(self, fd: int) -> bytes:
+        """私有方法：从非阻塞的输出管道读取一块数据，无数据时挂起等待可读事件。
+
+        Args:
+            fd: 输出管道的文件描述符
+
+        Returns:
+            bytes: 读取到的数据，空字节串表示管道已关闭
+        """
+        while True:
+            try:
+                return os.read(fd, _READ_CHUNK_SIZE)
+            except BlockingIOError:
+                pass
+
+            loop = asyncio.get_running_loop()
+            readable = loop.create_future()
+            loop.add_reader(fd, lambda: readable.done() or readable.set_result(None))
+            try:
+                await readable
+            finally:
+                loop.remove_reader(fd)
 
     async def write_process(self, data: str) -> None:
         """写入终端输入（简化版本，不等待完成）。
@@ -1988,8 +2416,8 @@ class LocalTerminal(ITerminal):
         self.close()
 
     def close(self) -> None:
-        # 检查进程是否存在
-        if not self._process or self._process.poll() is not None:
+        # 检查进程是否存在（构造函数中途失败时进程属性可能尚未设置）
+        if not getattr(self, '_process', None) or self._process.poll() is not None:
             logger.info("ℹ️ 终端进程已关闭或未启动，无需重复操作")
             # 重置状态
             self._process = None
@@ -2000,8 +2428,8 @@ class LocalTerminal(ITerminal):
 
         # 在同步上下文中尝试获取锁，如果已经被获取则跳过
         try:
-            # 使用acquire(blocking=False)来非阻塞获取锁
-            lock_acquired = self._lock.acquire(blocking=False)
+            # 非阻塞获取锁，close 为同步方法，不能等待
+            lock_acquired = self._lock.try_acquire()
             if not lock_acquired:
                 logger.debug("🔒 终端锁已被其他任务持有，跳过锁获取进行关闭")
         except Exception:
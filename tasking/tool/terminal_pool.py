@@ -0,0 +1,295 @@
+"""
+终端会话池：为同一个工作空间管理多个预热的 LocalTerminal，供并发任务借用
+"""
+
+import asyncio
+import time
+from collections import deque
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+from loguru import logger
+
+from .terminal import LocalTerminal
+
+
+class TerminalPool:
+    """终端会话池：管理同一工作空间下的多个长期 bash 会话。
+
+    - 初始化时预热 `min_size` 个终端，按需扩容，总数不超过 `max_size`
+    - 借出（checkout）的终端由借用方独占，同时借出的终端的当前目录、环境变量互不影响
+    - 归还（checkin）时终端会恢复初始化完成时的环境变量、函数和别名并切换回工作空间根目录，
+      下一个借用方不会看到上一个借用方留下的这些状态。初始化时已存在的非导出 shell 变量的值和
+      shell 选项（如 `set -e`）不会恢复
+    - 空闲超过 `idle_timeout` 秒的终端会在借出/归还时被回收，至少保留 `min_size` 个
+    - 终端全部借出且达到上限时，借用方按先后顺序等待
+
+    Example:
+        ```python
+        pool = TerminalPool(root_dir="/tmp/root", workspace="ws", max_size=4)
+        async with pool.session() as terminal:
+            output = await terminal.run_command("ls")
+        pool.close()
+        ```
+    """
+    _root_dir: str
+    _workspace: str | None
+    _resolved_workspace: str                    # 终端解析后的工作空间绝对路径
+    _create_workspace: bool
+    _allowed_commands: list[str]
+    _disable_script_execution: bool
+    _init_commands: list[str]
+    _max_output_bytes: int | None
+    _min_size: int
+    _max_size: int
+    _idle_timeout: float | None
+    _idle: deque[tuple[LocalTerminal, float]]   # 空闲终端及其归还时间，右端为最近归还
+    _in_use: set[LocalTerminal]
+    _creating: int                              # 正在创建中的终端数量
+    _waiters: deque[asyncio.Future[None]]
+    _closed: bool
+
+    def __init__(
+        self,
+        root_dir: str,
+        workspace: str | None = None,
+        create_workspace: bool = False,
+        allowed_commands: list[str] | None = None,
+        disable_script_execution: bool = True,
+        init_commands: list[str] | None = None,
+        max_output_bytes: int | None = None,
+        min_size: int = 1,
+        max_size: int = 4,
+        idle_timeout: float | None = 300.0,
+    ) -> None:
+        """初始化终端会话池并预热 `min_size` 个终端
+
+        Args:
+            root_dir: 根目录路径（必须为绝对路径），参见 LocalTerminal。
+            workspace: 工作空间路径，参见 LocalTerminal。
+            create_workspace: 工作空间不存在时是否自动创建。
+            allowed_commands: 允许命令列表（白名单），所有终端共享同一配置。
+            disable_script_execution: 是否禁用脚本执行。
+            init_commands: 每个终端启动后执行的初始化命令列表。
+            max_output_bytes: 单条命令输出的字节上限。
+            min_size: 预热并常驻的终端数量，至少为1，默认值为1。
+            max_size: 终端数量上限，默认值为4。
+            idle_timeout: 空闲多少秒后回收超出 `min_size` 的终端，None表示不回收，默认值为300秒。
+
+        Raises:
+            ValueError: 如果 min_size/max_size/idle_timeout 配置无效。
+        """
+        if min_size < 1:
+            raise ValueError(f"min_size必须大于0：{min_size}")
+        if max_size < min_size:
+            raise ValueError(f"max_size不能小于min_size：min_size={min_size}, max_size={max_size}")
+        if idle_timeout is not None and idle_timeout < 0:
+            raise ValueError(f"idle_timeout不能为负数：{idle_timeout}")
+
+        self._root_dir = root_dir
+        self._workspace = workspace
+        self._create_workspace = create_workspace
+        self._allowed_commands = allowed_commands.copy() if allowed_commands else []
+        self._disable_script_execution = disable_script_execution
+        self._init_commands = init_commands.copy() if init_commands else []
+        self._max_output_bytes = max_output_bytes
+        self._min_size = min_size
+        self._max_size = max_size
+        self._idle_timeout = idle_timeout
+        self._idle = deque()
+        self._in_use = set()
+        self._creating = 0
+        self._waiters = deque()
+        self._closed = False
+
+        # 预热终端
+        try:
+            for _ in range(min_size):
+                self._idle.append((self._create_terminal(), time.monotonic()))
+            self._resolved_workspace = self._idle[0][0].get_workspace()
+        except Exception:
+            self.close()
+            raise
+        logger.info(f"[终端池] 已预热 {min_size} 个终端，上限 {max_size} 个")
+
+    def _create_terminal(self) -> LocalTerminal:
+        """私有方法：按照池的配置创建一个新终端"""
+        return LocalTerminal(
+            root_dir=self._root_dir,
+            workspace=self._workspace,
+            create_workspace=self._create_workspace,
+            allowed_commands=self._allowed_commands,
+            disable_script_execution=self._disable_script_execution,
+            init_commands=self._init_commands,
+            max_output_bytes=self._max_output_bytes,
+        )
+
+    def get_size(self) -> int:
+        """获取当前终端总数（空闲 + 借出 + 创建中）"""
+        return len(self._idle) + len(self._in_use) + self._creating
+
+    def get_idle_count(self) -> int:
+        """获取空闲终端数量"""
+        return len(self._idle)
+
+    def get_workspace(self) -> str:
+        """获取终端池对应的工作空间绝对路径"""
+        return self._resolved_workspace
+
+    def _is_alive(self, terminal: LocalTerminal) -> bool:
+        process = getattr(terminal, "_process", None)
+        return process is not None and process.poll() is None
+
+    def _discard(self, terminal: LocalTerminal) -> None:
+        """私有方法：关闭并丢弃一个终端"""
+        try:
+            terminal.close()
+        except Exception as e:
+            logger.warning(f"[终端池] 关闭终端 {terminal.get_id()} 失败：{e}")
+
+    def reap_idle(self) -> int:
+        """回收空闲超时的终端，至少保留 `min_size` 个终端
+
+        Returns:
+            int: 回收的终端数量
+        """
+        if self._idle_timeout is None:
+            return 0
+
+        reaped = 0
+        now = time.monotonic()
+        # 左端为最早归还的终端
+        while self._idle and self.get_size() > self._min_size:
+            terminal, released_at = self._idle[0]
+            if now - released_at < self._idle_timeout:
+                break
+            self._idle.popleft()
+            self._discard(terminal)
+            reaped += 1
+
+        if reaped:
+            logger.debug(f"[终端池] 回收了 {reaped} 个空闲终端")
+        return reaped
+
+    async def checkout(self, timeout: float | None = None) -> LocalTerminal:
+        """借出一个终端，借用方独占使用直到调用 `checkin` 归还
+
+        Args:
+            timeout: 没有空闲终端且已达上限时的最长等待时间（秒），None表示一直等待。
+
+        Returns:
+            LocalTerminal: 借出的终端
+
+        Raises:
+            RuntimeError: 终端池已关闭。
+            TimeoutError: 等待空闲终端超时。
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            if self._closed:
+                raise RuntimeError("终端池已关闭")
+            self.reap_idle()
+
+            # 1. 优先使用最近归还的空闲终端
+            while self._idle:
+                terminal, _ = self._idle.pop()
+                if self._is_alive(terminal):
+                    self._in_use.add(terminal)
+                    return terminal
+                logger.warning(f"[终端池] 终端 {terminal.get_id()} 已退出，丢弃")
+                self._discard(terminal)
+
+            # 2. 未达上限时新建终端（LocalTerminal 初始化为同步阻塞操作，放到线程中执行）
+            if self.get_size() < self._max_size:
+                self._creating += 1
+                try:
+                    terminal = await asyncio.to_thread(self._create_terminal)
+                finally:
+                    self._creating -= 1
+                if self._closed:
+                    self._discard(terminal)
+                    raise RuntimeError("终端池已关闭")
+                self._in_use.add(terminal)
+                logger.debug(f"[终端池] 新建终端 {terminal.get_id()}，当前共 {self.get_size()} 个")
+                return terminal
+
+            # 3. 已达上限，排队等待归还
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+                await asyncio.wait_for(waiter, timeout=remaining)
+            except TimeoutError:
+                # 超时的同时可能刚好有终端归还，转交给下一个等待者
+                if self._idle:
+                    self._wake_next()
+                raise TimeoutError(f"等待空闲终端超时（{timeout}秒）") from None
+            finally:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+
+    async def checkin(self, terminal: LocalTerminal) -> None:
+        """归还借出的终端。终端会恢复初始的 shell 状态并切换回工作空间根目录，失败或已退出的终端会被丢弃
+
+        Args:
+            terminal: 通过 `checkout` 借出的终端
+
+        Raises:
+            ValueError: 终端不是从该终端池借出的。
+        """
+        if terminal not in self._in_use:
+            raise ValueError(f"终端 {terminal.get_id()} 不是从该终端池借出的")
+
+        keep = not self._closed and self._is_alive(terminal)
+        if keep:
+            try:
+                # 重置环境变量、函数、别名和当前目录，隔离不同借用方的会话状态
+                await terminal.reset_shell_state()
+                await terminal.cd_to_workspace()
+            except Exception as e:
+                logger.warning(f"[终端池] 终端 {terminal.get_id()} 重置会话状态失败，丢弃：{e}")
+                keep = False
+
+        self._in_use.discard(terminal)
+        if keep:
+            self._idle.append((terminal, time.monotonic()))
+        else:
+            self._discard(terminal)
+        self.reap_idle()
+        self._wake_next()
+
+    def _wake_next(self) -> None:
+        """私有方法：唤醒最早排队的借用方"""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                break
+
+    @asynccontextmanager
+    async def session(self, timeout: float | None = None) -> AsyncIterator[LocalTerminal]:
+        """借出一个终端，使用结束后自动归还
+
+        Args:
+            timeout: 等待空闲终端的最长时间（秒），None表示一直等待。
+
+        Yields:
+            LocalTerminal: 借出的终端
+        """
+        terminal = await self.checkout(timeout=timeout)
+        try:
+            yield terminal
+        finally:
+            await self.checkin(terminal)
+
+    def close(self) -> None:
+        """关闭终端池，关闭所有空闲终端。借出中的终端会在归还时关闭"""
+        self._closed = True
+        while self._idle:
+            terminal, _ = self._idle.popleft()
+            self._discard(terminal)
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+        logger.debug("[终端池] 已关闭")
@@ -6,13 +6,24 @@
 2. 内存中的编辑操作处理
 3. 异步文件IO写入
 4. 统一的编辑流程和diff输出
+5. 大文件的流式改写
 """
 
+import codecs
+import mmap
 import os
+import threading
 from abc import ABC, abstractmethod
+from array import array
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Iterator, Sequence
+from itertools import chain
+from typing import NamedTuple
+
+from asyncer import asyncify
 
 from ..model.filesystem import EditOperation
-from ..utils.diff import diff_lines, diff_to_text
+from ..utils.diff import Hunk, hunks_to_text, iter_hunks
 from .filesystem import IFileSystem
 
 
@@ -43,11 +54,20 @@ class ITextEditor(ABC):
         raise NotImplementedError("edit_file 方法未实现")
 
     @abstractmethod
-    async def view(self, file_path: str) -> str:
-        """查看文件内容，按行切分并标注行号
+    async def view(
+        self,
+        file_path: str,
+        start_line: int | None = None,
+        end_line: int | None = None,
+        max_bytes: int | None = None,
+    ) -> str:
+        """查看文件内容，按行切分并标注行号，可以只查看指定范围的行
 
         Args:
             file_path: 目标文件路径
+            start_line: 起始行号（从1开始，包含），None表示从第一行开始
+            end_line: 结束行号（包含），None表示到最后一行
+            max_bytes: 输出的最大字节数，超出时截断并提示继续查看的起始行号，None表示不限制
 
         Returns:
             带行号的文件内容字符串
@@ -55,20 +75,205 @@ class ITextEditor(ABC):
         Raises:
             FileNotFoundError: 文件不存在
             RuntimeError: 读取文件失败
+            ValueError: 行号范围或 max_bytes 无效
         """
         raise NotImplementedError("view 方法未实现")
 
 
+_STREAM_CHUNK_SIZE = 64 * 1024  # 流式读写时每块的大小
+_LINE_INDEX_CACHE_SIZE = 16     # 缓存行偏移索引的文件数量
+
+
+class _LineIndex(NamedTuple):
+    """文件的行偏移索引，文件的修改时间或大小变化时失效"""
+
+    mtime_ns: int
+    """建立索引时文件的修改时间"""
+    size: int
+    """建立索引时文件的大小"""
+    offsets: array
+    """每一行起始位置的字节偏移，按 `\\n` 分行"""
+
+
+def _build_line_offsets(mm: mmap.mmap) -> array:
+    """扫描一遍文件内容，记录每一行起始位置的字节偏移"""
+    offsets = array('q', [0])
+    find = mm.find
+    append = offsets.append
+    pos = find(b'\n')
+    while pos != -1:
+        append(pos + 1)
+        pos = find(b'\n', pos + 1)
+    return offsets
+
+
+class _EditPlan:
+    """编辑计划：记录编辑后的文件由原文件的哪些行、哪些新内容按顺序组成。
+
+    片段列表中 `range` 表示原文件中连续的一段行（索引从0开始），`list[str]` 表示新写入的行。
+    每个编辑操作只在片段边界上拆分、删除或插入片段，不移动原文件的行，
+    因此 N 个操作的开销只与片段数量有关，与文件行数无关；原文件的行在片段中始终保持递增顺序，
+    最终按顺序遍历一次片段即可生成编辑后的内容，也可以边读原文件边写出。
+    """
+    _segments: list[range | list[str]]
+    _old_count: int
+    _length: int
+
+    def __init__(self, old_count: int) -> None:
+        """初始化编辑计划
+
+        Args:
+            old_count: 原文件的行数
+        """
+        self._segments = [range(old_count)] if old_count else []
+        self._old_count = old_count
+        self._length = old_count
+
+    def __len__(self) -> int:
+        """编辑后的行数"""
+        return self._length
+
+    def get_old_count(self) -> int:
+        """原文件的行数"""
+        return self._old_count
+
+    def get_segments(self) -> list[range | list[str]]:
+        """按顺序获取片段列表"""
+        return self._segments
+
+    def _split(self, index: int) -> int:
+        """私有方法：确保编辑后的第 index 行（从0开始）位于片段开头，返回该片段在列表中的位置"""
+        position = 0
+        for seg_idx, segment in enumerate(self._segments):
+            if index == position:
+                return seg_idx
+            if index < position + len(segment):
+                cut = index - position
+                self._segments[seg_idx:seg_idx + 1] = [segment[:cut], segment[cut:]]
+                return seg_idx + 1
+            position += len(segment)
+        return len(self._segments)
+
+    def insert(self, index: int, content: str) -> None:
+        """在编辑后的第 index 行（从0开始）之前插入一行"""
+        seg_idx = self._split(index)
+        previous = self._segments[seg_idx - 1] if seg_idx > 0 else None
+        if isinstance(previous, list):
+            # 与前面的新内容合并，减少片段数量
+            previous.append(content)
+        else:
+            self._segments.insert(seg_idx, [content])
+        self._length += 1
+
+    def delete(self, index: int) -> None:
+        """删除编辑后的第 index 行（从0开始）"""
+        seg_idx = self._split(index)
+        segment = self._segments[seg_idx]
+        if len(segment) == 1:
+            del self._segments[seg_idx]
+        else:
+            self._segments[seg_idx] = segment[1:]
+        self._length -= 1
+
+    def replace(self, index: int, content: str) -> None:
+        """替换编辑后的第 index 行（从0开始）"""
+        self.delete(index)
+        self.insert(index, content)
+
+    def materialize(self, old_lines: Sequence[str]) -> list[str]:
+        """按编辑计划生成编辑后的完整行列表
+
+        Args:
+            old_lines: 原文件的行列表
+        """
+        new_lines: list[str] = []
+        for segment in self._segments:
+            if isinstance(segment, range):
+                new_lines.extend(old_lines[segment.start:segment.stop])
+            else:
+                new_lines.extend(segment)
+        return new_lines
+
+    def iter_matches(self) -> Iterator[tuple[int, int]]:
+        """按顺序生成保留下来的原文件行的 (旧索引, 新索引) 对"""
+        new_index = 0
+        for segment in self._segments:
+            if isinstance(segment, range):
+                for old_index in segment:
+                    yield old_index, new_index
+                    new_index += 1
+            else:
+                new_index += len(segment)
+
+    def get_inserted_lines(self) -> dict[int, str]:
+        """获取新写入的行，键为编辑后的行索引（从0开始）"""
+        inserted: dict[int, str] = {}
+        new_index = 0
+        for segment in self._segments:
+            if isinstance(segment, list):
+                for content in segment:
+                    inserted[new_index] = content
+                    new_index += 1
+            else:
+                new_index += len(segment)
+        return inserted
+
+    def get_context_indices(self, k: int) -> set[int]:
+        """获取生成差异时需要的原文件行索引：被删除的行，以及每处变化上下 k 行"""
+        indices: set[int] = set()
+        old_index = 0
+        for segment in chain(self._segments, [range(self._old_count, self._old_count)]):
+            if isinstance(segment, range):
+                if segment.start > old_index:
+                    indices.update(range(max(0, old_index - k), min(self._old_count, segment.start + k)))
+                old_index = segment.stop
+            else:
+                indices.update(range(max(0, old_index - k), min(self._old_count, old_index + k)))
+        return indices
+
+
+class _SparseLines(Sequence[str]):
+    """只保存部分行的行序列，用于在不加载整个文件的情况下生成差异块"""
+
+    def __init__(self, length: int, lines: dict[int, str]) -> None:
+        self._length = length
+        self._lines = lines
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, index: int) -> str:  # type: ignore[override]
+        return self._lines[index]
+
+
 class LocalTextEditor(ITextEditor):
     """基础文本编辑器实现"""
 
-    def __init__(self, file_system: IFileSystem):
+    def __init__(
+        self,
+        file_system: IFileSystem,
+        max_diff_chars: int | None = 10000,
+        stream_threshold: int = 8 * 1024 * 1024,
+    ):
         """初始化文本编辑器
 
         Args:
             file_system: 文件系统实例，用于获取终端和文件操作
+            max_diff_chars: 编辑结果中差异内容的最大字符数，超出时截断，None表示不限制，默认值为10000
+            stream_threshold: 超过该字节数的文件使用流式改写，不整体读入内存，默认值为8MB
+
+        Raises:
+            ValueError: 如果 max_diff_chars 或 stream_threshold 不是正数。
         """
+        if max_diff_chars is not None and max_diff_chars <= 0:
+            raise ValueError(f"max_diff_chars必须大于0：{max_diff_chars}")
+        if stream_threshold <= 0:
+            raise ValueError(f"stream_threshold必须大于0：{stream_threshold}")
         self._file_system = file_system
+        self._max_diff_chars = max_diff_chars
+        self._stream_threshold = stream_threshold
+        self._line_indexes: OrderedDict[str, _LineIndex] = OrderedDict()
+        self._line_indexes_lock = threading.Lock()
 
     async def open_file(self, file_path: str) -> str:
         """打开文件"""
@@ -100,6 +305,14 @@ class LocalTextEditor(ITextEditor):
         # 验证操作合法性
         self._validate_operations(operations, file_exists)
 
+        # 文件内容即将改变，丢弃缓存的行偏移索引
+        with self._line_indexes_lock:
+            self._line_indexes.pop(file_abs, None)
+
+        # 大文件使用流式改写，内存占用与文件大小无关
+        if file_exists and self._get_file_size(file_abs) > self._stream_threshold:
+            return await self._edit_file_streaming(file_abs, operations)
+
         # 获取编辑前的完整文件内容（用于diff）
         # lines 中每行不包含换行符，只是纯文本内容
         old_lines: list[str] = []
@@ -132,64 +345,92 @@ class LocalTextEditor(ITextEditor):
             return diff_output + "\n\n" + edit_result
         return edit_result
 
-    def _execute_delete_operation(self, new_lines: list[str], op: EditOperation) -> None:
+    def _execute_delete_operation(self, plan: _EditPlan, op: EditOperation) -> None:
         """执行删除操作"""
         if op.line == -1:
             # 删除最后一行
-            if new_lines:
-                new_lines.pop()
-        elif 1 <= op.line <= len(new_lines):
+            if plan:
+                plan.delete(len(plan) - 1)
+        elif 1 <= op.line <= len(plan):
             # 删除指定行
-            del new_lines[op.line - 1]
+            plan.delete(op.line - 1)
         elif op.line == 0 or op.line == 1:
             # 删除第一行
-            if new_lines:
-                del new_lines[0]
+            if plan:
+                plan.delete(0)
         else:
-            raise ValueError(f"删除行号超出范围：{op.line}，文件共有 {len(new_lines)} 行")
+            raise ValueError(f"删除行号超出范围：{op.line}，文件共有 {len(plan)} 行")
 
-    def _execute_insert_operation(self, new_lines: list[str], op: EditOperation) -> None:
+    def _execute_insert_operation(self, plan: _EditPlan, op: EditOperation) -> None:
         """执行插入操作（单行内容）"""
         # 直接使用内容，已由_preprocess_operations处理为单行
         content = op.content
 
         if op.line == 0 or op.line == 1:
             # 插入到开头
-            new_lines.insert(0, content)
+            plan.insert(0, content)
         elif op.line == -1:
             # 插入到末尾
-            new_lines.append(content)
+            plan.insert(len(plan), content)
         else:
-            # 插入到指定行之前，允许插入到当前最后一行之后（行号=len(new_lines)+1）
-            if 1 <= op.line <= len(new_lines) + 1:
-                new_lines.insert(op.line - 1, content)
+            # 插入到指定行之前，允许插入到当前最后一行之后（行号=len(plan)+1）
+            if 1 <= op.line <= len(plan) + 1:
+                plan.insert(op.line - 1, content)
             else:
-                raise ValueError(f"插入行号超出范围：{op.line}，文件共有 {len(new_lines)} 行")
+                raise ValueError(f"插入行号超出范围：{op.line}，文件共有 {len(plan)} 行")
 
 
-    def _execute_modify_operation(self, new_lines: list[str], op: EditOperation) -> None:
+    def _execute_modify_operation(self, plan: _EditPlan, op: EditOperation) -> None:
         """执行修改操作"""
         # 不再转义换行符，保持原始内容
         escaped_content = op.content
         if op.line == -1:
             # 修改最后一行
-            if new_lines:
-                new_lines[-1] = escaped_content
+            if plan:
+                plan.replace(len(plan) - 1, escaped_content)
             else:
                 # 空文件修改最后一行相当于插入
-                new_lines.append(escaped_content)
+                plan.insert(0, escaped_content)
         elif op.line == 0 or op.line == 1:
             # 修改第一行
-            if new_lines:
-                new_lines[0] = escaped_content
+            if plan:
+                plan.replace(0, escaped_content)
             else:
                 # 空文件修改第一行相当于插入
-                new_lines.append(escaped_content)
-        elif 1 <= op.line <= len(new_lines):
+                plan.insert(0, escaped_content)
+        elif 1 <= op.line <= len(plan):
             # 修改指定行
-            new_lines[op.line - 1] = escaped_content
+            plan.replace(op.line - 1, escaped_content)
         else:
-            raise ValueError(f"修改行号超出范围：{op.line}，文件共有 {len(new_lines)} 行")
+            raise ValueError(f"修改行号超出范围：{op.line}，文件共有 {len(plan)} 行")
+
+    def _build_edit_plan(self, old_count: int, operations: list[EditOperation]) -> _EditPlan:
+        """按传入顺序应用所有编辑操作，生成编辑计划
+
+        每个操作的行号都基于前面操作执行后的文件内容，编辑计划负责把它换算到原文件的行上，
+        不会实际移动文件中的行。
+
+        Args:
+            old_count: 原文件的行数
+            operations: 编辑操作列表
+
+        Returns:
+            编辑计划
+        """
+        plan = _EditPlan(old_count)
+
+        # 严格按照传入顺序执行操作，不排序，不合并
+        for op in operations:
+            if op.op == "delete":
+                self._execute_delete_operation(plan, op)
+            elif op.op == "insert":
+                # 严格插入单行内容，不自动拆分多行
+                # 如需插入多行，请使用多个EditOperation对象
+                self._execute_insert_operation(plan, op)
+            elif op.op == "modify":
+                self._execute_modify_operation(plan, op)
+
+        return plan
 
     def _apply_operations_in_memory(
         self,
@@ -200,6 +441,7 @@ class LocalTextEditor(ITextEditor):
         """在内存中应用所有编辑操作
         1. 不按行号排序，严格按照传入顺序执行
         2. 保留内容中的原始换行符，不进行转义处理
+        3. 先生成编辑计划，最后一次性生成编辑后的行列表
 
         Args:
             old_lines: 原始文件内容（按行分割，不包含换行符）
@@ -209,25 +451,151 @@ class LocalTextEditor(ITextEditor):
         Returns:
             编辑后的文件内容（按行分割，不包含换行符）
         """
-        # 创建副本，避免修改原始列表
-        new_lines = old_lines.copy() if old_lines else []
-
         # 如果文件不存在，从空列表开始
         if not file_exists:
-            new_lines = []
+            old_lines = []
 
-        # 严格按照传入顺序执行操作，不排序，不合并
-        for op in operations:
-            if op.op == "delete":
-                self._execute_delete_operation(new_lines, op)
-            elif op.op == "insert":
-                # 严格插入单行内容，不自动拆分多行
-                # 如需插入多行，请使用多个EditOperation对象
-                self._execute_insert_operation(new_lines, op)
-            elif op.op == "modify":
-                self._execute_modify_operation(new_lines, op)
+        plan = self._build_edit_plan(len(old_lines), operations)
+        return plan.materialize(old_lines)
 
-        return new_lines
+    def _get_file_size(self, file_abs: str) -> int:
+        """获取文件大小，获取失败时返回0"""
+        try:
+            return os.path.getsize(file_abs)
+        except OSError:
+            return 0
+
+    async def _iter_file_lines(self, file_abs: str) -> AsyncIterator[str]:
+        """流式读取文本文件，逐行返回不包含换行符的内容（与 str.splitlines 的分行规则一致）
+
+        Raises:
+            RuntimeError: 文件无法解码为UTF-8格式。
+        """
+        decoder = codecs.getincrementaldecoder("utf-8")()
+        pending = ""
+        try:
+            async for chunk in self._file_system.open_file_stream(file_abs, _STREAM_CHUNK_SIZE):
+                pending += decoder.decode(chunk)
+                pieces = pending.splitlines(keepends=True)
+                # 最后一段可能不完整（例如 \r\n 被拆分到两个块中），留到下一块一起处理
+                pending = pieces.pop() if pieces else ""
+                for piece in pieces:
+                    yield piece.splitlines()[0]
+            pending += decoder.decode(b"", final=True)
+        except UnicodeDecodeError as e:
+            raise RuntimeError(f"文件无法解码为UTF-8格式：{file_abs}") from e
+        for line in pending.splitlines():
+            yield line
+
+    async def _iter_rewritten_chunks(
+        self,
+        file_abs: str,
+        plan: _EditPlan,
+        context_indices: set[int],
+        context_lines: dict[int, str],
+    ) -> AsyncIterator[bytes]:
+        """边读取原文件边按编辑计划生成编辑后的内容
+
+        Args:
+            file_abs: 原文件路径
+            plan: 编辑计划
+            context_indices: 需要收集的原文件行索引（用于生成差异）
+            context_lines: 收集到的原文件行，键为行索引
+
+        Yields:
+            bytes: 编辑后的文件内容分块
+
+        Raises:
+            RuntimeError: 原文件在编辑过程中被修改。
+        """
+        source = aiter(self._iter_file_lines(file_abs))
+        old_index = 0
+        parts: list[str] = []
+        size = 0
+
+        def flush() -> bytes:
+            """取出已缓存的行并编码为一个数据块"""
+            nonlocal size
+            chunk = ('\n'.join(parts) + '\n').encode('utf-8')
+            parts.clear()
+            size = 0
+            return chunk
+
+        async def read_until(stop: int, keep_from: int) -> AsyncIterator[bytes]:
+            """读取原文件到第 stop 行之前，keep_from 之前的行为被删除的行，缓存超过块大小时立即输出"""
+            nonlocal old_index, size
+            while old_index < stop:
+                line = await anext(source, None)
+                if line is None:
+                    raise RuntimeError(f"文件在编辑过程中被修改：{file_abs}")
+                if old_index in context_indices:
+                    context_lines[old_index] = line
+                if old_index >= keep_from:
+                    parts.append(line)
+                    size += len(line) + 1
+                    if size >= _STREAM_CHUNK_SIZE:
+                        yield flush()
+                old_index += 1
+
+        for segment in plan.get_segments():
+            if isinstance(segment, range):
+                async for chunk in read_until(segment.stop, segment.start):
+                    yield chunk
+            else:
+                # 写入时转义行内容中的换行符，避免干扰文件结构
+                for content in segment:
+                    escaped = content.replace('\n', '\\n')
+                    parts.append(escaped)
+                    size += len(escaped) + 1
+                    if size >= _STREAM_CHUNK_SIZE:
+                        yield flush()
+
+        # 剩余的行都已被删除
+        async for chunk in read_until(plan.get_old_count(), plan.get_old_count()):
+            yield chunk
+        if await anext(source, None) is not None:
+            raise RuntimeError(f"文件在编辑过程中被修改：{file_abs}")
+        if parts:
+            yield flush()
+
+    async def _edit_file_streaming(self, file_abs: str, operations: list[EditOperation]) -> str:
+        """流式编辑大文件：先统计行数生成编辑计划，再边读边写到临时文件后替换原文件
+
+        只有编辑计划、变化附近的上下文行和单个数据块驻留内存。
+
+        Args:
+            file_abs: 目标文件绝对路径
+            operations: 编辑操作列表
+
+        Returns:
+            编辑前后对比与写入结果
+        """
+        # 第一遍：统计行数
+        old_count = 0
+        async for _ in self._iter_file_lines(file_abs):
+            old_count += 1
+
+        plan = self._build_edit_plan(old_count, operations)
+
+        # 第二遍：改写文件，同时收集生成差异所需的原文件行
+        k = 3
+        context_lines: dict[int, str] = {}
+        chunks = self._iter_rewritten_chunks(file_abs, plan, plan.get_context_indices(k), context_lines)
+        edit_result = await self._file_system.save_file_stream(file_abs, chunks, replace=True)
+
+        # 编辑计划中已经记录了保留的行，直接生成差异块，无需重新计算差异
+        new_lines = {index: line.replace('\n', '\\n') for index, line in plan.get_inserted_lines().items()}
+        hunks = iter_hunks(
+            _SparseLines(old_count, context_lines),
+            _SparseLines(len(plan), new_lines),
+            k=k,
+            matches=plan.iter_matches(),
+        )
+        diff_output = self._format_hunks_output(file_abs, hunks)
+
+        if diff_output:
+            return diff_output + "\n\n" + edit_result
+        return edit_result
 
     async def _write_file_async(self, file_path: str, lines: list[str]) -> str:
         """异步写入文件（使用filesystem.save_file方法）
@@ -288,15 +656,37 @@ class LocalTextEditor(ITextEditor):
                     raise ValueError(f"非法操作类型（索引 {idx}）：{op.op}，仅支持 {allowed_ops}")
 
 
-    async def view(self, file_path: str) -> str:
+    async def view(
+        self,
+        file_path: str,
+        start_line: int | None = None,
+        end_line: int | None = None,
+        max_bytes: int | None = None,
+    ) -> str:
         """查看文件内容，按行切分并标注行号
 
+        文件通过mmap映射读取，并缓存每个文件的行偏移索引（文件修改时间或大小变化时重建），
+        重复查看同一个大文件的某个范围时，只读取该范围的内容。
+
         Args:
             file_path: 目标文件路径
+            start_line: 起始行号（从1开始，包含），None表示从第一行开始
+            end_line: 结束行号（包含），None表示到最后一行
+            max_bytes: 输出的最大字节数，超出时截断并提示继续查看的起始行号，None表示不限制
 
         Returns:
             带行号的文件内容字符串，格式为表格形式，或文件不存在/为空的提示信息
+
+        Raises:
+            ValueError: 行号范围或 max_bytes 无效
         """
+        if start_line is not None and start_line < 1:
+            raise ValueError(f"起始行号必须大于0：{start_line}")
+        if end_line is not None and end_line < (start_line or 1):
+            raise ValueError(f"结束行号不能小于起始行号：start_line={start_line}, end_line={end_line}")
+        if max_bytes is not None and max_bytes <= 0:
+            raise ValueError(f"max_bytes必须大于0：{max_bytes}")
+
         # 检查文件是否存在
         allowed_path = self._file_system.get_terminal().check_path(file_path)
         if not allowed_path:
@@ -309,38 +699,71 @@ class LocalTextEditor(ITextEditor):
             return "文件不存在或为空,编辑时会自动创建"
 
         try:
-            # 检查文件大小
-            file_size = os.path.getsize(file_abs)
-
-            # 如果文件为空，返回提示信息
-            if file_size == 0:
-                return "文件不存在或为空,编辑时会自动创建"
-
-            # 使用文件系统的open_file方法读取文件内容
-            content = await self._file_system.open_file(file_abs, "text", "utf-8")
-
-            # 如果返回的是bytes，尝试解码为字符串
-            if isinstance(content, bytes):
-                try:
-                    content = content.decode('utf-8')
-                except UnicodeDecodeError:
-                    raise RuntimeError(f"文件无法解码为UTF-8格式：{file_path}")
-
-            # 按行分割内容
-            lines = content.split('\n')
-            # 构建表格格式的输出
-            result_lines: list[str] = []
-            # 为每一行添加行号
-            for i, line in enumerate(lines, 1):
-                result_lines.append(f"{i}  {line}")
-
-            # 重新拼接为字符串
-            return '\n'.join(result_lines)
-
+            # mmap和建立索引都是同步阻塞操作，放到线程中执行
+            return await asyncify(self._read_view)(file_abs, start_line or 1, end_line, max_bytes)
         except Exception:
             # 如果发生异常，也返回提示信息
             return "文件不存在或为空,编辑时会自动创建"
 
+    def _get_line_offsets(self, file_abs: str, stat: os.stat_result, mm: mmap.mmap) -> array:
+        """获取文件的行偏移索引，文件未变化时直接使用缓存"""
+        with self._line_indexes_lock:
+            cached = self._line_indexes.get(file_abs)
+            if cached is not None and cached.mtime_ns == stat.st_mtime_ns and cached.size == stat.st_size:
+                self._line_indexes.move_to_end(file_abs)
+                return cached.offsets
+
+        offsets = _build_line_offsets(mm)
+        with self._line_indexes_lock:
+            self._line_indexes[file_abs] = _LineIndex(stat.st_mtime_ns, stat.st_size, offsets)
+            self._line_indexes.move_to_end(file_abs)
+            while len(self._line_indexes) > _LINE_INDEX_CACHE_SIZE:
+                self._line_indexes.popitem(last=False)
+        return offsets
+
+    def _read_view(self, file_abs: str, start_line: int, end_line: int | None, max_bytes: int | None) -> str:
+        """读取指定范围的行并标注行号（同步方法）
+
+        Raises:
+            UnicodeDecodeError: 文件内容无法解码为UTF-8格式
+        """
+        with open(file_abs, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            # 如果文件为空，返回提示信息（空文件无法mmap）
+            if stat.st_size == 0:
+                return "文件不存在或为空,编辑时会自动创建"
+
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                offsets = self._get_line_offsets(file_abs, stat, mm)
+                total = len(offsets)
+                if start_line > total:
+                    return f"起始行号超出范围：{start_line}，文件共有 {total} 行"
+                last_line = total if end_line is None else min(end_line, total)
+
+                # 构建表格格式的输出，为每一行添加行号
+                result_lines: list[str] = []
+                size = 0
+                for index in range(start_line - 1, last_line):
+                    line_end = offsets[index + 1] - 1 if index + 1 < total else len(mm)
+                    raw = mm[offsets[index]:line_end]
+                    prefix = f"{index + 1}  "
+                    size += len(prefix) + len(raw) + 1
+                    if max_bytes is not None and size > max_bytes:
+                        if not result_lines:
+                            # 单行超过上限时只显示该行开头的部分
+                            keep = max(0, max_bytes - len(prefix))
+                            result_lines.append(prefix + raw[:keep].decode('utf-8', errors='ignore'))
+                            index += 1
+                        result_lines.append(
+                            f"...[输出超过 {max_bytes} 字节已截断，文件共有 {total} 行，"
+                            f"可从第 {index + 1} 行继续查看]"
+                        )
+                        break
+                    result_lines.append(prefix + raw.decode('utf-8'))
+
+                # 重新拼接为字符串
+                return '\n'.join(result_lines)
+
     async def _get_lines_content(self, file_path: str, line_numbers: list[int]) -> dict[int, str]:
         """获取文件指定行号的内容
 
@@ -407,11 +830,23 @@ class LocalTextEditor(ITextEditor):
         if old_lines == new_lines:
             return ""
         
-        # 使用diff.py的函数计算差异
-        diff_items = diff_lines(old_lines, new_lines)
+        # 使用diff.py的函数按差异块逐个生成差异
+        return self._format_hunks_output(file_path, iter_hunks(old_lines, new_lines, k=k))
+
+    def _format_hunks_output(self, file_path: str, hunks: Iterator[Hunk]) -> str:
+        """将差异块格式化为git diff风格的输出，没有差异块时返回空字符串
+
+        Args:
+            file_path: 文件路径
+            hunks: 差异块
+
+        Returns:
+            文本格式的差异显示（类似git diff风格）
+        """
+        first_hunk = next(hunks, None)
         
         # 如果没有差异，不显示diff
-        if not diff_items:
+        if first_hunk is None:
             return ""
         
         # 生成git diff风格的头部
@@ -421,8 +856,8 @@ class LocalTextEditor(ITextEditor):
         lines.append(f"+++ b/{file_path}")
         lines.append("")
         
-        # 使用diff_to_text生成差异内容（带上下文）
-        diff_text = diff_to_text(diff_items, old_lines, new_lines, k=k)
+        # 逐个渲染差异块（带上下文），超出上限时截断
+        diff_text = hunks_to_text(chain([first_hunk], hunks), max_chars=self._max_diff_chars)
         lines.append(diff_text)
         
         return "\n".join(lines)
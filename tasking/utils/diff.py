@@ -1,3 +1,5 @@
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from itertools import chain
 from typing import NamedTuple
 from enum import Enum
 
@@ -21,6 +23,183 @@ class DiffItem(NamedTuple):
     """内容"""
 
 
+def _middle_snake(
+    a: list[int], a_lo: int, a_hi: int,
+    b: list[int], b_lo: int, b_hi: int,
+) -> tuple[int, int, int, int]:
+    """Myers 线性空间算法：同时从两端搜索最短编辑路径，返回路径中间的蛇形匹配段。
+
+    Args:
+        a: 旧序列。
+        a_lo: 旧序列区间起点。
+        a_hi: 旧序列区间终点（不含）。
+        b: 新序列。
+        b_lo: 新序列区间起点。
+        b_hi: 新序列区间终点（不含）。
+
+    Returns:
+        tuple[int, int, int, int]: 中间蛇形段的起点和终点 (x0, y0, x1, y1)，相对于区间起点。
+    """
+    n = a_hi - a_lo
+    m = b_hi - b_lo
+    delta = n - m
+    odd = delta & 1
+    max_d = (n + m + 1) // 2
+    offset = max_d + 1
+    forward = [0] * (2 * max_d + 3)
+    backward = [0] * (2 * max_d + 3)
+
+    for d in range(max_d + 1):
+        # 正向搜索
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and forward[offset + k - 1] < forward[offset + k + 1]):
+                x = forward[offset + k + 1]
+            else:
+                x = forward[offset + k - 1] + 1
+            y = x - k
+            x0, y0 = x, y
+            while x < n and y < m and a[a_lo + x] == b[b_lo + y]:
+                x += 1
+                y += 1
+            forward[offset + k] = x
+            if odd and delta - (d - 1) <= k <= delta + (d - 1):
+                if x + backward[offset + delta - k] >= n:
+                    return x0, y0, x, y
+
+        # 反向搜索（在反转的序列上进行，对角线 k 对应正向对角线 delta - k）
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and backward[offset + k - 1] < backward[offset + k + 1]):
+                x = backward[offset + k + 1]
+            else:
+                x = backward[offset + k - 1] + 1
+            y = x - k
+            x0, y0 = x, y
+            while x < n and y < m and a[a_hi - 1 - x] == b[b_hi - 1 - y]:
+                x += 1
+                y += 1
+            backward[offset + k] = x
+            if not odd and -d <= delta - k <= d:
+                if x + forward[offset + delta - k] >= n:
+                    return n - x, m - y, n - x0, m - y0
+
+    raise RuntimeError("未找到中间蛇形段（内部错误）")
+
+
+def match_lines(old_lines: Sequence[str], new_lines: Sequence[str]) -> list[tuple[int, int]]:
+    """计算两个行列表的最长公共子序列，返回匹配的索引对列表（按索引递增）。
+
+    使用 Myers 差分算法的线性空间版本：
+    1. 先裁剪公共前缀和公共后缀，大部分编辑只改动少数几行，可以直接跳过未改动的部分
+    2. 只在一侧出现的行不可能匹配，提前剔除，缩小搜索规模
+    3. 对剩余部分按中间蛇形段分治，时间 O((N+M)·D)，空间 O(N+M)，D 为编辑距离
+
+    Args:
+        old_lines: 旧列表。
+        new_lines: 新列表。
+
+    Returns:
+        list[tuple[int, int]]: 匹配的 (旧索引, 新索引) 列表，索引从0开始。
+    """
+    old_len, new_len = len(old_lines), len(new_lines)
+
+    # 1. 公共前缀/后缀
+    prefix = 0
+    limit = min(old_len, new_len)
+    while prefix < limit and old_lines[prefix] == new_lines[prefix]:
+        prefix += 1
+    suffix = 0
+    limit -= prefix
+    while suffix < limit and old_lines[old_len - 1 - suffix] == new_lines[new_len - 1 - suffix]:
+        suffix += 1
+
+    matches: list[tuple[int, int]] = [(i, i) for i in range(prefix)]
+
+    # 2. 行内容映射为整数，并剔除只在一侧出现的行
+    old_mid = old_lines[prefix:old_len - suffix]
+    new_mid = new_lines[prefix:new_len - suffix]
+    if old_mid and new_mid:
+        ids: dict[str, int] = {}
+        for line in new_mid:
+            ids.setdefault(line, len(ids))
+        old_index = [i for i, line in enumerate(old_mid) if line in ids]
+        a = [ids[old_mid[i]] for i in old_index]
+        old_ids = set(a)
+        new_index = [j for j, line in enumerate(new_mid) if ids[line] in old_ids]
+        b = [ids[new_mid[j]] for j in new_index]
+
+        # 3. 分治求解，使用显式栈避免递归过深
+        middle: list[tuple[int, int]] = []
+        stack = [(0, len(a), 0, len(b))]
+        while stack:
+            a_lo, a_hi, b_lo, b_hi = stack.pop()
+            # 区间内的公共前缀/后缀
+            while a_lo < a_hi and b_lo < b_hi and a[a_lo] == b[b_lo]:
+                middle.append((a_lo, b_lo))
+                a_lo += 1
+                b_lo += 1
+            while a_lo < a_hi and b_lo < b_hi and a[a_hi - 1] == b[b_hi - 1]:
+                a_hi -= 1
+                b_hi -= 1
+                middle.append((a_hi, b_hi))
+            if a_lo == a_hi or b_lo == b_hi:
+                continue
+
+            x0, y0, x1, y1 = _middle_snake(a, a_lo, a_hi, b, b_lo, b_hi)
+            middle.extend((a_lo + x0 + i, b_lo + y0 + i) for i in range(x1 - x0))
+            stack.append((a_lo + x1, a_hi, b_lo + y1, b_hi))
+            stack.append((a_lo, a_lo + x0, b_lo, b_lo + y0))
+
+        middle.sort()
+        matches.extend((prefix + old_index[i], prefix + new_index[j]) for i, j in middle)
+
+    matches.extend((old_len - suffix + i, new_len - suffix + i) for i in range(suffix))
+    return matches
+
+
+def _diff_from_matches(
+    old_lines: list[str],
+    new_lines: list[str],
+    matches: list[tuple[int, int]],
+) -> list[DiffItem]:
+    """根据匹配的索引对生成差异列表，每段差异中删除行在前、插入行在后。"""
+    diff_items: list[DiffItem] = []
+    old_idx = 0
+    new_idx = 0
+    # 末尾追加哨兵，统一处理最后一段差异
+    for match_old, match_new in [*matches, (len(old_lines), len(new_lines))]:
+        # 处理旧文件中需要删除的行（在匹配之前）
+        for i in range(old_idx, match_old):
+            diff_items.append(DiffItem(
+                line=i + 1,  # 旧文件中的行号（从1开始）
+                operation=Operation.DELETE,
+                content=old_lines[i].rstrip('\n\r')
+            ))
+        # 处理新文件中需要插入的行（在匹配之前）
+        for j in range(new_idx, match_new):
+            diff_items.append(DiffItem(
+                line=j + 1,  # 新文件中的行号（从1开始）
+                operation=Operation.INSERT,
+                content=new_lines[j].rstrip('\n\r')
+            ))
+        # 跳过匹配的行（相同行不添加到diff中）
+        old_idx = match_old + 1
+        new_idx = match_new + 1
+    return diff_items
+
+
+def _iter_matches_from_diff(
+    diff_items: list[DiffItem],
+    old_len: int,
+    new_len: int,
+) -> Iterator[tuple[int, int]]:
+    """从差异列表还原匹配的索引对：未删除的旧行与未插入的新行按顺序一一对应，无需重新计算LCS。"""
+    deleted = {item.line - 1 for item in diff_items if item.operation == Operation.DELETE}
+    inserted = {item.line - 1 for item in diff_items if item.operation == Operation.INSERT}
+    kept_old = (i for i in range(old_len) if i not in deleted)
+    kept_new = (j for j in range(new_len) if j not in inserted)
+    return zip(kept_old, kept_new)
+
+
 def diff_lines(old_lines: list[str], new_lines: list[str]) -> list[DiffItem]:
     """比较两个列表，返回差异（类似GitHub diff风格）。
 
@@ -32,231 +211,251 @@ def diff_lines(old_lines: list[str], new_lines: list[str]) -> list[DiffItem]:
         list[DiffItem]: 差异列表，每个元素为 DiffItem 对象。
         行号表示在新文件中的行号（对于INSERT）或旧文件中的行号（对于DELETE）。
     """
-    # 使用最长公共子序列（LCS）算法计算差异
-    def lcs(x: list[str], y: list[str]) -> list[tuple[int, int]]:
-        """计算最长公共子序列，返回匹配的索引对列表"""
-        m, n = len(x), len(y)
-        # dp[i][j] 表示 x[0:i] 和 y[0:j] 的最长公共子序列长度
-        dp = [[0] * (n + 1) for _ in range(m + 1)]
-        
-        # 填充dp表
-        for i in range(1, m + 1):
-            for j in range(1, n + 1):
-                if x[i - 1] == y[j - 1]:
-                    dp[i][j] = dp[i - 1][j - 1] + 1
-                else:
-                    dp[i][j] = max(dp[i - 1][j], dp[i][j - 1])
-        
-        # 回溯找到LCS的索引对
-        matches: list[tuple[int, int]] = []
-        i, j = m, n
-        while i > 0 and j > 0:
-            if x[i - 1] == y[j - 1]:
-                matches.append((i - 1, j - 1))
-                i -= 1
-                j -= 1
-            elif dp[i - 1][j] > dp[i][j - 1]:
-                i -= 1
-            else:
-                j -= 1
-        
-        return matches[::-1]  # 反转列表
-    
-    # 计算LCS匹配
-    matches = lcs(old_lines, new_lines)
-    
-    # 构建差异列表
-    diff_items: list[DiffItem] = []
+    return _diff_from_matches(old_lines, new_lines, match_lines(old_lines, new_lines))
+
+
+class HunkLine(NamedTuple):
+    """差异块中的一行"""
+
+    old_line: int
+    """旧文件中的行号（从1开始），插入行为0"""
+    new_line: int
+    """新文件中的行号（从1开始），删除行为0"""
+    operation: Operation | None
+    """操作类型，上下文行为None"""
+    content: str
+    """内容"""
+
+
+class Hunk(NamedTuple):
+    """差异块（对应统一diff格式中的一个 `@@ -a,b +c,d @@` 段落）"""
+
+    old_start: int
+    """旧文件起始行号"""
+    old_count: int
+    """旧文件行数"""
+    new_start: int
+    """新文件起始行号"""
+    new_count: int
+    """新文件行数"""
+    lines: list[HunkLine]
+    """差异块中的行（上下文行、删除行、插入行）"""
+
+    def header(self) -> str:
+        """差异块头部，格式为 `@@ -a,b +c,d @@`"""
+        return f"@@ -{self.old_start},{self.old_count} +{self.new_start},{self.new_count} @@"
+
+
+def _iter_change_blocks(
+    matches: Iterable[tuple[int, int]],
+    old_len: int,
+    new_len: int,
+) -> Iterator[tuple[int, int, int, int]]:
+    """根据匹配的索引对，按顺序生成变化区间 (旧起点, 旧终点, 新起点, 新终点)，终点不含。"""
     old_idx = 0
     new_idx = 0
-    match_idx = 0
-    
-    while old_idx < len(old_lines) or new_idx < len(new_lines):
-        # 检查是否有匹配
-        if match_idx < len(matches):
-            match_old, match_new = matches[match_idx]
-            
-            # 处理旧文件中需要删除的行（在匹配之前）
-            while old_idx < match_old:
-                diff_items.append(DiffItem(
-                    line=old_idx + 1,  # 旧文件中的行号（从1开始）
-                    operation=Operation.DELETE,
-                    content=old_lines[old_idx].rstrip('\n\r')
-                ))
-                old_idx += 1
-            
-            # 处理新文件中需要插入的行（在匹配之前）
-            while new_idx < match_new:
-                diff_items.append(DiffItem(
-                    line=new_idx + 1,  # 新文件中的行号（从1开始）
-                    operation=Operation.INSERT,
-                    content=new_lines[new_idx].rstrip('\n\r')
-                ))
-                new_idx += 1
-            
-            # 跳过匹配的行（相同行不添加到diff中）
-            old_idx = match_old + 1
-            new_idx = match_new + 1
-            match_idx += 1
+    for match_old, match_new in chain(matches, [(old_len, new_len)]):
+        if match_old > old_idx or match_new > new_idx:
+            yield old_idx, match_old, new_idx, match_new
+        old_idx = match_old + 1
+        new_idx = match_new + 1
+
+
+def _build_hunk(
+    blocks: list[tuple[int, int, int, int]],
+    old_lines: Sequence[str],
+    new_lines: Sequence[str],
+    context: int,
+) -> Hunk:
+    """将若干相邻的变化区间及其上下文组装为一个差异块。"""
+    lines: list[HunkLine] = []
+
+    # 前置上下文：变化区间之间的行都是匹配行，旧行号加上偏移即为新行号
+    first_old, _, first_new, _ = blocks[0]
+    old_lo = max(0, first_old - context)
+    new_lo = old_lo + first_new - first_old
+    for i in range(old_lo, first_old):
+        lines.append(HunkLine(i + 1, i + 1 + first_new - first_old, None, old_lines[i].rstrip('\n\r')))
+
+    for index, (block_old_lo, block_old_hi, block_new_lo, block_new_hi) in enumerate(blocks):
+        for i in range(block_old_lo, block_old_hi):
+            lines.append(HunkLine(i + 1, 0, Operation.DELETE, old_lines[i].rstrip('\n\r')))
+        for j in range(block_new_lo, block_new_hi):
+            lines.append(HunkLine(0, j + 1, Operation.INSERT, new_lines[j].rstrip('\n\r')))
+
+        # 与下一个变化区间之间的上下文，或者末尾的后置上下文
+        shift = block_new_hi - block_old_hi
+        if index + 1 < len(blocks):
+            context_end = blocks[index + 1][0]
         else:
-            # 没有更多匹配，处理剩余的行
-            # 删除旧文件中剩余的行
-            while old_idx < len(old_lines):
-                diff_items.append(DiffItem(
-                    line=old_idx + 1,
-                    operation=Operation.DELETE,
-                    content=old_lines[old_idx].rstrip('\n\r')
-                ))
-                old_idx += 1
-            
-            # 插入新文件中剩余的行
-            while new_idx < len(new_lines):
-                diff_items.append(DiffItem(
-                    line=new_idx + 1,
-                    operation=Operation.INSERT,
-                    content=new_lines[new_idx].rstrip('\n\r')
-                ))
-                new_idx += 1
-    
-    return diff_items
+            context_end = min(len(old_lines), block_old_hi + context)
+        for i in range(block_old_hi, context_end):
+            lines.append(HunkLine(i + 1, i + 1 + shift, None, old_lines[i].rstrip('\n\r')))
 
+    last_old_hi, last_new_hi = blocks[-1][1], blocks[-1][3]
+    old_hi = min(len(old_lines), last_old_hi + context)
+    new_hi = old_hi + last_new_hi - last_old_hi
+    old_count = old_hi - old_lo
+    new_count = new_hi - new_lo
+    return Hunk(
+        # 按照统一diff格式，行数为0时起始行号为前一行
+        old_start=old_lo + 1 if old_count else old_lo,
+        old_count=old_count,
+        new_start=new_lo + 1 if new_count else new_lo,
+        new_count=new_count,
+        lines=lines,
+    )
+
+
+def iter_hunks(
+    old_lines: Sequence[str],
+    new_lines: Sequence[str],
+    k: int = 3,
+    matches: Iterable[tuple[int, int]] | None = None,
+) -> Iterator[Hunk]:
+    """逐个生成差异块，上下文相互重叠或相邻的变化合并为同一个差异块。
+
+    生成器每次只保留当前差异块，相距很远的两处修改不会把中间的内容都带上。
 
-def _get_context_lines(
-    diff_items: list[DiffItem],
-    old_lines: list[str],
-    new_lines: list[str],
-    k: int
-) -> list[tuple[int, int, Operation, str, bool]]:
-    """获取需要显示的行（包括变化行和上下文行）。
-    
     Args:
-        diff_items: 差异列表。
         old_lines: 旧文件行列表。
         new_lines: 新文件行列表。
-        k: 保留变化内容的上下 k 行内容。当设置为 -1 时，保留所有内容。
-    
+        k: 每个差异块保留变化内容的上下 k 行内容，默认 3 行。小于0时不保留上下文。
+        matches: 已经计算好的匹配索引对（按索引递增），为None时使用 `match_lines` 计算。
+            传入匹配时，old_lines/new_lines 只需要能按索引取到差异块中用到的行。
+
+    Yields:
+        Hunk: 差异块
+    """
+    if matches is None:
+        matches = match_lines(old_lines, new_lines)
+    context = max(k, 0)
+
+    pending: list[tuple[int, int, int, int]] = []
+    for block in _iter_change_blocks(matches, len(old_lines), len(new_lines)):
+        # 与上一个变化区间之间的匹配行超过 2k 行时，上下文不重叠，拆分为新的差异块
+        if pending and block[0] - pending[-1][1] > 2 * context:
+            yield _build_hunk(pending, old_lines, new_lines, context)
+            pending = []
+        pending.append(block)
+    if pending:
+        yield _build_hunk(pending, old_lines, new_lines, context)
+
+
+def _escape_html(content: str) -> str:
+    """转义HTML特殊字符"""
+    return (content
+            .replace("&", "&amp;")
+            .replace("<", "&lt;")
+            .replace(">", "&gt;")
+            .replace('"', "&quot;")
+            .replace("'", "&#39;"))
+
+
+def _html_row(display_line: int | str, op_symbol: str, content: str, bg_color: str, text_color: str) -> str:
+    return (
+        f'<tr style="background-color: {bg_color};">'
+        f'<td style="padding: 8px; border: 1px solid #d0d7de; color: {text_color};">{display_line}</td>'
+        f'<td style="padding: 8px; border: 1px solid #d0d7de; color: {text_color}; font-weight: bold;">{op_symbol}</td>'
+        f'<td style="padding: 8px; border: 1px solid #d0d7de; color: {text_color}; white-space: pre-wrap;">{_escape_html(content)}</td>'
+        '</tr>'
+    )
+
+
+def _hunk_to_text_lines(hunk: Hunk) -> Iterator[str]:
+    """将差异块渲染为文本行"""
+    yield hunk.header()
+    for line in hunk.lines:
+        if line.operation is None:
+            # 上下文行使用空格作为操作符
+            yield rf" {line.old_line:4d}  {line.content}"
+        elif line.operation == Operation.INSERT:
+            yield rf"+{line.new_line:4d}  {line.content}"
+        else:  # DELETE
+            yield rf"-{line.old_line:4d}  {line.content}"
+
+
+def _hunk_to_html_rows(hunk: Hunk) -> Iterator[str]:
+    """将差异块渲染为HTML表格行"""
+    yield (
+        '<tr style="background-color: #ddf4ff;">'
+        f'<td colspan="3" style="padding: 8px; border: 1px solid #d0d7de; color: #57606a;">{hunk.header()}</td>'
+        '</tr>'
+    )
+    for line in hunk.lines:
+        if line.operation is None:
+            # 上下文行使用灰色背景
+            yield _html_row(line.old_line, " ", line.content, "#f6f8fa", "#57606a")
+        elif line.operation == Operation.INSERT:
+            yield _html_row(line.new_line, line.operation.value, line.content, "#d4edda", "#155724")
+        else:  # DELETE
+            yield _html_row(line.old_line, line.operation.value, line.content, "#f8d7da", "#721c24")
+
+
+def _render_hunks(
+    hunks: Iterable[Hunk],
+    render: Callable[[Hunk], Iterator[str]],
+    max_chars: int | None,
+) -> tuple[list[str], bool, int]:
+    """逐个渲染差异块，总长度超过上限时停止渲染。
+
     Returns:
-        list[tuple[int, int, Operation, str, bool]]: (旧文件行号, 新文件行号, 操作类型, 内容, 是否为上下文行)
+        tuple[list[str], bool, int]: (渲染结果片段, 是否截断, 未显示的差异块数量)
     """
-    if k == -1:
-        # 保留所有内容，只显示变化行
-        result: list[tuple[int, int, Operation, str, bool]] = []
-        for item in diff_items:
-            if item.operation == Operation.DELETE:
-                result.append((item.line, 0, item.operation, item.content, False))
-            else:  # INSERT
-                result.append((0, item.line, item.operation, item.content, False))
-        return result
-    
-    # 重新计算LCS以找到匹配的行
-    def lcs(x: list[str], y: list[str]) -> list[tuple[int, int]]:
-        """计算最长公共子序列，返回匹配的索引对列表"""
-        m, n = len(x), len(y)
-        dp = [[0] * (n + 1) for _ in range(m + 1)]
-        
-        for i in range(1, m + 1):
-            for j in range(1, n + 1):
-                if x[i - 1] == y[j - 1]:
-                    dp[i][j] = dp[i - 1][j - 1] + 1
-                else:
-                    dp[i][j] = max(dp[i - 1][j], dp[i][j - 1])
-        
-        matches: list[tuple[int, int]] = []
-        i, j = m, n
-        while i > 0 and j > 0:
-            if x[i - 1] == y[j - 1]:
-                matches.append((i - 1, j - 1))
-                i -= 1
-                j -= 1
-            elif dp[i - 1][j] > dp[i][j - 1]:
-                i -= 1
-            else:
-                j -= 1
-        
-        return matches[::-1]
-    
-    matches = lcs(old_lines, new_lines)
-    
-    # 收集所有变化行的位置
-    changed_old_lines: set[int] = set()
-    changed_new_lines: set[int] = set()
-    for item in diff_items:
-        if item.operation == Operation.DELETE:
-            changed_old_lines.add(item.line - 1)  # 转换为0-based索引
-        else:  # INSERT
-            changed_new_lines.add(item.line - 1)  # 转换为0-based索引
-    
-    # 确定需要显示的行范围
-    if not changed_old_lines and not changed_new_lines:
-        return []
-    
-    all_changed_old = changed_old_lines if changed_old_lines else {0}
-    all_changed_new = changed_new_lines if changed_new_lines else {0}
-    
-    min_old_idx = min(all_changed_old) if all_changed_old else 0
-    max_old_idx = max(all_changed_old) if all_changed_old else len(old_lines) - 1
-    min_new_idx = min(all_changed_new) if all_changed_new else 0
-    max_new_idx = max(all_changed_new) if all_changed_new else len(new_lines) - 1
-    
-    # 扩展范围以包含上下文
-    start_old = max(0, min_old_idx - k)
-    end_old = min(len(old_lines), max_old_idx + k + 1)
-    start_new = max(0, min_new_idx - k)
-    end_new = min(len(new_lines), max_new_idx + k + 1)
-    
-    # 构建匹配映射
-    match_map_old_to_new: dict[int, int] = {old_idx: new_idx for old_idx, new_idx in matches}
-    match_map_new_to_old: dict[int, int] = {new_idx: old_idx for old_idx, new_idx in matches}
-    
-    result_lines: list[tuple[int, int, Operation, str, bool]] = []
-    seen: set[tuple[int, int]] = set()
-    
-    # 处理旧文件中的行
-    for old_idx in range(start_old, end_old):
-        if old_idx in match_map_old_to_new:
-            new_idx = match_map_old_to_new[old_idx]
-            if old_idx in changed_old_lines:
-                # 这是删除的行
-                content = old_lines[old_idx].rstrip('\n\r')
-                result_lines.append((old_idx + 1, 0, Operation.DELETE, content, False))
-                seen.add((old_idx, -1))
-            elif new_idx >= start_new and new_idx < end_new:
-                # 这是上下文行（相同的行）
-                content = old_lines[old_idx].rstrip('\n\r')
-                if (old_idx, new_idx) not in seen:
-                    result_lines.append((old_idx + 1, new_idx + 1, Operation.DELETE, content, True))
-                    seen.add((old_idx, new_idx))
-        elif old_idx in changed_old_lines:
-            # 删除的行，但不在匹配中
-            content = old_lines[old_idx].rstrip('\n\r')
-            result_lines.append((old_idx + 1, 0, Operation.DELETE, content, False))
-            seen.add((old_idx, -1))
-    
-    # 处理新文件中的行
-    for new_idx in range(start_new, end_new):
-        if new_idx in match_map_new_to_old:
-            old_idx = match_map_new_to_old[new_idx]
-            if new_idx in changed_new_lines and (old_idx, new_idx) not in seen:
-                # 这是插入的行
-                content = new_lines[new_idx].rstrip('\n\r')
-                result_lines.append((0, new_idx + 1, Operation.INSERT, content, False))
-                seen.add((-1, new_idx))
-        elif new_idx in changed_new_lines:
-            # 插入的行，但不在匹配中
-            content = new_lines[new_idx].rstrip('\n\r')
-            result_lines.append((0, new_idx + 1, Operation.INSERT, content, False))
-            seen.add((-1, new_idx))
-    
-    # 按旧文件行号排序，如果旧文件行号为0则按新文件行号排序
-    result_lines.sort(key=lambda x: (x[0] if x[0] > 0 else x[1], x[1]))
-    return result_lines
+    parts: list[str] = []
+    size = 0
+    hunk_iter = iter(hunks)
+    for hunk in hunk_iter:
+        for part in render(hunk):
+            size += len(part) + 1
+            if max_chars is not None and size > max_chars:
+                # 剩余的差异块只计数，不渲染
+                return parts, True, sum(1 for _ in hunk_iter)
+            parts.append(part)
+    return parts, False, 0
+
+
+def hunks_to_text(hunks: Iterable[Hunk], max_chars: int | None = None) -> str:
+    """将差异块逐个渲染为文本格式（类似git diff格式），可限制输出的总字符数。
+
+    Args:
+        hunks: 差异块，可以是 `iter_hunks` 返回的生成器。
+        max_chars: 输出的最大字符数，超出时截断并提示未显示的差异块数量。None表示不限制。
+
+    Returns:
+        str: 文本格式的差异显示。
+    """
+    parts, truncated, remaining = _render_hunks(hunks, _hunk_to_text_lines, max_chars)
+    if truncated:
+        parts.append(f"...[差异输出超过 {max_chars} 字符已截断，另有 {remaining} 个差异块未显示]")
+    return "\n".join(parts)
+
+
+def hunks_to_html(hunks: Iterable[Hunk], max_chars: int | None = None) -> str:
+    """将差异块逐个渲染为 HTML 表格行，可限制输出的总字符数。
+
+    Args:
+        hunks: 差异块，可以是 `iter_hunks` 返回的生成器。
+        max_chars: 表格行的最大字符数，超出时截断并提示未显示的差异块数量。None表示不限制。
+
+    Returns:
+        str: HTML 表格行。
+    """
+    parts, truncated, remaining = _render_hunks(hunks, _hunk_to_html_rows, max_chars)
+    if truncated:
+        parts.append(
+            '<tr><td colspan="3" style="padding: 8px; border: 1px solid #d0d7de; color: #57606a;">'
+            f'...[差异输出超过 {max_chars} 字符已截断，另有 {remaining} 个差异块未显示]</td></tr>'
+        )
+    return "".join(parts)
 
 
 def diff_to_html(
     diff_items: list[DiffItem],
     old_lines: list[str] | None = None,
     new_lines: list[str] | None = None,
-    k: int = 3
+    k: int = 3,
+    max_chars: int | None = None,
 ) -> str:
     """将差异列表转换为 HTML 格式（类似GitHub风格）。
 
@@ -264,124 +463,66 @@ def diff_to_html(
         diff_items: 差异列表。
         old_lines: 旧文件行列表（用于获取上下文）。如果为None，则不显示上下文。
         new_lines: 新文件行列表（用于获取上下文）。如果为None，则不显示上下文。
-        k: 保留变化内容的上下 k 行内容，默认 3 行。当设置为 -1 时，保留所有内容。
+        k: 每个差异块保留变化内容的上下 k 行内容，默认 3 行。当设置为 -1 时，只显示变化行。
+        max_chars: 表格内容的最大字符数，超出时截断。None表示不限制。
 
     Returns:
         str: HTML 格式的差异显示。
     """
-    html = '<table style="border-collapse: collapse; width: 100%; font-family: monospace;">'
-    html += '<thead><tr style="background-color: #f6f8fa;">'
-    html += '<th style="padding: 8px; text-align: left; border: 1px solid #d0d7de;">行号</th>'
-    html += '<th style="padding: 8px; text-align: left; border: 1px solid #d0d7de;">操作</th>'
-    html += '<th style="padding: 8px; text-align: left; border: 1px solid #d0d7de;">内容</th>'
-    html += '</tr></thead><tbody>'
-    
-    # 如果提供了原始文件内容，则包含上下文
+    parts = [
+        '<table style="border-collapse: collapse; width: 100%; font-family: monospace;">',
+        '<thead><tr style="background-color: #f6f8fa;">',
+        '<th style="padding: 8px; text-align: left; border: 1px solid #d0d7de;">行号</th>',
+        '<th style="padding: 8px; text-align: left; border: 1px solid #d0d7de;">操作</th>',
+        '<th style="padding: 8px; text-align: left; border: 1px solid #d0d7de;">内容</th>',
+        '</tr></thead><tbody>',
+    ]
+
+    # 如果提供了原始文件内容，则按差异块显示上下文
     if old_lines is not None and new_lines is not None:
-        context_lines = _get_context_lines(diff_items, old_lines, new_lines, k)
-        for old_line_num, new_line_num, operation, content, is_context in context_lines:
-            if is_context:
-                # 上下文行使用灰色背景
-                bg_color = "#f6f8fa"
-                text_color = "#57606a"
-                op_symbol = " "
-                display_line = old_line_num if old_line_num > 0 else new_line_num
-            else:
-                # 变化行使用彩色背景
-                if operation == Operation.INSERT:
-                    bg_color = "#d4edda"
-                    text_color = "#155724"
-                    op_symbol = operation.value
-                    display_line = new_line_num
-                else:  # DELETE
-                    bg_color = "#f8d7da"
-                    text_color = "#721c24"
-                    op_symbol = operation.value
-                    display_line = old_line_num
-            
-            # 转义HTML特殊字符
-            escaped_content = (content
-                             .replace("&", "&amp;")
-                             .replace("<", "&lt;")
-                             .replace(">", "&gt;")
-                             .replace('"', "&quot;")
-                             .replace("'", "&#39;"))
-            
-            html += f'<tr style="background-color: {bg_color};">'
-            html += f'<td style="padding: 8px; border: 1px solid #d0d7de; color: {text_color};">{display_line}</td>'
-            html += f'<td style="padding: 8px; border: 1px solid #d0d7de; color: {text_color}; font-weight: bold;">{op_symbol}</td>'
-            html += f'<td style="padding: 8px; border: 1px solid #d0d7de; color: {text_color}; white-space: pre-wrap;">{escaped_content}</td>'
-            html += '</tr>'
+        matches = _iter_matches_from_diff(diff_items, len(old_lines), len(new_lines))
+        parts.append(hunks_to_html(iter_hunks(old_lines, new_lines, k, matches), max_chars))
     else:
         # 不包含上下文，只显示变化行
         for item in diff_items:
-            # 根据操作类型设置行背景色
             if item.operation == Operation.INSERT:
-                bg_color = "#d4edda"  # 浅绿色背景
-                text_color = "#155724"  # 深绿色文字
+                parts.append(_html_row(item.line, item.operation.value, item.content, "#d4edda", "#155724"))
             else:  # DELETE
-                bg_color = "#f8d7da"  # 浅红色背景
-                text_color = "#721c24"  # 深红色文字
-            
-            # 转义HTML特殊字符
-            content = (item.content
-                      .replace("&", "&amp;")
-                      .replace("<", "&lt;")
-                      .replace(">", "&gt;")
-                      .replace('"', "&quot;")
-                      .replace("'", "&#39;"))
-            
-            html += f'<tr style="background-color: {bg_color};">'
-            html += f'<td style="padding: 8px; border: 1px solid #d0d7de; color: {text_color};">{item.line}</td>'
-            html += f'<td style="padding: 8px; border: 1px solid #d0d7de; color: {text_color}; font-weight: bold;">{item.operation.value}</td>'
-            html += f'<td style="padding: 8px; border: 1px solid #d0d7de; color: {text_color}; white-space: pre-wrap;">{content}</td>'
-            html += '</tr>'
-    
-    html += '</tbody></table>'
-    return html
+                parts.append(_html_row(item.line, item.operation.value, item.content, "#f8d7da", "#721c24"))
+
+    parts.append('</tbody></table>')
+    return "".join(parts)
 
 
 def diff_to_text(
     diff_items: list[DiffItem],
     old_lines: list[str] | None = None,
     new_lines: list[str] | None = None,
-    k: int = 3
+    k: int = 3,
+    max_chars: int | None = None,
 ) -> str:
-    """将差异列表转换为文本格式，保留变化内容的上下 k 行内容。
+    """将差异列表转换为文本格式，按差异块保留变化内容的上下 k 行内容。
 
     Args:
         diff_items: 差异列表。
         old_lines: 旧文件行列表（用于获取上下文）。如果为None，则不显示上下文。
         new_lines: 新文件行列表（用于获取上下文）。如果为None，则不显示上下文。
-        k: 保留变化内容的上下 k 行内容，默认 3 行。当设置为 -1 时，保留所有内容。
+        k: 每个差异块保留变化内容的上下 k 行内容，默认 3 行。当设置为 -1 时，只显示变化行。
+        max_chars: 输出的最大字符数，超出时截断。None表示不限制。
 
     Returns:
         str: 文本格式的差异显示（类似git diff格式）。
     """
-    result_lines: list[str] = []
-    
-    # 如果提供了原始文件内容，则包含上下文
+    # 如果提供了原始文件内容，则按差异块显示上下文
     if old_lines is not None and new_lines is not None:
-        context_lines = _get_context_lines(diff_items, old_lines, new_lines, k)
-        for old_line_num, new_line_num, operation, content, is_context in context_lines:
-            if is_context:
-                # 上下文行使用空格作为操作符
-                display_line = old_line_num if old_line_num > 0 else new_line_num
-                result_lines.append(rf" {display_line:4d}  {content}")
-            else:
-                # 变化行使用+或-作为操作符
-                op_symbol = operation.value
-                if operation == Operation.INSERT:
-                    display_line = new_line_num
-                else:  # DELETE
-                    display_line = old_line_num
-                result_lines.append(rf"{op_symbol}{display_line:4d}  {content}")
-    else:
-        # 不包含上下文，只显示变化行
-        for item in diff_items:
-            op_symbol = item.operation.value
-            result_lines.append(rf"{op_symbol}{item.line:4d}  {item.content}")
-    
+        matches = _iter_matches_from_diff(diff_items, len(old_lines), len(new_lines))
+        return hunks_to_text(iter_hunks(old_lines, new_lines, k, matches), max_chars)
+
+    # 不包含上下文，只显示变化行
+    result_lines: list[str] = []
+    for item in diff_items:
+        op_symbol = item.operation.value
+        result_lines.append(rf"{op_symbol}{item.line:4d}  {item.content}")
     return "\n".join(result_lines)
 
 
@@ -389,7 +530,8 @@ def diff_files(
     old_file: str,
     new_file: str,
     output_format: str = "html",
-    k: int = 3
+    k: int = 3,
+    max_chars: int | None = None,
 ) -> str:
     """将两个文件进行差异比较。
 
@@ -397,7 +539,8 @@ def diff_files(
         old_file: 旧文件路径。
         new_file: 新文件路径。
         output_format: 输出格式，"html" 或 "text"，默认为 "html"。
-        k: 保留变化内容的上下 k 行内容，默认 3 行。当设置为 -1 时，保留所有内容。
+        k: 每个差异块保留变化内容的上下 k 行内容，默认 3 行。当设置为 -1 时，只显示变化行。
+        max_chars: 差异内容的最大字符数，超出时截断。None表示不限制。
 
     Returns:
         str: 差异格式（HTML 或文本）。
@@ -410,9 +553,9 @@ def diff_files(
     diff_items = diff_lines(old_lines, new_lines)
     
     if output_format == "text":
-        return diff_to_text(diff_items, old_lines, new_lines, k)
+        return diff_to_text(diff_items, old_lines, new_lines, k, max_chars)
     else:
-        return diff_to_html(diff_items, old_lines, new_lines, k)
+        return diff_to_html(diff_items, old_lines, new_lines, k, max_chars)
 
 
 if __name__ == "__main__":
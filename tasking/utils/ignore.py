@@ -0,0 +1,206 @@
+"""
+.gitignore 风格的忽略规则：把模式编译为正则表达式，按照 git 的优先级判断路径是否被忽略
+"""
+
+import re
+from collections.abc import Iterable, Sequence
+from typing import NamedTuple
+
+
+class IgnoreRule(NamedTuple):
+    """单条忽略规则"""
+
+    regex: re.Pattern[str]
+    """匹配相对路径（以 `/` 分隔）的正则表达式"""
+    negate: bool
+    """是否为 `!` 开头的重新包含规则"""
+    dir_only: bool
+    """是否只匹配目录（模式以 `/` 结尾）"""
+
+
+def _translate(pattern: str) -> str:
+    """将 gitignore 通配符转换为正则表达式（`*`/`?`/`[...]` 不匹配 `/`，`**` 匹配任意层目录）"""
+    out: list[str] = []
+    i, n = 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        if c == "*":
+            at_segment_start = i == 0 or pattern[i - 1] == "/"
+            if at_segment_start and pattern.startswith("**", i):
+                if pattern.startswith("**/", i):
+                    # `**/` 匹配零或多级目录
+                    out.append("(?:.*/)?")
+                    i += 3
+                    continue
+                if i + 2 == n:
+                    # 末尾的 `/**` 匹配目录下的所有内容
+                    out.append(".*")
+                    i += 2
+                    continue
+            out.append("[^/]*")
+            i += 1
+        elif c == "?":
+            out.append("[^/]")
+            i += 1
+        elif c == "[":
+            j = i + 1
+            if j < n and pattern[j] in "!^":
+                j += 1
+            if j < n and pattern[j] == "]":
+                j += 1
+            while j < n and pattern[j] != "]":
+                j += 1
+            if j >= n:
+                out.append("\\[")
+                i += 1
+                continue
+            stuff = pattern[i + 1:j]
+            if stuff[0] in "!^":
+                stuff = "^" + stuff[1:]
+            out.append("[" + stuff.replace("\\", "\\\\") + "]")
+            i = j + 1
+        elif c == "\\" and i + 1 < n:
+            out.append(re.escape(pattern[i + 1]))
+            i += 2
+        else:
+            out.append(re.escape(c))
+            i += 1
+    return "".join(out)
+
+
+def parse_ignore_pattern(line: str) -> IgnoreRule | None:
+    """解析单行 gitignore 模式
+
+    Args:
+        line: 模式文本
+
+    Returns:
+        IgnoreRule | None: 解析后的规则，空行和注释返回None
+    """
+    line = line.rstrip("\r\n")
+    if not line or line.startswith("#"):
+        return None
+    # 去掉未转义的行尾空格
+    while line.endswith(" ") and not line.endswith("\\ "):
+        line = line[:-1]
+
+    negate = line.startswith("!")
+    if negate:
+        line = line[1:]
+    dir_only = line.endswith("/")
+    line = line.rstrip("/")
+    if not line:
+        return None
+
+    # 包含 `/` 的模式相对于规则所在目录匹配，否则匹配任意层级的名称
+    anchored = "/" in line
+    body = _translate(line.lstrip("/"))
+    regex = body if anchored else f"(?:.*/)?{body}"
+    return IgnoreRule(re.compile(regex, re.DOTALL), negate, dir_only)
+
+
+class IgnoreRules:
+    """来自同一来源（如一个 .gitignore 文件）的一组忽略规则
+
+    - 路径相对于 `base` 目录匹配，同一组规则中后出现的规则优先
+    - 没有 `!` 规则时把所有规则合并为一个正则表达式，每个路径只需匹配一次
+
+    Example:
+        ```python
+        rules = IgnoreRules.from_lines(["*.pyc", "build/", "!keep.pyc"])
+        rules.match("pkg/a.pyc", is_dir=False)   # True
+        ```
+    """
+    _base: str
+    _rules: list[IgnoreRule]
+    _has_negation: bool
+    _combined_files: re.Pattern[str] | None
+    _combined_dirs: re.Pattern[str] | None
+
+    def __init__(self, rules: Sequence[IgnoreRule], base: str = "") -> None:
+        """初始化忽略规则
+
+        Args:
+            rules: 规则列表，按出现顺序
+            base: 规则所在目录（相对路径，以 `/` 分隔），空字符串表示根目录
+        """
+        self._base = base.strip("/")
+        self._rules = list(rules)
+        self._combined_files = None
+        self._combined_dirs = None
+        self._has_negation = any(rule.negate for rule in self._rules)
+        if not self._has_negation:
+            file_patterns = [rule.regex.pattern for rule in self._rules if not rule.dir_only]
+            dir_patterns = [rule.regex.pattern for rule in self._rules]
+            if file_patterns:
+                self._combined_files = re.compile("|".join(f"(?:{p})" for p in file_patterns), re.DOTALL)
+            if dir_patterns:
+                self._combined_dirs = re.compile("|".join(f"(?:{p})" for p in dir_patterns), re.DOTALL)
+
+    @classmethod
+    def from_lines(cls, lines: Iterable[str], base: str = "") -> "IgnoreRules":
+        """从模式文本创建忽略规则"""
+        rules = [rule for rule in map(parse_ignore_pattern, lines) if rule is not None]
+        return cls(rules, base)
+
+    @classmethod
+    def from_file(cls, file_path: str, base: str = "") -> "IgnoreRules | None":
+        """从 .gitignore 文件创建忽略规则
+
+        Returns:
+            IgnoreRules | None: 忽略规则，文件不存在、无法读取或没有有效规则时返回None
+        """
+        try:
+            with open(file_path, encoding="utf-8", errors="replace") as f:
+                rules = cls.from_lines(f, base)
+        except OSError:
+            return None
+        return rules if rules._rules else None
+
+    def get_base(self) -> str:
+        """获取规则所在目录"""
+        return self._base
+
+    def match(self, rel_path: str, is_dir: bool) -> bool | None:
+        """判断路径是否被这组规则忽略
+
+        Args:
+            rel_path: 相对路径（与 base 相同的起点，以 `/` 分隔）
+            is_dir: 路径是否为目录
+
+        Returns:
+            bool | None: True表示忽略，False表示被 `!` 规则重新包含，None表示没有匹配的规则
+        """
+        if self._base:
+            if not rel_path.startswith(self._base + "/"):
+                return None
+            rel_path = rel_path[len(self._base) + 1:]
+
+        if not self._has_negation:
+            combined = self._combined_dirs if is_dir else self._combined_files
+            return True if combined is not None and combined.fullmatch(rel_path) else None
+
+        for rule in reversed(self._rules):
+            if rule.dir_only and not is_dir:
+                continue
+            if rule.regex.fullmatch(rel_path):
+                return not rule.negate
+        return None
+
+
+def is_ignored(scopes: Sequence[IgnoreRules], rel_path: str, is_dir: bool) -> bool:
+    """按照 git 的优先级判断路径是否被忽略：越靠近路径的规则（列表中越靠后）优先
+
+    Args:
+        scopes: 从外层到内层的规则组列表
+        rel_path: 相对路径（以 `/` 分隔）
+        is_dir: 路径是否为目录
+
+    Returns:
+        bool: 是否被忽略
+    """
+    for rules in reversed(scopes):
+        matched = rules.match(rel_path, is_dir)
+        if matched is not None:
+            return matched
+    return False
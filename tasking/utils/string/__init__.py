@@ -19,7 +19,7 @@ from .message import (
     is_text_message,
     is_multimodal_message,
 )
-from .xml import extract_by_label, fix_incomplete_labels
+from .xml import extract_by_label, fix_incomplete_labels, parse_labels, LabelEvent, StreamingLabelParser
 
 __all__ = [
     # Markdown functions
@@ -43,4 +43,8 @@ __all__ = [
     # XML functions
     "extract_by_label",
     "fix_incomplete_labels",
+    "parse_labels",
+    # XML classes
+    "LabelEvent",
+    "StreamingLabelParser",
 ]
@@ -1,13 +1,109 @@
 """XML 标签提取工具模块，提供从带标签内容中提取文本的功能。"""
 
+import functools
 import re
+from bisect import bisect_left
+from collections.abc import Iterable, Mapping
+from types import MappingProxyType
+from typing import NamedTuple
+
+
+# 开始标签和结束标签，支持任意标签名和属性
+_TAG_PATTERN = re.compile(r'<(/?)([a-zA-Z][a-zA-Z0-9_-]*)(?:\s[^>]*)?>')
+# 文本末尾可能在后续文本到达后成为标签的片段
+_PARTIAL_TAG_PATTERN = re.compile(r'</?(?:[a-zA-Z][a-zA-Z0-9_-]*(?:\s[^>]*)?)?\Z')
+# 空的标签对，如 <tag></tag>
+_EMPTY_TAG_PATTERN = re.compile(r'<([a-zA-Z][a-zA-Z0-9_-]*)(?:\s[^>]*)?>\s*</\1>')
+# 空白行
+_BLANK_LINES_PATTERN = re.compile(r'\n\s*\n')
+# 缓存最近解析的内容，同一条消息通常会被多个调用方提取不同的标签
+_PARSE_CACHE_SIZE = 32
+
+
+def _label_content(
+    content: str,
+    start: int,
+    end: int,
+    stray: list[tuple[int, int]],
+    stray_starts: list[int],
+    suffix: str = "",
+) -> str:
+    """截取标签内容：移除范围内多余的结束标签和空标签对，合并空白行并去掉首尾空白"""
+    pieces: list[str] = []
+    cursor = start
+    index = bisect_left(stray_starts, start)
+    while index < len(stray) and stray[index][1] <= end:
+        pieces.append(content[cursor:stray[index][0]])
+        cursor = stray[index][1]
+        index += 1
+    pieces.append(content[cursor:end])
+    pieces.append(suffix)
+
+    text = _EMPTY_TAG_PATTERN.sub('', "".join(pieces))
+    return _BLANK_LINES_PATTERN.sub('\n', text).strip()
+
+
+@functools.lru_cache(maxsize=_PARSE_CACHE_SIZE)
+def parse_labels(content: str) -> Mapping[str, str]:
+    """单次扫描解析内容中的所有标签，返回标签名到内容的映射。
+
+    使用与 `fix_incomplete_labels` 相同的栈算法容错：
+    - 与栈顶不匹配的结束标签视为多余标签，从内容中移除
+    - 未闭合的开始标签的内容延续到文本末尾，并为其中未闭合的标签补全结束标签
+    - 标签名不区分大小写，同名标签取文档中第一个内容不为空的标签
+
+    提取的内容会移除空标签对、合并空白行并去掉首尾空白。结果会被缓存，返回只读映射。
+
+    Args:
+        content (str): 包含尖括号标签的内容
+
+    Returns:
+        Mapping[str, str]: 小写标签名到标签内容的映射
+    """
+    elements: list[tuple[int, int, str]] = []   # (内容起始位置, 内容结束位置, 标签名)
+    stray: list[tuple[int, int]] = []           # 多余的结束标签的位置
+    stack: list[tuple[str, int]] = []           # (标签名, 内容起始位置)
+
+    for match in _TAG_PATTERN.finditer(content):
+        tag_name = match.group(2)
+        if match.group(1):
+            if stack and stack[-1][0] == tag_name:
+                _, start = stack.pop()
+                elements.append((start, match.start(), tag_name))
+            else:
+                stray.append((match.start(), match.end()))
+        else:
+            stack.append((tag_name, match.end()))
+
+    # 未闭合的开始标签延续到文本末尾，内层未闭合的标签在末尾补全结束标签
+    unclosed: dict[int, int] = {}               # 内容起始位置 -> 栈中的深度
+    for depth, (tag_name, start) in enumerate(stack):
+        elements.append((start, len(content), tag_name))
+        unclosed[start] = depth
+    elements.sort()
+
+    stray_starts = [start for start, _ in stray]
+    labels: dict[str, str] = {}
+    for start, end, tag_name in elements:
+        key = tag_name.lower()
+        if key in labels:
+            continue
+
+        suffix = ""
+        if start in unclosed:
+            suffix = "".join(f'</{name}>' for name, _ in reversed(stack[unclosed[start] + 1:]))
+        text = _label_content(content, start, end, stray, stray_starts, suffix)
+        if text:
+            labels[key] = text
+
+    return MappingProxyType(labels)
 
 
 def extract_by_label(content: str, *labels: str) -> str:
     """Extract the content by the label.
 
-    按优先级顺序查找多个标签，找到第一个匹配的标签就返回其内容。
-    支持多种格式：带换行符、不带换行符、自闭合标签等。
+    按优先级顺序查找多个标签，找到第一个内容不为空的标签就返回其内容。
+    支持多种格式：带换行符、不带换行符、带属性、未闭合的标签等，解析规则见 `parse_labels`。
 
     Args:
         content (str):
@@ -19,38 +115,129 @@ def extract_by_label(content: str, *labels: str) -> str:
         str:
             The extracted content. If the content is not found, return an empty string.
     """
-    content = fix_incomplete_labels(content)
-
-    # 多种匹配模式，按优先级顺序
-    patterns = [
-        # 1. 带换行符的完整标签: <tag attr="value">\ncontent\n</tag>
-        r"<{label}(?:\s[^>]*)?>\s*\n(.*?)\n\s*</{label}>",
-        # 2. 不带换行符的完整标签: <tag attr="value">content</tag>
-        r"<{label}(?:\s[^>]*)?>(.*?)</{label}>",
-        # 3. 紧凑的完整标签: <tag attr="value">content</tag> (无空白)
-        r"<{label}(?:\s[^>]*)?>([^<]*?)</{label}>",
-        # 4. 带换行符的自闭合标签: <tag attr="value">\ncontent
-        r"<{label}(?:\s[^>]*)?>\s*\n(.*?)(?:\n\s*<|\n*$|$)",
-        # 5. 不带换行符的自闭合标签: <tag attr="value">content
-        r"<{label}(?:\s[^>]*)?>(.*?)(?=<|$)",
-        # 6. 更宽松的匹配，直到遇到下一个标签或结尾
-        r"<{label}(?:\s[^>]*)?>\s*\n?(.*?)\n?(?=<|$)",
-    ]
+    parsed = parse_labels(content)
 
     # Traverse all the labels in priority order
     for label in labels:
-        for pattern in patterns:
-            result = re.search(pattern.format(label=label), content, re.DOTALL | re.IGNORECASE)
-            if result:
-                extracted = result.group(1).strip()
-                # 如果提取的内容不为空，则返回
-                if extracted:
-                    return extracted
+        extracted = parsed.get(label.lower())
+        if extracted:
+            return extracted
 
     # All the labels are not found
     return ""
 
 
+class LabelEvent(NamedTuple):
+    """流式解析时闭合的标签"""
+
+    label: str
+    """小写标签名"""
+    content: str
+    """标签内容，处理方式与 `parse_labels` 相同"""
+    end: int
+    """结束标签在已接收文本中的结束位置"""
+
+
+class StreamingLabelParser:
+    """增量标签解析器：逐块接收流式生成的文本，标签闭合时立即产生事件
+
+    - 标签的识别和容错规则与 `parse_labels` 相同，分块输入与一次性输入识别出的标签完全一致
+    - 每个标签只在第一次闭合且内容不为空时产生一次事件。与 `parse_labels` 不同，
+      事件按结束标签的顺序产生，未闭合的标签不会产生事件
+    - 只在新文本块包含 `>` 时扫描，并且只扫描上次扫描之后的文本和末尾未完成的标签
+
+    Example:
+        ```python
+        parser = StreamingLabelParser(labels=["finish"])
+        parser.feed("<think>...</think><fin")          # []
+        parser.feed("ish>true</finish>")               # [LabelEvent(label="finish", content="true", end=39)]
+        ```
+    """
+    _labels: frozenset[str] | None
+    _parts: list[str]                   # 已接收的文本块
+    _tail_parts: list[str]              # 尚未扫描的文本块
+    _tail_start: int                    # 尚未扫描的文本的起始位置
+    _stack: list[tuple[str, int]]       # (标签名, 内容起始位置)
+    _stray: list[tuple[int, int]]       # 多余的结束标签的位置
+    _stray_starts: list[int]
+    _emitted: set[str]
+
+    def __init__(self, labels: Iterable[str] | None = None) -> None:
+        """初始化增量标签解析器
+
+        Args:
+            labels (Iterable[str] | None): 需要产生事件的标签，不区分大小写，None表示所有标签
+        """
+        self._labels = frozenset(label.lower() for label in labels) if labels is not None else None
+        self._parts = []
+        self._tail_parts = []
+        self._tail_start = 0
+        self._stack = []
+        self._stray = []
+        self._stray_starts = []
+        self._emitted = set()
+
+    def get_text(self) -> str:
+        """获取已接收的全部文本"""
+        if len(self._parts) > 1:
+            self._parts = ["".join(self._parts)]
+        return self._parts[0] if self._parts else ""
+
+    def feed(self, text: str) -> list[LabelEvent]:
+        """接收一块文本，返回这块文本中闭合的标签
+
+        Args:
+            text (str): 新生成的文本块
+
+        Returns:
+            list[LabelEvent]: 按结束标签的顺序排列的标签事件
+        """
+        if not text:
+            return []
+        self._parts.append(text)
+        self._tail_parts.append(text)
+        # 标签总是以 `>` 结束，没有 `>` 时不会有新的标签
+        if ">" not in text:
+            return []
+
+        tail = "".join(self._tail_parts)
+        base = self._tail_start
+        events: list[LabelEvent] = []
+        last_end = 0
+        for match in _TAG_PATTERN.finditer(tail):
+            last_end = match.end()
+            event = self._handle_tag(match.group(1) == '/', match.group(2), base + match.start(), base + last_end)
+            if event is not None:
+                events.append(event)
+
+        # 最后一个 `>` 之前的 `<` 不可能再成为标签，只保留末尾可能未完成的标签
+        partial = _PARTIAL_TAG_PATTERN.search(tail, max(last_end, tail.rfind(">") + 1))
+        keep = partial.start() if partial is not None else len(tail)
+        self._tail_start = base + keep
+        self._tail_parts = [tail[keep:]] if keep < len(tail) else []
+        return events
+
+    def _handle_tag(self, is_closing: bool, tag_name: str, start: int, end: int) -> LabelEvent | None:
+        """私有方法：按照栈算法处理一个标签，需要产生事件时返回事件"""
+        if not is_closing:
+            self._stack.append((tag_name, end))
+            return None
+        if not self._stack or self._stack[-1][0] != tag_name:
+            self._stray.append((start, end))
+            self._stray_starts.append(start)
+            return None
+
+        _, content_start = self._stack.pop()
+        label = tag_name.lower()
+        if label in self._emitted or (self._labels is not None and label not in self._labels):
+            return None
+        content = _label_content(self.get_text(), content_start, start, self._stray, self._stray_starts)
+        if not content:
+            return None
+        self._emitted.add(label)
+        return LabelEvent(label, content, end)
+
+
 def fix_incomplete_labels(content: str) -> str:
     """修复不完整的尖括号标签，使用括号合法性的栈算法来匹配任意标签。
 
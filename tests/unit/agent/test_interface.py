@@ -50,7 +50,7 @@ class TestIAgentInterface(unittest.TestCase, AgentTestMixin):
             'get_llm', 'get_llms',
             'get_workflow', 'set_workflow',
             'get_tool_service', 'get_tools_with_tags',
-            'call_tool',
+            'close', 'call_tool',
             'run_task_stream',
             'add_pre_run_once_hook', 'add_post_run_once_hook',
             'observe',
@@ -110,6 +110,9 @@ class TestIAgentInterface(unittest.TestCase, AgentTestMixin):
             async def get_tools_with_tags(self, tags: set[str]) -> dict[str, McpTool]:
                 return {}
 
+            async def close(self) -> None:
+                pass
+
             async def call_tool(self, context: dict[str, Any], name: str, task: ITask[MockState, MockEvent], inject: dict[str, Any], kwargs: dict[str, Any]) -> Message:
                 raise NotImplementedError
 
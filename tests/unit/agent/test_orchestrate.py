@@ -308,5 +308,76 @@ class TestOrchestrateErrorHandling:
         assert final_event is None, "FINISHED should not have a transition (end state)"
 
 
+class TestCreateSubTaskDependencies:
+    """Test sibling dependencies declared in the orchestration JSON."""
+
+    @staticmethod
+    def _create_parent():
+        from tasking.core.state_machine.task import (
+            BaseTreeTaskNode, get_base_states, get_base_transition
+        )
+
+        def create_node() -> BaseTreeTaskNode[TaskState, TaskEvent]:
+            return BaseTreeTaskNode[TaskState, TaskEvent](
+                valid_states=get_base_states(),
+                init_state=TaskState.CREATED,
+                transitions=get_base_transition(),
+                unique_protocol=[TextBlock(text="test protocol")],
+                tags=set(),
+                task_type="test",
+                max_depth=3,
+            )
+
+        return create_node(), {"test": create_node}
+
+    def test_dependencies_are_attached(self):
+        """Declared dependencies are stored on the created sub-tasks."""
+        parent, valid_tasks = self._create_parent()
+        task_json = """{
+            "调研A": {"任务类型": "test", "任务输入": "a"},
+            "调研B": {"任务类型": "test", "任务输入": "b"},
+            "汇总": {"任务类型": "test", "任务输入": "c", "依赖任务": ["调研A", "调研B"]}
+        }"""
+
+        create_sub_tasks(task_json, {"valid_tasks": valid_tasks, "task": parent})
+
+        sub_tasks = {sub_task.get_title(): sub_task for sub_task in parent.get_sub_tasks()}
+        assert list(sub_tasks.keys()) == ["调研A", "调研B", "汇总"]
+        assert sub_tasks["调研A"].get_dependencies() == []
+        assert sub_tasks["汇总"].get_dependencies() == ["调研A", "调研B"]
+
+    def test_single_string_dependency(self):
+        """A single dependency may be given as a string."""
+        parent, valid_tasks = self._create_parent()
+        task_json = """{
+            "A": {"任务类型": "test", "任务输入": "a"},
+            "B": {"任务类型": "test", "任务输入": "b", "依赖任务": "A"}
+        }"""
+
+        create_sub_tasks(task_json, {"valid_tasks": valid_tasks, "task": parent})
+
+        assert parent.get_sub_tasks()[1].get_dependencies() == ["A"]
+
+    def test_unknown_dependency_rejected(self):
+        """Dependencies on missing siblings are rejected before any sub-task is created."""
+        parent, valid_tasks = self._create_parent()
+        task_json = '{"A": {"任务类型": "test", "任务输入": "a", "依赖任务": ["不存在"]}}'
+
+        with pytest.raises(ValueError, match="不存在"):
+            create_sub_tasks(task_json, {"valid_tasks": valid_tasks, "task": parent})
+        assert parent.get_sub_tasks() == []
+
+    def test_cyclic_dependency_rejected(self):
+        """Cyclic dependencies are rejected."""
+        parent, valid_tasks = self._create_parent()
+        task_json = """{
+            "A": {"任务类型": "test", "任务输入": "a", "依赖任务": ["B"]},
+            "B": {"任务类型": "test", "任务输入": "b", "依赖任务": ["A"]}
+        }"""
+
+        with pytest.raises(ValueError, match="环"):
+            create_sub_tasks(task_json, {"valid_tasks": valid_tasks, "task": parent})
+
+
 if __name__ == "__main__":
     pytest.main([__file__])
\ No newline at end of file
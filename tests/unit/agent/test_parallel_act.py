@@ -0,0 +1,149 @@
+"""Tests for parallel execution of concurrency-safe tool calls."""
+
+import asyncio
+import unittest
+from typing import Any
+from unittest.mock import MagicMock
+
+from mcp.types import Tool as McpTool, ToolAnnotations
+
+from tasking.core.agent import IAgent, CONCURRENCY_SAFE_TAG, is_concurrency_safe
+from tasking.core.agent.parallel import act_tool_calls, group_tool_calls
+from tasking.core.state_machine.task import BaseTreeTaskNode, get_base_states, get_base_transition
+from tasking.core.state_machine.task.const import TaskState, TaskEvent
+from tasking.model import Message, Role, TextBlock, ToolCallRequest
+from tasking.model.queue import AsyncQueue
+
+
+def create_tool(name: str, read_only: bool = False, tags: list[str] | None = None) -> McpTool:
+    annotations = ToolAnnotations(readOnlyHint=True) if read_only else None
+    meta = {"_fastmcp": {"tags": tags}} if tags is not None else None
+    return McpTool(name=name, inputSchema={"type": "object"}, annotations=annotations, _meta=meta)
+
+
+TOOLS = {
+    "read_file": create_tool("read_file", read_only=True),
+    "search": create_tool("search", tags=[CONCURRENCY_SAFE_TAG]),
+    "write_file": create_tool("write_file"),
+}
+
+
+def tool_call(name: str, call_id: str) -> ToolCallRequest:
+    return ToolCallRequest(id=call_id, name=name, args={})
+
+
+def create_task() -> BaseTreeTaskNode[TaskState, TaskEvent]:
+    """Create a task whose context already holds the assistant turn."""
+    task = BaseTreeTaskNode[TaskState, TaskEvent](
+        valid_states=get_base_states(),
+        init_state=TaskState.CREATED,
+        transitions=get_base_transition(),
+        unique_protocol=[TextBlock(text="test protocol")],
+        tags=set(),
+        task_type="test",
+        max_depth=3,
+    )
+    task.get_context().append_context_data(Message(role=Role.USER, content=[TextBlock(text="go")]))
+    task.get_context().append_context_data(Message(role=Role.ASSISTANT, content=[TextBlock(text="calling")]))
+    return task
+
+
+class FakeActor:
+    """Fake agent.act that appends results after a per-call delay."""
+
+    def __init__(self, delays: dict[str, float], errors: set[str] | None = None) -> None:
+        self.delays = delays
+        self.errors = errors or set()
+        self.running = 0
+        self.max_running = 0
+
+    async def act(self, context: dict[str, Any], workflow: Any, queue: Any, tool_call: ToolCallRequest, task: Any) -> Message:
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            await asyncio.sleep(self.delays.get(tool_call.id, 0.01))
+        finally:
+            self.running -= 1
+        if tool_call.id in self.errors:
+            raise RuntimeError(f"{tool_call.id} failed")
+        result = Message(role=Role.TOOL, tool_call_id=tool_call.id, content=[TextBlock(text=tool_call.id)])
+        task.append_context(result)
+        return result
+
+
+def create_agent(actor: FakeActor) -> MagicMock:
+    agent = MagicMock(spec=IAgent)
+    agent.act = actor.act
+    return agent
+
+
+class TestGroupToolCalls(unittest.TestCase):
+    """Test detection of concurrency-safe tools and grouping."""
+
+    def test_is_concurrency_safe(self) -> None:
+        self.assertTrue(is_concurrency_safe(TOOLS["read_file"]))
+        self.assertTrue(is_concurrency_safe(TOOLS["search"]))
+        self.assertFalse(is_concurrency_safe(TOOLS["write_file"]))
+        self.assertFalse(is_concurrency_safe(None))
+
+    def test_sequential_by_default(self) -> None:
+        calls = [tool_call("read_file", "1"), tool_call("search", "2")]
+        self.assertEqual(group_tool_calls(calls, TOOLS), [[calls[0]], [calls[1]]])
+
+    def test_consecutive_safe_calls_are_grouped(self) -> None:
+        calls = [
+            tool_call("read_file", "1"),
+            tool_call("search", "2"),
+            tool_call("write_file", "3"),
+            tool_call("read_file", "4"),
+            tool_call("unknown", "5"),
+            tool_call("read_file", "6"),
+            tool_call("read_file", "7"),
+        ]
+        groups = group_tool_calls(calls, TOOLS, parallel=True)
+        self.assertEqual(
+            [[call.id for call in group] for group in groups],
+            [["1", "2"], ["3"], ["4"], ["5"], ["6", "7"]],
+        )
+
+
+class TestActToolCalls(unittest.IsolatedAsyncioTestCase):
+    """Test concurrent execution and result ordering."""
+
+    async def test_results_keep_call_order(self) -> None:
+        """Results land in the context in call order even when they complete in reverse."""
+        actor = FakeActor(delays={"1": 0.06, "2": 0.03, "3": 0.01})
+        task = create_task()
+        calls = [tool_call("read_file", call_id) for call_id in ("1", "2", "3")]
+
+        outcomes = await act_tool_calls(create_agent(actor), {}, MagicMock(), AsyncQueue[Message](), task, calls)
+
+        self.assertEqual(actor.max_running, 3)
+        self.assertEqual([outcome.tool_call_id for outcome in outcomes], ["1", "2", "3"])  # type: ignore[union-attr]
+        context = task.get_context().get_context_data()
+        self.assertEqual([message.tool_call_id for message in context[2:]], ["1", "2", "3"])
+
+    async def test_exceptions_are_returned_in_order(self) -> None:
+        actor = FakeActor(delays={}, errors={"2"})
+        task = create_task()
+        calls = [tool_call("read_file", call_id) for call_id in ("1", "2", "3")]
+
+        outcomes = await act_tool_calls(create_agent(actor), {}, MagicMock(), AsyncQueue[Message](), task, calls)
+
+        self.assertIsInstance(outcomes[0], Message)
+        self.assertIsInstance(outcomes[1], RuntimeError)
+        self.assertIsInstance(outcomes[2], Message)
+
+    async def test_single_call_runs_directly(self) -> None:
+        actor = FakeActor(delays={}, errors={"1"})
+        task = create_task()
+
+        outcomes = await act_tool_calls(
+            create_agent(actor), {}, MagicMock(), AsyncQueue[Message](), task, [tool_call("write_file", "1")],
+        )
+
+        self.assertIsInstance(outcomes[0], RuntimeError)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,149 @@
+"""Tests for streaming label detection in BaseAgent.think."""
+
+import asyncio
+import unittest
+from typing import Any
+from unittest.mock import MagicMock
+
+from tasking.core.agent import BaseAgent
+from tasking.core.state_machine.task import BaseTreeTaskNode, get_base_states, get_base_transition
+from tasking.core.state_machine.task.const import TaskState, TaskEvent
+from tasking.hook.human import HumanInterfere
+from tasking.hook.stream import stream_output_hook
+from tasking.model import CompletionConfig, Message, Role, StopReason, TextBlock
+from tasking.model.queue import AsyncQueue
+from tasking.utils.string.xml import LabelEvent
+
+
+CHUNKS = [
+    "<think>\nplan the ", "work\n</think>\n<out", "put>\nthe answer\n</output>\n",
+    "<finish>tr", "ue</fin", "ish>", "\n<note>", "trailing text", " that is never needed", "</note>",
+]
+
+
+class FakeStreamLLM:
+    """Fake LLM that streams fixed text chunks with a delay between them."""
+
+    def __init__(self, chunks: list[str], delay: float = 0.01) -> None:
+        self.chunks = chunks
+        self.delay = delay
+        self.sent = 0
+
+    async def completion(
+        self,
+        messages: list[Message],
+        tools: Any,
+        stream_queue: Any,
+        completion_config: CompletionConfig,
+        **kwargs: Any,
+    ) -> Message:
+        for chunk in self.chunks:
+            await stream_queue.put(Message(role=Role.ASSISTANT, content=[TextBlock(text=chunk)], is_chunking=True))
+            self.sent += 1
+            await asyncio.sleep(self.delay)
+        return Message(role=Role.ASSISTANT, content=[TextBlock(text="".join(self.chunks))], stop_reason=StopReason.STOP)
+
+
+def create_task() -> BaseTreeTaskNode[TaskState, TaskEvent]:
+    task = BaseTreeTaskNode[TaskState, TaskEvent](
+        valid_states=get_base_states(),
+        init_state=TaskState.CREATED,
+        transitions=get_base_transition(),
+        unique_protocol=[TextBlock(text="test protocol")],
+        tags=set(),
+        task_type="test",
+        max_depth=3,
+    )
+    task.get_context().append_context_data(Message(role=Role.USER, content=[TextBlock(text="go")]))
+    return task
+
+
+def text_of(message: Message) -> str:
+    return "".join(block.text for block in message.content if isinstance(block, TextBlock))
+
+
+class TestStreamLabels(unittest.IsolatedAsyncioTestCase):
+    """Test label hooks and early stopping during streaming think."""
+
+    async def think(self, agent: BaseAgent, llm: FakeStreamLLM, **config: Any) -> tuple[Message, Any]:
+        workflow = MagicMock()
+        workflow.get_llm.return_value = llm
+        task = create_task()
+        # The stream queue must be consumed for think to finish
+        agent.add_post_think_hook(stream_output_hook)
+        result = await agent.think(
+            context={},
+            workflow=workflow,
+            queue=AsyncQueue[Message](),
+            task=task,
+            valid_tools={},
+            completion_config=CompletionConfig(stream=True, **config),
+        )
+        return result, task
+
+    async def test_without_labels(self) -> None:
+        llm = FakeStreamLLM(CHUNKS, delay=0)
+        result, task = await self.think(BaseAgent(name="test", agent_type="test"), llm)
+
+        self.assertEqual(text_of(result), "".join(CHUNKS))
+        self.assertEqual(llm.sent, len(CHUNKS))
+        self.assertIs(task.get_context().get_context_data()[-1], result)
+
+    async def test_stop_label_cancels_generation(self) -> None:
+        llm = FakeStreamLLM(CHUNKS)
+        result, task = await self.think(BaseAgent(name="test", agent_type="test"), llm, stop_labels=["Finish"])
+
+        # The stream stops right after the chunk that closes </finish>
+        self.assertEqual(llm.sent, CHUNKS.index("ish>") + 1)
+        self.assertTrue(text_of(result).endswith("<finish>true</finish>"))
+        self.assertEqual(result.stop_reason, StopReason.STOP)
+        self.assertIs(task.get_context().get_context_data()[-1], result)
+
+    async def test_stop_label_value(self) -> None:
+        # A false finish flag does not stop the stream, the tool calls that follow must still arrive
+        chunks = ["<finish>fals" if chunk == "<finish>tr" else chunk for chunk in CHUNKS]
+        llm = FakeStreamLLM(chunks)
+        result, _ = await self.think(BaseAgent(name="test", agent_type="test"), llm, stop_labels=["finish=true"])
+        self.assertEqual(llm.sent, len(chunks))
+        self.assertEqual(text_of(result), "".join(chunks))
+
+        llm = FakeStreamLLM(CHUNKS)
+        result, _ = await self.think(BaseAgent(name="test", agent_type="test"), llm, stop_labels=["finish=TRUE"])
+        self.assertEqual(llm.sent, CHUNKS.index("ish>") + 1)
+        self.assertTrue(text_of(result).endswith("<finish>true</finish>"))
+
+    async def test_hooks_receive_labels_before_stream_ends(self) -> None:
+        llm = FakeStreamLLM(CHUNKS)
+        agent = BaseAgent(name="test", agent_type="test")
+        received: list[tuple[LabelEvent, int]] = []
+
+        async def hook(context: dict[str, Any], queue: Any, event: LabelEvent, task: Any) -> None:
+            received.append((event, llm.sent))
+
+        agent.add_stream_label_hook(hook)
+        result, _ = await self.think(agent, llm)
+
+        self.assertEqual(text_of(result), "".join(CHUNKS))
+        self.assertEqual(
+            [(event.label, event.content) for event, _ in received],
+            [("think", "plan the work"), ("output", "the answer"), ("finish", "true"), ("note", "trailing text that is never needed")],
+        )
+        # The finish label is handled while the tail is still being generated
+        self.assertLess(received[2][1], len(CHUNKS))
+
+    async def test_hook_error_cancels_generation(self) -> None:
+        llm = FakeStreamLLM(CHUNKS)
+        agent = BaseAgent(name="test", agent_type="test")
+
+        def hook(context: dict[str, Any], queue: Any, event: LabelEvent, task: Any) -> None:
+            if event.label == "output":
+                raise HumanInterfere([TextBlock(text="stop")])
+
+        agent.add_stream_label_hook(hook)
+        with self.assertRaises(HumanInterfere):
+            await self.think(agent, llm)
+        self.assertLess(llm.sent, len(CHUNKS))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,180 @@
+"""Tests for the cached tool catalog used by BaseAgent.get_tools_with_tags."""
+
+import asyncio
+import unittest
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import patch
+
+from mcp.types import Tool as McpTool, ToolListChangedNotification
+
+from tasking.core.agent import BaseAgent, ToolCatalog
+from tasking.core.agent.catalog import ToolIndex
+
+
+def create_tool(name: str, tags: list[str] | None = None) -> McpTool:
+    """Create an MCP tool, tools without tags carry no fastmcp meta."""
+    meta = {"_fastmcp": {"tags": tags}} if tags is not None else None
+    return McpTool(name=name, inputSchema={"type": "object"}, _meta=meta)
+
+
+class FakeToolService:
+    """Minimal stand-in for a fastmcp Client that counts list_tools calls."""
+
+    def __init__(self, tools: list[McpTool]) -> None:
+        self.tools = tools
+        self.list_calls = 0
+        self.connected = False
+
+    def is_connected(self) -> bool:
+        return self.connected
+
+    async def __aenter__(self) -> "FakeToolService":
+        self.connected = True
+        return self
+
+    async def __aexit__(self, *_args: Any) -> None:
+        self.connected = False
+
+    async def list_tools(self) -> list[McpTool]:
+        self.list_calls += 1
+        await asyncio.sleep(0)
+        return list(self.tools)
+
+
+TOOLS = [
+    create_tool("plain"),
+    create_tool("read", ["fs"]),
+    create_tool("write", ["fs", "write"]),
+    create_tool("shell", ["terminal"]),
+]
+
+
+class TestToolIndex(unittest.TestCase):
+    """Test tag selection through the inverted index."""
+
+    def test_subset_selection(self) -> None:
+        index = ToolIndex(TOOLS)
+        self.assertEqual(list(index.select({"fs"})), ["plain", "read"])
+        self.assertEqual(list(index.select({"fs", "write"})), ["plain", "read", "write"])
+        self.assertEqual(list(index.select({"terminal", "fs"})), ["plain", "read", "shell"])
+        self.assertEqual(list(index.select(set())), ["plain"])
+
+    def test_result_is_a_copy(self) -> None:
+        index = ToolIndex(TOOLS)
+        index.select({"fs"}).clear()
+        self.assertEqual(list(index.select({"fs"})), ["plain", "read"])
+
+
+class TestToolCatalog(unittest.IsolatedAsyncioTestCase):
+    """Test caching, expiry and invalidation."""
+
+    async def test_repeated_lookups_hit_the_cache(self) -> None:
+        service = FakeToolService(TOOLS)
+        catalog = ToolCatalog(ttl=60)
+
+        for _ in range(10):
+            tools = await catalog.get_tools_with_tags(service, {"fs"})  # type: ignore[arg-type]
+
+        self.assertEqual(list(tools), ["plain", "read"])
+        self.assertEqual(service.list_calls, 1)
+
+    async def test_concurrent_refresh_lists_once(self) -> None:
+        service = FakeToolService(TOOLS)
+        catalog = ToolCatalog(ttl=60)
+
+        await asyncio.gather(*(catalog.get_tools_with_tags(service, {"fs"}) for _ in range(5)))  # type: ignore[arg-type]
+
+        self.assertEqual(service.list_calls, 1)
+
+    async def test_ttl_expiry(self) -> None:
+        service = FakeToolService(TOOLS)
+        catalog = ToolCatalog(ttl=10)
+
+        with patch("tasking.core.agent.catalog.time.monotonic", return_value=100.0):
+            await catalog.get_tools_with_tags(service, {"fs"})  # type: ignore[arg-type]
+        with patch("tasking.core.agent.catalog.time.monotonic", return_value=105.0):
+            await catalog.get_tools_with_tags(service, {"fs"})  # type: ignore[arg-type]
+        self.assertEqual(service.list_calls, 1)
+        with patch("tasking.core.agent.catalog.time.monotonic", return_value=111.0):
+            await catalog.get_tools_with_tags(service, {"fs"})  # type: ignore[arg-type]
+        self.assertEqual(service.list_calls, 2)
+
+    async def test_zero_ttl_disables_cache(self) -> None:
+        service = FakeToolService(TOOLS)
+        catalog = ToolCatalog(ttl=0)
+
+        await catalog.get_tools_with_tags(service, {"fs"})  # type: ignore[arg-type]
+        await catalog.get_tools_with_tags(service, {"fs"})  # type: ignore[arg-type]
+
+        self.assertEqual(service.list_calls, 2)
+
+    async def test_list_changed_notification_invalidates(self) -> None:
+        service = FakeToolService(TOOLS)
+        catalog = ToolCatalog(ttl=None)
+        await catalog.get_tools_with_tags(service, {"fs"})  # type: ignore[arg-type]
+
+        service.tools = TOOLS + [create_tool("grep", ["fs"])]
+        await catalog.handle_message(ToolListChangedNotification())
+        tools = await catalog.get_tools_with_tags(service, {"fs"})  # type: ignore[arg-type]
+
+        self.assertEqual(service.list_calls, 2)
+        self.assertIn("grep", tools)
+
+        # Notifications wrapped in a ServerNotification root model are handled as well
+        await catalog.handle_message(SimpleNamespace(root=ToolListChangedNotification()))
+        await catalog.get_tools_with_tags(service, {"fs"})  # type: ignore[arg-type]
+        self.assertEqual(service.list_calls, 3)
+
+    async def test_other_messages_keep_cache(self) -> None:
+        service = FakeToolService(TOOLS)
+        catalog = ToolCatalog(ttl=None)
+        await catalog.get_tools_with_tags(service, {"fs"})  # type: ignore[arg-type]
+
+        await catalog.handle_message(RuntimeError("transport error"))
+        await catalog.get_tools_with_tags(service, {"fs"})  # type: ignore[arg-type]
+
+        self.assertEqual(service.list_calls, 1)
+
+    async def test_services_are_cached_separately(self) -> None:
+        first = FakeToolService(TOOLS)
+        second = FakeToolService([create_tool("other")])
+        catalog = ToolCatalog()
+
+        self.assertIn("read", await catalog.get_tools_with_tags(first, {"fs"}))  # type: ignore[arg-type]
+        self.assertEqual(list(await catalog.get_tools_with_tags(second, {"fs"})), ["other"])  # type: ignore[arg-type]
+
+        catalog.invalidate(first)  # type: ignore[arg-type]
+        await catalog.get_tools_with_tags(first, {"fs"})  # type: ignore[arg-type]
+        await catalog.get_tools_with_tags(second, {"fs"})  # type: ignore[arg-type]
+        self.assertEqual((first.list_calls, second.list_calls), (2, 1))
+
+    def test_negative_ttl_rejected(self) -> None:
+        with self.assertRaises(ValueError):
+            ToolCatalog(ttl=-1)
+
+
+class TestAgentToolCatalog(unittest.IsolatedAsyncioTestCase):
+    """BaseAgent resolves tools through the catalog."""
+
+    async def test_agents_share_catalog_per_service(self) -> None:
+        service = FakeToolService(TOOLS)
+        catalog = ToolCatalog()
+        agents = [
+            BaseAgent(name=f"agent_{i}", agent_type="test", tool_service=service, tool_catalog=catalog)  # type: ignore[arg-type]
+            for i in range(3)
+        ]
+
+        for agent in agents:
+            tools = await agent.get_tools_with_tags({"terminal"})
+            self.assertEqual(list(tools), ["plain", "shell"])
+
+        self.assertEqual(service.list_calls, 1)
+
+    async def test_agent_without_tool_service(self) -> None:
+        agent = BaseAgent(name="agent", agent_type="test")  # type: ignore[var-annotated]
+        self.assertEqual(await agent.get_tools_with_tags({"fs"}), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,193 @@
+"""Tests and benchmark for the persistent MCP tool session pool."""
+
+import asyncio
+import time
+import unittest
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import anyio
+from fastmcp import Client, FastMCP
+from loguru import logger
+
+from tasking.core.agent import BaseAgent, ToolCatalog, ToolSessionPool
+from tasking.model import ToolCallRequest
+
+
+def create_server(running: list[int] | None = None) -> FastMCP:
+    """Create an in-process fastmcp server with a trivial tool and a slow tool.
+
+    `running` records the current and the highest number of overlapping slow calls.
+    """
+    server = FastMCP("bench")
+    running = running if running is not None else [0, 0]
+
+    @server.tool
+    def echo(text: str) -> str:
+        return text
+
+    @server.tool
+    async def slow(text: str, context: dict[str, Any] | None = None) -> str:
+        running[0] += 1
+        running[1] = max(running)
+        try:
+            await asyncio.sleep(0.2)
+        finally:
+            running[0] -= 1
+        return text
+
+    return server
+
+
+class TestToolSessionPool(unittest.IsolatedAsyncioTestCase):
+    """Test session reuse, reconnection and shutdown."""
+
+    async def test_session_is_kept_open_between_calls(self) -> None:
+        client = Client(create_server())
+        async with ToolSessionPool(client) as pool:
+            first = await pool.call_tool("echo", {"text": "a"})
+            self.assertTrue(client.is_connected())
+            second = await pool.call_tool("echo", {"text": "b"})
+
+            self.assertEqual(first.data, "a")
+            self.assertEqual(second.data, "b")
+            self.assertTrue(client.is_connected())
+
+        self.assertFalse(client.is_connected())
+
+    async def test_reconnects_after_disconnect(self) -> None:
+        client = Client(create_server())
+        async with ToolSessionPool(client, health_check_interval=0) as pool:
+            await pool.call_tool("echo", {"text": "a"})
+            # Simulate the transport going away
+            await client.__aexit__(None, None, None)
+
+            result = await pool.call_tool("echo", {"text": "b"})
+
+            self.assertEqual(result.data, "b")
+            self.assertTrue(client.is_connected())
+
+    async def test_concurrent_calls_share_sessions(self) -> None:
+        client = Client(create_server())
+        async with ToolSessionPool(client, size=3) as pool:
+            results = await asyncio.gather(*(pool.call_tool("echo", {"text": str(i)}) for i in range(12)))
+
+        self.assertEqual([result.data for result in results], [str(i) for i in range(12)])
+
+    async def test_closed_pool_rejects_calls(self) -> None:
+        pool = ToolSessionPool(Client(create_server()))
+        await pool.close()
+
+        with self.assertRaises(RuntimeError):
+            await pool.call_tool("echo", {"text": "a"})
+
+    async def test_retries_only_undelivered_requests(self) -> None:
+        client = Client(create_server())
+        async with ToolSessionPool(client) as pool:
+            result = await pool.call_tool("echo", {"text": "a"})
+
+            # The request may already have run on the server, so it is not sent again
+            with patch.object(client, "call_tool", AsyncMock(side_effect=RuntimeError("boom"))) as call_tool:
+                with self.assertRaises(RuntimeError):
+                    await pool.call_tool("echo", {"text": "b"})
+                self.assertEqual(call_tool.await_count, 1)
+
+            # The write stream was closed, the request never left the client
+            with patch.object(client, "call_tool", AsyncMock(side_effect=[anyio.ClosedResourceError(), result])) as call_tool:
+                self.assertEqual((await pool.call_tool("echo", {"text": "a"})).data, "a")
+                self.assertEqual(call_tool.await_count, 2)
+
+    async def test_close_does_not_wait_for_running_calls(self) -> None:
+        client = Client(create_server())
+        pool = ToolSessionPool(client)
+        call = asyncio.create_task(pool.call_tool("slow", {"text": "a"}))
+        await asyncio.sleep(0.05)
+
+        await asyncio.wait_for(pool.close(), timeout=1)
+        self.assertFalse(client.is_connected())
+        call.cancel()
+        await asyncio.gather(call, return_exceptions=True)
+
+        with self.assertRaises(RuntimeError):
+            await pool.call_tool("echo", {"text": "a"})
+
+    def test_rebinds_on_new_event_loop(self) -> None:
+        pool = ToolSessionPool(Client(create_server()))
+        # Each asyncio.run starts a new event loop, the pool reconnects instead of failing
+        self.assertEqual(asyncio.run(pool.call_tool("echo", {"text": "a"})).data, "a")
+        self.assertEqual(asyncio.run(pool.call_tool("echo", {"text": "b"})).data, "b")
+        asyncio.run(pool.close())
+
+    def test_invalid_config(self) -> None:
+        client = Client(create_server())
+        with self.assertRaises(ValueError):
+            ToolSessionPool(client, size=0)
+        with self.assertRaises(ValueError):
+            ToolSessionPool(client, health_check_interval=-1)
+        with self.assertRaises(ValueError):
+            BaseAgent(name="agent", agent_type="test", tool_service=client, tool_session_pool=ToolSessionPool(Client(create_server())))
+
+    async def test_agent_lists_tools_through_pool(self) -> None:
+        client = Client(create_server())
+        agent = BaseAgent(name="agent", agent_type="test", tool_service=client, tool_catalog=ToolCatalog())
+
+        tools = await agent.get_tools_with_tags(set())
+        self.assertIn("echo", tools)
+        self.assertTrue(client.is_connected())
+
+        await agent.close()
+        self.assertFalse(client.is_connected())
+
+    async def test_agent_tool_calls_run_concurrently(self) -> None:
+        running = [0, 0]
+        client = Client(create_server(running))
+        workflow = MagicMock()
+        workflow.get_tool.return_value = None
+
+        async with BaseAgent(name="agent", agent_type="test", tool_service=client) as agent:
+            start = time.perf_counter()
+            results = await asyncio.gather(*(
+                agent.call_tool({}, ToolCallRequest(id=f"call_{i}", name="slow", args={"text": str(i)}), workflow, MagicMock())
+                for i in range(4)
+            ))
+            elapsed = time.perf_counter() - start
+
+        # The default single session is shared, the slow calls overlap instead of running one by one
+        self.assertEqual([result.content[0].text for result in results], ["0", "1", "2", "3"])
+        self.assertEqual(running[1], 4)
+        self.assertLess(elapsed, 0.6)
+        self.assertFalse(client.is_connected())
+
+
+class TestToolSessionPoolBenchmark(unittest.IsolatedAsyncioTestCase):
+    """Benchmark: persistent sessions against reconnect-per-call."""
+
+    async def test_benchmark_calls_per_second(self) -> None:
+        rounds = 50
+        tool_call = ToolCallRequest(id="call_1", name="echo", args={"text": "hello"})
+
+        # Reconnect-per-call, the previous behaviour of BaseAgent.call_tool
+        client = Client(create_server())
+        start = time.perf_counter()
+        for _ in range(rounds):
+            async with client:
+                await client.call_tool(name=tool_call.name, arguments=dict(tool_call.args))
+        reconnect_rate = rounds / (time.perf_counter() - start)
+
+        # Persistent session
+        client = Client(create_server())
+        async with ToolSessionPool(client) as pool:
+            start = time.perf_counter()
+            for _ in range(rounds):
+                await pool.call_tool(name=tool_call.name, arguments=dict(tool_call.args))
+            pooled_rate = rounds / (time.perf_counter() - start)
+
+        logger.info(
+            f"[Benchmark] reconnect-per-call: {reconnect_rate:.1f} calls/s, "
+            f"persistent session: {pooled_rate:.1f} calls/s"
+        )
+        self.assertGreater(pooled_rate, reconnect_rate)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,199 @@
+"""
+本地伪造的 OpenAI 兼容服务端，用于统计上游请求次数与测量并发性能。
+
+实现 `POST .../chat/completions`（支持流式 SSE 与非流式响应）和 `POST .../embeddings`，不依赖任何第三方服务端框架。
+"""
+
+import asyncio
+import json
+import time
+from typing import Any
+
+
+class FakeOpenAIServer:
+    """OpenAI 兼容的本地伪造服务端
+
+    Example:
+        ```python
+        async with FakeOpenAIServer(chunks=["Hello", " world"]) as server:
+            client = AsyncOpenAI(base_url=server.base_url, api_key="test")
+            ...
+            assert server.request_count == 1
+        ```
+    """
+
+    def __init__(
+        self,
+        chunks: list[str] | None = None,
+        tool_call: dict[str, Any] | None = None,
+        usage: dict[str, Any] | None = None,
+        latency: float = 0.0,
+        argument_chunk_size: int = 0,
+        usage_in_last_chunk: bool = False,
+        embedding: list[float] | None = None,
+    ) -> None:
+        """
+        Args:
+            chunks: 流式返回的文本片段
+            tool_call: 可选的工具调用 {"id", "name", "arguments"}
+            usage: 返回的 token 用量
+            latency: 每个请求的模拟网络延迟（秒）
+            argument_chunk_size: 流式返回时工具参数每个片段的长度，0表示不切分
+            usage_in_last_chunk: 流式返回时总是把用量附在带结束原因的最后一个片段上（智谱风格），
+                否则只在请求 `stream_options.include_usage` 时单独返回一个用量片段
+            embedding: 嵌入接口返回的向量
+        """
+        self.chunks = chunks if chunks is not None else ["Hello", " from", " fake", " server"]
+        self.tool_call = tool_call
+        self.usage = usage or {"prompt_tokens": 11, "completion_tokens": 7, "total_tokens": 18}
+        self.latency = latency
+        self.argument_chunk_size = argument_chunk_size
+        self.usage_in_last_chunk = usage_in_last_chunk
+        self.embedding = embedding if embedding is not None else [0.1, 0.2, 0.3, 0.4]
+        # 收到的请求体
+        self.requests: list[dict[str, Any]] = []
+        # 当前并发处理的请求数与峰值
+        self.in_flight = 0
+        self.max_in_flight = 0
+        # 接受的 TCP 连接数
+        self.connection_count = 0
+        self._server: asyncio.Server | None = None
+        self._port = 0
+
+    @property
+    def request_count(self) -> int:
+        return len(self.requests)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self._port}/v1"
+
+    async def __aenter__(self) -> "FakeOpenAIServer":
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        self._port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def __aexit__(self, *_args: Any) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    # ********** HTTP 处理 **********
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connection_count += 1
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers: dict[str, str] = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    key, _, value = line.decode("latin-1").partition(":")
+                    headers[key.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", "0")))
+                payload: dict[str, Any] = json.loads(body) if body else {}
+
+                self.requests.append(payload)
+                self.in_flight += 1
+                self.max_in_flight = max(self.max_in_flight, self.in_flight)
+                try:
+                    if self.latency > 0:
+                        await asyncio.sleep(self.latency)
+                    if request_line.split()[1].rstrip(b"/").endswith(b"/embeddings"):
+                        await self._write_embeddings(writer, payload)
+                        continue
+                    if payload.get("stream"):
+                        await self._write_stream(writer, payload)
+                        # SSE 响应以关闭连接结束
+                        break
+                    await self._write_json(writer, payload)
+                finally:
+                    self.in_flight -= 1
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _write_json(self, writer: asyncio.StreamWriter, payload: dict[str, Any]) -> None:
+        message: dict[str, Any] = {"role": "assistant", "content": "".join(self.chunks)}
+        finish_reason = "stop"
+        if self.tool_call is not None:
+            message["tool_calls"] = [{
+                "id": self.tool_call["id"],
+                "type": "function",
+                "function": {"name": self.tool_call["name"], "arguments": self.tool_call["arguments"]},
+            }]
+            finish_reason = "tool_calls"
+        body = json.dumps({
+            "id": "chatcmpl-fake",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": payload.get("model", "fake"),
+            "choices": [{"index": 0, "message": message, "finish_reason": finish_reason}],
+            "usage": self.usage,
+        }).encode()
+        writer.write(
+            b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+            + f"Content-Length: {len(body)}\r\n\r\n".encode()
+            + body
+        )
+        await writer.drain()
+
+    async def _write_embeddings(self, writer: asyncio.StreamWriter, payload: dict[str, Any]) -> None:
+        inputs = payload.get("input")
+        count = len(inputs) if isinstance(inputs, list) else 1
+        body = json.dumps({
+            "object": "list",
+            "model": payload.get("model", "fake"),
+            "data": [{"object": "embedding", "index": i, "embedding": self.embedding} for i in range(count)],
+            "usage": {"prompt_tokens": self.usage["prompt_tokens"], "total_tokens": self.usage["prompt_tokens"]},
+        }).encode()
+        writer.write(
+            b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+            + f"Content-Length: {len(body)}\r\n\r\n".encode()
+            + body
+        )
+        await writer.drain()
+
+    async def _write_stream(self, writer: asyncio.StreamWriter, payload: dict[str, Any]) -> None:
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\nConnection: close\r\n\r\n")
+
+        def event(choices: list[dict[str, Any]], usage: dict[str, Any] | None = None) -> bytes:
+            chunk = {
+                "id": "chatcmpl-fake",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": payload.get("model", "fake"),
+                "choices": choices,
+                "usage": usage,
+            }
+            return f"data: {json.dumps(chunk)}\n\n".encode()
+
+        for text in self.chunks:
+            writer.write(event([{"index": 0, "delta": {"role": "assistant", "content": text}, "finish_reason": None}]))
+
+        finish_reason = "stop"
+        if self.tool_call is not None:
+            arguments: str = self.tool_call["arguments"]
+            # 第一个片段带有 id 与函数名，后续片段只包含参数
+            size = self.argument_chunk_size or max(len(arguments), 1)
+            pieces = [arguments[i:i + size] for i in range(0, len(arguments), size)] or [""]
+            for i, piece in enumerate(pieces):
+                tool_delta: dict[str, Any] = {"index": 0, "function": {"arguments": piece}}
+                if i == 0:
+                    tool_delta["id"] = self.tool_call["id"]
+                    tool_delta["type"] = "function"
+                    tool_delta["function"]["name"] = self.tool_call["name"]
+                writer.write(event([{"index": 0, "delta": {"tool_calls": [tool_delta]}, "finish_reason": None}]))
+            finish_reason = "tool_calls"
+
+        last_usage = self.usage if self.usage_in_last_chunk else None
+        writer.write(event([{"index": 0, "delta": {}, "finish_reason": finish_reason}], last_usage))
+        if not self.usage_in_last_chunk and (payload.get("stream_options") or {}).get("include_usage"):
+            writer.write(event([], self.usage))
+        writer.write(b"data: [DONE]\n\n")
+        await writer.drain()
@@ -0,0 +1,151 @@
+"""Tests for the per-context message history conversion cache."""
+
+import time
+from unittest.mock import Mock
+
+import pytest
+from loguru import logger
+
+from tasking.llm.anthropic import _extend_anthropic_messages, to_anthropic_messages
+from tasking.llm.history import MessageHistoryCache
+from tasking.llm.openai import _extend_openai_dict, to_openai_dict
+from tasking.llm.zhipu import _extend_zhipu_messages, to_zhipu_messages
+from tasking.model import Message, Role, TextBlock, ToolCallRequest
+
+
+CONVERTERS = [
+    pytest.param(_extend_openai_dict, to_openai_dict, id="openai"),
+    pytest.param(_extend_anthropic_messages, to_anthropic_messages, id="anthropic"),
+    pytest.param(_extend_zhipu_messages, to_zhipu_messages, id="zhipu"),
+]
+
+
+def _text(role: Role, text: str) -> Message:
+    return Message(role=role, content=[TextBlock(text=text)])
+
+
+def _turns() -> list[list[Message]]:
+    """Messages appended to one context, one list per completion request."""
+    tool_call = ToolCallRequest(id="call_1", name="search", args={"query": "weather"})
+    return [
+        [_text(Role.SYSTEM, "You are a helper."), _text(Role.SYSTEM, "Answer briefly.")],
+        # The first USER message of a turn is merged into the last cached one
+        [_text(Role.USER, "Hello"), _text(Role.USER, "What is the weather?")],
+        [Message(role=Role.ASSISTANT, content=[TextBlock(text="Let me search.")], tool_calls=[tool_call])],
+        [
+            Message(role=Role.TOOL, content=[TextBlock(text="Sunny")], tool_call_id="call_1"),
+            _text(Role.USER, "Thanks"),
+        ],
+        [_text(Role.USER, "And tomorrow?")],
+        [_text(Role.ASSISTANT, "Also sunny.")],
+    ]
+
+
+class TestMessageHistoryCache:
+    """Test incremental conversion against the full conversion."""
+
+    @pytest.mark.parametrize("extend, convert", CONVERTERS)
+    def test_incremental_matches_full_conversion(self, extend, convert):
+        cache = MessageHistoryCache(extend)
+        messages: list[Message] = []
+        for turn in _turns():
+            messages.extend(turn)
+            assert cache.convert(messages) == convert(messages)
+
+    def test_only_new_messages_are_converted(self):
+        extend = Mock(side_effect=_extend_openai_dict)
+        cache = MessageHistoryCache(extend)
+        messages: list[Message] = []
+        for turn in _turns():
+            messages.extend(turn)
+            cache.convert(messages)
+
+        converted = [message for call in extend.call_args_list for message in call.args[1]]
+        assert converted == messages
+
+    def test_merge_does_not_change_previous_result(self):
+        cache = MessageHistoryCache(_extend_openai_dict)
+        messages = [_text(Role.USER, "Hello")]
+        first = cache.convert(messages)
+        expected_first = to_openai_dict(messages)
+
+        messages.append(_text(Role.USER, "Again"))
+        second = cache.convert(messages)
+
+        assert len(first) == len(second) == 1
+        assert first == expected_first
+        assert second == to_openai_dict(messages)
+
+    def test_replaced_message_resets_context(self):
+        extend = Mock(side_effect=_extend_openai_dict)
+        cache = MessageHistoryCache(extend)
+        messages = [_text(Role.USER, "Hello"), _text(Role.ASSISTANT, "Hi")]
+        cache.convert(messages)
+
+        messages[1] = _text(Role.ASSISTANT, "Hey")
+        assert cache.convert(messages) == to_openai_dict(messages)
+        assert extend.call_args.args[1] == messages
+
+        # A shorter context is converted from scratch as well
+        assert cache.convert(messages[:1]) == to_openai_dict(messages[:1])
+
+    def test_conversion_error_drops_context(self):
+        extend = Mock(side_effect=_extend_openai_dict)
+        cache = MessageHistoryCache(extend)
+        messages = [_text(Role.USER, "Hello")]
+        cache.convert(messages)
+
+        extend.side_effect = RuntimeError("broken")
+        with pytest.raises(RuntimeError):
+            cache.convert(messages + [_text(Role.ASSISTANT, "Hi")])
+
+        extend.side_effect = _extend_openai_dict
+        messages.append(_text(Role.ASSISTANT, "Hi"))
+        assert cache.convert(messages) == to_openai_dict(messages)
+        assert extend.call_args.args[1] == messages
+
+    def test_least_recently_used_context_evicted(self):
+        extend = Mock(side_effect=_extend_openai_dict)
+        cache = MessageHistoryCache(extend, max_contexts=2)
+        contexts = [[_text(Role.USER, f"task {i}")] for i in range(3)]
+        for context in contexts:
+            cache.convert(context)
+
+        extend.reset_mock()
+        cache.convert(contexts[2])
+        assert extend.call_args.args[1] == []
+        cache.convert(contexts[0])
+        assert extend.call_args.args[1] == contexts[0]
+
+    def test_invalid_max_contexts(self):
+        with pytest.raises(ValueError):
+            MessageHistoryCache(_extend_openai_dict, max_contexts=0)
+
+    def test_empty_messages(self):
+        assert MessageHistoryCache(_extend_openai_dict).convert([]) == []
+
+
+class TestMessageHistoryCacheBenchmark:
+    """Micro benchmark of a growing context."""
+
+    def test_growing_context(self):
+        turns = 200
+        messages: list[Message] = []
+        cache = MessageHistoryCache(_extend_openai_dict)
+        full = cached = 0.0
+        for i in range(turns):
+            messages.append(_text(Role.USER if i % 2 == 0 else Role.ASSISTANT, f"message {i} " * 50))
+
+            start = time.perf_counter()
+            expected = to_openai_dict(messages)
+            full += time.perf_counter() - start
+
+            start = time.perf_counter()
+            result = cache.convert(messages)
+            cached += time.perf_counter() - start
+            assert result == expected
+
+        logger.info(
+            f"[Benchmark] {turns} 轮消息历史转换：全量 {full * 1e3:.1f}ms，增量 {cached * 1e3:.1f}ms"
+        )
+        assert cached < full
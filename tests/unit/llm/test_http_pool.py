@@ -0,0 +1,191 @@
+"""Tests for the shared HTTP client registry."""
+
+import asyncio
+
+import httpx
+import pytest
+from loguru import logger
+from openai import AsyncOpenAI
+from pydantic import SecretStr
+
+from tasking.llm import OpenAiEmbeddingLLM, OpenAiLLM, Provider
+from tasking.llm.http_pool import HttpClientRegistry, PoolStats, get_http_client_registry
+from tasking.model import CompletionConfig, Message, Role, TextBlock
+from tasking.model.queue import AsyncQueue
+from tasking.model.setting import LLMConfig
+from tests.unit.llm.fake_server import FakeOpenAIServer
+
+
+def _messages() -> list[Message]:
+    return [Message(role=Role.USER, content=[TextBlock(text="Hello")])]
+
+
+def _config(base_url: str, api_key: str = "test-key") -> LLMConfig:
+    return LLMConfig(provider="openai", model="fake-model", api_key=api_key, base_url=base_url)
+
+
+def _stats(base_url: str) -> PoolStats:
+    return next(stats for stats in get_http_client_registry().get_stats() if stats.base_url == base_url)
+
+
+class TestHttpClientRegistry:
+    """Test client sharing and lifecycle."""
+
+    def test_clients_shared_by_provider_url_and_key(self):
+        registry = HttpClientRegistry()
+        key = SecretStr("sk-secret")
+        client = registry.get_client(Provider.OPENAI, "http://a/v1", key, 60)
+
+        assert registry.get_client(Provider.OPENAI, "http://a/v1/", SecretStr("sk-secret"), 30) is client
+        assert registry.get_client(Provider.ANTHROPIC, "http://a/v1", key, 60) is not client
+        assert registry.get_client(Provider.OPENAI, "http://b/v1", key, 60) is not client
+        assert registry.get_client(Provider.OPENAI, "http://a/v1", SecretStr("other"), 60) is not client
+        assert len(registry.get_stats()) == 4
+        # The API key itself is never exposed by the metrics
+        assert "sk-secret" not in repr(registry.get_stats())
+
+    def test_llm_instances_share_client(self):
+        config = _config("http://shared.test/v1")
+        llm = OpenAiLLM(config)
+        embed = OpenAiEmbeddingLLM(config)
+        other = OpenAiLLM(_config("http://shared.test/v1", api_key="other-key"))
+
+        assert llm.client._client is OpenAiLLM(config).client._client
+        assert llm.client._client is embed._client._client
+        assert other.client._client is not llm.client._client
+        assert llm.client.timeout == config.timeout
+
+    @pytest.mark.asyncio
+    async def test_sdk_close_keeps_shared_client_open(self):
+        registry = HttpClientRegistry()
+        client = registry.get_client(Provider.OPENAI, "http://a/v1", SecretStr("key"), 60)
+
+        await AsyncOpenAI(base_url="http://a/v1", api_key="key", http_client=client).close()
+        assert not client.is_closed
+
+        await registry.aclose()
+        assert client.is_closed
+        assert registry.get_stats() == []
+        assert registry.get_client(Provider.OPENAI, "http://a/v1", SecretStr("key"), 60) is not client
+
+    def test_invalid_arguments(self):
+        with pytest.raises(ValueError):
+            HttpClientRegistry(max_connections=0)
+        with pytest.raises(ValueError):
+            HttpClientRegistry(keepalive_expiry=0)
+
+
+class TestPoolStats:
+    """Test pool utilization metrics against a local fake server."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_share_connections(self):
+        concurrency = 8
+        async with FakeOpenAIServer(latency=0.05) as server:
+            llms = [OpenAiLLM(_config(server.base_url)) for _ in range(concurrency)]
+            await asyncio.gather(*(llm.completion(_messages(), None, None, CompletionConfig()) for llm in llms))
+
+            stats = _stats(server.base_url)
+            assert stats.requests == concurrency
+            assert stats.peak_in_flight == concurrency
+            assert stats.in_flight == 0
+            assert stats.utilization == 0
+            assert stats.connections == concurrency
+            assert stats.idle_connections == concurrency
+
+            # Keep-alive connections are reused by the next round
+            await asyncio.gather(*(llm.completion(_messages(), None, None, CompletionConfig()) for llm in llms))
+            assert server.connection_count == concurrency
+            assert _stats(server.base_url).requests == 2 * concurrency
+
+    @pytest.mark.asyncio
+    async def test_cancelled_stream_releases_connection(self):
+        class CancellingQueue(AsyncQueue[Message]):
+            """Cancel the completion after the first chunk, like a closed stop label."""
+
+            async def put(self, item: Message, block: bool = True, timeout: float | None = None) -> None:
+                await super().put(item, block, timeout)
+                task = asyncio.current_task()
+                assert task is not None
+                task.cancel()
+                # The cancellation arrives here, outside of the SDK stream iterator
+                await asyncio.sleep(0)
+
+        async with FakeOpenAIServer() as server:
+            llm = OpenAiLLM(_config(server.base_url))
+            think_task = asyncio.create_task(llm.completion(_messages(), None, CancellingQueue(), CompletionConfig()))
+            with pytest.raises(asyncio.CancelledError):
+                await think_task
+
+            # The stream is closed right away, the request no longer counts as in flight
+            assert _stats(server.base_url).in_flight == 0
+
+    def test_environment_proxies_are_mounted(self, monkeypatch):
+        for name in ("HTTP_PROXY", "ALL_PROXY", "NO_PROXY", "http_proxy", "https_proxy", "all_proxy", "no_proxy"):
+            monkeypatch.delenv(name, raising=False)
+        monkeypatch.setenv("HTTPS_PROXY", "http://proxy.test:3128")
+        monkeypatch.setenv("NO_PROXY", "internal.test")
+        registry = HttpClientRegistry()
+        client = registry.get_client(Provider.OPENAI, "https://api.test/v1", SecretStr("key"), 60)
+        direct = client._transport_for_url(httpx.URL("http://api.test/v1"))
+
+        proxied = client._transport_for_url(httpx.URL("https://api.test/v1/chat/completions"))
+        assert proxied is not direct
+        assert proxied._proxy == "http://proxy.test:3128"
+        # NO_PROXY hosts and schemes without a proxy go straight to the server
+        assert client._transport_for_url(httpx.URL("https://internal.test/v1")) is direct
+
+    @pytest.mark.asyncio
+    async def test_requests_go_through_environment_proxy(self, monkeypatch):
+        for name in ("HTTPS_PROXY", "ALL_PROXY", "NO_PROXY", "http_proxy", "https_proxy", "all_proxy", "no_proxy"):
+            monkeypatch.delenv(name, raising=False)
+        async with FakeOpenAIServer() as server:
+            # The fake server plays the proxy, the target host itself does not resolve
+            monkeypatch.setenv("HTTP_PROXY", server.base_url.removesuffix("/v1"))
+            llm = OpenAiLLM(_config("http://proxied.invalid/v1"))
+
+            result = await llm.completion(_messages(), None, None, CompletionConfig())
+
+            assert result.content[0].text == "Hello from fake server"
+            assert server.request_count == 1
+            assert _stats("http://proxied.invalid/v1").requests == 1
+
+    def test_pools_per_event_loop(self):
+        async def run() -> Message:
+            async with FakeOpenAIServer() as server:
+                llm = OpenAiLLM(_config(server.base_url))
+                await llm.completion(_messages(), None, None, CompletionConfig())
+                return await llm.completion(_messages(), None, None, CompletionConfig())
+
+        # The shared client is used from several event loops one after another
+        for _ in range(3):
+            assert asyncio.run(run()).content[0].text == "Hello from fake server"
+
+
+class TestHttpPoolBenchmark:
+    """Micro benchmark of connections opened by many LLM instances."""
+
+    @pytest.mark.asyncio
+    async def test_connections_opened(self):
+        instances, rounds = 16, 5
+        async with FakeOpenAIServer() as server:
+            # Before: every instance owns a client with its own pool
+            clients = [AsyncOpenAI(base_url=server.base_url, api_key="test-key") for _ in range(instances)]
+            for _ in range(rounds):
+                for client in clients:
+                    await client.chat.completions.create(model="fake-model", messages=[{"role": "user", "content": "Hi"}])
+            separate = server.connection_count
+            for client in clients:
+                await client.close()
+
+        async with FakeOpenAIServer() as server:
+            llms = [OpenAiLLM(_config(server.base_url)) for _ in range(instances)]
+            for _ in range(rounds):
+                for llm in llms:
+                    await llm.completion(_messages(), None, None, CompletionConfig())
+            shared = server.connection_count
+
+        logger.info(
+            f"[Benchmark] {instances} 个实例各发送 {rounds} 个请求：独立客户端建立 {separate} 个连接，共享连接池建立 {shared} 个连接"
+        )
+        assert shared < separate
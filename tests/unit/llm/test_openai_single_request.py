@@ -0,0 +1,100 @@
+"""
+Regression benchmark: streaming completions must hit the upstream exactly once.
+
+Uses a local fake OpenAI-compatible server so the real HTTP client path is exercised.
+"""
+
+import time
+
+import pytest
+from loguru import logger
+
+from tasking.llm.openai import OpenAiLLM
+from tasking.model import Message, Role, TextBlock, CompletionConfig, StopReason
+from tasking.model.queue import AsyncQueue
+from tasking.model.setting import LLMConfig
+from tests.unit.llm.fake_server import FakeOpenAIServer
+
+
+def _messages() -> list[Message]:
+    return [Message(role=Role.USER, content=[TextBlock(text="Hello")])]
+
+
+def _llm(server: FakeOpenAIServer) -> OpenAiLLM:
+    config = LLMConfig(provider="openai", model="fake-model", api_key="test-key", base_url=server.base_url)
+    return OpenAiLLM(config)
+
+
+class TestOpenAISingleUpstreamRequest:
+    """One completion, one upstream request."""
+
+    async def test_streaming_completion_single_request(self):
+        """Usage and finish reason are read from the stream, without a second request."""
+        async with FakeOpenAIServer(chunks=["Hello", " there"]) as server:
+            llm = _llm(server)
+            queue = AsyncQueue[Message]()
+
+            result = await llm.completion(_messages(), None, queue, CompletionConfig(stream=True))
+
+            assert server.request_count == 1
+            assert server.requests[0]["stream"] is True
+            assert server.requests[0]["stream_options"] == {"include_usage": True}
+            assert result.content[0].text == "Hello there"
+            assert result.stop_reason == StopReason.STOP
+            assert result.usage.prompt_tokens == 11
+            assert result.usage.completion_tokens == 7
+            assert result.usage.total_tokens == 18
+
+    async def test_streaming_tool_call_single_request(self):
+        """Tool calls and finish reason are assembled from the stream."""
+        tool_call = {"id": "call_1", "name": "search", "arguments": '{"query": "weather"}'}
+        async with FakeOpenAIServer(chunks=[], tool_call=tool_call) as server:
+            llm = _llm(server)
+
+            result = await llm.completion(_messages(), None, AsyncQueue[Message](), CompletionConfig(stream=True))
+
+            assert server.request_count == 1
+            assert result.stop_reason == StopReason.TOOL_CALL
+            assert len(result.tool_calls) == 1
+            assert result.tool_calls[0].id == "call_1"
+            assert result.tool_calls[0].name == "search"
+            assert result.tool_calls[0].args == {"query": "weather"}
+
+    async def test_stream_options_can_be_ignored(self):
+        """Servers without stream_options support still work, usage is reported as unavailable."""
+        async with FakeOpenAIServer() as server:
+            llm = _llm(server)
+            config = CompletionConfig(stream=True, ignore_params=["stream_options"])
+
+            result = await llm.completion(_messages(), None, AsyncQueue[Message](), config)
+
+            assert server.request_count == 1
+            assert "stream_options" not in server.requests[0]
+            assert result.usage.total_tokens == -100
+
+    async def test_non_streaming_completion_single_request(self):
+        """Non-streaming mode is unchanged."""
+        async with FakeOpenAIServer() as server:
+            llm = _llm(server)
+
+            result = await llm.completion(_messages(), None, None, CompletionConfig(stream=False))
+
+            assert server.request_count == 1
+            assert result.usage.total_tokens == 18
+
+    @pytest.mark.parametrize("rounds", [20])
+    async def test_benchmark_requests_per_completion(self, rounds: int):
+        """Benchmark: N streamed completions cost exactly N upstream requests."""
+        async with FakeOpenAIServer(chunks=["chunk"] * 50, latency=0.005) as server:
+            llm = _llm(server)
+
+            start = time.perf_counter()
+            for _ in range(rounds):
+                await llm.completion(_messages(), None, AsyncQueue[Message](), CompletionConfig(stream=True))
+            elapsed = time.perf_counter() - start
+
+            logger.info(
+                f"[Benchmark] {rounds} streamed completions, {server.request_count} upstream requests, "
+                f"{elapsed / rounds * 1000:.2f} ms/completion"
+            )
+            assert server.request_count == rounds
@@ -0,0 +1,162 @@
+"""Tests for provider-side prompt caching: breakpoint planning, stable tools and cached token counts."""
+
+import asyncio
+import copy
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import AsyncMock, Mock, patch
+
+from tasking.llm.anthropic import AnthropicLLM, _create_usage, add_cache_control, to_anthropic, to_anthropic_messages
+from tasking.llm.openai import OpenAiLLM, to_openai
+from tasking.llm.prompt_cache import get_cached_tokens, plan_cache_breakpoints, sort_tools
+from tasking.model import CompletionConfig, Message, Role, TextBlock, ToolCallRequest
+from tasking.model.queue import AsyncQueue
+from tasking.model.setting import LLMConfig
+from tests.unit.llm.fake_server import FakeOpenAIServer
+
+
+PROTOCOL = "protocol " * 1000
+
+
+def _tools() -> list[Any]:
+    return [
+        SimpleNamespace(
+            name=name,
+            description=f"{name} tool " * 200,
+            inputSchema={"type": "object", "properties": {}},
+            annotations=None,
+        )
+        for name in ["search", "edit", "run"]
+    ]
+
+
+def _conversation() -> list[Message]:
+    tool_call = ToolCallRequest(id="call_1", name="search", args={"query": "weather"})
+    return [
+        Message(role=Role.SYSTEM, content=[TextBlock(text=PROTOCOL)]),
+        Message(role=Role.USER, content=[TextBlock(text="What is the weather?")]),
+        Message(role=Role.ASSISTANT, content=[TextBlock(text="Let me search.")], tool_calls=[tool_call]),
+        Message(role=Role.TOOL, content=[TextBlock(text="Sunny")], tool_call_id="call_1"),
+        Message(role=Role.ASSISTANT, content=[TextBlock(text="It is sunny.")]),
+        Message(role=Role.USER, content=[TextBlock(text="And tomorrow?")]),
+    ]
+
+
+def _breakpoints(history: list) -> list[int]:
+    return [
+        index for index, message in enumerate(history)
+        if isinstance(message["content"], list) and "cache_control" in message["content"][-1]
+    ]
+
+
+class TestPlanCacheBreakpoints:
+    """Test breakpoint selection."""
+
+    def test_last_previous_request_and_first(self):
+        roles = ["user", "user", "assistant", "user", "assistant", "user"]
+        assert plan_cache_breakpoints(roles, [5000] * 6) == [0, 3, 5]
+
+    def test_short_prefix_skipped(self):
+        roles = ["user", "assistant", "user"]
+        assert plan_cache_breakpoints(roles, [10, 10, 10]) == []
+        assert plan_cache_breakpoints(roles, [10, 10, 5000]) == [2]
+        # Tool definitions count towards the prefix
+        assert plan_cache_breakpoints(roles, [10, 10, 10], prefix_size=5000) == [0, 2]
+
+    def test_max_breakpoints(self):
+        roles = ["user", "assistant", "user", "assistant", "user"]
+        assert plan_cache_breakpoints(roles, [5000] * 5, max_breakpoints=1) == [4]
+        assert plan_cache_breakpoints(roles, [5000] * 5, max_breakpoints=0) == []
+        assert plan_cache_breakpoints([], []) == []
+
+    def test_single_message(self):
+        assert plan_cache_breakpoints(["user"], [5000]) == [0]
+
+
+class TestAnthropicCacheControl:
+    """Test cache_control breakpoints in Anthropic requests."""
+
+    def test_marks_tools_and_messages_without_mutating_history(self):
+        history = to_anthropic_messages(_conversation())
+        original = copy.deepcopy(history)
+        kwargs = to_anthropic(CompletionConfig(), _tools())
+
+        marked = add_cache_control(history, kwargs)
+
+        assert history == original
+        assert [tool["name"] for tool in kwargs["tools"]] == ["edit", "run", "search"]
+        assert kwargs["tools"][-1]["cache_control"] == {"type": "ephemeral"}
+        assert "cache_control" not in kwargs["tools"][0]
+        # First message, end of the previous request (tool result) and the last message
+        assert _breakpoints(marked) == [0, 2, 4]
+        assert marked[0]["content"][-1]["text"] == history[0]["content"]
+        assert marked[1] is history[1]
+
+    def test_short_prompt_is_unchanged(self):
+        history = to_anthropic_messages([Message(role=Role.USER, content=[TextBlock(text="Hi")])])
+        kwargs = to_anthropic(CompletionConfig(), None)
+        assert add_cache_control(history, kwargs) == history
+
+    @patch("tasking.llm.anthropic.AsyncAnthropic")
+    def test_completion_sends_breakpoints(self, mock_anthropic):
+        mock_client = Mock()
+        mock_response = Mock()
+        mock_response.content = [Mock(type="text", text="ok")]
+        mock_response.stop_reason = "end_turn"
+        mock_response.usage = Mock(
+            input_tokens=10, output_tokens=5, cache_read_input_tokens=3000, cache_creation_input_tokens=20,
+        )
+        mock_client.messages.create = AsyncMock(return_value=mock_response)
+        mock_anthropic.return_value = mock_client
+        llm = AnthropicLLM(LLMConfig(provider="anthropic", model="claude", api_key="test-key"))
+
+        result = asyncio.run(llm.completion(_conversation(), None, None, CompletionConfig()))
+        assert _breakpoints(mock_client.messages.create.call_args.kwargs["messages"]) == [0, 2, 4]
+        assert result.usage.prompt_tokens == 3030
+        assert result.usage.cached_tokens == 3000
+        assert result.usage.cache_creation_tokens == 20
+        assert result.usage.total_tokens == 3035
+
+        # Prompt caching can be turned off
+        asyncio.run(llm.completion(_conversation(), None, None, CompletionConfig(prompt_cache=False)))
+        assert _breakpoints(mock_client.messages.create.call_args.kwargs["messages"]) == []
+
+    def test_usage_without_cache_fields(self):
+        usage = _create_usage(Mock(spec=["input_tokens", "output_tokens"], input_tokens=10, output_tokens=20))
+        assert (usage.prompt_tokens, usage.total_tokens) == (10, 30)
+        assert usage.cached_tokens == -100
+        assert usage.cache_creation_tokens == -100
+
+
+class TestStablePrefix:
+    """Test stable tool ordering and cached token counts of OpenAI compatible APIs."""
+
+    def test_tools_sorted_by_name(self):
+        tools = _tools()
+        assert [tool.name for tool in sort_tools(tools)] == ["edit", "run", "search"]
+        names = [tool["function"]["name"] for tool in to_openai(CompletionConfig(), tools[::-1])["tools"]]
+        assert names == ["edit", "run", "search"]
+
+    def test_get_cached_tokens(self):
+        assert get_cached_tokens(SimpleNamespace(prompt_tokens_details=SimpleNamespace(cached_tokens=64))) == 64
+        assert get_cached_tokens(SimpleNamespace(prompt_tokens_details=None)) == -100
+        assert get_cached_tokens(None) == -100
+
+    def test_openai_usage_reports_cached_tokens(self):
+        usage = {
+            "prompt_tokens": 100, "completion_tokens": 7, "total_tokens": 107,
+            "prompt_tokens_details": {"cached_tokens": 64},
+        }
+
+        async def run(stream: bool) -> Message:
+            async with FakeOpenAIServer(usage=usage) as server:
+                llm = OpenAiLLM(LLMConfig(provider="openai", model="gpt", api_key="test-key", base_url=server.base_url))
+                queue = AsyncQueue[Message]() if stream else None
+                return await llm.completion(
+                    [Message(role=Role.USER, content=[TextBlock(text="Hello")])], None, queue, CompletionConfig(),
+                )
+
+        for stream in (False, True):
+            result = asyncio.run(run(stream))
+            assert result.usage.prompt_tokens == 100
+            assert result.usage.cached_tokens == 64
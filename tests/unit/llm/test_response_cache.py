@@ -0,0 +1,262 @@
+"""Tests for the local completion response cache and the CachedLLM decorator."""
+
+import asyncio
+import os
+import tempfile
+import time
+from typing import Any
+
+import pytest
+import pytest_asyncio
+from loguru import logger
+
+from tasking.llm import CachedLLM, ILLM, Provider, ResponseCache
+from tasking.model import CompletionConfig, CompletionUsage, Message, Role, StopReason, TextBlock
+from tasking.model.queue import AsyncQueue, IAsyncQueue
+
+
+CHUNKS = ["Hello", " from", " the", " model"]
+
+
+class FakeLLM(ILLM):
+    """Fake LLM that streams fixed chunks and counts its calls."""
+
+    def __init__(self, model: str = "fake-model", delay: float = 0.0, error: Exception | None = None) -> None:
+        self.model = model
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+
+    @classmethod
+    def from_config(cls, config: Any) -> ILLM:
+        return cls()
+
+    def get_provider(self) -> Provider:
+        return Provider.OPENAI
+
+    def get_base_url(self) -> str:
+        return "http://fake"
+
+    def get_model(self) -> str:
+        return self.model
+
+    async def completion(
+        self,
+        messages: list[Message],
+        tools: Any,
+        stream_queue: IAsyncQueue[Message] | None,
+        completion_config: CompletionConfig,
+        **kwargs: Any,
+    ) -> Message:
+        self.calls += 1
+        if self.error is not None:
+            raise self.error
+        for chunk in CHUNKS:
+            await asyncio.sleep(self.delay)
+            if stream_queue is not None:
+                await stream_queue.put(Message(role=Role.ASSISTANT, content=[TextBlock(text=chunk)], is_chunking=True))
+        return Message(
+            role=Role.ASSISTANT,
+            content=[TextBlock(text="".join(CHUNKS))],
+            stop_reason=StopReason.STOP,
+            usage=CompletionUsage(prompt_tokens=10, completion_tokens=4, total_tokens=14),
+        )
+
+
+def _messages() -> list[Message]:
+    # Fresh uids and timestamps on every call, the cache key must not depend on them
+    return [
+        Message(role=Role.SYSTEM, content=[TextBlock(text="protocol")]),
+        Message(role=Role.USER, content=[TextBlock(text="Hello")]),
+    ]
+
+
+async def _drain(queue: AsyncQueue[Message]) -> list[str]:
+    texts: list[str] = []
+    while not queue.is_empty():
+        message = await queue.get()
+        texts.append(message.content[0].text)
+    return texts
+
+
+@pytest_asyncio.fixture
+async def cache():
+    cache = ResponseCache(":memory:")
+    try:
+        yield cache
+    finally:
+        await cache.close()
+
+
+class TestCachedLLM:
+    """Test cache hits, misses and replay."""
+
+    @pytest.mark.asyncio
+    async def test_identical_request_hits_cache(self, cache):
+        llm = FakeLLM()
+        cached_llm = CachedLLM(llm, cache)
+
+        first = await cached_llm.completion(_messages(), None, None, CompletionConfig())
+        second = await cached_llm.completion(_messages(), None, None, CompletionConfig())
+
+        assert llm.calls == 1
+        assert cached_llm.get_stats() == (1, 1)
+        assert second.content == first.content
+        assert second.stop_reason == StopReason.STOP
+        assert second.uid != first.uid
+        # A cache hit spends no tokens
+        assert first.usage.total_tokens == 14
+        assert (second.usage.prompt_tokens, second.usage.completion_tokens, second.usage.total_tokens) == (0, 0, 0)
+
+    @pytest.mark.asyncio
+    async def test_different_request_misses(self, cache):
+        llm = FakeLLM()
+        cached_llm = CachedLLM(llm, cache)
+
+        await cached_llm.completion(_messages(), None, None, CompletionConfig())
+        await cached_llm.completion(_messages(), None, None, CompletionConfig(temperature=0.1))
+        await cached_llm.completion(_messages()[:1], None, None, CompletionConfig())
+        await CachedLLM(FakeLLM(model="other"), cache).completion(_messages(), None, None, CompletionConfig())
+        assert llm.calls == 3
+
+        # Streaming does not change the request, so it shares the cache entry
+        await cached_llm.completion(_messages(), None, AsyncQueue[Message](), CompletionConfig(stream=True))
+        assert llm.calls == 3
+
+    @pytest.mark.asyncio
+    async def test_stream_chunks_replayed(self, cache):
+        llm = FakeLLM(delay=0.01)
+        cached_llm = CachedLLM(llm, cache)
+
+        queue = AsyncQueue[Message]()
+        await cached_llm.completion(_messages(), None, queue, CompletionConfig(stream=True))
+        assert await _drain(queue) == CHUNKS
+
+        queue = AsyncQueue[Message]()
+        result = await cached_llm.completion(_messages(), None, queue, CompletionConfig(stream=True))
+        assert llm.calls == 1
+        assert await _drain(queue) == CHUNKS
+        assert result.content[0].text == "".join(CHUNKS)
+
+    @pytest.mark.asyncio
+    async def test_non_stream_result_replayed_as_one_chunk(self, cache):
+        cached_llm = CachedLLM(FakeLLM(), cache)
+        await cached_llm.completion(_messages(), None, None, CompletionConfig())
+
+        queue = AsyncQueue[Message]()
+        await cached_llm.completion(_messages(), None, queue, CompletionConfig(stream=True))
+        assert await _drain(queue) == ["".join(CHUNKS)]
+
+    @pytest.mark.asyncio
+    async def test_replay_speed(self, cache):
+        await CachedLLM(FakeLLM(delay=0.05), cache).completion(_messages(), None, AsyncQueue[Message](), CompletionConfig())
+
+        start = time.perf_counter()
+        await CachedLLM(FakeLLM(), cache).completion(_messages(), None, AsyncQueue[Message](), CompletionConfig())
+        instant = time.perf_counter() - start
+
+        start = time.perf_counter()
+        await CachedLLM(FakeLLM(), cache, replay_speed=2.0).completion(
+            _messages(), None, AsyncQueue[Message](), CompletionConfig(),
+        )
+        paced = time.perf_counter() - start
+
+        assert instant < 0.05
+        assert paced >= 0.09
+
+    @pytest.mark.asyncio
+    async def test_failed_completion_not_cached(self, cache):
+        llm = FakeLLM(error=RuntimeError("boom"))
+        cached_llm = CachedLLM(llm, cache)
+        for _ in range(2):
+            with pytest.raises(RuntimeError):
+                await cached_llm.completion(_messages(), None, None, CompletionConfig())
+        assert llm.calls == 2
+        assert await cache.count() == 0
+
+    def test_invalid_replay_speed(self, cache):
+        with pytest.raises(ValueError):
+            CachedLLM(FakeLLM(), cache, replay_speed=0)
+
+
+class TestResponseCache:
+    """Test persistence, expiry and eviction of the store."""
+
+    @staticmethod
+    def _message(text: str) -> Message:
+        return Message(role=Role.ASSISTANT, content=[TextBlock(text=text)])
+
+    async def test_persisted_across_instances(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "responses.sqlite3")
+            cache = ResponseCache(path)
+            await cache.put("key", self._message("hello"), [(0.0, "hel"), (0.1, "lo")])
+            await cache.close()
+
+            cache = ResponseCache(path)
+            cached = await cache.get("key")
+            await cache.close()
+        assert cached is not None
+        assert cached.message.content[0].text == "hello"
+        assert cached.chunks == [(0.0, "hel"), (0.1, "lo")]
+
+    async def test_expired_entry_removed(self):
+        cache = ResponseCache(":memory:", ttl=0.05)
+        await cache.put("key", self._message("hello"), [])
+        assert await cache.get("key") is not None
+        await asyncio.sleep(0.1)
+        assert await cache.get("key") is None
+        assert await cache.count() == 0
+        await cache.close()
+
+    async def test_least_recently_used_evicted(self):
+        cache = ResponseCache(":memory:", max_entries=2)
+        await cache.put("a", self._message("a"), [])
+        await asyncio.sleep(0.01)
+        await cache.put("b", self._message("b"), [])
+        await asyncio.sleep(0.01)
+        assert await cache.get("a") is not None
+
+        await cache.put("c", self._message("c"), [])
+        assert await cache.get("b") is None
+        assert await cache.get("a") is not None
+        assert await cache.get("c") is not None
+        await cache.close()
+
+    async def test_size_bound(self):
+        cache = ResponseCache(":memory:", max_bytes=1000)
+        for i in range(10):
+            await cache.put(f"key{i}", self._message("x" * 200), [])
+            await asyncio.sleep(0.001)
+        count = await cache.count()
+        assert 0 < count < 10
+        # Only the oldest entries are evicted
+        for i in range(10 - count, 10):
+            assert await cache.get(f"key{i}") is not None
+        await cache.close()
+
+    def test_invalid_arguments(self):
+        for kwargs in ({"ttl": 0}, {"max_entries": 0}, {"max_bytes": -1}):
+            with pytest.raises(ValueError):
+                ResponseCache(":memory:", **kwargs)
+
+
+class TestResponseCacheBenchmark:
+    """Micro benchmark of replaying a completion from the cache."""
+
+    @pytest.mark.asyncio
+    async def test_hit_latency(self, cache):
+        rounds = 20
+        cached_llm = CachedLLM(FakeLLM(delay=0.005), cache)
+
+        start = time.perf_counter()
+        await cached_llm.completion(_messages(), None, AsyncQueue[Message](), CompletionConfig())
+        miss = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in range(rounds):
+            await cached_llm.completion(_messages(), None, AsyncQueue[Message](), CompletionConfig())
+        hit = (time.perf_counter() - start) / rounds
+        logger.info(f"[Benchmark] 补全结果缓存：未命中 {miss * 1e3:.2f}ms，命中平均 {hit * 1e3:.2f}ms")
+
+        assert hit < miss
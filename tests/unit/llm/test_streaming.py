@@ -99,17 +99,17 @@ class TestOpenAIStreaming(TestLLMStreaming):
         """Test successful OpenAI streaming."""
         # Setup mock streaming response
         mock_client = Mock()
-        mock_stream, final_completion = self._create_mock_openai_stream([
+        mock_stream = self._create_mock_openai_stream([
             {"content": "Hello"},
             {"content": " there"},
             {"content": "! How"},
             {"content": " can"},
             {"content": " I"},
             {"content": " help"},
-            {"content": " you"},
+            {"content": " you", "finish_reason": "stop"},
         ])
-        # Return mock stream for first call (streaming), final completion for second call (non-streaming)
-        mock_client.chat.completions.create = AsyncMock(side_effect=[mock_stream, final_completion])
+        # Usage and finish reason come from the stream, no second request is made
+        mock_client.chat.completions.create = AsyncMock(return_value=mock_stream)
         mock_openai.return_value = mock_client
 
         # Create LLM instance
@@ -133,6 +133,16 @@ class TestOpenAIStreaming(TestLLMStreaming):
         assert chunks[1].content[0].text == " there"
         assert chunks[-1].content[0].text == " you"
 
+        # Verify a single streaming request with usage enabled
+        assert mock_client.chat.completions.create.await_count == 1
+        call_kwargs = mock_client.chat.completions.create.call_args.kwargs
+        assert call_kwargs["stream"] is True
+        assert call_kwargs["stream_options"] == {"include_usage": True}
+        assert result.usage.prompt_tokens == 50
+        assert result.usage.completion_tokens == 100
+        assert result.usage.total_tokens == 150
+        assert result.stop_reason == StopReason.STOP
+
     @patch('tasking.llm.openai.AsyncOpenAI')
     async def test_openai_streaming_with_tool_calls(self, mock_openai, mock_stream_queue, sample_messages, streaming_config):
         """Test OpenAI streaming with tool calls."""
@@ -148,13 +158,13 @@ class TestOpenAIStreaming(TestLLMStreaming):
         tool_call_mock.id = "call_123"
         tool_call_mock.function = function_mock
 
-        mock_stream, final_completion = self._create_mock_openai_stream_with_tool_calls([
+        mock_stream = self._create_mock_openai_stream_with_tool_calls([
             {"content": "I'll", "tool_calls": None},
             {"content": " call", "tool_calls": None},
-            {"content": " a function.", "tool_calls": [tool_call_mock]},
+            {"content": " a function.", "tool_calls": [tool_call_mock], "finish_reason": "tool_calls"},
         ])
-        # Return mock stream for first call (streaming), final completion for second call (non-streaming)
-        mock_client.chat.completions.create = AsyncMock(side_effect=[mock_stream, final_completion])
+        # Usage and finish reason come from the stream, no second request is made
+        mock_client.chat.completions.create = AsyncMock(return_value=mock_stream)
         mock_openai.return_value = mock_client
 
         config = LLMConfig(provider="openai", model="gpt-4", api_key="test-key")
@@ -168,6 +178,9 @@ class TestOpenAIStreaming(TestLLMStreaming):
         assert tool_call.id == "call_123"
         assert tool_call.name == "test_func"
         assert tool_call.args == {"param": "value"}
+        assert result.stop_reason == StopReason.TOOL_CALL
+        assert result.usage.total_tokens == 100
+        assert mock_client.chat.completions.create.await_count == 1
 
         # Note: In the current OpenAI implementation, tool calls are accumulated internally
         # but not sent as individual chunks to the stream queue. This is expected behavior.
@@ -196,6 +209,8 @@ class TestOpenAIStreaming(TestLLMStreaming):
             raise Exception("Connection lost")
 
         mock_stream.__aiter__ = lambda self: async_iter()
+        # The SDK stream is closed when iteration is interrupted
+        mock_stream.close = AsyncMock()
         mock_stream.get_final_completion = AsyncMock(side_effect=Exception("Connection lost"))
 
         mock_client.chat.completions.create = AsyncMock(return_value=mock_stream)
@@ -211,6 +226,7 @@ class TestOpenAIStreaming(TestLLMStreaming):
         # Some chunks should have been sent before the error (accounting for retries)
         # Each retry sends the chunks again, so 2 chunks * 3 retries + 1 initial = 8 chunks
         assert mock_stream_queue.put_count >= 2  # At least some chunks sent
+        mock_stream.close.assert_awaited_once()
 
     @patch('tasking.llm.openai.AsyncOpenAI')
     async def test_openai_non_streaming_mode(self, mock_openai, sample_messages, non_streaming_config):
@@ -239,8 +255,8 @@ class TestOpenAIStreaming(TestLLMStreaming):
         assert result.content[0].text == "Hello! This is a non-streaming response."
         assert result.is_chunking is False
 
-    def _create_mock_openai_stream(self, content_chunks: list[dict[str, Any]]) -> tuple[Mock, Mock]:
-        """Create a mock OpenAI streaming response and final completion."""
+    def _create_mock_openai_stream(self, content_chunks: list[dict[str, Any]]) -> Mock:
+        """Create a mock OpenAI streaming response ending with a usage chunk."""
         # Create the stream chunks
         stream_chunks = []
         for chunk_data in content_chunks:
@@ -249,9 +265,16 @@ class TestOpenAIStreaming(TestLLMStreaming):
                     delta=Mock(
                         content=chunk_data.get("content"),
                         tool_calls=chunk_data.get("tool_calls")
-                    )
-                )]
+                    ),
+                    finish_reason=chunk_data.get("finish_reason"),
+                )],
+                usage=None,
             ))
+        # Final usage chunk (stream_options.include_usage)
+        stream_chunks.append(Mock(
+            choices=[],
+            usage=Mock(prompt_tokens=50, completion_tokens=100, total_tokens=150),
+        ))
 
         # Create a mock that supports async iteration
         mock_stream = Mock()
@@ -262,30 +285,13 @@ class TestOpenAIStreaming(TestLLMStreaming):
                 yield chunk
 
         mock_stream.__aiter__ = lambda self: async_iter()
+        # The SDK stream is closed when iteration is interrupted
+        mock_stream.close = AsyncMock()
 
-        # Mock the final completion
-        final_completion = Mock()
-        final_completion.usage = Mock()
-        # Configure mock usage attributes properly
-        final_completion.usage.configure_mock(
-            prompt_tokens=50,
-            completion_tokens=100,
-            total_tokens=150
-        )
-        final_completion.choices = [
-            Mock(
-                message=Mock(
-                    content="Hello there! How can I help you",
-                    tool_calls=None
-                ),
-                finish_reason="stop"
-            )
-        ]
-
-        return mock_stream, final_completion
+        return mock_stream
 
-    def _create_mock_openai_stream_with_tool_calls(self, chunks: list[dict[str, Any]]) -> tuple[Mock, Mock]:
-        """Create a mock OpenAI stream with tool calls and final completion."""
+    def _create_mock_openai_stream_with_tool_calls(self, chunks: list[dict[str, Any]]) -> Mock:
+        """Create a mock OpenAI stream with tool calls ending with a usage chunk."""
         # Create the stream chunks
         stream_chunks = []
         for chunk_data in chunks:
@@ -296,9 +302,16 @@ class TestOpenAIStreaming(TestLLMStreaming):
                     delta=Mock(
                         content=chunk_data.get("content"),
                         tool_calls=tool_calls
-                    )
-                )]
+                    ),
+                    finish_reason=chunk_data.get("finish_reason"),
+                )],
+                usage=None,
             ))
+        # Final usage chunk (stream_options.include_usage)
+        stream_chunks.append(Mock(
+            choices=[],
+            usage=Mock(prompt_tokens=30, completion_tokens=70, total_tokens=100),
+        ))
 
         # Create a mock that supports async iteration
         mock_stream = Mock()
@@ -309,31 +322,10 @@ class TestOpenAIStreaming(TestLLMStreaming):
                 yield chunk
 
         mock_stream.__aiter__ = lambda self: async_iter()
+        # The SDK stream is closed when iteration is interrupted
+        mock_stream.close = AsyncMock()
 
-        # Mock the final completion with tool calls
-        final_completion = Mock()
-        final_completion.usage = Mock()
-        # Configure mock usage attributes properly
-        final_completion.usage.configure_mock(
-            prompt_tokens=30,
-            completion_tokens=70,
-            total_tokens=100
-        )
-        final_completion.choices = [
-            Mock(
-                message=Mock(
-                    content="I'll call a function.",
-                    tool_calls=[Mock(
-                        id="call_123",
-                        function=Mock(name="test_func", arguments='{"param": "value"}')
-                    )]
-                ),
-                finish_reason="tool_calls"
-            )
-        ]
-
-
-        return mock_stream, final_completion
+        return mock_stream
 
 
 class TestAnthropicStreaming(TestLLMStreaming):
@@ -448,7 +440,7 @@ class TestAnthropicStreaming(TestLLMStreaming):
 class TestZhipuStreaming(TestLLMStreaming):
     """Test Zhipu streaming implementation."""
 
-    @patch('tasking.llm.zhipu.ZhipuAI')
+    @patch('tasking.llm.zhipu.AsyncOpenAI')
     async def test_zhipu_streaming_success(self, mock_openai, mock_stream_queue, sample_messages, streaming_config):
         """Test successful Zhipu streaming."""
         # Similar to OpenAI but with Zhipu-specific handling
@@ -459,33 +451,8 @@ class TestZhipuStreaming(TestLLMStreaming):
             "AI助手"
         ])
 
-        # Mock the non-streaming call for final usage info
-        final_response = Mock()
-        final_response.usage = Mock()
-        final_response.usage.configure_mock(
-            prompt_tokens=20,
-            completion_tokens=40,
-            total_tokens=60
-        )
-        final_response.choices = [
-            Mock(
-                message=Mock(
-                    content="你好，我是AI助手",
-                    tool_calls=None
-                ),
-                finish_reason="stop"
-            )
-        ]
-
-        # Configure create to return different responses based on call parameters
-        def mock_create(*args, **kwargs):
-            if kwargs.get("stream", False):
-                return mock_stream
-            else:
-                return final_response
-
-        # For Zhipu, the create method is synchronous (not async) due to asyncify usage
-        mock_client.chat.completions.create = mock_create
+        # Zhipu returns usage with the last chunk, no second request is made
+        mock_client.chat.completions.create = AsyncMock(return_value=mock_stream)
         mock_openai.return_value = mock_client
 
         config = LLMConfig(provider="zhipu", model="glm-4", api_key="test-key")
@@ -495,17 +462,25 @@ class TestZhipuStreaming(TestLLMStreaming):
 
         assert isinstance(result, Message)
         assert result.role == Role.ASSISTANT
+        assert result.content[0].text == "你好，我是AI助手"
+        assert result.stop_reason == StopReason.STOP
+        assert result.usage.total_tokens == 60
         assert mock_stream_queue.put_count == 3
+        mock_client.chat.completions.create.assert_awaited_once()
 
     def _create_mock_zhipu_stream(self, content_chunks: list[str]) -> Mock:
         """Create a mock Zhipu streaming response."""
-        # Create the stream chunks
+        # Create the stream chunks, the last one carries the finish reason and usage
         stream_chunks = []
-        for content in content_chunks:
+        for i, content in enumerate(content_chunks):
+            is_last = i == len(content_chunks) - 1
+            usage = Mock(prompt_tokens=20, completion_tokens=40, total_tokens=60, prompt_tokens_details=None)
             stream_chunks.append(Mock(
                 choices=[Mock(
-                    delta=Mock(content=content, tool_calls=None)
-                )]
+                    delta=Mock(content=content, tool_calls=None),
+                    finish_reason="stop" if is_last else None,
+                )],
+                usage=usage if is_last else None,
             ))
 
         # Create a mock that supports async iteration
@@ -517,26 +492,8 @@ class TestZhipuStreaming(TestLLMStreaming):
                 yield chunk
 
         mock_stream.__aiter__ = lambda self: async_iter()
-
-        # Mock the final completion
-        final_completion = Mock()
-        final_completion.usage = Mock()
-        # Configure mock usage attributes properly
-        final_completion.usage.configure_mock(
-            prompt_tokens=20,
-            completion_tokens=40,
-            total_tokens=60
-        )
-        final_completion.choices = [
-            Mock(
-                message=Mock(
-                    content="你好，我是AI助手",
-                    tool_calls=None
-                ),
-                finish_reason="stop"
-            )
-        ]
-
+        # The SDK stream is closed when iteration is interrupted
+        mock_stream.close = AsyncMock()
 
         return mock_stream
 
@@ -553,33 +510,7 @@ class TestArkStreaming(TestLLMStreaming):
             "，很高兴",
             "为您服务"
         ])
-
-        # Mock the non-streaming call for final usage info
-        final_response = Mock()
-        final_response.usage = Mock()
-        final_response.usage.configure_mock(
-            prompt_tokens=25,
-            completion_tokens=45,
-            total_tokens=70
-        )
-        final_response.choices = [
-            Mock(
-                message=Mock(
-                    content="我是豆包，很高兴为您服务",
-                    tool_calls=None
-                ),
-                finish_reason="stop"
-            )
-        ]
-
-        # Configure create to return different responses based on call parameters
-        async def mock_create(*args, **kwargs):
-            if kwargs.get("stream", False):
-                return mock_stream
-            else:
-                return final_response
-
-        mock_client.chat.completions.create = AsyncMock(side_effect=mock_create)
+        mock_client.chat.completions.create = AsyncMock(return_value=mock_stream)
         mock_openai.return_value = mock_client
 
         config = LLMConfig(provider="ark", model="doubao-pro-32k", api_key="test-key")
@@ -590,17 +521,31 @@ class TestArkStreaming(TestLLMStreaming):
         assert isinstance(result, Message)
         assert result.role == Role.ASSISTANT
         assert mock_stream_queue.put_count == 3
+        assert result.content[0].text == "我是豆包，很高兴为您服务"
+        # Usage and finish reason come from the stream, no second request is made
+        assert mock_client.chat.completions.create.await_count == 1
+        assert mock_client.chat.completions.create.call_args.kwargs["stream_options"] == {"include_usage": True}
+        assert result.usage.prompt_tokens == 25
+        assert result.usage.total_tokens == 70
+        assert result.stop_reason == StopReason.STOP
 
     def _create_mock_ark_stream(self, content_chunks: list[str]) -> Mock:
-        """Create a mock Ark streaming response."""
+        """Create a mock Ark streaming response ending with a usage chunk."""
         # Create the stream chunks
         stream_chunks = []
-        for content in content_chunks:
+        for i, content in enumerate(content_chunks):
             stream_chunks.append(Mock(
                 choices=[Mock(
-                    delta=Mock(content=content, tool_calls=None)
-                )]
+                    delta=Mock(content=content, tool_calls=None),
+                    finish_reason="stop" if i == len(content_chunks) - 1 else None,
+                )],
+                usage=None,
             ))
+        # Final usage chunk (stream_options.include_usage)
+        stream_chunks.append(Mock(
+            choices=[],
+            usage=Mock(prompt_tokens=25, completion_tokens=45, total_tokens=70),
+        ))
 
         # Create a mock that supports async iteration
         mock_stream = Mock()
@@ -611,26 +556,8 @@ class TestArkStreaming(TestLLMStreaming):
                 yield chunk
 
         mock_stream.__aiter__ = lambda self: async_iter()
-
-        # Mock the final completion
-        final_completion = Mock()
-        final_completion.usage = Mock()
-        # Configure mock usage attributes properly
-        final_completion.usage.configure_mock(
-            prompt_tokens=25,
-            completion_tokens=45,
-            total_tokens=70
-        )
-        final_completion.choices = [
-            Mock(
-                message=Mock(
-                    content="我是豆包，很高兴为您服务",
-                    tool_calls=None
-                ),
-                finish_reason="stop"
-            )
-        ]
-
+        # The SDK stream is closed when iteration is interrupted
+        mock_stream.close = AsyncMock()
 
         return mock_stream
 
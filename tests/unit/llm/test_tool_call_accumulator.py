@@ -0,0 +1,204 @@
+"""Tests for the shared streaming tool-call accumulator."""
+
+import json
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+
+from tasking.llm.anthropic import AnthropicLLM
+from tasking.llm.openai import OpenAiLLM
+from tasking.llm.stream import ToolCallAccumulator, _IncrementalJSONParser, parse_tool_arguments
+from tasking.model import Message, Role, TextBlock, CompletionConfig, StopReason
+from tasking.model.queue import AsyncQueue
+from tasking.model.setting import LLMConfig
+from tests.unit.llm.fake_server import FakeOpenAIServer
+
+
+def _messages() -> list[Message]:
+    return [Message(role=Role.USER, content=[TextBlock(text="Hello")])]
+
+
+class TestParseToolArguments:
+    """Test argument parsing."""
+
+    def test_strict_json(self):
+        assert parse_tool_arguments('{"a": 1}') == {"a": 1}
+
+    def test_empty(self):
+        assert parse_tool_arguments("") == {}
+        assert parse_tool_arguments("  ") == {}
+
+    def test_truncated_json_is_repaired(self):
+        assert parse_tool_arguments('{"query": "wea') == {"query": "wea"}
+
+    def test_non_object_returns_empty(self):
+        assert parse_tool_arguments("[1, 2]") == {}
+
+
+class TestToolCallAccumulator:
+    """Test fragment buffering and final parsing."""
+
+    def test_fragments_parsed_once_at_finish(self):
+        """Fragments that are not standalone JSON objects are joined before parsing."""
+        arguments = json.dumps({"path": "/tmp/a.txt", "content": "line 1\nline 2", "mode": "w"})
+        accumulator = ToolCallAccumulator()
+        accumulator.add(0, id="call_1", name="write_file")
+        for i in range(0, len(arguments), 3):
+            accumulator.add(0, arguments=arguments[i:i + 3])
+
+        tool_calls = accumulator.finish()
+
+        assert len(tool_calls) == 1
+        assert tool_calls[0].id == "call_1"
+        assert tool_calls[0].name == "write_file"
+        assert tool_calls[0].args == json.loads(arguments)
+
+    def test_multiple_tool_calls_keep_order(self):
+        accumulator = ToolCallAccumulator()
+        accumulator.add(1, id="call_b", name="b", arguments='{"x": 2}')
+        accumulator.add(0, id="call_a", name="a", arguments='{"x": ')
+        accumulator.add(0, arguments="1}")
+
+        tool_calls = accumulator.finish()
+
+        assert [tool_call.name for tool_call in tool_calls] == ["b", "a"]
+        assert tool_calls[1].args == {"x": 1}
+
+    def test_default_id_and_empty_arguments(self):
+        accumulator = ToolCallAccumulator()
+        accumulator.add(2, name="noop")
+
+        tool_calls = accumulator.finish()
+
+        assert tool_calls[0].id == "tool_call_2"
+        assert tool_calls[0].args == {}
+
+    def test_preview_is_cached_until_new_fragment(self):
+        accumulator = ToolCallAccumulator()
+        accumulator.add(0, id="call_1", name="search", arguments='{"query": "wea')
+
+        first = accumulator.preview(0)
+        assert first == {"query": "wea"}
+        assert accumulator.preview(0) is first
+
+        accumulator.add(0, arguments='ther", "limit": 3}')
+        assert accumulator.preview(0) == {"query": "weather", "limit": 3}
+        assert accumulator.arguments(0) == '{"query": "weather", "limit": 3}'
+
+    def test_preview_scans_only_new_fragments(self):
+        arguments = json.dumps(
+            {"path": "a.txt", "content": 'say "hi"\\\n\u00e9\U0001F600' * 50, "lines": [1, -2.5e3, True, None], "meta": {}},
+            ensure_ascii=True,
+        )
+        accumulator = ToolCallAccumulator()
+        scanned: list[str] = []
+        feed = _IncrementalJSONParser.feed
+
+        def counting_feed(parser: _IncrementalJSONParser, text: str) -> None:
+            scanned.append(text)
+            feed(parser, text)
+
+        with patch.object(_IncrementalJSONParser, "feed", counting_feed), \
+                patch("tasking.llm.stream.parse_tool_arguments") as full_parse:
+            # Split escapes and surrogate pairs across fragments
+            for start in range(0, len(arguments), 3):
+                accumulator.add(0, arguments=arguments[start:start + 3])
+                preview = accumulator.preview(0)
+                assert isinstance(preview, dict)
+
+        # Every character is scanned exactly once and the full buffer is never re-parsed
+        assert "".join(scanned) == arguments
+        full_parse.assert_not_called()
+        assert preview == json.loads(arguments)
+
+    def test_preview_partial_values(self):
+        accumulator = ToolCallAccumulator()
+        expected = [
+            ('{"query": "wea', {"query": "wea"}),
+            ('ther\\u00', {"query": "weather"}),
+            ('e9", "li', {"query": "weatheré"}),
+            ('mit": 1', {"query": "weatheré", "limit": 1}),
+            ('2, "tags": ["a", tr', {"query": "weatheré", "limit": 12, "tags": ["a", True]}),
+            ('ue], "x": {"y": nu', {"query": "weatheré", "limit": 12, "tags": ["a", True], "x": {"y": None}}),
+            ('ll}}', {"query": "weatheré", "limit": 12, "tags": ["a", True], "x": {"y": None}}),
+        ]
+        for fragment, preview in expected:
+            accumulator.add(0, arguments=fragment)
+            assert accumulator.preview(0) == preview
+
+    def test_preview_falls_back_for_invalid_json(self):
+        accumulator = ToolCallAccumulator()
+        accumulator.add(0, arguments="{'query': 'weather'")
+
+        assert accumulator.preview(0) == parse_tool_arguments("{'query': 'weather'")
+
+
+class TestStreamingToolCallAssembly:
+    """Fragmented tool-call arguments are assembled correctly by the adapters."""
+
+    async def test_openai_fragmented_arguments(self):
+        arguments = json.dumps({"query": "weather in Beijing", "days": 3, "units": {"temp": "C"}})
+        tool_call = {"id": "call_1", "name": "search", "arguments": arguments}
+        async with FakeOpenAIServer(chunks=[], tool_call=tool_call, argument_chunk_size=5) as server:
+            config = LLMConfig(provider="openai", model="fake-model", api_key="test-key", base_url=server.base_url)
+            llm = OpenAiLLM(config)
+
+            result = await llm.completion(_messages(), None, AsyncQueue[Message](), CompletionConfig(stream=True))
+
+            assert result.stop_reason == StopReason.TOOL_CALL
+            assert len(result.tool_calls) == 1
+            assert result.tool_calls[0].args == json.loads(arguments)
+
+    @patch('tasking.llm.anthropic.AsyncAnthropic')
+    async def test_anthropic_input_json_deltas(self, mock_anthropic):
+        events = [
+            SimpleNamespace(
+                type="content_block_start",
+                index=0,
+                content_block=SimpleNamespace(type="tool_use", id="toolu_1", name="search"),
+            ),
+            SimpleNamespace(
+                type="content_block_delta",
+                index=0,
+                delta=SimpleNamespace(type="input_json_delta", partial_json='{"query": "wea'),
+            ),
+            SimpleNamespace(
+                type="content_block_delta",
+                index=0,
+                delta=SimpleNamespace(type="input_json_delta", partial_json='ther"}'),
+            ),
+            SimpleNamespace(type="content_block_stop", index=0, content_block=SimpleNamespace(type="tool_use")),
+        ]
+
+        class MockStream:
+            async def __aenter__(self):
+                return self
+
+            async def __aexit__(self, *_args):
+                return None
+
+            def __aiter__(self):
+                return self._iterate()
+
+            async def _iterate(self):
+                for event in events:
+                    yield event
+
+            async def get_final_message(self):
+                return SimpleNamespace(
+                    usage=SimpleNamespace(input_tokens=10, output_tokens=5),
+                    stop_reason="tool_use",
+                )
+
+        mock_client = Mock()
+        mock_client.messages.stream = Mock(return_value=MockStream())
+        mock_anthropic.return_value = mock_client
+
+        config = LLMConfig(provider="anthropic", model="claude-test", api_key="test-key")
+        llm = AnthropicLLM(config)
+
+        result = await llm.completion(_messages(), None, AsyncQueue[Message](), CompletionConfig(stream=True))
+
+        assert len(result.tool_calls) == 1
+        assert result.tool_calls[0].id == "toolu_1"
+        assert result.tool_calls[0].name == "search"
+        assert result.tool_calls[0].args == {"query": "weather"}
@@ -1,10 +1,17 @@
 """Zhipu LLM implementation unit tests."""
 
+import asyncio
+import time
+
 import pytest
 from unittest.mock import Mock, AsyncMock, patch, MagicMock
 from typing import Any
 
-from tasking.llm.zhipu import ZhipuLLM, ZhipuEmbeddingLLM, to_zhipu_messages
+from asyncer import asyncify
+from loguru import logger
+from openai import OpenAI
+
+from tasking.llm.zhipu import ZhipuLLM, ZhipuEmbeddingLLM, to_zhipu, to_zhipu_messages
 from tasking.model import (
     Message,
     Role,
@@ -16,7 +23,9 @@ from tasking.model import (
     MultimodalContent,
 )
 from tasking.model.message import ImageBlock
+from tasking.model.queue import AsyncQueue
 from tasking.model.setting import LLMConfig
+from tests.unit.llm.fake_server import FakeOpenAIServer
 
 
 class TestZhipuLLM:
@@ -95,7 +104,7 @@ class TestZhipuLLM:
         assert len(image_blocks) == 1
         assert image_blocks[0]["image_url"]["url"] == "https://example.com/image.jpg"
 
-    @patch('tasking.llm.zhipu.ZhipuAI')
+    @patch('tasking.llm.zhipu.AsyncOpenAI')
     def test_parameters_passed_to_zhipu_client(self, mock_zhipu_ai):
         """Test that parameters are correctly passed to Zhipu client."""
         # Setup mock client
@@ -115,7 +124,7 @@ class TestZhipuLLM:
             completion_tokens=20,
             total_tokens=30
         )
-        mock_client.chat.completions.create = Mock(return_value=mock_completion)
+        mock_client.chat.completions.create = AsyncMock(return_value=mock_completion)
         mock_zhipu_ai.return_value = mock_client
 
         # Create ZhipuLLM instance
@@ -164,16 +173,12 @@ class TestZhipuLLM:
         assert zhipu_messages[0]["role"] == "user"
         assert zhipu_messages[0]["content"] == "<block>Test</block>"
 
-    @patch('tasking.llm.zhipu.ZhipuAI')
+    @patch('tasking.llm.zhipu.AsyncOpenAI')
     def test_mock_client_return_value_parsing(self, mock_zhipu_ai):
         """Test that mock client return values are correctly parsed."""
         # Setup mock client with specific return value
         mock_client = Mock()
-
-        # Import ZhipuCompletion to make mock pass isinstance check
-        from zai.types.chat.chat_completion import Completion as ZhipuCompletion
-
-        mock_completion = Mock(spec=ZhipuCompletion)  # Make it pass isinstance check
+        mock_completion = Mock()
         mock_completion.choices = [
             Mock(
                 message=Mock(
@@ -188,8 +193,8 @@ class TestZhipuLLM:
             completion_tokens=25,
             total_tokens=40
         )
-        # Mock the sync method since ZhipuLLM uses asyncify
-        mock_client.chat.completions.create = Mock(return_value=mock_completion)
+        # ZhipuLLM awaits the native async client
+        mock_client.chat.completions.create = AsyncMock(return_value=mock_completion)
         mock_zhipu_ai.return_value = mock_client
 
         # Create ZhipuLLM and call it
@@ -219,20 +224,19 @@ class TestZhipuLLM:
 class TestZhipuEmbeddingLLM:
     """Test ZhipuEmbeddingLLM class."""
 
-    @patch('tasking.llm.zhipu.asyncio.to_thread')
-    @patch('tasking.llm.zhipu.ZhipuAI')
-    def test_embedding_parameters_passed_to_client(self, mock_zhipu_ai, mock_to_thread):
+    @patch('tasking.llm.zhipu.AsyncOpenAI')
+    def test_embedding_parameters_passed_to_client(self, mock_zhipu_ai):
         """Test that embedding parameters are correctly passed to Zhipu client."""
-        # Setup mock embedding response that to_thread will return
+        # Setup mock embedding response that the async client will return
         mock_embedding_response = Mock()
         # Create proper mock structure for response.data[0].embedding access
         mock_data_item = Mock()
         mock_data_item.embedding = [0.1, 0.2, 0.3, 0.4]
         mock_embedding_response.data = [mock_data_item]
-        mock_to_thread.return_value = mock_embedding_response
 
         # Setup mock client
         mock_client = Mock()
+        mock_client.embeddings.create = AsyncMock(return_value=mock_embedding_response)
         mock_zhipu_ai.return_value = mock_client
 
         # Create ZhipuEmbeddingLLM instance
@@ -249,12 +253,9 @@ class TestZhipuEmbeddingLLM:
         import asyncio
         result = asyncio.run(embedding_llm.embed(contents, dimensions=1536))
 
-        # Verify asyncio.to_thread was called with correct parameters
-        mock_to_thread.assert_called_once()
-        call_args = mock_to_thread.call_args
-
-        # Check that the client method and parameters were passed correctly
-        assert call_args.args[0] == mock_client.embeddings.create  # First arg should be the client method
+        # Verify the client was awaited with correct parameters
+        mock_client.embeddings.create.assert_awaited_once()
+        call_args = mock_client.embeddings.create.call_args
         assert call_args.kwargs["model"] == "embedding-2"
         assert call_args.kwargs["input"] == "Hello world"
 
@@ -263,20 +264,19 @@ class TestZhipuEmbeddingLLM:
         assert isinstance(result[0], (float, int))
         assert result == [0.1, 0.2, 0.3, 0.4]  # Should match our mock setup
 
-    @patch('tasking.llm.zhipu.asyncio.to_thread')
-    @patch('tasking.llm.zhipu.ZhipuAI')
-    def test_embedding_mock_client_return_value(self, mock_zhipu_ai, mock_to_thread):
+    @patch('tasking.llm.zhipu.AsyncOpenAI')
+    def test_embedding_mock_client_return_value(self, mock_zhipu_ai):
         """Test that embedding mock client return values are correctly parsed."""
-        # Setup mock embedding response that to_thread will return
+        # Setup mock embedding response that the async client will return
         mock_embedding_response = Mock()
         # Create proper mock structure for response.data[0].embedding access
         mock_data_item = Mock()
         mock_data_item.embedding = [0.9, 0.8, 0.7, 0.6, 0.5]
         mock_embedding_response.data = [mock_data_item]
-        mock_to_thread.return_value = mock_embedding_response
 
         # Setup mock client
         mock_client = Mock()
+        mock_client.embeddings.create = AsyncMock(return_value=mock_embedding_response)
         mock_zhipu_ai.return_value = mock_client
 
         # Create and test
@@ -291,5 +291,108 @@ class TestZhipuEmbeddingLLM:
         assert isinstance(result[0], (float, int))
 
 
+def _config(base_url: str, model: str = "glm-4") -> LLMConfig:
+    return LLMConfig(provider="zhipu", model=model, api_key="test-key", base_url=base_url)
+
+
+def _messages() -> list[Message]:
+    return [Message(role=Role.USER, content=[TextBlock(text="Hello")])]
+
+
+class TestZhipuNativeAsync:
+    """Test the native async client against a local fake server."""
+
+    def test_thinking_sent_in_request_body(self):
+        kwargs = to_zhipu(CompletionConfig(allow_thinking=False, extra_body={"do_sample": False}))
+        assert "thinking" not in kwargs
+        assert kwargs["extra_body"] == {"thinking": {"type": "disabled"}, "do_sample": False}
+
+        async def run() -> dict[str, Any]:
+            async with FakeOpenAIServer() as server:
+                await ZhipuLLM(_config(server.base_url)).completion(
+                    _messages(), None, None, CompletionConfig(allow_thinking=True),
+                )
+                return server.requests[0]
+
+        payload = asyncio.run(run())
+        assert payload["model"] == "glm-4"
+        assert payload["thinking"] == {"type": "enabled"}
+        assert payload["messages"][0]["content"] == "<block>Hello</block>"
+
+    @pytest.mark.asyncio
+    async def test_streaming_single_request(self):
+        usage = {
+            "prompt_tokens": 100, "completion_tokens": 7, "total_tokens": 107,
+            "prompt_tokens_details": {"cached_tokens": 64},
+        }
+        async with FakeOpenAIServer(usage=usage, usage_in_last_chunk=True) as server:
+            queue = AsyncQueue[Message]()
+            result = await ZhipuLLM(_config(server.base_url)).completion(_messages(), None, queue, CompletionConfig())
+
+            # Usage and finish reason come from the stream, no second request is made
+            assert server.request_count == 1
+            assert result.content[0].text == "Hello from fake server"
+            assert result.stop_reason == StopReason.STOP
+            assert result.usage.prompt_tokens == 100
+            assert result.usage.cached_tokens == 64
+
+    @pytest.mark.asyncio
+    async def test_streaming_tool_call(self):
+        tool_call = {"id": "call_1", "name": "search", "arguments": '{"query": "weather"}'}
+        async with FakeOpenAIServer(chunks=[], tool_call=tool_call, usage_in_last_chunk=True) as server:
+            result = await ZhipuLLM(_config(server.base_url)).completion(
+                _messages(), None, AsyncQueue[Message](), CompletionConfig(),
+            )
+        assert result.stop_reason == StopReason.TOOL_CALL
+        assert result.tool_calls[0].name == "search"
+        assert result.tool_calls[0].args == {"query": "weather"}
+
+    @pytest.mark.asyncio
+    async def test_embeddings(self):
+        async with FakeOpenAIServer(embedding=[0.5, 0.25, 0.125]) as server:
+            embed_llm = ZhipuEmbeddingLLM(_config(server.base_url, model="embedding-3"))
+            assert await embed_llm.embed([TextBlock(text="Hello")], dimensions=2) == [0.5, 0.25]
+            batch = await embed_llm.embed_batch([[TextBlock(text="a")], [TextBlock(text="b")]], dimensions=1024)
+            assert batch == [[0.5, 0.25, 0.125]] * 2
+            assert server.requests[0]["dimensions"] == 2
+            assert server.requests[1]["input"] == ["a", "b"]
+
+
+class TestZhipuConcurrencyBenchmark:
+    """Micro benchmark of concurrent Zhipu calls against a local fake server."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_completions(self):
+        concurrency, latency = 64, 0.1
+        request = {"model": "glm-4", "messages": [{"role": "user", "content": "Hello"}]}
+
+        # Before: the synchronous client is offloaded to the bounded worker thread pool
+        async with FakeOpenAIServer(latency=latency) as server:
+            client = OpenAI(base_url=server.base_url, api_key="test-key")
+            start = time.perf_counter()
+            await asyncio.gather(*(asyncify(client.chat.completions.create)(**request) for _ in range(concurrency)))
+            threaded = time.perf_counter() - start
+            threaded_peak = server.max_in_flight
+            client.close()
+
+        # After: native async requests, no worker thread is pinned while waiting
+        async with FakeOpenAIServer(latency=latency) as server:
+            llm = ZhipuLLM(_config(server.base_url))
+            start = time.perf_counter()
+            results = await asyncio.gather(*(
+                llm.completion(_messages(), None, None, CompletionConfig()) for _ in range(concurrency)
+            ))
+            native = time.perf_counter() - start
+            native_peak = server.max_in_flight
+
+        logger.info(
+            f"[Benchmark] {concurrency} 个并发智谱请求：线程池 {threaded * 1e3:.1f}ms（峰值并发 {threaded_peak}），"
+            f"原生异步 {native * 1e3:.1f}ms（峰值并发 {native_peak}）"
+        )
+        assert all(result.content[0].text == "Hello from fake server" for result in results)
+        assert native_peak == concurrency
+        assert threaded_peak < concurrency
+
+
 if __name__ == "__main__":
     pytest.main([__file__])
\ No newline at end of file
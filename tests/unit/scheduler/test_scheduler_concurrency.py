@@ -0,0 +1,217 @@
+"""Tests for concurrent sub-task scheduling in the tree scheduler."""
+
+import asyncio
+import unittest
+from unittest.mock import MagicMock
+
+from tasking.core.agent import IAgent
+from tasking.core.scheduler import build_base_scheduler
+from tasking.core.state_machine.task import (
+    BaseTreeTaskNode,
+    ITreeTaskNode,
+    RequirementTreeTaskView,
+    get_base_states,
+    get_base_transition,
+)
+from tasking.core.state_machine.task.const import TaskState, TaskEvent
+from tasking.model import Message, TextBlock
+from tasking.model.queue import AsyncQueue
+
+
+class ProtocolTreeTaskNode(BaseTreeTaskNode[TaskState, TaskEvent]):
+    """Tree task node with the class attributes required by the task views."""
+    _protocol = [TextBlock(text="test protocol")]
+    _task_type = "test"
+    _tags: set[str] = set()
+
+
+def create_node(title: str) -> BaseTreeTaskNode[TaskState, TaskEvent]:
+    """Create a tree task node with the default state transitions."""
+    node = ProtocolTreeTaskNode(
+        valid_states=get_base_states(),
+        init_state=TaskState.CREATED,
+        transitions=get_base_transition(),
+        unique_protocol=[TextBlock(text="test protocol")],
+        tags=set(),
+        task_type="test",
+        max_depth=3,
+    )
+    node.set_title(title)
+    return node
+
+
+def create_tree(num_sub_tasks: int) -> BaseTreeTaskNode[TaskState, TaskEvent]:
+    """Create a root node with ``num_sub_tasks`` children."""
+    root = create_node("root")
+    for i in range(num_sub_tasks):
+        create_node(f"sub_{i}").set_parent(root)
+    return root
+
+
+class ConcurrencyTracker:
+    """Fake executor behaviour that records how many runs overlap."""
+
+    def __init__(self, delays: dict[str, float] | None = None, fail: set[str] | None = None) -> None:
+        self.delays = delays or {}
+        self.fail = fail or set()
+        self.running = 0
+        self.max_running = 0
+        self.finished_order: list[str] = []
+
+    async def run_task_stream(
+        self,
+        context: dict,
+        queue: AsyncQueue[Message],
+        task: ITreeTaskNode[TaskState, TaskEvent],
+    ) -> None:
+        title = task.get_title()
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            await asyncio.sleep(self.delays.get(title, 0.02))
+        finally:
+            self.running -= 1
+
+        if title in self.fail:
+            task.set_error(f"{title} failed")
+        else:
+            task.set_completed(f"{title} output")
+        self.finished_order.append(title)
+
+
+def create_executor(tracker: ConcurrencyTracker) -> MagicMock:
+    executor = MagicMock(spec=IAgent)
+    executor.run_task_stream = tracker.run_task_stream
+    return executor
+
+
+class TestConcurrentSubTasks(unittest.IsolatedAsyncioTestCase):
+    """Test concurrent sub-task execution of the tree scheduler."""
+
+    async def test_default_is_sequential(self) -> None:
+        """Sub-tasks run one by one when concurrency is not configured."""
+        tracker = ConcurrencyTracker()
+        scheduler = build_base_scheduler(executor=create_executor(tracker))
+        root = create_tree(4)
+
+        await scheduler.schedule({}, AsyncQueue[Message](), root)
+
+        self.assertEqual(root.get_current_state(), TaskState.FINISHED)
+        self.assertEqual(tracker.max_running, 1)
+        self.assertEqual(tracker.finished_order, ["sub_0", "sub_1", "sub_2", "sub_3", "root"])
+
+    async def test_unbounded_concurrency(self) -> None:
+        """All siblings overlap when max_concurrency is 0."""
+        tracker = ConcurrencyTracker()
+        scheduler = build_base_scheduler(executor=create_executor(tracker), max_concurrency=0)
+        root = create_tree(6)
+
+        await scheduler.schedule({}, AsyncQueue[Message](), root)
+
+        self.assertEqual(root.get_current_state(), TaskState.FINISHED)
+        self.assertEqual(tracker.max_running, 6)
+        # Parent runs only after all children finished
+        self.assertEqual(tracker.finished_order[-1], "root")
+
+    async def test_node_concurrency_bound(self) -> None:
+        """Per-node bound limits the number of siblings scheduled together."""
+        tracker = ConcurrencyTracker()
+        scheduler = build_base_scheduler(executor=create_executor(tracker), max_concurrency=2)
+        root = create_tree(6)
+
+        await scheduler.schedule({}, AsyncQueue[Message](), root)
+
+        self.assertEqual(root.get_current_state(), TaskState.FINISHED)
+        self.assertEqual(tracker.max_running, 2)
+
+    async def test_tree_concurrency_bound(self) -> None:
+        """Tree-wide bound applies across nested nodes without deadlocking."""
+        tracker = ConcurrencyTracker()
+        scheduler = build_base_scheduler(
+            executor=create_executor(tracker),
+            max_concurrency=0,
+            max_tree_concurrency=3,
+        )
+        root = create_node("root")
+        for i in range(3):
+            child = create_node(f"sub_{i}")
+            child.set_parent(root)
+            for j in range(3):
+                create_node(f"sub_{i}_{j}").set_parent(child)
+
+        await asyncio.wait_for(scheduler.schedule({}, AsyncQueue[Message](), root), timeout=5)
+
+        self.assertEqual(root.get_current_state(), TaskState.FINISHED)
+        self.assertEqual(tracker.max_running, 3)
+
+    async def test_view_keeps_planned_order(self) -> None:
+        """Requirement view lists sub-task results in planned order, not completion order."""
+        tracker = ConcurrencyTracker(delays={"sub_0": 0.06, "sub_1": 0.04, "sub_2": 0.01})
+        scheduler = build_base_scheduler(executor=create_executor(tracker), max_concurrency=0)
+        root = create_tree(3)
+
+        await scheduler.schedule({}, AsyncQueue[Message](), root)
+
+        self.assertEqual(tracker.finished_order[:3], ["sub_2", "sub_1", "sub_0"])
+        view = RequirementTreeTaskView[TaskState, TaskEvent]()(root)
+        positions = [view.index(f"sub_{i} output") for i in range(3)]
+        self.assertEqual(positions, sorted(positions))
+
+    async def test_canceled_sibling_resets_parent(self) -> None:
+        """A canceled sibling still drives the parent back to CREATED."""
+        tracker = ConcurrencyTracker(fail={"sub_1"})
+        scheduler = build_base_scheduler(
+            executor=create_executor(tracker),
+            max_error_retry=1,
+            max_concurrency=0,
+        )
+        root = create_tree(3)
+        queue = AsyncQueue[Message]()
+
+        # Drive the root manually into RUNNING and run a single RUNNING step
+        root.set_max_revisit_count(scheduler.get_max_revisit_count())
+        await root.handle_event(TaskEvent.PLANED)
+        on_running = scheduler.get_on_state_fn(TaskState.RUNNING)
+        assert on_running is not None
+        event = await on_running(scheduler, {}, queue, root)
+
+        self.assertEqual(event, TaskEvent.INIT)
+        states = {sub_task.get_title(): sub_task.get_current_state() for sub_task in root.get_sub_tasks()}
+        self.assertEqual(states["sub_0"], TaskState.FINISHED)
+        self.assertEqual(states["sub_1"], TaskState.CANCELED)
+        self.assertEqual(states["sub_2"], TaskState.FINISHED)
+        # The parent executor is not called when a sibling was canceled
+        self.assertNotIn("root", tracker.finished_order)
+
+    async def test_sub_task_exception_propagates(self) -> None:
+        """Exceptions are raised after all siblings have settled."""
+        tracker = ConcurrencyTracker()
+
+        async def run_task_stream(context, queue, task) -> None:
+            if task.get_title() == "sub_0":
+                raise RuntimeError("boom")
+            await tracker.run_task_stream(context, queue, task)
+
+        executor = MagicMock(spec=IAgent)
+        executor.run_task_stream = run_task_stream
+        scheduler = build_base_scheduler(executor=executor, max_concurrency=0)
+        root = create_tree(3)
+
+        with self.assertRaises(RuntimeError):
+            await scheduler.schedule({}, AsyncQueue[Message](), root)
+        self.assertEqual(sorted(tracker.finished_order), ["sub_1", "sub_2"])
+
+
+class TestConcurrencyConfig(unittest.TestCase):
+    """Test validation of concurrency parameters."""
+
+    def test_negative_concurrency_rejected(self) -> None:
+        executor = MagicMock(spec=IAgent)
+        with self.assertRaises(ValueError):
+            build_base_scheduler(executor=executor, max_concurrency=-1)
+        with self.assertRaises(ValueError):
+            build_base_scheduler(executor=executor, max_tree_concurrency=-1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,193 @@
+"""Tests for dependency-aware (DAG) sub-task scheduling."""
+
+import asyncio
+import unittest
+from unittest.mock import MagicMock
+
+from tasking.core.agent import IAgent
+from tasking.core.scheduler import build_dag_scheduler
+from tasking.core.scheduler.dag import schedule_by_dependencies
+from tasking.core.state_machine.task import (
+    BaseTreeTaskNode,
+    ITreeTaskNode,
+    check_dependencies,
+    get_base_states,
+    get_base_transition,
+)
+from tasking.core.state_machine.task.const import TaskState, TaskEvent
+from tasking.model import Message, TextBlock
+from tasking.model.queue import AsyncQueue
+
+
+def create_node(title: str, dependencies: list[str] | None = None) -> BaseTreeTaskNode[TaskState, TaskEvent]:
+    """Create a tree task node with the default state transitions."""
+    node = BaseTreeTaskNode[TaskState, TaskEvent](
+        valid_states=get_base_states(),
+        init_state=TaskState.CREATED,
+        transitions=get_base_transition(),
+        unique_protocol=[TextBlock(text="test protocol")],
+        tags=set(),
+        task_type="test",
+        max_depth=3,
+    )
+    node.set_title(title)
+    node.set_dependencies(dependencies or [])
+    return node
+
+
+class RecordingExecutor:
+    """Fake executor behaviour that records start/finish order and overlap."""
+
+    def __init__(self, delays: dict[str, float] | None = None, fail: set[str] | None = None) -> None:
+        self.delays = delays or {}
+        self.fail = fail or set()
+        self.running = 0
+        self.max_running = 0
+        self.started: list[str] = []
+        self.finished: list[str] = []
+
+    async def run_task_stream(
+        self,
+        context: dict,
+        queue: AsyncQueue[Message],
+        task: ITreeTaskNode[TaskState, TaskEvent],
+    ) -> None:
+        title = task.get_title()
+        self.started.append(title)
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            await asyncio.sleep(self.delays.get(title, 0.02))
+        finally:
+            self.running -= 1
+
+        if title in self.fail:
+            task.set_error(f"{title} failed")
+        else:
+            task.set_completed(f"{title} output")
+        self.finished.append(title)
+
+
+def create_executor(recorder: RecordingExecutor) -> MagicMock:
+    executor = MagicMock(spec=IAgent)
+    executor.run_task_stream = recorder.run_task_stream
+    return executor
+
+
+class TestDagScheduler(unittest.IsolatedAsyncioTestCase):
+    """Test build_dag_scheduler."""
+
+    async def test_fan_in_runs_independent_steps_concurrently(self) -> None:
+        """Three independent steps run together, synthesis runs after all of them."""
+        recorder = RecordingExecutor()
+        scheduler = build_dag_scheduler(executor=create_executor(recorder))
+        root = create_node("root")
+        for title in ("research_0", "research_1", "research_2"):
+            create_node(title).set_parent(root)
+        create_node("synthesis", ["research_0", "research_1", "research_2"]).set_parent(root)
+
+        await scheduler.schedule({}, AsyncQueue[Message](), root)
+
+        self.assertEqual(root.get_current_state(), TaskState.FINISHED)
+        self.assertEqual(recorder.max_running, 3)
+        self.assertEqual(recorder.started[3], "synthesis")
+        self.assertEqual(recorder.finished[-2:], ["synthesis", "root"])
+
+    async def test_dependency_declared_before_predecessor(self) -> None:
+        """A sub-task listed first still waits for its predecessor."""
+        recorder = RecordingExecutor(delays={"A": 0.05})
+        scheduler = build_dag_scheduler(executor=create_executor(recorder))
+        root = create_node("root")
+        create_node("B", ["A"]).set_parent(root)
+        create_node("A").set_parent(root)
+
+        await scheduler.schedule({}, AsyncQueue[Message](), root)
+
+        self.assertEqual(recorder.finished, ["A", "B", "root"])
+        # Planned order is kept in the parent
+        self.assertEqual([sub_task.get_title() for sub_task in root.get_sub_tasks()], ["B", "A"])
+
+    async def test_starts_as_soon_as_predecessors_finish(self) -> None:
+        """A dependent starts without waiting for unrelated slow siblings."""
+        recorder = RecordingExecutor(delays={"slow": 0.2, "fast": 0.01, "after_fast": 0.01})
+        scheduler = build_dag_scheduler(executor=create_executor(recorder))
+        root = create_node("root")
+        create_node("slow").set_parent(root)
+        create_node("fast").set_parent(root)
+        create_node("after_fast", ["fast"]).set_parent(root)
+
+        await scheduler.schedule({}, AsyncQueue[Message](), root)
+
+        self.assertLess(recorder.finished.index("after_fast"), recorder.finished.index("slow"))
+
+    async def test_canceled_predecessor_skips_dependents(self) -> None:
+        """Dependents of a canceled sub-task are not scheduled and the parent resets."""
+        recorder = RecordingExecutor(fail={"A"})
+        scheduler = build_dag_scheduler(executor=create_executor(recorder), max_error_retry=1)
+        root = create_node("root")
+        create_node("A").set_parent(root)
+        create_node("B", ["A"]).set_parent(root)
+        create_node("C").set_parent(root)
+        queue = AsyncQueue[Message]()
+
+        root.set_max_revisit_count(scheduler.get_max_revisit_count())
+        await root.handle_event(TaskEvent.PLANED)
+        on_running = scheduler.get_on_state_fn(TaskState.RUNNING)
+        assert on_running is not None
+        event = await on_running(scheduler, {}, queue, root)
+
+        self.assertEqual(event, TaskEvent.INIT)
+        states = {sub_task.get_title(): sub_task.get_current_state() for sub_task in root.get_sub_tasks()}
+        self.assertEqual(states["A"], TaskState.CANCELED)
+        self.assertEqual(states["B"], TaskState.CREATED)
+        self.assertEqual(states["C"], TaskState.FINISHED)
+        self.assertNotIn("B", recorder.started)
+
+    async def test_cyclic_dependencies_rejected(self) -> None:
+        """Cycles among siblings raise ValueError."""
+        scheduler = build_dag_scheduler(executor=create_executor(RecordingExecutor()))
+        root = create_node("root")
+        create_node("A", ["B"]).set_parent(root)
+        create_node("B", ["A"]).set_parent(root)
+
+        with self.assertRaises(ValueError):
+            await scheduler.schedule({}, AsyncQueue[Message](), root)
+
+
+    async def test_duplicate_or_empty_titles_rejected(self) -> None:
+        """Sibling titles are the dependency keys, so they must be unique and non-empty."""
+        for titles in (["A", "A"], ["A", ""]):
+            recorder = RecordingExecutor()
+            scheduler = build_dag_scheduler(executor=create_executor(recorder))
+
+            with self.assertRaises(ValueError):
+                await schedule_by_dependencies(scheduler, {}, AsyncQueue[Message](), [create_node(title) for title in titles])
+            self.assertEqual(recorder.started, [])
+
+
+class TestCheckDependencies(unittest.TestCase):
+    """Test dependency validation and ordering."""
+
+    def test_topological_order(self) -> None:
+        order = check_dependencies({"C": ["A", "B"], "A": [], "B": ["A"]})
+        self.assertEqual(order, ["A", "B", "C"])
+
+    def test_independent_tasks_keep_order(self) -> None:
+        order = check_dependencies({"x": [], "y": [], "z": []})
+        self.assertEqual(order, ["x", "y", "z"])
+
+    def test_unknown_dependency(self) -> None:
+        with self.assertRaises(ValueError):
+            check_dependencies({"A": ["missing"]})
+
+    def test_cycle(self) -> None:
+        with self.assertRaises(ValueError):
+            check_dependencies({"A": ["C"], "B": ["A"], "C": ["B"]})
+
+    def test_self_dependency_rejected_by_node(self) -> None:
+        with self.assertRaises(ValueError):
+            create_node("A", ["A"])
+
+
+if __name__ == '__main__':
+    unittest.main()
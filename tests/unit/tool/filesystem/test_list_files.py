@@ -0,0 +1,166 @@
+"""
+流式列出目录测试
+
+验证 iter_files 的遍历顺序、深度和数量限制、忽略规则，以及 list_files_page 的分页游标。
+"""
+
+import os
+import tempfile
+import time
+
+import pytest
+from loguru import logger
+
+from tasking.model.filesystem import FileType
+from tasking.tool.filesystem import LocalFileSystem
+from tasking.tool.terminal import LocalTerminal
+
+
+FILES = [
+    "a.py", "b/c.txt", "b/d/e.md", "b.x/f", "node_modules/x/y.js",
+    ".git/config", "build/out.o", "keep.log", "x.log", "src/.gitignore", "src/gen.py", "src/main.py",
+]
+
+
+@pytest.fixture
+def workspace():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for rel_path in FILES:
+            path = os.path.join(temp_dir, rel_path)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("gen.py\n" if rel_path == "src/.gitignore" else "content")
+        with open(os.path.join(temp_dir, ".gitignore"), "w", encoding="utf-8") as f:
+            f.write("node_modules/\n*.log\n!keep.log\n/build\n")
+
+        terminal = LocalTerminal(root_dir=temp_dir)
+        try:
+            yield temp_dir, LocalFileSystem(terminal)
+        finally:
+            terminal.close()
+
+
+async def collect(filesystem, directory, **kwargs) -> list[str]:
+    return [info.path async for info in filesystem.iter_files(directory, **kwargs)]
+
+
+class TestIterFiles:
+    """测试流式遍历"""
+
+    @pytest.mark.asyncio
+    async def test_order_and_fields(self, workspace):
+        temp_dir, filesystem = workspace
+        paths = await collect(filesystem, temp_dir, recursive=True)
+
+        # 深度优先，目录在其内容之前，同一目录下按名称排序
+        assert paths.index("b") < paths.index("b/c.txt") < paths.index("b/d/e.md") < paths.index("b.x")
+        assert len(paths) == len(set(paths)) == 21
+
+        infos = {info.path: info for info in await filesystem.list_files(os.path.join(temp_dir, "b"))}
+        assert set(infos) == {"b/c.txt", "b/d"}
+        assert infos["b/c.txt"].size == 7
+        assert infos["b/c.txt"].parent == "b"
+        assert infos["b/c.txt"].extension == ".txt"
+        assert infos["b/c.txt"].file_type == FileType.TEXT
+        assert infos["b/d"].file_type == FileType.FOLDER
+        assert infos["b/d"].size is None
+
+        # 工作区根目录下的条目以 "." 作为父目录
+        infos = {info.path: info for info in await filesystem.list_files(temp_dir)}
+        assert infos["a.py"].parent == "."
+        assert infos["b"].parent == "."
+
+    @pytest.mark.asyncio
+    async def test_limits(self, workspace):
+        temp_dir, filesystem = workspace
+        assert await collect(filesystem, temp_dir, recursive=True, max_depth=1) == \
+            await collect(filesystem, temp_dir)
+        assert await collect(filesystem, temp_dir, recursive=True, max_entries=3) == [".git", ".git/config", ".gitignore"]
+        with pytest.raises(ValueError):
+            await collect(filesystem, temp_dir, max_depth=0)
+
+    @pytest.mark.asyncio
+    async def test_gitignore(self, workspace):
+        temp_dir, filesystem = workspace
+        paths = await collect(filesystem, temp_dir, recursive=True, use_gitignore=True)
+        assert paths == [
+            ".gitignore", "a.py", "b", "b/c.txt", "b/d", "b/d/e.md", "b.x", "b.x/f",
+            "keep.log", "src", "src/.gitignore", "src/main.py",
+        ]
+
+        # 列出子目录时仍然应用上级目录的 .gitignore
+        assert await collect(filesystem, os.path.join(temp_dir, "src"), use_gitignore=True) == \
+            ["src/.gitignore", "src/main.py"]
+
+    @pytest.mark.asyncio
+    async def test_ignore_patterns(self, workspace):
+        temp_dir, filesystem = workspace
+        paths = await collect(filesystem, temp_dir, recursive=True, ignore_patterns=[".*", "b*", "*.py"])
+        assert paths == ["keep.log", "node_modules", "node_modules/x", "node_modules/x/y.js", "src", "x.log"]
+
+
+class TestListFilesPage:
+    """测试分页"""
+
+    @pytest.mark.asyncio
+    async def test_pages_cover_everything(self, workspace):
+        temp_dir, filesystem = workspace
+        expected = await collect(filesystem, temp_dir, recursive=True)
+
+        pages: list[list[str]] = []
+        cursor = None
+        while True:
+            page = await filesystem.list_files_page(temp_dir, recursive=True, max_entries=3, cursor=cursor)
+            pages.append([info.path for info in page.entries])
+            cursor = page.next_cursor
+            if cursor is None:
+                break
+
+        assert [path for page in pages for path in page] == expected
+        assert all(len(page) == 3 for page in pages[:-1])
+
+    @pytest.mark.asyncio
+    async def test_cursor_survives_deletion(self, workspace):
+        """游标指向的条目被删除后仍然从它之后继续"""
+        temp_dir, filesystem = workspace
+        page = await filesystem.list_files_page(temp_dir, recursive=True, max_entries=5)
+        assert page.next_cursor == "b"
+
+        os.remove(os.path.join(temp_dir, "b", "c.txt"))
+        os.remove(os.path.join(temp_dir, "b", "d", "e.md"))
+        os.rmdir(os.path.join(temp_dir, "b", "d"))
+        os.rmdir(os.path.join(temp_dir, "b"))
+        page = await filesystem.list_files_page(temp_dir, recursive=True, max_entries=2, cursor=page.next_cursor)
+        assert [info.path for info in page.entries] == ["b.x", "b.x/f"]
+
+    @pytest.mark.asyncio
+    async def test_invalid_cursor(self, workspace):
+        temp_dir, filesystem = workspace
+        with pytest.raises(ValueError):
+            await filesystem.list_files_page(os.path.join(temp_dir, "b"), cursor="src/main.py")
+
+
+class TestListBenchmark:
+    """大目录遍历性能测试"""
+
+    @pytest.mark.asyncio
+    async def test_large_tree(self, workspace):
+        temp_dir, filesystem = workspace
+        root = os.path.join(temp_dir, "big")
+        for i in range(100):
+            os.makedirs(os.path.join(root, f"pkg{i}"))
+            for j in range(100):
+                with open(os.path.join(root, f"pkg{i}", f"m{j}.js"), "w", encoding="utf-8"):
+                    pass
+
+        start = time.perf_counter()
+        infos = await filesystem.list_files(root, recursive=True)
+        full_time = time.perf_counter() - start
+        start = time.perf_counter()
+        page = await filesystem.list_files_page(root, recursive=True, max_entries=100, cursor="big/pkg50/m5.js")
+        page_time = time.perf_counter() - start
+        logger.info(f"[Benchmark] 10100 项目录：完整列出 {full_time:.3f}s，从游标读取一页 {page_time:.4f}s")
+
+        assert len(infos) == 10100
+        assert page.entries[0].path == "big/pkg50/m50.js"
+        assert page_time < full_time
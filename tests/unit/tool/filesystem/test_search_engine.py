@@ -0,0 +1,193 @@
+"""
+进程内搜索引擎测试
+
+验证 LocalSearchEngine 的文件过滤、内容匹配与 find + grep 的结果一致，
+以及 LocalFileSystem 对不支持参数回退到bash。
+"""
+
+import os
+import tempfile
+import time
+
+import pytest
+from loguru import logger
+
+from tasking.model.filesystem import FileFilter, OutputFormat, SearchParams, SearchPattern
+from tasking.tool.filesystem import LocalFileSystem
+from tasking.tool.search import LocalSearchEngine
+from tasking.tool.terminal import LocalTerminal
+
+
+FILES = {
+    "a.py": "import os\ndef hello():\n    return 'Hello'\n\n# TODO: fix\nx = 1\n",
+    "b.txt": "hello world\nHELLO again\nnothing\nhello: colon\n",
+    "sub/c.py": "def foo():\n    pass\n\ndef bar():\n    hello = 1\n",
+    "sub/deep/d.js": "function hello() {}\n// hello\n",
+    ".hidden/e.py": "hello hidden\n",
+    "sub/.f.py": "hello hidden file\n",
+    "中文.md": "你好 hello 世界\n",
+    "noeol.txt": "last hello",
+}
+
+
+@pytest.fixture
+def workspace():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for rel_path, content in FILES.items():
+            path = os.path.join(temp_dir, rel_path)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(content)
+        with open(os.path.join(temp_dir, "binary.bin"), "wb") as f:
+            f.write(b"hello\0\x01\x02")
+
+        terminal = LocalTerminal(root_dir=temp_dir)
+        try:
+            yield temp_dir, LocalFileSystem(terminal), LocalFileSystem(terminal, search_backend="bash")
+        finally:
+            terminal.close()
+
+
+def match_keys(result) -> set[tuple[str, int, str]]:
+    return {(match.file_path, match.line_number, match.matched_content) for match in result.file_results}
+
+
+PARAMS = [
+    SearchParams(content_pattern=SearchPattern(pattern="hello")),
+    SearchParams(content_pattern=SearchPattern(pattern="hello", case_sensitive=False)),
+    SearchParams(content_pattern=SearchPattern(pattern="^def \\w+", is_regex=True)),
+    SearchParams(content_pattern=SearchPattern(pattern="hello|TODO", is_regex=True),
+                 file_filter=FileFilter(extensions=["py"])),
+    SearchParams(content_pattern=SearchPattern(pattern="hello"), file_filter=FileFilter(max_depth=1)),
+    SearchParams(content_pattern=SearchPattern(pattern="hello"), file_filter=FileFilter(max_depth=2)),
+    SearchParams(content_pattern=SearchPattern(pattern="hello"),
+                 file_filter=FileFilter(name_patterns=["*.txt"], exclude_patterns=["noeol*"])),
+    SearchParams(content_pattern=SearchPattern(pattern="hello", case_sensitive=False),
+                 output_format=OutputFormat(max_matches_per_file=1)),
+    SearchParams(content_pattern=SearchPattern(pattern="hello", invert_match=True),
+                 file_filter=FileFilter(extensions=["txt"])),
+]
+
+
+class TestNativeMatchesBash:
+    """进程内搜索与 find + grep 的结果一致"""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("params", PARAMS)
+    async def test_same_matches(self, workspace, params):
+        temp_dir, native, bash = workspace
+        params = params.model_copy(update={"search_paths": [temp_dir]})
+
+        native_result = await native.search(params)
+        bash_result = await bash.search(params)
+
+        assert native_result.errors == []
+        assert match_keys(native_result) == match_keys(bash_result)
+        assert native_result.files_with_matches == bash_result.files_with_matches
+
+    @pytest.mark.asyncio
+    async def test_text_output_lines(self, workspace):
+        """grep风格文本输出包含与grep相同的匹配行和上下文行"""
+        temp_dir, native, bash = workspace
+        params = SearchParams(
+            content_pattern=SearchPattern(pattern="hello"),
+            search_paths=[os.path.join(temp_dir, "sub")],
+            output_format=OutputFormat(context_lines=1),
+        )
+
+        native_text = await native.search_text(params)
+        bash_text = await bash.search_text(params)
+
+        assert set(native_text.split("\n")) == set(bash_text.split("\n"))
+
+
+class TestLocalSearchEngine:
+    """测试引擎本身的行为"""
+
+    def test_iter_files_skips_hidden_and_binary_filter(self, workspace):
+        temp_dir, _, _ = workspace
+        engine = LocalSearchEngine()
+        files = [os.path.relpath(path, temp_dir) for path in engine.iter_files([temp_dir], FileFilter())]
+
+        assert ".hidden/e.py" not in files
+        assert "sub/.f.py" not in files
+        assert files.index("a.py") < files.index("sub/c.py") < files.index("sub/deep/d.js")
+
+    @pytest.mark.asyncio
+    async def test_context_and_columns(self, workspace):
+        temp_dir, _, _ = workspace
+        engine = LocalSearchEngine(max_workers=2)
+        try:
+            params = SearchParams(
+                content_pattern=SearchPattern(pattern="return"),
+                output_format=OutputFormat(context_lines=2),
+            )
+            results, files_searched = await engine.search(params, [temp_dir])
+        finally:
+            engine.shutdown()
+
+        assert files_searched == 7
+        assert len(results) == 1
+        match = results[0].matches[0]
+        assert match.line_number == 3
+        assert match.context_before == ["import os", "def hello():"]
+        assert match.context_after == ["", "# TODO: fix"]
+        assert (match.start_column, match.end_column) == (5, 10)
+
+    def test_multiple_extensions(self, workspace):
+        temp_dir, _, _ = workspace
+        files = LocalSearchEngine().iter_files([temp_dir], FileFilter(extensions=["py", "md"]))
+        assert sorted(os.path.relpath(path, temp_dir) for path in files) == ["a.py", "sub/c.py", "中文.md"]
+
+    def test_unsupported_params(self):
+        assert not LocalSearchEngine.is_supported(
+            SearchParams(content_pattern=SearchPattern(pattern="[[:alpha:]]+", is_regex=True)))
+        assert not LocalSearchEngine.is_supported(
+            SearchParams(content_pattern=SearchPattern(pattern="a"),
+                         output_format=OutputFormat(highlight_matches=True)))
+        assert LocalSearchEngine.is_supported(SearchParams(content_pattern=SearchPattern(pattern="(a")))
+
+    @pytest.mark.asyncio
+    async def test_posix_class_falls_back_to_bash(self, workspace):
+        temp_dir, native, _ = workspace
+        params = SearchParams(
+            content_pattern=SearchPattern(pattern="^[[:space:]]+pass", is_regex=True),
+            search_paths=[temp_dir],
+        )
+        result = await native.search(params)
+        assert [(os.path.basename(m.file_path), m.line_number) for m in result.file_results] == [("c.py", 2)]
+
+    def test_invalid_backend(self, workspace):
+        temp_dir, native, _ = workspace
+        with pytest.raises(ValueError):
+            LocalFileSystem(native.get_terminal(), search_backend="ripgrep")  # type: ignore[arg-type]
+
+
+class TestSearchBenchmark:
+    """进程内搜索性能测试"""
+
+    @pytest.mark.asyncio
+    async def test_many_files(self, workspace):
+        temp_dir, native, bash = workspace
+        root = os.path.join(temp_dir, "many")
+        for i in range(40):
+            os.makedirs(os.path.join(root, f"pkg{i}"))
+            for j in range(50):
+                with open(os.path.join(root, f"pkg{i}", f"m{j}.py"), "w", encoding="utf-8") as f:
+                    f.write("".join(f"value_{k} = {k}\n" for k in range(100)))
+                    if j == 7:
+                        f.write("needle_here = True\n")
+
+        params = SearchParams(content_pattern=SearchPattern(pattern="needle_here"), search_paths=[root])
+
+        start = time.perf_counter()
+        native_result = await native.search(params)
+        native_time = time.perf_counter() - start
+        start = time.perf_counter()
+        bash_result = await bash.search(params)
+        bash_time = time.perf_counter() - start
+        logger.info(f"[Benchmark] 2000 个文件搜索：native {native_time:.3f}s，bash {bash_time:.3f}s")
+
+        assert native_result.total_matches == 40
+        assert match_keys(native_result) == match_keys(bash_result)
+        assert native_result.total_files_searched == 2000
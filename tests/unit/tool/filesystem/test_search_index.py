@@ -0,0 +1,192 @@
+"""
+工作空间三元组索引测试
+
+验证索引筛选后的搜索结果与不使用索引时一致、正则字面量提取，
+以及文件修改后的增量更新和索引的持久化。
+"""
+
+import os
+import tempfile
+import time
+
+import pytest
+from loguru import logger
+
+from tasking.model.filesystem import FileFilter, SearchParams, SearchPattern
+from tasking.tool.filesystem import LocalFileSystem
+from tasking.tool.search_index import TrigramIndex, required_trigrams
+from tasking.tool.terminal import LocalTerminal
+
+
+FILES = {
+    "a.py": "import os\ndef hello_world():\n    return 'Hello'\n",
+    "b.txt": "HELLO again\nnothing here\n",
+    "sub/c.py": "def foo():\n    pass\n\nclass Needle:\n    value = 1\n",
+    "sub/d.md": "你好 世界\nmarkdown text\n",
+}
+
+
+@pytest.fixture
+def workspace():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        root = os.path.join(temp_dir, "ws")
+        for rel_path, content in FILES.items():
+            path = os.path.join(root, rel_path)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(content)
+
+        terminal = LocalTerminal(root_dir=root)
+        index_path = os.path.join(temp_dir, "index.sqlite3")
+        index = TrigramIndex(terminal.get_workspace(), index_path=index_path)
+        try:
+            yield root, index_path, LocalFileSystem(terminal, search_index=index), LocalFileSystem(terminal)
+        finally:
+            index.close()
+            terminal.close()
+
+
+def match_keys(result) -> set[tuple[str, int, str]]:
+    return {(match.file_path, match.line_number, match.matched_content) for match in result.file_results}
+
+
+PATTERNS = [
+    SearchPattern(pattern="hello"),
+    SearchPattern(pattern="hello", case_sensitive=False),
+    SearchPattern(pattern="你好"),
+    SearchPattern(pattern="def \\w+\\(", is_regex=True),
+    SearchPattern(pattern="(?i)needle", is_regex=True),
+    SearchPattern(pattern="foo|markdown", is_regex=True),
+    SearchPattern(pattern="val(ue)+ = \\d", is_regex=True),
+    SearchPattern(pattern="here", invert_match=True),
+    SearchPattern(pattern="missing"),
+]
+
+
+class TestRequiredTrigrams:
+    """测试搜索模式的必需片段"""
+
+    def test_literal(self):
+        assert required_trigrams(SearchPattern(pattern="Hello")) == {b"hel", b"ell", b"llo"}
+
+    def test_regex_runs(self):
+        trigrams = required_trigrams(SearchPattern(pattern="^def (\\w+)_impl\\(", is_regex=True))
+        assert trigrams == {b"def", b"ef ", b"_im", b"imp", b"mpl", b"pl("}
+
+    def test_no_pruning(self):
+        assert required_trigrams(SearchPattern(pattern="ab")) is None
+        assert required_trigrams(SearchPattern(pattern="foo|bar", is_regex=True)) is None
+        assert required_trigrams(SearchPattern(pattern="(abc)?x", is_regex=True)) is None
+        assert required_trigrams(SearchPattern(pattern="hello", invert_match=True)) is None
+        # 忽略大小写时不使用非ASCII片段
+        assert required_trigrams(SearchPattern(pattern="你好", case_sensitive=False)) is None
+
+
+class TestIndexedSearch:
+    """测试使用索引的搜索"""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("pattern", PATTERNS)
+    async def test_same_matches(self, workspace, pattern):
+        root, _, indexed, plain = workspace
+        params = SearchParams(content_pattern=pattern, search_paths=[root])
+
+        indexed_result = await indexed.search(params)
+        plain_result = await plain.search(params)
+
+        assert indexed_result.errors == []
+        assert match_keys(indexed_result) == match_keys(plain_result)
+        assert indexed_result.total_files_searched == plain_result.total_files_searched
+
+    @pytest.mark.asyncio
+    async def test_write_paths_update_index(self, workspace):
+        root, _, indexed, _ = workspace
+        params = SearchParams(content_pattern=SearchPattern(pattern="fresh_token"), search_paths=[root])
+        assert (await indexed.search(params)).total_matches == 0
+
+        await indexed.save_file(os.path.join(root, "b.txt"), "fresh_token\n", "utf-8", replace=True)
+        await indexed.new_file(os.path.join(root, "sub/new.py"), "text", "x = 'fresh_token'\n", "utf-8")
+        result = await indexed.search(params)
+        assert sorted(os.path.basename(m.file_path) for m in result.file_results) == ["b.txt", "new.py"]
+
+        await indexed.delete_file(os.path.join(root, "b.txt"))
+        result = await indexed.search(params)
+        assert [os.path.basename(m.file_path) for m in result.file_results] == ["new.py"]
+
+    @pytest.mark.asyncio
+    async def test_external_change_detected(self, workspace):
+        root, _, indexed, _ = workspace
+        params = SearchParams(content_pattern=SearchPattern(pattern="outside_edit"), search_paths=[root])
+        assert (await indexed.search(params)).total_matches == 0
+
+        # 不经过文件系统工具修改文件，依靠修改时间和大小检测变化
+        path = os.path.join(root, "sub", "d.md")
+        with open(path, "a", encoding="utf-8") as f:
+            f.write("outside_edit\n")
+        result = await indexed.search(params)
+        assert [(m.file_path, m.line_number) for m in result.file_results] == [(path, 3)]
+
+    @pytest.mark.asyncio
+    async def test_persistence(self, workspace):
+        root, index_path, indexed, _ = workspace
+        await indexed.search(SearchParams(content_pattern=SearchPattern(pattern="hello"), search_paths=[root]))
+
+        reopened = TrigramIndex(indexed.get_terminal().get_workspace(), index_path=index_path)
+        try:
+            assert reopened.get_file_count() == len(FILES)
+            files = sorted(os.path.join(root, rel_path) for rel_path in FILES)
+            assert reopened.filter_candidates(files, SearchPattern(pattern="Needle")) == \
+                [os.path.join(root, "sub", "c.py")]
+        finally:
+            reopened.close()
+
+        # 不同工作空间的索引文件会被清空
+        other = TrigramIndex("/other/workspace", index_path=index_path)
+        try:
+            assert other.get_file_count() == 0
+        finally:
+            other.close()
+
+    def test_invalid_configuration(self, workspace):
+        root, index_path, indexed, _ = workspace
+        terminal = indexed.get_terminal()
+        with pytest.raises(ValueError):
+            LocalFileSystem(terminal, search_backend="bash",
+                            search_index=TrigramIndex(terminal.get_workspace(), index_path=index_path))
+        with pytest.raises(ValueError):
+            LocalFileSystem(terminal, search_index=TrigramIndex(
+                "/other/workspace", index_path=index_path + ".other"))
+
+
+class TestIndexBenchmark:
+    """索引筛选性能测试"""
+
+    @pytest.mark.asyncio
+    async def test_many_files(self, workspace):
+        root, _, indexed, plain = workspace
+        many = os.path.join(root, "many")
+        for i in range(20):
+            os.makedirs(os.path.join(many, f"pkg{i}"))
+            for j in range(50):
+                with open(os.path.join(many, f"pkg{i}", f"m{j}.py"), "w", encoding="utf-8") as f:
+                    f.write("".join(f"value_{k} = compute_{k}(x)\n" for k in range(200)))
+                    if j == 7:
+                        f.write("needle_here = True\n")
+
+        params = SearchParams(content_pattern=SearchPattern(pattern="needle_here"), search_paths=[many],
+                              file_filter=FileFilter(extensions=["py"]))
+
+        start = time.perf_counter()
+        await indexed.search(params)
+        build_time = time.perf_counter() - start
+        start = time.perf_counter()
+        indexed_result = await indexed.search(params)
+        indexed_time = time.perf_counter() - start
+        start = time.perf_counter()
+        plain_result = await plain.search(params)
+        plain_time = time.perf_counter() - start
+        logger.info(f"[Benchmark] 1000 个文件搜索：建立索引 {build_time:.3f}s，"
+                    f"使用索引 {indexed_time:.3f}s，不使用索引 {plain_time:.3f}s")
+
+        assert indexed_result.total_matches == 20
+        assert match_keys(indexed_result) == match_keys(plain_result)
@@ -0,0 +1,236 @@
+"""
+终端命令串行锁测试
+
+验证 TerminalLock 异步等待不阻塞事件循环、FIFO公平排队、等待超时、可重入、
+跨线程使用以及统计信息，并验证 LocalTerminal 并发执行命令时事件循环保持响应。
+"""
+
+import asyncio
+import tempfile
+import threading
+import time
+
+import pytest
+
+from tasking.tool.terminal import LocalTerminal, TerminalLock
+
+
+async def hold(lock: TerminalLock, seconds: float) -> None:
+    await lock.acquire()
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        lock.release()
+
+
+class TestTerminalLock:
+    """测试 TerminalLock 的排队、超时与统计"""
+
+    @pytest.mark.asyncio
+    async def test_waiting_does_not_block_event_loop(self):
+        """等待锁时事件循环上的其他任务可以继续运行"""
+        lock = TerminalLock()
+        ticks = 0
+
+        async def ticker() -> None:
+            nonlocal ticks
+            for _ in range(10):
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        holder = asyncio.create_task(hold(lock, 0.15))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(hold(lock, 0))
+        await ticker()
+        await asyncio.gather(holder, waiter)
+
+        assert ticks == 10
+        assert lock.get_stats().max_queue_depth == 1
+
+    @pytest.mark.asyncio
+    async def test_fifo_order(self):
+        """锁按照排队顺序移交"""
+        lock = TerminalLock()
+        order: list[int] = []
+
+        async def worker(index: int) -> None:
+            await lock.acquire()
+            try:
+                order.append(index)
+                await asyncio.sleep(0.01)
+            finally:
+                lock.release()
+
+        await lock.acquire()
+        tasks = []
+        for i in range(5):
+            tasks.append(asyncio.create_task(worker(i)))
+            await asyncio.sleep(0)
+        assert lock.get_stats().queue_depth == 5
+        lock.release()
+        await asyncio.gather(*tasks)
+
+        assert order == [0, 1, 2, 3, 4]
+        stats = lock.get_stats()
+        assert stats.queue_depth == 0
+        assert stats.acquisitions == 6
+        assert stats.max_wait_time > 0
+        assert stats.avg_wait_time > 0
+
+    @pytest.mark.asyncio
+    async def test_waiter_timeout(self):
+        """等待超时抛出TimeoutError，并从队列中移除"""
+        lock = TerminalLock()
+        holder = asyncio.create_task(hold(lock, 0.2))
+        await asyncio.sleep(0)
+
+        with pytest.raises(TimeoutError):
+            await lock.acquire(timeout=0.05)
+
+        stats = lock.get_stats()
+        assert stats.timeouts == 1
+        assert stats.queue_depth == 0
+        await holder
+        assert not lock.locked()
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_leaves_queue(self):
+        """被取消的等待者不会拿走锁"""
+        lock = TerminalLock()
+        await lock.acquire()
+        waiter = asyncio.create_task(lock.acquire())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+        lock.release()
+        assert not lock.locked()
+        assert lock.get_stats().queue_depth == 0
+
+    @pytest.mark.asyncio
+    async def test_reentrant_and_owner_check(self):
+        """同一任务可重入，其他任务不能释放"""
+        lock = TerminalLock()
+        await lock.acquire()
+        await lock.acquire()
+
+        async def foreign_release() -> None:
+            lock.release()
+
+        with pytest.raises(RuntimeError):
+            await asyncio.create_task(foreign_release())
+
+        lock.release()
+        assert lock.locked()
+        lock.release()
+        assert not lock.locked()
+        with pytest.raises(RuntimeError):
+            lock.release()
+
+    def test_cross_thread_event_loops(self):
+        """不同线程中的事件循环共享同一把锁"""
+        lock = TerminalLock()
+        inside = 0
+        overlaps = 0
+        counter_lock = threading.Lock()
+
+        async def critical_section() -> None:
+            nonlocal inside, overlaps
+            await lock.acquire()
+            try:
+                with counter_lock:
+                    inside += 1
+                    if inside > 1:
+                        overlaps += 1
+                await asyncio.sleep(0.005)
+                with counter_lock:
+                    inside -= 1
+            finally:
+                lock.release()
+
+        def worker() -> None:
+            for _ in range(5):
+                asyncio.run(critical_section())
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=10)
+
+        assert overlaps == 0
+        assert lock.get_stats().acquisitions == 20
+        assert not lock.locked()
+
+    def test_try_acquire(self):
+        """同步非阻塞获取"""
+        lock = TerminalLock()
+        assert lock.try_acquire()
+        assert lock.try_acquire()
+        lock.release()
+        lock.release()
+        assert not lock.locked()
+
+
+class TestLocalTerminalLock:
+    """测试 LocalTerminal 使用异步锁串行执行命令"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_commands_keep_loop_responsive(self):
+        """两个任务共享终端时，事件循环在命令执行期间保持响应"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            terminal = LocalTerminal(root_dir=temp_dir, disable_script_execution=False)
+            try:
+                ticks = 0
+                stop = asyncio.Event()
+
+                async def ticker() -> None:
+                    nonlocal ticks
+                    while not stop.is_set():
+                        ticks += 1
+                        await asyncio.sleep(0.01)
+
+                ticker_task = asyncio.create_task(ticker())
+                start = time.monotonic()
+                outputs = await asyncio.gather(
+                    terminal.run_command("sleep 0.2; echo first"),
+                    terminal.run_command("sleep 0.2; echo second"),
+                )
+                elapsed = time.monotonic() - start
+                stop.set()
+                await ticker_task
+
+                assert "first" in outputs[0]
+                assert "second" in outputs[1]
+                # 命令串行执行，期间ticker持续运行
+                assert elapsed >= 0.4
+                assert ticks >= 20
+                stats = terminal.get_lock_stats()
+                assert stats.max_queue_depth >= 1
+                assert stats.max_wait_time > 0.1
+            finally:
+                terminal.close()
+
+    @pytest.mark.asyncio
+    async def test_acquire_timeout(self):
+        """等待终端锁超时时run_command抛出TimeoutError"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            terminal = LocalTerminal(root_dir=temp_dir, acquire_timeout=0.05)
+            try:
+                slow = asyncio.create_task(terminal.run_command("sleep 0.3"))
+                await asyncio.sleep(0.05)
+
+                with pytest.raises(TimeoutError):
+                    await terminal.run_command("echo late")
+
+                await slow
+                assert terminal.get_lock_stats().timeouts == 1
+                assert "ok" in await terminal.run_command("echo ok")
+            finally:
+                terminal.close()
+
+    def test_negative_acquire_timeout(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            with pytest.raises(ValueError):
+                LocalTerminal(root_dir=temp_dir, acquire_timeout=-1)
@@ -0,0 +1,104 @@
+"""
+终端输出读取测试
+
+验证 read_process 按块读取非阻塞管道、在缓冲区中查找完成标记，
+以及超长输出的首尾截断。
+"""
+
+import tempfile
+import time
+
+import pytest
+from loguru import logger
+
+from tasking.tool.terminal import LocalTerminal, _OutputCollector
+
+
+class TestOutputCollector:
+    """测试输出收集器的首尾截断"""
+
+    def test_no_limit(self):
+        collector = _OutputCollector()
+        collector.add(b"hello ")
+        collector.add(b"world")
+        assert collector.get_text() == "hello world"
+        assert collector.omitted == 0
+
+    def test_under_limit(self):
+        collector = _OutputCollector(limit=20)
+        collector.add(b"0123456789")
+        assert collector.get_text() == "0123456789"
+
+    def test_head_and_tail_are_kept(self):
+        collector = _OutputCollector(limit=10)
+        for i in range(10):
+            collector.add(str(i).encode() * 5)
+
+        assert collector.total == 50
+        assert collector.omitted == 40
+        text = collector.get_text()
+        assert text.startswith("00000")
+        assert text.endswith("99999")
+        assert "已省略中间 40 字节" in text
+
+
+class TestTerminalOutputReading:
+    """测试 LocalTerminal 的分块输出读取"""
+
+    @pytest.fixture
+    def terminal(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            term = LocalTerminal(root_dir=temp_dir)
+            yield term
+            term.close()
+
+    @pytest.mark.asyncio
+    async def test_large_output(self, terminal):
+        """大量输出行完整返回"""
+        start = time.perf_counter()
+        output = await terminal.run_command("seq 1 100000")
+        elapsed = time.perf_counter() - start
+        logger.info(f"[Benchmark] 读取 100000 行输出耗时 {elapsed:.3f}s")
+
+        lines = output.split("\n")
+        assert len(lines) == 100000
+        assert lines[0] == "1"
+        assert lines[-1] == "100000"
+
+    @pytest.mark.asyncio
+    async def test_output_without_trailing_newline(self, terminal):
+        """命令输出末尾没有换行时也能识别完成标记"""
+        assert await terminal.run_command("printf abc") == "abc"
+        assert await terminal.run_command("echo next") == "next"
+
+    @pytest.mark.asyncio
+    async def test_empty_and_multibyte_output(self, terminal):
+        assert await terminal.run_command("true") == ""
+        assert await terminal.run_command("echo '你好，世界'") == "你好，世界"
+
+    @pytest.mark.asyncio
+    async def test_consecutive_commands_do_not_mix(self, terminal):
+        for i in range(20):
+            assert await terminal.run_command(f"echo line{i}") == f"line{i}"
+
+    @pytest.mark.asyncio
+    async def test_output_byte_cap(self):
+        """超出字节上限时只保留开头和结尾"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            terminal = LocalTerminal(root_dir=temp_dir, max_output_bytes=1000)
+            try:
+                output = await terminal.run_command("seq 1 100000")
+                assert output.startswith("1\n2\n3\n")
+                assert output.endswith("99999\n100000")
+                assert "输出过长" in output
+                assert len(output.encode()) < 1200
+
+                # 截断后终端仍可继续使用
+                assert await terminal.run_command("echo ok") == "ok"
+            finally:
+                terminal.close()
+
+    def test_invalid_output_cap(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            with pytest.raises(ValueError):
+                LocalTerminal(root_dir=temp_dir, max_output_bytes=0)
@@ -0,0 +1,105 @@
+"""
+命令安全校验性能测试
+
+验证预编译规则组与校验结果缓存：重复校验的结果与首次一致、缓存按当前目录区分，
+并对一组取自终端测试的命令做微基准测试。
+"""
+
+import os
+import tempfile
+import time
+
+import pytest
+from loguru import logger
+
+from tasking.tool.terminal import LocalTerminal
+
+
+# 取自终端安全测试的命令：(命令, 是否人类允许, 预期结果)
+COMMAND_CORPUS: list[tuple[str, bool, bool]] = [
+    ("ls -la", False, True),
+    ("echo hello", False, True),
+    ("find . -name '*.py'", False, True),
+    ("grep -rn key ./src", False, True),
+    ("cat file.txt | grep key", False, True),
+    ("ls 2>/dev/null", False, True),
+    ("cp a.txt b.txt && mv b.txt c.txt", False, True),
+    ("sed -i 's/a/b/' file.txt", False, True),
+    ("cat /etc/passwd", False, False),
+    ("find / -name passwd", False, False),
+    ("sudo ls", True, False),
+    ("/usr/bin/sudo rm -rf /", True, False),
+    ("rm -rf ./*", True, False),
+    ("rm -rf ../other", False, False),
+    ("echo x > /etc/hosts", True, False),
+    ("eval 'ls'", True, False),
+    ("bash -c 'sudo ls'", True, False),
+    ("echo $(sudo whoami)", True, False),
+    ("diff <(ls) <(ls)", True, False),
+    ("cat <<EOF", False, False),
+    ("python script.py", False, False),
+    ("./run.sh", False, False),
+    ("X='a'; echo $X", False, False),
+    ("chmod +x a.sh", False, False),
+    ("chmod +x a.sh", True, True),
+    ("apt-get install curl", False, False),
+    ("mkfs.ext4 /dev/sda1", True, False),
+    ("ls; sudo ls", True, False),
+]
+
+
+@pytest.fixture
+def terminal():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        os.makedirs(os.path.join(temp_dir, "sub"))
+        terminal = LocalTerminal(root_dir=temp_dir)
+        try:
+            yield terminal
+        finally:
+            terminal.close()
+
+
+class TestCommandVerdictCache:
+    """测试命令校验结果缓存"""
+
+    @pytest.mark.parametrize("command, allow_by_human, expected", COMMAND_CORPUS)
+    def test_cached_verdict_matches(self, terminal, command, allow_by_human, expected):
+        assert terminal.check_command(command, allow_by_human) is expected
+        # 第二次命中缓存，结果不变
+        assert terminal.check_command(command, allow_by_human) is expected
+        # 是否人类允许是缓存键的一部分
+        if not allow_by_human and not expected:
+            assert terminal.check_command(command, True) is terminal.check_command(command, True)
+
+    @pytest.mark.asyncio
+    async def test_cache_keyed_by_current_dir(self, terminal):
+        """相对路径基于当前目录解析，切换目录后不能复用之前的结果"""
+        assert terminal.check_command("cat ../a.txt") is False
+
+        await terminal.run_command("cd sub")
+        assert terminal.check_command("cat ../a.txt") is True
+
+        await terminal.run_command("cd ..")
+        assert terminal.check_command("cat ../a.txt") is False
+
+
+class TestCommandPolicyBenchmark:
+    """命令安全校验微基准测试"""
+
+    def test_corpus(self, terminal):
+        rounds = 20
+        start = time.perf_counter()
+        for command, allow_by_human, expected in COMMAND_CORPUS:
+            assert terminal.check_command(command, allow_by_human) is expected
+        first = (time.perf_counter() - start) / len(COMMAND_CORPUS)
+
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for command, allow_by_human, _ in COMMAND_CORPUS:
+                terminal.check_command(command, allow_by_human)
+        cached = (time.perf_counter() - start) / (rounds * len(COMMAND_CORPUS))
+        logger.info(
+            f"[Benchmark] 命令安全校验：首次平均 {first * 1e6:.1f}us，缓存命中平均 {cached * 1e6:.1f}us"
+        )
+
+        assert cached < first
@@ -0,0 +1,212 @@
+"""
+终端会话池测试
+
+验证 TerminalPool 的预热、借出/归还、目录隔离、上限与等待、空闲回收，
+以及 LocalFileSystem 从终端池借用终端执行搜索。
+"""
+
+import asyncio
+import os
+import tempfile
+import time
+
+import pytest
+
+from tasking.model.filesystem import SearchParams, SearchPattern
+from tasking.tool.filesystem import LocalFileSystem
+from tasking.tool.terminal import LocalTerminal
+from tasking.tool.terminal_pool import TerminalPool
+
+
+@pytest.fixture
+def temp_root():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        yield temp_dir
+
+
+class TestTerminalPool:
+    """测试 TerminalPool 的基本行为"""
+
+    def test_prewarm(self, temp_root):
+        pool = TerminalPool(root_dir=temp_root, min_size=2, max_size=3)
+        try:
+            assert pool.get_size() == 2
+            assert pool.get_idle_count() == 2
+            assert pool.get_workspace() == temp_root
+        finally:
+            pool.close()
+
+    def test_invalid_config(self, temp_root):
+        with pytest.raises(ValueError):
+            TerminalPool(root_dir=temp_root, min_size=0)
+        with pytest.raises(ValueError):
+            TerminalPool(root_dir=temp_root, min_size=3, max_size=2)
+        with pytest.raises(ValueError):
+            TerminalPool(root_dir=temp_root, idle_timeout=-1)
+
+    @pytest.mark.asyncio
+    async def test_sessions_have_isolated_cwd(self, temp_root):
+        """同时借出的终端互不影响，归还后目录重置到工作空间"""
+        os.makedirs(os.path.join(temp_root, "sub"))
+        pool = TerminalPool(root_dir=temp_root, min_size=2, max_size=2)
+        try:
+            first = await pool.checkout()
+            second = await pool.checkout()
+            assert first is not second
+
+            await first.run_command("cd sub")
+            assert first.get_current_dir() == os.path.join(temp_root, "sub")
+            assert second.get_current_dir() == temp_root
+
+            await pool.checkin(first)
+            await pool.checkin(second)
+
+            async with pool.session() as terminal:
+                assert terminal.get_current_dir() == temp_root
+                assert (await terminal.run_command("pwd")).strip() == temp_root
+        finally:
+            pool.close()
+
+    @pytest.mark.asyncio
+    async def test_checkin_resets_shell_state(self, temp_root):
+        """归还后环境变量、函数和别名恢复到初始化完成时的状态"""
+        pool = TerminalPool(
+            root_dir=temp_root, min_size=1, max_size=1, disable_script_execution=False,
+            init_commands=["export KEEP=init", "alias keep=pwd"],
+        )
+        try:
+            async with pool.session() as terminal:
+                await terminal.run_command("export LEAK=secret")
+                await terminal.run_command("PLAIN=x")
+                await terminal.run_command("export KEEP=changed")
+                await terminal.run_command("unset HOME")
+                await terminal.run_command("greet() { echo hi; }")
+                await terminal.run_command("alias ll='ls -l'")
+
+            async with pool.session() as terminal:
+                output = await terminal.run_command('echo "[$LEAK][$PLAIN][$KEEP][$HOME]"')
+                assert output.strip() == f"[][][init][{os.environ['HOME']}]"
+                assert "not found" in await terminal.run_command("type greet")
+                assert (await terminal.run_command("alias")).strip() == "alias keep='pwd'"
+        finally:
+            pool.close()
+
+    @pytest.mark.asyncio
+    async def test_concurrent_sessions_run_in_parallel(self, temp_root):
+        pool = TerminalPool(root_dir=temp_root, min_size=3, max_size=3)
+        try:
+            async def sleeper(i: int) -> str:
+                async with pool.session() as terminal:
+                    return await terminal.run_command(f"sleep 0.5; echo {i}")
+
+            start = time.monotonic()
+            outputs = await asyncio.gather(*(sleeper(i) for i in range(3)))
+            elapsed = time.monotonic() - start
+
+            assert outputs == ["0", "1", "2"]
+            assert elapsed < 1.2
+        finally:
+            pool.close()
+
+    @pytest.mark.asyncio
+    async def test_max_size_and_waiting(self, temp_root):
+        pool = TerminalPool(root_dir=temp_root, min_size=1, max_size=1)
+        try:
+            terminal = await pool.checkout()
+            with pytest.raises(TimeoutError):
+                await pool.checkout(timeout=0.05)
+
+            waiter = asyncio.create_task(pool.checkout())
+            await asyncio.sleep(0.01)
+            assert not waiter.done()
+            await pool.checkin(terminal)
+
+            assert await asyncio.wait_for(waiter, timeout=5) is terminal
+            assert pool.get_size() == 1
+            await pool.checkin(terminal)
+        finally:
+            pool.close()
+
+    @pytest.mark.asyncio
+    async def test_grows_on_demand_and_reaps_idle(self, temp_root):
+        pool = TerminalPool(root_dir=temp_root, min_size=1, max_size=3, idle_timeout=0)
+        try:
+            terminals = [await pool.checkout() for _ in range(3)]
+            assert pool.get_size() == 3
+            assert len({terminal.get_id() for terminal in terminals}) == 3
+
+            for terminal in terminals:
+                await pool.checkin(terminal)
+
+            # 空闲超时的终端被回收，仅保留min_size个
+            assert pool.get_size() == 1
+        finally:
+            pool.close()
+
+    @pytest.mark.asyncio
+    async def test_dead_terminal_is_replaced(self, temp_root):
+        pool = TerminalPool(root_dir=temp_root, min_size=1, max_size=1)
+        try:
+            terminal = await pool.checkout()
+            await pool.checkin(terminal)
+            terminal.close()
+
+            replacement = await pool.checkout()
+            assert replacement is not terminal
+            assert await replacement.run_command("echo alive") == "alive"
+            await pool.checkin(replacement)
+        finally:
+            pool.close()
+
+    @pytest.mark.asyncio
+    async def test_foreign_terminal_and_closed_pool(self, temp_root):
+        pool = TerminalPool(root_dir=temp_root)
+        terminal = LocalTerminal(root_dir=temp_root)
+        try:
+            with pytest.raises(ValueError):
+                await pool.checkin(terminal)
+        finally:
+            terminal.close()
+
+        pool.close()
+        assert pool.get_idle_count() == 0
+        with pytest.raises(RuntimeError):
+            await pool.checkout()
+
+
+class TestFileSystemWithPool:
+    """测试 LocalFileSystem 从终端池借用终端"""
+
+    @pytest.mark.asyncio
+    async def test_search_borrows_from_pool(self, temp_root):
+        with open(os.path.join(temp_root, "a.py"), "w") as f:
+            f.write("def hello():\n    pass\n")
+
+        terminal = LocalTerminal(root_dir=temp_root)
+        pool = TerminalPool(root_dir=temp_root, min_size=2, max_size=2)
+        try:
+            filesystem = LocalFileSystem(terminal, terminal_pool=pool)
+            params = SearchParams(
+                content_pattern=SearchPattern(pattern="hello"),
+                search_paths=[temp_root],
+            )
+
+            results = await asyncio.gather(filesystem.search(params), filesystem.search(params))
+
+            assert all(result.total_matches == 1 for result in results)
+            assert terminal.get_lock_stats().acquisitions == 0
+            assert pool.get_idle_count() == 2
+        finally:
+            pool.close()
+            terminal.close()
+
+    def test_workspace_mismatch(self, temp_root):
+        os.makedirs(os.path.join(temp_root, "other"))
+        terminal = LocalTerminal(root_dir=temp_root)
+        pool = TerminalPool(root_dir=temp_root, workspace="other")
+        try:
+            with pytest.raises(ValueError):
+                LocalFileSystem(terminal, terminal_pool=pool)
+        finally:
+            pool.close()
+            terminal.close()
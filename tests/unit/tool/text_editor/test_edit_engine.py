@@ -0,0 +1,232 @@
+"""
+文本编辑引擎测试
+
+验证编辑计划与逐个执行操作的结果一致、大文件流式改写，
+以及文件的原子写入（临时文件 + 重命名）。
+"""
+
+import os
+import random
+import tempfile
+import time
+
+import pytest
+from loguru import logger
+
+from tasking.model.filesystem import EditOperation
+from tasking.tool.filesystem import LocalFileSystem
+from tasking.tool.terminal import LocalTerminal
+from tasking.tool.text_editor import LocalTextEditor, _STREAM_CHUNK_SIZE
+
+
+def apply_sequentially(lines: list[str], operations: list[EditOperation]) -> list[str]:
+    """参考实现：直接在列表上逐个执行操作"""
+    lines = list(lines)
+    for op in operations:
+        if op.op == "delete":
+            if op.line == -1:
+                if lines:
+                    lines.pop()
+            elif 1 <= op.line <= len(lines):
+                del lines[op.line - 1]
+            elif op.line in (0, 1):
+                if lines:
+                    del lines[0]
+        elif op.op == "insert":
+            if op.line in (0, 1):
+                lines.insert(0, op.content)
+            elif op.line == -1:
+                lines.append(op.content)
+            else:
+                lines.insert(op.line - 1, op.content)
+        else:
+            if op.line == -1:
+                if lines:
+                    lines[-1] = op.content
+                else:
+                    lines.append(op.content)
+            elif op.line in (0, 1):
+                if lines:
+                    lines[0] = op.content
+                else:
+                    lines.append(op.content)
+            else:
+                lines[op.line - 1] = op.content
+    return lines
+
+
+def random_operations(rng: random.Random, line_count: int, count: int) -> list[EditOperation]:
+    operations: list[EditOperation] = []
+    for i in range(count):
+        op = rng.choice(["insert", "delete", "modify"])
+        upper = line_count + 1 if op == "insert" else line_count
+        if upper < 1 or rng.random() < 0.1:
+            line = rng.choice([-1, 0, 1])
+        else:
+            line = rng.randint(1, upper)
+        operations.append(EditOperation(line=line, op=op, content=f"new{i}"))
+        if op == "insert":
+            line_count += 1
+        elif op == "delete" and line_count > 0:
+            line_count -= 1
+        elif op == "modify" and line_count == 0:
+            line_count = 1
+    return operations
+
+
+@pytest.fixture
+def workspace():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        terminal = LocalTerminal(root_dir=temp_dir)
+        try:
+            yield temp_dir, LocalFileSystem(terminal)
+        finally:
+            terminal.close()
+
+
+class TestEditPlan:
+    """测试编辑计划保持逐个执行的语义"""
+
+    def test_matches_sequential_semantics(self):
+        rng = random.Random(7)
+        editor = LocalTextEditor(file_system=None)  # type: ignore[arg-type]
+        for _ in range(300):
+            old_lines = [f"line{i}" for i in range(rng.randint(0, 15))]
+            operations = random_operations(rng, len(old_lines), rng.randint(1, 20))
+
+            result = editor._apply_operations_in_memory(old_lines, operations, file_exists=True)
+
+            assert result == apply_sequentially(old_lines, operations)
+
+    def test_out_of_range(self):
+        editor = LocalTextEditor(file_system=None)  # type: ignore[arg-type]
+        with pytest.raises(ValueError):
+            editor._apply_operations_in_memory(["a"], [EditOperation(line=5, op="modify", content="x")], True)
+
+    def test_many_inserts_near_top(self):
+        """大文件开头附近的大量插入只与操作数量相关"""
+        editor = LocalTextEditor(file_system=None)  # type: ignore[arg-type]
+        old_lines = [f"line{i}" for i in range(200000)]
+        operations = [EditOperation(line=i % 50 + 1, op="insert", content=f"new{i}") for i in range(2000)]
+
+        start = time.perf_counter()
+        result = editor._apply_operations_in_memory(old_lines, operations, file_exists=True)
+        elapsed = time.perf_counter() - start
+        logger.info(f"[Benchmark] 20万行文件开头插入 2000 行耗时 {elapsed:.3f}s")
+
+        assert len(result) == 202000
+        assert result[-1] == "line199999"
+        assert elapsed < 2
+
+
+class TestStreamingEdit:
+    """测试大文件流式改写"""
+
+    @pytest.mark.asyncio
+    async def test_streaming_matches_in_memory(self, workspace):
+        temp_dir, filesystem = workspace
+        content = "".join(f"line{i}\n" for i in range(5000))
+        operations = [
+            EditOperation(line=10, op="modify", content="changed"),
+            EditOperation(line=1, op="insert", content="header"),
+            EditOperation(line=4000, op="delete", content=""),
+            EditOperation(line=-1, op="insert", content="footer"),
+        ]
+
+        results = []
+        for name, threshold in (("memory.txt", 10 * 1024 * 1024), ("stream.txt", 1)):
+            path = os.path.join(temp_dir, name)
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(content)
+            output = await LocalTextEditor(filesystem, stream_threshold=threshold).edit_file(path, operations)
+            with open(path, encoding="utf-8") as f:
+                results.append(f.read())
+            assert "@@ -" in output
+            assert "+  11  changed" in output
+
+        assert results[0] == results[1]
+        assert results[1].startswith("header\nline0\n")
+        assert results[1].endswith("line4999\nfooter\n")
+        assert "line3998\n" not in results[1]
+        # 不残留临时文件
+        assert sorted(os.listdir(temp_dir)) == ["memory.txt", "stream.txt"]
+
+    @pytest.mark.asyncio
+    async def test_streaming_keeps_escaped_newlines(self, workspace):
+        temp_dir, filesystem = workspace
+        path = os.path.join(temp_dir, "escaped.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("a\\nb\r\nsecond\n")
+
+        editor = LocalTextEditor(filesystem, stream_threshold=1)
+        await editor.edit_file(path, [EditOperation(line=-1, op="insert", content="x\ny")])
+
+        with open(path, encoding="utf-8") as f:
+            assert f.read() == "a\\nb\nsecond\nx\\ny\n"
+
+    @pytest.mark.asyncio
+    async def test_streaming_chunks_stay_bounded(self, workspace):
+        """编辑靠近文件末尾时，未改动的行也按块输出，不会整体缓存"""
+        temp_dir, filesystem = workspace
+        path = os.path.join(temp_dir, "large.txt")
+        line_count = 40000
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("".join(f"line{i:08d} {'x' * 40}\n" for i in range(line_count)))
+
+        sizes: list[int] = []
+        save_file_stream = filesystem.save_file_stream
+
+        async def recording_save(file_path, chunks, **kwargs):
+            async def record():
+                async for chunk in chunks:
+                    sizes.append(len(chunk))
+                    yield chunk
+            return await save_file_stream(file_path, record(), **kwargs)
+
+        filesystem.save_file_stream = recording_save
+        editor = LocalTextEditor(filesystem, stream_threshold=1)
+        await editor.edit_file(path, [EditOperation(line=line_count - 5, op="modify", content="changed")])
+
+        assert len(sizes) > 1
+        assert max(sizes) < _STREAM_CHUNK_SIZE + 1024
+        with open(path, encoding="utf-8") as f:
+            lines = f.read().splitlines()
+        assert len(lines) == line_count
+        assert lines[line_count - 6] == "changed"
+        assert lines[-1] == f"line{line_count - 1:08d} {'x' * 40}"
+
+
+class TestAtomicSave:
+    """测试原子写入"""
+
+    @pytest.mark.asyncio
+    async def test_failed_stream_keeps_original(self, workspace):
+        temp_dir, filesystem = workspace
+        path = os.path.join(temp_dir, "keep.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("original\n")
+
+        async def broken_chunks():
+            yield b"partial"
+            raise RuntimeError("中断")
+
+        with pytest.raises(RuntimeError):
+            await filesystem.save_file_stream(path, broken_chunks(), replace=True)
+
+        with open(path, encoding="utf-8") as f:
+            assert f.read() == "original\n"
+        assert os.listdir(temp_dir) == ["keep.txt"]
+
+    @pytest.mark.asyncio
+    async def test_save_keeps_file_mode(self, workspace):
+        temp_dir, filesystem = workspace
+        path = os.path.join(temp_dir, "mode.sh")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("echo hi\n")
+        os.chmod(path, 0o750)
+
+        await filesystem.save_file(path, "echo bye\n", "utf-8", replace=True)
+
+        assert os.stat(path).st_mode & 0o777 == 0o750
+        with open(path, encoding="utf-8") as f:
+            assert f.read() == "echo bye\n"
@@ -0,0 +1,137 @@
+"""
+文本编辑器范围查看测试
+
+验证 view 的行号范围、字节上限、行偏移索引缓存及其失效。
+"""
+
+import os
+import tempfile
+import time
+
+import pytest
+from loguru import logger
+
+from tasking.model.filesystem import EditOperation
+from tasking.tool.filesystem import LocalFileSystem
+from tasking.tool.terminal import LocalTerminal
+from tasking.tool.text_editor import LocalTextEditor
+
+
+@pytest.fixture
+def editor_and_dir():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        terminal = LocalTerminal(root_dir=temp_dir)
+        try:
+            yield LocalTextEditor(LocalFileSystem(terminal)), temp_dir
+        finally:
+            terminal.close()
+
+
+def write_lines(path: str, count: int) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        f.writelines(f"line{i}\n" for i in range(1, count + 1))
+
+
+class TestViewRange:
+    """测试范围查看"""
+
+    @pytest.mark.asyncio
+    async def test_full_view_unchanged(self, editor_and_dir):
+        """不指定范围时输出与原来一致（末尾换行后的空行也会编号）"""
+        editor, temp_dir = editor_and_dir
+        path = os.path.join(temp_dir, "small.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("a\n中文\nc\n")
+
+        assert await editor.view(path) == "1  a\n2  中文\n3  c\n4  "
+
+    @pytest.mark.asyncio
+    async def test_line_range(self, editor_and_dir):
+        editor, temp_dir = editor_and_dir
+        path = os.path.join(temp_dir, "range.txt")
+        write_lines(path, 10000)
+
+        output = await editor.view(path, start_line=4000, end_line=4002)
+        assert output == "4000  line4000\n4001  line4001\n4002  line4002"
+
+        # 结束行号超出文件时截止到最后一行
+        assert await editor.view(path, start_line=10000, end_line=20000) == "10000  line10000\n10001  "
+        assert "超出范围" in await editor.view(path, start_line=20000)
+
+    @pytest.mark.asyncio
+    async def test_max_bytes(self, editor_and_dir):
+        editor, temp_dir = editor_and_dir
+        path = os.path.join(temp_dir, "cap.txt")
+        write_lines(path, 1000)
+
+        output = await editor.view(path, max_bytes=100)
+        lines = output.split("\n")
+        assert lines[0] == "1  line1"
+        assert "可从第" in lines[-1]
+        next_line = len(lines)
+        assert f"可从第 {next_line} 行继续查看" in lines[-1]
+        assert len("\n".join(lines[:-1]).encode()) <= 100
+
+    @pytest.mark.asyncio
+    async def test_single_long_line_is_cut(self, editor_and_dir):
+        editor, temp_dir = editor_and_dir
+        path = os.path.join(temp_dir, "long.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("x" * 10000 + "\nshort\n")
+
+        output = await editor.view(path, max_bytes=50)
+        first, note = output.split("\n")
+        assert first.startswith("1  xxx")
+        assert len(first) == 50
+        assert "可从第 2 行继续查看" in note
+
+    @pytest.mark.asyncio
+    async def test_invalid_arguments(self, editor_and_dir):
+        editor, temp_dir = editor_and_dir
+        path = os.path.join(temp_dir, "a.txt")
+        write_lines(path, 3)
+        with pytest.raises(ValueError):
+            await editor.view(path, start_line=0)
+        with pytest.raises(ValueError):
+            await editor.view(path, start_line=3, end_line=2)
+        with pytest.raises(ValueError):
+            await editor.view(path, max_bytes=0)
+
+
+class TestLineIndexCache:
+    """测试行偏移索引缓存"""
+
+    @pytest.mark.asyncio
+    async def test_repeated_views_use_cache(self, editor_and_dir):
+        editor, temp_dir = editor_and_dir
+        path = os.path.join(temp_dir, "big.log")
+        write_lines(path, 500000)
+
+        start = time.perf_counter()
+        await editor.view(path, start_line=1, end_line=1)
+        first = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for i in range(20):
+            output = await editor.view(path, start_line=400000 + i * 10, end_line=400000 + i * 10 + 49)
+        repeated = (time.perf_counter() - start) / 20
+        logger.info(f"[Benchmark] 50万行文件首次查看 {first:.3f}s，缓存后平均 {repeated:.4f}s")
+
+        assert output.startswith("400190  line400190")
+        assert repeated < first
+
+    @pytest.mark.asyncio
+    async def test_cache_invalidated_on_change(self, editor_and_dir):
+        editor, temp_dir = editor_and_dir
+        path = os.path.join(temp_dir, "change.txt")
+        write_lines(path, 5)
+        assert await editor.view(path, start_line=2, end_line=2) == "2  line2"
+
+        # 外部修改文件
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("first\nsecond line changed\n")
+        assert await editor.view(path, start_line=2, end_line=2) == "2  second line changed"
+
+        # 通过编辑器修改文件
+        await editor.edit_file(path, [EditOperation(line=1, op="insert", content="header")])
+        assert await editor.view(path, start_line=2, end_line=2) == "2  first"
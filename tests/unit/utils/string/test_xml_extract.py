@@ -1,8 +1,12 @@
 #!/usr/bin/env python3
 """Test cases for the xml extract_by_label function."""
 
+import time
 import unittest
-from tasking.utils.string.xml import extract_by_label
+
+from loguru import logger
+
+from tasking.utils.string.xml import StreamingLabelParser, extract_by_label, parse_labels
 
 
 class TestXMLExtract(unittest.TestCase):
@@ -45,5 +49,100 @@ class TestXMLExtract(unittest.TestCase):
         self.assertEqual(extract_by_label(input_content, 'non_existent_label'), '')
 
 
+class TestParseLabels(unittest.TestCase):
+    """Test the single-pass label parser."""
+
+    def test_parse_all_labels(self):
+        """Test parsing every label of a message at once."""
+        content = '<think>\nplan\n\nmore\n</think>\n<output>\nThe answer\n</output>\n<finish>true</finish>'
+        self.assertEqual(dict(parse_labels(content)), {'think': 'plan\nmore', 'output': 'The answer', 'finish': 'true'})
+
+    def test_case_insensitive(self):
+        """Test labels are matched case-insensitively."""
+        self.assertEqual(extract_by_label('<Output>x</Output>', 'output'), 'x')
+        self.assertEqual(extract_by_label('<output>x</output>', 'OUTPUT'), 'x')
+
+    def test_unclosed_label(self):
+        """Test unclosed labels extend to the end and inner labels are closed."""
+        self.assertEqual(extract_by_label('<think>done</think>\n<output>\nresult', 'output'), 'result')
+        self.assertEqual(extract_by_label('<output>hello<finish>true</finish>', 'output'), 'hello<finish>true</finish>')
+        self.assertEqual(extract_by_label('<output>a<b>c</output>', 'output'), 'a<b>c</b>')
+
+    def test_stray_closing_label(self):
+        """Test closing labels without a matching opening label are removed."""
+        self.assertEqual(extract_by_label('<output>a</think>b</output>', 'output'), 'ab')
+        self.assertEqual(extract_by_label('</output>', 'output'), '')
+
+    def test_nested_and_repeated_labels(self):
+        """Test nested labels and the first non-empty occurrence."""
+        content = '<a></a><a>\n<b>inner</b>\n</a><b>second</b>'
+        self.assertEqual(extract_by_label(content, 'a'), '<b>inner</b>')
+        self.assertEqual(extract_by_label(content, 'b'), 'inner')
+
+    def test_comparison_is_not_label(self):
+        """Test comparisons in the content are not treated as labels."""
+        self.assertEqual(extract_by_label('<output>if a < b and c > d: a<b</output>', 'output'), 'if a < b and c > d: a<b')
+
+    def test_long_output_benchmark(self):
+        """Benchmark extracting labels from a long model output."""
+        paragraph = '这是一段推理内容，包含 a < b 以及 x > y 的比较。\nSome code: if (a<b) { return <T>; }\n\n'
+        content = f'<think>\n{paragraph * 400}</think>\n<output>\n{paragraph * 200}</output>\n<finish>true</finish>'
+        self.assertGreater(len(content.encode('utf-8')), 50 * 1024)
+
+        parse_labels.cache_clear()
+        start = time.perf_counter()
+        self.assertEqual(extract_by_label(content, 'finish', 'finish_flag', 'finish_workflow'), 'true')
+        first = time.perf_counter() - start
+
+        start = time.perf_counter()
+        self.assertEqual(extract_by_label(content, 'human_interfere'), '')
+        self.assertTrue(extract_by_label(content, 'output').startswith('这是一段推理内容'))
+        cached = (time.perf_counter() - start) / 2
+        logger.info(f"[Benchmark] {len(content.encode('utf-8')) // 1024}KB 输出标签提取："
+                    f"首次解析 {first * 1000:.2f}ms，缓存命中 {cached * 1000:.3f}ms")
+
+        self.assertLess(cached, first)
+
+
+class TestStreamingLabelParser(unittest.TestCase):
+    """Test the incremental label parser."""
+
+    CONTENT = ('<think>\ncompare a < b and x<1\n</think>\n<output attr="1">\nline 1\n\nline 2\n</think></output>\n'
+               '<finish>true</finish><finish>false</finish>\n<note>unclosed')
+
+    def feed_all(self, parser: StreamingLabelParser, chunk_size: int) -> list:
+        events = []
+        for i in range(0, len(self.CONTENT), chunk_size):
+            events.extend(parser.feed(self.CONTENT[i:i + chunk_size]))
+        return events
+
+    def test_events_on_close(self):
+        """Test events are emitted once per label as soon as it closes."""
+        parser = StreamingLabelParser()
+        self.assertEqual(parser.feed('<finish>tr'), [])
+        self.assertEqual(parser.feed('ue</fin'), [])
+        events = parser.feed('ish> tail')
+        self.assertEqual([(e.label, e.content) for e in events], [('finish', 'true')])
+        self.assertEqual(parser.get_text()[:events[0].end], '<finish>true</finish>')
+
+    def test_chunking_does_not_matter(self):
+        """Test any chunk size gives the same events, consistent with parse_labels."""
+        expected = self.feed_all(StreamingLabelParser(), len(self.CONTENT))
+        for chunk_size in (1, 2, 3, 7, 16):
+            self.assertEqual(self.feed_all(StreamingLabelParser(), chunk_size), expected)
+
+        labels = parse_labels(self.CONTENT)
+        self.assertEqual([e.label for e in expected], ['think', 'output', 'finish'])
+        for event in expected:
+            self.assertEqual(event.content, labels[event.label])
+        # Unclosed labels never produce events
+        self.assertEqual(labels['note'], 'unclosed')
+
+    def test_label_filter(self):
+        """Test only the requested labels produce events."""
+        events = self.feed_all(StreamingLabelParser(labels=['FINISH']), 5)
+        self.assertEqual([(e.label, e.content) for e in events], [('finish', 'true')])
+
+
 if __name__ == '__main__':
     unittest.main()
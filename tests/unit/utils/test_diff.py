@@ -5,10 +5,15 @@ diff工具单元测试
 """
 
 import pytest
+import random
 import tempfile
+import time
 import os
 from pathlib import Path
-from tasking.utils.diff import diff_lines, diff_to_html, diff_to_text, diff_files, Operation, DiffItem
+from loguru import logger
+from tasking.utils.diff import (
+    diff_lines, diff_to_html, diff_to_text, diff_files, match_lines, iter_hunks, hunks_to_text, Operation, DiffItem,
+)
 
 
 class TestDiffLines:
@@ -408,6 +413,167 @@ class TestDiffContext:
         assert any("生成式" in item.content or "生成式" in text for item in diff_items)
 
 
+def _lcs_length(x: list[str], y: list[str]) -> int:
+    """参考实现：动态规划计算最长公共子序列长度"""
+    dp = [[0] * (len(y) + 1) for _ in range(len(x) + 1)]
+    for i in range(1, len(x) + 1):
+        for j in range(1, len(y) + 1):
+            if x[i - 1] == y[j - 1]:
+                dp[i][j] = dp[i - 1][j - 1] + 1
+            else:
+                dp[i][j] = max(dp[i - 1][j], dp[i][j - 1])
+    return dp[len(x)][len(y)]
+
+
+class TestMatchLines:
+    """测试Myers差分算法的匹配结果"""
+
+    def test_matches_are_longest_common_subsequence(self):
+        """随机输入下匹配长度与动态规划结果一致，且匹配合法"""
+        rng = random.Random(42)
+        for _ in range(500):
+            old_lines = [rng.choice("abcde") for _ in range(rng.randint(0, 30))]
+            new_lines = [rng.choice("abcdef") for _ in range(rng.randint(0, 30))]
+            matches = match_lines(old_lines, new_lines)
+
+            assert len(matches) == _lcs_length(old_lines, new_lines)
+            assert all(old_lines[i] == new_lines[j] for i, j in matches)
+            assert all(
+                matches[n][0] < matches[n + 1][0] and matches[n][1] < matches[n + 1][1]
+                for n in range(len(matches) - 1)
+            )
+
+    def test_common_prefix_and_suffix(self):
+        old_lines = ["a", "b", "c", "d", "e"]
+        new_lines = ["a", "b", "x", "d", "e"]
+        assert match_lines(old_lines, new_lines) == [(0, 0), (1, 1), (3, 3), (4, 4)]
+
+    def test_lines_only_on_one_side(self):
+        old_lines = ["a", "only_old", "b", "c"]
+        new_lines = ["only_new", "a", "c", "b"]
+        matches = match_lines(old_lines, new_lines)
+        assert len(matches) == 2
+        assert all(old_lines[i] == new_lines[j] for i, j in matches)
+
+
+class TestHunks:
+    """测试差异块的生成与渲染"""
+
+    def test_distant_edits_produce_separate_hunks(self):
+        """相距很远的两处修改生成两个小的差异块，不包含中间内容"""
+        old_lines = [f"line{i}\n" for i in range(1, 10001)]
+        new_lines = list(old_lines)
+        new_lines[9] = "changed10\n"
+        new_lines[9989] = "changed9990\n"
+
+        hunks = list(iter_hunks(old_lines, new_lines, k=3))
+
+        assert [hunk.header() for hunk in hunks] == ["@@ -7,7 +7,7 @@", "@@ -9987,7 +9987,7 @@"]
+        assert all(len(hunk.lines) == 8 for hunk in hunks)
+        text = diff_to_text(diff_lines(old_lines, new_lines), old_lines, new_lines, k=3)
+        assert "line5000" not in text
+        assert "-  10  line10" in text
+        assert "+  10  changed10" in text
+
+    def test_close_edits_are_merged(self):
+        """上下文重叠的修改合并为同一个差异块"""
+        old_lines = [f"line{i}" for i in range(1, 21)]
+        new_lines = list(old_lines)
+        new_lines[4] = "x"
+        new_lines[9] = "y"
+
+        hunks = list(iter_hunks(old_lines, new_lines, k=3))
+
+        assert len(hunks) == 1
+        assert hunks[0].header() == "@@ -2,12 +2,12 @@"
+        context = [line for line in hunks[0].lines if line.operation is None]
+        assert all(line.old_line == line.new_line for line in context)
+
+    def test_line_numbers_after_insert_and_delete(self):
+        old_lines = ["a", "b", "c", "d"]
+        new_lines = ["a", "x", "y", "b", "d"]
+
+        hunks = list(iter_hunks(old_lines, new_lines, k=1))
+
+        assert [hunk.header() for hunk in hunks] == ["@@ -1,4 +1,5 @@"]
+        assert [(line.old_line, line.new_line, line.operation) for line in hunks[0].lines] == [
+            (1, 1, None),
+            (0, 2, Operation.INSERT),
+            (0, 3, Operation.INSERT),
+            (2, 4, None),
+            (3, 0, Operation.DELETE),
+            (4, 5, None),
+        ]
+
+    def test_insert_into_empty_file(self):
+        hunks = list(iter_hunks([], ["a", "b"]))
+        assert hunks[0].header() == "@@ -0,0 +1,2 @@"
+
+    def test_output_cap(self):
+        """超出字符上限时截断并提示剩余差异块数量"""
+        old_lines = [f"line{i}" for i in range(1000)]
+        new_lines = [line if i % 20 else f"changed{i}" for i, line in enumerate(old_lines)]
+
+        full = hunks_to_text(iter_hunks(old_lines, new_lines))
+        capped = hunks_to_text(iter_hunks(old_lines, new_lines), max_chars=500)
+
+        assert full.count("@@ -") == 50
+        assert len(capped) < 600
+        assert capped.startswith("@@ -1,4 +1,4 @@")
+        assert "个差异块未显示" in capped
+        assert "changed980" not in capped
+
+
+class TestDiffBenchmark:
+    """大文件差分性能测试"""
+
+    def test_large_file_few_edits(self):
+        """2万行文件的少量修改应在很短时间内完成差分和渲染"""
+        test_dir = Path(__file__).resolve().parents[2] / "assets"
+        with open(test_dir / "ai_intro_v1.txt", "r", encoding="utf-8") as f:
+            base_lines = f.readlines()
+
+        old_lines = [f"{i}: {line}" for i in range(20000 // len(base_lines) + 1) for line in base_lines][:20000]
+        new_lines = list(old_lines)
+        new_lines[100] = "changed\n"
+        new_lines.insert(15000, "inserted\n")
+        del new_lines[19000]
+
+        start = time.perf_counter()
+        diff_items = diff_lines(old_lines, new_lines)
+        text = diff_to_text(diff_items, old_lines, new_lines, k=3)
+        elapsed = time.perf_counter() - start
+        logger.info(f"[Benchmark] 20000 行文件差分耗时 {elapsed:.3f}s")
+
+        assert len(diff_items) == 4
+        assert "+ 101  changed" in text
+        assert elapsed < 5
+
+    def test_large_file_many_edits(self):
+        """大量分散修改的文件差分"""
+        test_dir = Path(__file__).resolve().parents[2] / "assets"
+        with open(test_dir / "ai_intro_v1.txt", "r", encoding="utf-8") as f:
+            old_base = f.readlines()
+        with open(test_dir / "ai_intro_v2.txt", "r", encoding="utf-8") as f:
+            new_base = f.readlines()
+
+        old_lines = [f"{i % 7}: {line}" for i in range(100) for line in old_base]
+        new_lines = [f"{i % 7}: {line}" for i in range(100) for line in new_base]
+
+        start = time.perf_counter()
+        diff_items = diff_lines(old_lines, new_lines)
+        elapsed = time.perf_counter() - start
+        logger.info(f"[Benchmark] {len(old_lines)} -> {len(new_lines)} 行大量修改差分耗时 {elapsed:.3f}s")
+
+        # 去掉删除行后的旧文件与去掉插入行后的新文件一致
+        deleted = {item.line for item in diff_items if item.operation == Operation.DELETE}
+        inserted = {item.line for item in diff_items if item.operation == Operation.INSERT}
+        kept_old = [line for i, line in enumerate(old_lines, 1) if i not in deleted]
+        kept_new = [line for j, line in enumerate(new_lines, 1) if j not in inserted]
+        assert kept_old == kept_new
+        assert elapsed < 5
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
 
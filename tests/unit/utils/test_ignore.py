@@ -0,0 +1,45 @@
+"""
+.gitignore 风格忽略规则测试
+"""
+
+import pytest
+
+from tasking.utils.ignore import IgnoreRules, is_ignored
+
+
+class TestIgnoreRules:
+    """测试模式匹配"""
+
+    @pytest.mark.parametrize("path, is_dir, expected", [
+        ("a.pyc", False, True),
+        ("pkg/a.pyc", False, True),
+        ("build", True, True),
+        ("build", False, None),             # 目录规则不匹配文件
+        ("src/build", True, True),
+        ("root.txt", False, True),
+        ("src/root.txt", False, None),      # 以 / 开头的规则只匹配规则所在目录
+        ("docs/a.md", False, True),
+        ("docs/x/y/a.md", False, True),
+        ("logs/a/b", False, True),
+        ("logs", True, None),
+        ("data1.csv", False, True),
+        ("datax.csv", False, None),
+    ])
+    def test_patterns(self, path, is_dir, expected):
+        rules = IgnoreRules.from_lines([
+            "# 注释", "", "*.pyc", "build/", "/root.txt", "docs/**/*.md", "logs/**", "data[0-9].csv",
+        ])
+        assert rules.match(path, is_dir) is expected
+
+    def test_negation_and_base(self):
+        rules = IgnoreRules.from_lines(["*.log", "!keep.log"], base="sub")
+        assert rules.match("sub/a.log", False) is True
+        assert rules.match("sub/deep/keep.log", False) is False
+        assert rules.match("a.log", False) is None
+
+    def test_inner_scope_wins(self):
+        outer = IgnoreRules.from_lines(["*.log"])
+        inner = IgnoreRules.from_lines(["!keep.log"], base="sub")
+        assert is_ignored([outer, inner], "sub/keep.log", False) is False
+        assert is_ignored([outer, inner], "keep.log", False) is True
+        assert is_ignored([outer, inner], "sub/a.txt", False) is False